@@ -1,4 +1,5 @@
 import streamlit as st
+from core.chat_utils import ChatNotice, stream_chat_reply, write_stream
 from core.offer_letter_flow import show_offer_letter_flow
 from purchase_agreement.section1_offer import render_section_1_offer
 from purchase_agreement.section2_agency import render_section_2_agency
@@ -17,6 +18,9 @@ from purchase_agreement.section23_30_overview import render_section23_30_overvie
 from purchase_agreement.section31_expiration import render_section31_expiration
 from purchase_agreement.section_final_review_signatures import render_final_review_signatures
 from purchase_agreement.section_signatures_export import render_signatures_export
+from purchase_agreement.prefetch import prefetch_default_explainers
+from purchase_agreement.navigation import Page, render_pages
+from purchase_agreement.profiler import render_profiler_panel
 
 
 # ==========================================================
@@ -94,6 +98,9 @@ with st.sidebar:
         st.subheader("Settings")
         st.write("Password, email, etc. (coming soon)")
 
+    # Render timings – only with ?admin=<PA_ADMIN_TOKEN>
+    render_profiler_panel()
+
 
 # ==========================================================
 # 🏡 HEADER — BRAND
@@ -125,6 +132,8 @@ with col1:
         st.session_state.current_mode = "purchase_agreement"
         reset_offer_state()
         st.session_state.messages = []
+        # Warm the default section explainers while the buyer reads Section 1
+        prefetch_default_explainers()
 
 with col2:
     if st.button("Should I Buy This Property?", use_container_width=True):
@@ -151,7 +160,7 @@ st.markdown("---")
 # ==========================================================
 # 💬 GENERIC CHAT (for non-offer flows)
 # ==========================================================
-def show_generic_chat():
+def show_generic_chat(mode=None):
     # show history
     for msg in st.session_state.messages:
         with st.chat_message(msg["role"]):
@@ -164,110 +173,103 @@ def show_generic_chat():
         with st.chat_message("user"):
             st.write(user_input)
 
-        # placeholder AI response for now
-        ai_response = "Thanks! I’ll help you shortly. (AI logic coming later)"
-        st.session_state.messages.append({"role": "assistant", "content": ai_response})
+        # stream the reply through the shared client layer (core/chat_utils.py)
         with st.chat_message("assistant"):
-            st.write(ai_response)
+            ai_response = write_stream(stream_chat_reply(mode, st.session_state.messages))
+        # Errors and rate-limit notices are shown once but not kept, so they
+        # are never sent back to the model as something it said
+        if not isinstance(ai_response, ChatNotice):
+            st.session_state.messages.append({"role": "assistant", "content": ai_response})
 
 
 # ==========================================================
-# 🧩 MODE ROUTER — Which flow to show?
+# 📑 PURCHASE AGREEMENT PAGES
 # ==========================================================
-mode = st.session_state.current_mode
+# 1️⃣ Core Deal Terms: Section 1 + Section 3 + Sections 4–5 + Expiration
+def render_core_deal_terms():
+    st.markdown("### Section 1 – Offer")
+    render_section_1_offer()
 
-if mode is None:
-    st.info("Select one of the options above to begin.")
+    st.markdown("---")
+    # st.markdown("### Section 3 – Finance")
+    render_section3_finance()
 
-elif mode == "purchase_agreement":
-    st.subheader("Purchase Agreement – CA RPA Walkthrough (Beta)")
+    st.markdown("---")
+    st.markdown("### Subject to Sale of Buyer's Property")
+    render_section4_sale_of_buyer_property()
 
-    st.markdown(
-        "We’ll guide you through the **core deal terms first** (price, financing, sale of your current home, "
-        "and when your offer expires), then walk through costs, condition, contingencies, and the remaining fine print."
-    )
+    st.markdown("---")
+    st.markdown("### Expiration of Offer")
+    render_section31_expiration()
 
-    # ======================================================
-    # 🧱 TABS – COLLAPSED STRUCTURE
-    # ======================================================
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(
-        [
-            "Core Deal Terms",
-            "Section 2 – Costs",
-            "Section 3 – Condition & Repairs",
-            "Section 4 – Time Period to remove contingencies",
-            "Section 5 – Final Verification",
-            "Other (Agency, Misc & Disclosures)",
-            "Final Review & Export"
-        ]
-    )
 
-    # 1️⃣ Core Deal Terms: Section 1 + Section 3 + Sections 4–5 + Expiration
-    with tab1:
-        st.markdown("### Section 1 – Offer")
-        render_section_1_offer()
+# 6️⃣ Other: Agency, Misc, Disclosures, General Terms
+def render_other_terms():
+    st.markdown("### Section 2 – Agency / Representation")
+    render_section_2_agency()
 
-        st.markdown("---")
-        # st.markdown("### Section 3 – Finance")
-        render_section3_finance()
+    st.markdown("---")
+   # st.markdown("### Section 6 – Other Terms (Optional)")
+    render_section6_other_terms()
 
-        st.markdown("---")
-        st.markdown("### Subject to Sale of Buyer's Property")
-        render_section4_sale_of_buyer_property()
+    st.markdown("---")
+    #st.markdown("### Sections 10–13 – Disclosures Overview")
+    render_section10_13_overview()
 
-        st.markdown("---")
-        st.markdown("### Expiration of Offer")
-        render_section31_expiration()
+    st.markdown("---")
+    #st.markdown("### Sections 16–20 – Repairs, Taxes & Other Details")
+    render_section16_20_info()
 
-    # 2️⃣ Section 7 – Costs
-    with tab2:
-        render_section7_allocation_costs()
+    st.markdown("---")
+    st.markdown("### Sections 21–22 – Remedies & Dispute Resolution")
+    render_section21_22_remedies_disputes()
 
-    # 3️⃣ Section 8 – Condition & Repairs
-    with tab3:
-        render_section8_property_condition()
+    st.markdown("---")
+    #st.markdown("### Sections 23–30 – General Terms & Brokers")
+    render_section23_30_overview()
 
-    # 4️⃣ Section 14 – Contingencies
-    with tab4:
-        render_section14_contingencies()
 
-    # 5️⃣ Section 15 – Final Verification / Time
-    with tab5:
-        render_section15_time_dates()
+# 7️⃣ Final Review + Export in one flow
+def render_final_review_export():
+    st.markdown("### Step 1 – Final Review of Key Terms")
+    render_final_review_signatures()
 
-    # 6️⃣ Other: Agency, Misc, Disclosures, General Terms
-    with tab6:
-        st.markdown("### Section 2 – Agency / Representation")
-        render_section_2_agency()
+    st.markdown("---")
+    st.markdown("### Step 2 – Signatures & Export")
+    render_signatures_export()
 
-        st.markdown("---")
-       # st.markdown("### Section 6 – Other Terms (Optional)")
-        render_section6_other_terms()
 
-        st.markdown("---")
-        #st.markdown("### Sections 10–13 – Disclosures Overview")
-        render_section10_13_overview()
+PURCHASE_AGREEMENT_PAGES = [
+    Page("Core Deal Terms", render_core_deal_terms),
+    Page("Section 2 – Costs", render_section7_allocation_costs),
+    Page("Section 3 – Condition & Repairs", render_section8_property_condition),
+    Page("Section 4 – Time Period to remove contingencies", render_section14_contingencies),
+    Page("Section 5 – Final Verification", render_section15_time_dates),
+    Page("Other (Agency, Misc & Disclosures)", render_other_terms),
+    Page("Final Review & Export", render_final_review_export),
+]
 
-        st.markdown("---")
-        #st.markdown("### Sections 16–20 – Repairs, Taxes & Other Details")
-        render_section16_20_info()
 
-        st.markdown("---")
-        st.markdown("### Sections 21–22 – Remedies & Dispute Resolution")
-        render_section21_22_remedies_disputes()
+# ==========================================================
+# 🧩 MODE ROUTER — Which flow to show?
+# ==========================================================
+mode = st.session_state.current_mode
 
-        st.markdown("---")
-        #st.markdown("### Sections 23–30 – General Terms & Brokers")
-        render_section23_30_overview()
+if mode is None:
+    st.info("Select one of the options above to begin.")
 
-    # 7️⃣ Final Review + Export in one flow
-    with tab7:
-        st.markdown("### Step 1 – Final Review of Key Terms")
-        render_final_review_signatures()
+elif mode == "purchase_agreement":
+    st.subheader("Purchase Agreement – CA RPA Walkthrough (Beta)")
 
-        st.markdown("---")
-        st.markdown("### Step 2 – Signatures & Export")
-        render_signatures_export()
+    st.markdown(
+        "We’ll guide you through the **core deal terms first** (price, financing, sale of your current home, "
+        "and when your offer expires), then walk through costs, condition, contingencies, and the remaining fine print."
+    )
+
+    # ======================================================
+    # 🧱 PAGES – one section at a time (or tabs, see navigation.py)
+    # ======================================================
+    render_pages(PURCHASE_AGREEMENT_PAGES)
 
     # Global disclaimer under the whole mode
     st.markdown(DISCLAIMER_SHORT)
@@ -275,16 +277,16 @@ elif mode == "purchase_agreement":
 elif mode == "eval_property":
     st.subheader("Should I Buy This Property?")
     st.write("Property evaluation chat coming soon. For now, you can chat below.")
-    show_generic_chat()
+    show_generic_chat("eval_property")
 
 elif mode == "education":
     st.subheader("I’m New — Teach Me")
     st.write("Ask anything about homebuying, offers, or California forms. Chat below:")
-    show_generic_chat()
+    show_generic_chat("education")
 
 elif mode == "free_chat":
     st.subheader("Ask Something Else")
-    show_generic_chat()
+    show_generic_chat("free_chat")
 
 else:
     st.warning("Unknown mode. Please pick an option above.")
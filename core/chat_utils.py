@@ -0,0 +1,161 @@
+# core/chat_utils.py
+
+import os
+import time
+from typing import Optional, Dict, List, Iterator
+
+import streamlit as st
+
+from gpt_client import stream as stream_chat
+from purchase_agreement.ai_resilience import AI_FIRST_TOKEN_TIMEOUT_S, CircuitOpenError, call_with_resilience
+from purchase_agreement.model_router import MODEL_DEFAULT, estimate_cost
+from purchase_agreement.rate_limit import RateLimitExceeded, acquire_ai_call, current_session_id, estimate_call_tokens
+from purchase_agreement.settings import env_int
+from purchase_agreement.usage_ledger import estimate_usage, record_call
+
+
+# ------------------------------
+# 1. Settings + prompts
+# ------------------------------
+
+CHAT_MODEL = os.environ.get("GENERIC_CHAT_MODEL", MODEL_DEFAULT)
+CHAT_TEMPERATURE = 0.3
+# Only the most recent messages are sent, so long chats keep a bounded prompt.
+CHAT_HISTORY_MESSAGES = env_int("GENERIC_CHAT_HISTORY_MESSAGES", 12)
+CHAT_MAX_TOKENS = env_int("GENERIC_CHAT_MAX_TOKENS", 800)
+
+STREAM_RENDER_INTERVAL_S = 0.05
+
+BASE_PROMPT = (
+    "You are a friendly, experienced California buyer's real estate agent helping a home buyer. "
+    "Explain clearly, use plain language, and say when something depends on the buyer's "
+    "lender, attorney, or local practice. This is not legal or financial advice."
+)
+
+MODE_PROMPTS: Dict[str, str] = {
+    "eval_property": (
+        "The buyer is deciding whether to buy a specific property. Ask for what you need "
+        "(price, location, condition, HOA, financing) and walk through the pros, cons and risks."
+    ),
+    "education": (
+        "The buyer is new to buying a home. Teach step by step, define jargon the first time "
+        "you use it, and suggest what to learn next."
+    ),
+    "free_chat": "Answer the buyer's question about buying a home in California.",
+}
+
+
+def build_chat_messages(mode: Optional[str], history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    System prompt for the mode plus the last CHAT_HISTORY_MESSAGES turns
+    (history already ends with the new user message).
+    """
+    system = BASE_PROMPT
+    if mode in MODE_PROMPTS:
+        system += "\n\n" + MODE_PROMPTS[mode]
+    recent = [{"role": m["role"], "content": m["content"]} for m in history[-CHAT_HISTORY_MESSAGES:]]
+    return [{"role": "system", "content": system}] + recent
+
+
+# ------------------------------
+# 2. Streaming reply
+# ------------------------------
+
+class ChatNotice(str):
+    """
+    Text shown in the chat that did not come from the model: backend
+    errors and rate-limit notices. Shown to the buyer, never saved to the
+    chat history (it would be sent back to the model as an assistant turn).
+    """
+
+
+def stream_chat_reply(mode: Optional[str], history: List[Dict[str, str]]) -> Iterator[str]:
+    """
+    Stream the assistant's reply for the generic chat modes through the
+    shared client layer (gpt_client.py), with the same rate limits,
+    retries/circuit breaker and usage metering as the section helpers.
+    Problems are yielded as ChatNotice text instead of raised.
+    """
+    messages = build_chat_messages(mode, history)
+    started = time.perf_counter()
+
+    try:
+        acquire_ai_call(estimate_call_tokens(messages))
+    except RateLimitExceeded as e:
+        yield ChatNotice(f"⏳ {e}")
+        return
+
+    def open_stream(timeout: float):
+        chat = stream_chat(
+            messages,
+            model=CHAT_MODEL,
+            temperature=CHAT_TEMPERATURE,
+            max_tokens=CHAT_MAX_TOKENS,
+            timeout=min(timeout, AI_FIRST_TOKEN_TIMEOUT_S),
+        )
+        deltas = iter(chat)
+        try:
+            first = next(deltas, "")
+        except BaseException:
+            # A retried attempt must not keep its connection checked out
+            chat.close()
+            raise
+        return chat, first, deltas
+
+    chat = None
+    parts: List[str] = []
+    try:
+        chat, first, deltas = call_with_resilience(open_stream)
+        if first:
+            parts.append(first)
+            yield first
+        for delta in deltas:
+            parts.append(delta)
+            yield delta
+    except CircuitOpenError:
+        yield ChatNotice(
+            "The AI Realtor is having trouble reaching the AI service right now. Please try again in a minute."
+        )
+    except Exception as e:
+        yield ChatNotice(f"\n\nThere was an error talking to the AI backend. Please try again.\n\nDetails: {e}")
+    finally:
+        # Metered even when the stream is cut short: by the reported usage
+        # once it is complete, otherwise by an estimate of what was sent.
+        if chat is not None:
+            chat.close()
+            result = chat.result
+            usage = result.usage if result is not None else estimate_usage(messages, "".join(parts), CHAT_MODEL)
+            record_call(
+                session_id=current_session_id(),
+                section=None,
+                model=CHAT_MODEL,
+                route=mode or "chat",
+                streamed=True,
+                latency_s=time.perf_counter() - started,
+                ttft_s=result.ttft_s if result is not None else None,
+                cost_usd=estimate_cost(CHAT_MODEL, **usage),
+                **usage,
+            )
+
+
+def write_stream(tokens: Iterator[str]) -> str:
+    """
+    Render streamed text into the current container (redrawn at most every
+    STREAM_RENDER_INTERVAL_S) and return the full text, as a ChatNotice
+    when any part of it was one (the reply is then incomplete or an error).
+    """
+    placeholder = st.empty()
+    parts: List[str] = []
+    notice = False
+    last_render = 0.0
+    for token in tokens:
+        notice = notice or isinstance(token, ChatNotice)
+        parts.append(token)
+        now = time.perf_counter()
+        if now - last_render >= STREAM_RENDER_INTERVAL_S:
+            placeholder.markdown("".join(parts) + " ▌")
+            last_render = now
+
+    text = "".join(parts)
+    placeholder.markdown(text)
+    return ChatNotice(text) if notice else text
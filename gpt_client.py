@@ -0,0 +1,604 @@
+# gpt_client.py
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Dict, Any, Optional, List, Iterator, AsyncIterator, NamedTuple
+
+import httpx
+import streamlit as st
+from openai import AsyncOpenAI, OpenAI
+
+from purchase_agreement.settings import env_float, env_int, percentile
+
+
+# ------------------------------
+# 1. Connection pool settings
+# ------------------------------
+
+# All knobs can be overridden per deployment with environment variables.
+POOL_MAX_CONNECTIONS = env_int("OPENAI_POOL_MAX_CONNECTIONS", 20)
+POOL_MAX_KEEPALIVE = env_int("OPENAI_POOL_MAX_KEEPALIVE", 10)
+POOL_KEEPALIVE_EXPIRY = env_float("OPENAI_POOL_KEEPALIVE_EXPIRY", 90.0)
+CONNECT_TIMEOUT = env_float("OPENAI_CONNECT_TIMEOUT", 5.0)
+READ_TIMEOUT = env_float("OPENAI_READ_TIMEOUT", 60.0)
+
+DEFAULT_MODEL = os.environ.get("OPENAI_DEFAULT_MODEL", "gpt-4.1-mini")
+DEFAULT_TEMPERATURE = 0.3
+
+
+# ------------------------------
+# 2. Pool counters
+# ------------------------------
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, int] = {
+    "client_builds": 0,
+    "client_reuses": 0,
+    "requests": 0,
+    "new_connections": 0,
+    "tls_handshakes": 0,
+}
+
+
+def _bump(name: str, amount: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def _trace_connection(event_name: str, info: Dict[str, Any]) -> None:
+    """
+    httpcore trace hook. Only fires connect/TLS events when the pool has to
+    open a brand-new connection, so it tells us how often keep-alive misses.
+    """
+    if event_name == "connection.connect_tcp.complete":
+        _bump("new_connections")
+    elif event_name == "connection.start_tls.complete":
+        _bump("tls_handshakes")
+
+
+def _on_request(request: httpx.Request) -> None:
+    _bump("requests")
+    request.extensions["trace"] = _trace_connection
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Snapshot of the shared client counters.
+
+    `connection_reuse_rate` is the share of HTTP requests that went out on an
+    already-open keep-alive connection instead of paying a new TCP/TLS setup.
+    """
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_stats)
+
+    requests = stats["requests"]
+    reused = max(requests - stats["new_connections"], 0)
+    stats["reused_connections"] = reused
+    stats["connection_reuse_rate"] = (reused / requests) if requests else 0.0
+    return stats
+
+
+# ------------------------------
+# 3. Shared OpenAI client
+# ------------------------------
+
+_client: Optional[OpenAI] = None
+_client_lock = threading.Lock()
+
+
+def _require_api_key() -> None:
+    """
+    Make sure the API key is configured in Streamlit secrets.
+    No API key will ever be written in code.
+
+    Outside Streamlit (tools/load_test.py, the mock server) an OPENAI_API_KEY
+    environment variable is accepted instead; OPENAI_BASE_URL is honoured by
+    the SDK for pointing at tools/mock_openai_server.py.
+    """
+    if os.environ.get("OPENAI_API_KEY"):
+        return
+
+    try:
+        configured = "OPENAI_API_KEY" in st.secrets
+    except Exception:
+        # No secrets.toml at all (e.g. running a script outside Streamlit)
+        configured = False
+
+    if not configured:
+        raise ValueError(
+            "Missing OPENAI_API_KEY in Streamlit secrets.\n\n"
+            "Go to your Streamlit deployment → Secrets → add:\n"
+            "OPENAI_API_KEY = \"your-key-here\""
+        )
+
+
+def _build_http_client() -> httpx.Client:
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=POOL_MAX_KEEPALIVE,
+            keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        event_hooks={"request": [_on_request]},
+    )
+
+
+def get_shared_client() -> OpenAI:
+    """
+    Return the one OpenAI client for this process.
+
+    The client (and its httpx connection pool) is built lazily on first use
+    and then shared by every Streamlit session and thread, so repeated
+    questions reuse warm keep-alive connections instead of re-doing the
+    TCP + TLS handshake.
+    """
+    global _client
+
+    _require_api_key()
+
+    client = _client
+    if client is not None:
+        _bump("client_reuses")
+        return client
+
+    with _client_lock:
+        if _client is None:
+            # Streamlit automatically exposes secrets as environment variables for OpenAI's SDK.
+            # Retries are handled by purchase_agreement/ai_resilience.py, with
+            # jitter and a shared deadline, so the SDK's own retries are off.
+            _client = OpenAI(http_client=_build_http_client(), max_retries=0)
+            _bump("client_builds")
+        else:
+            _bump("client_reuses")
+        return _client
+
+
+def reset_shared_client() -> None:
+    """
+    Close and drop the shared client (e.g. after rotating the API key).
+    The next call to get_shared_client() builds a fresh pool.
+    """
+    global _client
+
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+# ------------------------------
+# 4. Shared async clients
+# ------------------------------
+
+# httpx.AsyncClient connections belong to the event loop that opened them,
+# so each running loop gets its own async client (and pool).
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+
+
+async def _atrace_connection(event_name: str, info: Dict[str, Any]) -> None:
+    _trace_connection(event_name, info)
+
+
+async def _aon_request(request: httpx.Request) -> None:
+    _bump("requests")
+    request.extensions["trace"] = _atrace_connection
+
+
+def get_shared_async_client() -> AsyncOpenAI:
+    """
+    Return the AsyncOpenAI client for the running event loop, building it
+    (with the same pool limits as the sync client) on first use.
+    """
+    _require_api_key()
+    loop = asyncio.get_running_loop()
+
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is not None:
+            _bump("client_reuses")
+            return client
+        client = AsyncOpenAI(
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                event_hooks={"request": [_aon_request]},
+            ),
+            max_retries=0,
+        )
+        _async_clients[loop] = client
+        _bump("client_builds")
+        return client
+
+
+# ------------------------------
+# 5. Request metrics
+# ------------------------------
+
+REQUEST_SAMPLES = 500
+
+_request_lock = threading.Lock()
+_request_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def _record_request(
+    api: str,
+    latency_s: float,
+    ttft_s: Optional[float] = None,
+    error: bool = False,
+    cached: bool = False,
+    aborted: bool = False,
+) -> None:
+    """
+    `aborted`: a stream closed before it was read to the end. It counts as
+    a call, but its partial latency stays out of the percentiles.
+    """
+    with _request_lock:
+        stats = _request_stats.setdefault(
+            api,
+            {
+                "calls": 0,
+                "errors": 0,
+                "aborted": 0,
+                "cache_hits": 0,
+                "latencies": deque(maxlen=REQUEST_SAMPLES),
+                "ttfts": deque(maxlen=REQUEST_SAMPLES),
+            },
+        )
+        stats["calls"] += 1
+        if error:
+            stats["errors"] += 1
+        if cached:
+            stats["cache_hits"] += 1
+            return
+        if aborted:
+            stats["aborted"] += 1
+            if ttft_s is not None:
+                stats["ttfts"].append(ttft_s)
+            return
+        stats["latencies"].append(latency_s)
+        if ttft_s is not None:
+            stats["ttfts"].append(ttft_s)
+
+
+def get_request_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Calls, errors, cache hits and upstream latency per API flavour
+    ("sync", "async", "stream", "async_stream").
+    """
+    with _request_lock:
+        snapshot = {
+            api: dict(stats, latencies=list(stats["latencies"]), ttfts=list(stats["ttfts"]))
+            for api, stats in _request_stats.items()
+        }
+
+    report = {}
+    for api, stats in snapshot.items():
+        report[api] = {
+            "calls": stats["calls"],
+            "errors": stats["errors"],
+            "aborted": stats["aborted"],
+            "cache_hits": stats["cache_hits"],
+            "latency_p50_s": percentile(stats["latencies"], 50),
+            "latency_p95_s": percentile(stats["latencies"], 95),
+            "ttft_p50_s": percentile(stats["ttfts"], 50),
+            "ttft_p95_s": percentile(stats["ttfts"], 95),
+        }
+    return report
+
+
+# ------------------------------
+# 6. Request API (sync / async / streaming)
+# ------------------------------
+
+class ChatResult(NamedTuple):
+    text: str
+    model: str
+    usage: Dict[str, int]          # prompt_tokens, cached_tokens, completion_tokens
+    latency_s: float
+    ttft_s: Optional[float] = None
+    cached: bool = False
+
+
+def usage_tokens(usage: Any) -> Dict[str, int]:
+    """
+    Pull prompt / cached / completion token counts out of an OpenAI usage
+    object. cached_tokens is how much of the prompt the provider served
+    from its prompt cache.
+    """
+    if usage is None:
+        return {"prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "cached_tokens": (getattr(details, "cached_tokens", 0) or 0) if details else 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+    }
+
+
+def _request_kwargs(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    timeout: Optional[float],
+    max_tokens: Optional[int],
+) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "timeout": timeout if timeout is not None else READ_TIMEOUT,
+    }
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    return kwargs
+
+
+def _cached_result(cache: Any, cache_key: Optional[str], model: str) -> Optional[ChatResult]:
+    """
+    Caching hook: `cache` is any object with get(key) / set(key, text), such
+    as purchase_agreement.ai_cache.ResponseCache; the caller owns the key.
+    """
+    if cache is None or cache_key is None:
+        return None
+    text = cache.get(cache_key)
+    if text is None:
+        return None
+    return ChatResult(text, model, usage_tokens(None), 0.0, cached=True)
+
+
+def complete(
+    messages: List[Dict[str, str]],
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    timeout: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    cache: Optional[Any] = None,
+    cache_key: Optional[str] = None,
+) -> ChatResult:
+    """
+    One blocking chat completion on the shared pooled client.
+    Errors propagate; retries and deadlines are the caller's policy.
+    """
+    cached = _cached_result(cache, cache_key, model)
+    if cached is not None:
+        _record_request("sync", 0.0, cached=True)
+        return cached
+
+    client = get_shared_client()
+    started = time.perf_counter()
+    try:
+        response = client.chat.completions.create(**_request_kwargs(messages, model, temperature, timeout, max_tokens))
+    except Exception:
+        _record_request("sync", time.perf_counter() - started, error=True)
+        raise
+
+    latency = time.perf_counter() - started
+    _record_request("sync", latency)
+    result = ChatResult(response.choices[0].message.content or "", model, usage_tokens(response.usage), latency)
+    if cache is not None and cache_key is not None and result.text:
+        cache.set(cache_key, result.text)
+    return result
+
+
+async def acomplete(
+    messages: List[Dict[str, str]],
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    timeout: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    cache: Optional[Any] = None,
+    cache_key: Optional[str] = None,
+) -> ChatResult:
+    """
+    asyncio version of complete(), on the running loop's shared client.
+    The cache hook is called synchronously (local lookups only).
+    """
+    cached = _cached_result(cache, cache_key, model)
+    if cached is not None:
+        _record_request("async", 0.0, cached=True)
+        return cached
+
+    client = get_shared_async_client()
+    started = time.perf_counter()
+    try:
+        response = await client.chat.completions.create(
+            **_request_kwargs(messages, model, temperature, timeout, max_tokens)
+        )
+    except Exception:
+        _record_request("async", time.perf_counter() - started, error=True)
+        raise
+
+    latency = time.perf_counter() - started
+    _record_request("async", latency)
+    result = ChatResult(response.choices[0].message.content or "", model, usage_tokens(response.usage), latency)
+    if cache is not None and cache_key is not None and result.text:
+        cache.set(cache_key, result.text)
+    return result
+
+
+def complete_many(
+    requests: List[Dict[str, Any]],
+    concurrency: int = 8,
+) -> List[Any]:
+    """
+    Run several acomplete() calls concurrently from synchronous code (e.g.
+    a Streamlit script or a build tool). Each request is a dict of
+    acomplete() keyword arguments. Returns ChatResults in order, or the
+    exception for requests that failed.
+    """
+    async def run() -> List[Any]:
+        limit = asyncio.Semaphore(max(1, concurrency))
+
+        async def one(kwargs: Dict[str, Any]) -> ChatResult:
+            async with limit:
+                return await acomplete(**kwargs)
+
+        try:
+            return await asyncio.gather(*(one(r) for r in requests), return_exceptions=True)
+        finally:
+            client = _async_clients.pop(asyncio.get_running_loop(), None)
+            if client is not None:
+                await client.close()
+
+    return asyncio.run(run())
+
+
+class ChatStream:
+    """
+    Iterate to get text deltas as they arrive. Once the stream is exhausted,
+    `result` holds the full text, token usage, latency and time to first token.
+
+    close() hands the pooled HTTP connection back right away. It runs when
+    iteration ends for any reason, including a consumer that stops reading
+    early, and callers that may never start or finish iterating should call
+    it themselves. A stream closed before its end is recorded as aborted.
+    """
+
+    def __init__(self, api: str, model: str, chunks: Any, started: float):
+        self.result: Optional[ChatResult] = None
+        self._api = api
+        self._model = model
+        self._chunks = chunks
+        self._started = started
+        self._parts: List[str] = []
+        self._usage: Any = None
+        self._ttft: Optional[float] = None
+        self._recorded = False
+
+    def _take(self, chunk: Any) -> Optional[str]:
+        if getattr(chunk, "usage", None) is not None:
+            self._usage = chunk.usage
+        if not chunk.choices:
+            return None
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            return None
+        if self._ttft is None:
+            self._ttft = time.perf_counter() - self._started
+        self._parts.append(delta)
+        return delta
+
+    def _finish(self, error: bool = False, aborted: bool = False) -> None:
+        if self._recorded:
+            return
+        self._recorded = True
+        latency = time.perf_counter() - self._started
+        _record_request(self._api, latency, ttft_s=self._ttft, error=error, aborted=aborted)
+        if not error and not aborted:
+            self.result = ChatResult(
+                "".join(self._parts), self._model, usage_tokens(self._usage), latency, ttft_s=self._ttft
+            )
+
+    def close(self) -> None:
+        self._finish(aborted=True)
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for chunk in self._chunks:
+                delta = self._take(chunk)
+                if delta:
+                    yield delta
+        except Exception:
+            self._finish(error=True)
+            raise
+        else:
+            self._finish()
+        finally:
+            self.close()
+
+
+class AsyncChatStream(ChatStream):
+    """
+    `async for` version of ChatStream; aclose() is the async close().
+    """
+
+    async def aclose(self) -> None:
+        self._finish(aborted=True)
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            await close()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            async for chunk in self._chunks:
+                delta = self._take(chunk)
+                if delta:
+                    yield delta
+        except Exception:
+            self._finish(error=True)
+            raise
+        else:
+            self._finish()
+        finally:
+            await self.aclose()
+
+
+def _stream_kwargs(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    timeout: Optional[float],
+    max_tokens: Optional[int],
+) -> Dict[str, Any]:
+    kwargs = _request_kwargs(messages, model, temperature, timeout, max_tokens)
+    kwargs["stream"] = True
+    # Final chunk carries token usage, including cached prompt tokens
+    kwargs["stream_options"] = {"include_usage": True}
+    return kwargs
+
+
+def stream(
+    messages: List[Dict[str, str]],
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    timeout: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+) -> ChatStream:
+    """
+    Open a streaming chat completion. The request is sent (and connection
+    or HTTP errors raised) here; text arrives by iterating the result.
+    `timeout` bounds the wait for the response to start.
+    """
+    client = get_shared_client()
+    started = time.perf_counter()
+    try:
+        chunks = client.chat.completions.create(**_stream_kwargs(messages, model, temperature, timeout, max_tokens))
+    except Exception:
+        _record_request("stream", time.perf_counter() - started, error=True)
+        raise
+    return ChatStream("stream", model, chunks, started)
+
+
+async def astream(
+    messages: List[Dict[str, str]],
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    timeout: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+) -> AsyncChatStream:
+    """
+    asyncio version of stream(): `async for text in await astream(...)`.
+    """
+    client = get_shared_async_client()
+    started = time.perf_counter()
+    try:
+        chunks = await client.chat.completions.create(
+            **_stream_kwargs(messages, model, temperature, timeout, max_tokens)
+        )
+    except Exception:
+        _record_request("async_stream", time.perf_counter() - started, error=True)
+        raise
+    return AsyncChatStream("async_stream", model, chunks, started)
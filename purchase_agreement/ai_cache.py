@@ -0,0 +1,276 @@
+# purchase_agreement/ai_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+from purchase_agreement.settings import env_flag, env_float, env_int
+
+
+# ------------------------------
+# 1. Settings
+# ------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = Path(os.environ.get("AI_CACHE_DIR", PROJECT_ROOT / ".cache"))
+
+CACHE_ENABLED = env_flag("AI_CACHE_ENABLED")
+CACHE_TTL_SECONDS = env_float("AI_CACHE_TTL_SECONDS", 7 * 24 * 3600)
+CACHE_MAX_ENTRIES = env_int("AI_CACHE_MAX_ENTRIES", 5000)
+CACHE_MAX_BYTES = env_int("AI_CACHE_MAX_BYTES", 50 * 1024 * 1024)
+MEMORY_MAX_ENTRIES = env_int("AI_CACHE_MEMORY_ENTRIES", 256)
+
+
+# ------------------------------
+# 2. Cache key
+# ------------------------------
+
+def make_cache_key(
+    model: str,
+    temperature: float,
+    messages: List[Dict[str, str]],
+    prefix_digest: Optional[str] = None,
+) -> str:
+    """
+    Stable hash of everything that determines the answer:
+    model, temperature, all system messages and the user prompt.
+
+    With `prefix_digest`, messages[0] is the compiled static prefix (see
+    prompt_compiler.py) and is represented by its digest instead of its text.
+    """
+    if prefix_digest is not None:
+        messages = [{"role": "system", "sha256": prefix_digest}] + list(messages[1:])
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "messages": messages},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ------------------------------
+# 3. Two-level cache (memory LRU → SQLite)
+# ------------------------------
+
+class ResponseCache:
+    """
+    In-memory LRU in front of a local SQLite store.
+
+    - Entries expire after `ttl_seconds`.
+    - The disk store is trimmed (least recently used first) whenever it grows
+      past `max_entries` rows or `max_bytes` of answer text.
+    - Hit/miss counters are kept per section id.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        ttl_seconds: float = CACHE_TTL_SECONDS,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+        memory_entries: int = MEMORY_MAX_ENTRIES,
+    ):
+        self.db_path = Path(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                section TEXT,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)"
+        )
+        self._conn.commit()
+
+    # ---- stats ----
+
+    def _count(self, section: Optional[str], name: str) -> None:
+        bucket = self._stats.setdefault(
+            section or "general",
+            {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0},
+        )
+        bucket[name] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-section counters plus hit rate.
+        """
+        with self._lock:
+            snapshot = {section: dict(values) for section, values in self._stats.items()}
+
+        for values in snapshot.values():
+            lookups = values["hits"] + values["misses"]
+            values["hit_rate"] = (values["hits"] / lookups) if lookups else 0.0
+        return snapshot
+
+    # ---- memory layer ----
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    # ---- public API ----
+
+    def get(self, key: str, section: Optional[str] = None) -> Optional[str]:
+        now = time.time()
+
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                value, expires_at = cached
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._count(section, "hits")
+                    self._count(section, "memory_hits")
+                    return value
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is None or row[1] + self.ttl_seconds <= now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self._count(section, "misses")
+                return None
+
+            value, created_at = row
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                (now, key),
+            )
+            self._conn.commit()
+            self._remember(key, value, created_at + self.ttl_seconds)
+            self._count(section, "hits")
+            self._count(section, "disk_hits")
+            return value
+
+    def peek(self, key: str) -> Optional[str]:
+        """
+        Memory-only lookup that leaves stats and LRU order alone. Used to
+        re-check right before an upstream call, since set() always writes
+        the memory layer.
+        """
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and cached[1] > time.time():
+                return cached[0]
+        return None
+
+    def set(self, key: str, value: str, section: Optional[str] = None) -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+
+        with self._lock:
+            self._remember(key, value, now + self.ttl_seconds)
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses (key, section, value, size, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, section, value, size, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+            self._count(section, "stores")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    # ---- eviction ----
+
+    def _evict(self, now: float) -> None:
+        """
+        Drop expired rows, then least-recently-used rows until the store is
+        back under both the row and byte limits. Caller holds the lock.
+        """
+        self._conn.execute(
+            "DELETE FROM responses WHERE created_at <= ?",
+            (now - self.ttl_seconds,),
+        )
+
+        count, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        doomed = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access ASC"
+        ):
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total_bytes -= size
+
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        for (key,) in doomed:
+            self._memory.pop(key, None)
+
+
+# ------------------------------
+# 4. Process-wide instance
+# ------------------------------
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Shared cache for the whole process, or None if caching is turned off
+    (AI_CACHE_ENABLED=0) or the store can't be opened.
+    """
+    global _cache
+
+    if not CACHE_ENABLED:
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = ResponseCache(CACHE_DIR / "ai_responses.sqlite3")
+                except (OSError, sqlite3.Error):
+                    return None
+    return _cache
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    cache = get_response_cache()
+    return cache.stats() if cache is not None else {}
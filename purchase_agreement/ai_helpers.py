@@ -1,13 +1,43 @@
 # purchase_agreement/ai_helpers.py
 
-from pathlib import Path
-from functools import lru_cache
-import json
-from typing import Optional, Dict, Any
+from collections import deque
+import itertools
+import math
+import threading
+import time
+from typing import Optional, Dict, Any, List, Iterator
 
 import streamlit as st
 from openai import OpenAI
 
+from gpt_client import complete as complete_chat, get_shared_client, stream as stream_chat
+from purchase_agreement.ai_cache import get_response_cache, make_cache_key
+from purchase_agreement.answer_pack import get_packed_answer
+from purchase_agreement.ai_resilience import AI_FIRST_TOKEN_TIMEOUT_S, CircuitOpenError, call_with_resilience
+from purchase_agreement.explainers import SECTION_EXPLAINERS, SECTION_FALLBACKS, explainer_request
+from purchase_agreement.faq_cache import faq_scope, get_faq_cache
+from purchase_agreement.model_router import Route, estimate_cost, glossary_answer, record_route, route_question
+from purchase_agreement.knowledge_index import (
+    KnowledgeIndex,
+    get_knowledge_index,
+    get_knowledge_store,
+    get_knowledge_version,
+    retrieve_knowledge,
+)
+from purchase_agreement.prompt_compiler import CompiledPrefix, compile_prefix
+from purchase_agreement.prompt_context import build_section_context, record_prompt_size
+from purchase_agreement.profiler import profiled
+from purchase_agreement.rate_limit import (
+    RateLimitExceeded,
+    acquire_ai_call,
+    current_session_id,
+    estimate_call_tokens,
+    release_ai_call,
+)
+from purchase_agreement.settings import env_float, env_int, percentile
+from purchase_agreement.usage_ledger import estimate_usage, record_call
+from purchase_agreement.single_flight import SingleFlight
+
 
 # ------------------------------
 # 1. Load OpenAI client securely
@@ -15,82 +45,435 @@ from openai import OpenAI
 
 def get_openai_client() -> OpenAI:
     """
-    Securely load the OpenAI client using ONLY st.secrets.
-    No API key will ever be written in code.
+    Return the process-wide pooled OpenAI client (see gpt_client.py).
+    The API key is loaded ONLY from st.secrets; no key is ever written in code.
     """
-    if "OPENAI_API_KEY" not in st.secrets:
-        raise ValueError(
-            "Missing OPENAI_API_KEY in Streamlit secrets.\n\n"
-            "Go to your Streamlit deployment → Secrets → add:\n"
-            "OPENAI_API_KEY = \"your-key-here\""
-        )
-
-    # Streamlit automatically exposes secrets as environment variables for OpenAI's SDK.
-    return OpenAI()
+    return get_shared_client()
 
 
 # ------------------------------
 # 2. Load your Knowledge Base
 # ------------------------------
 
-@lru_cache(maxsize=1)
 def load_knowledge_text() -> str:
     """
-    Load Knowledge/content.md as a single string.
+    The current text of every knowledge file as a single string. Edits on
+    disk are picked up without a restart (see KnowledgeStore).
     """
-    this_file = Path(__file__).resolve()
-    project_root = this_file.parent.parent  # go from /purchase_agreement → project root
-    knowledge_path = project_root / "Knowledge" / "content.md"
-
-    if knowledge_path.exists():
-        return knowledge_path.read_text(encoding="utf-8")
-
-    return ""
+    return get_knowledge_store().text()
 
 
 # ------------------------------
-# 3. Helper to build section context
+# 3. Message assembly
 # ------------------------------
 
-def _build_section_context(
+AI_TEMPERATURE = 0.3
+
+# Knowledge bases up to this size go into the static prefix in full, where the
+# provider's prompt cache makes them cheap; bigger ones switch to retrieval.
+KNOWLEDGE_STATIC_MAX_TOKENS = env_int("KNOWLEDGE_STATIC_MAX_TOKENS", 6000)
+
+PERSONA_PROMPT = """
+You are an experienced California residential real estate agent and transaction coordinator.
+You help buyers correctly understand and fill out the California Residential Purchase Agreement (CAR RPA).
+
+You do NOT give legal advice, tax advice, or binding lending approvals.
+Always recommend confirming details with a licensed real estate agent, lender, and/or California real estate attorney.
+
+Later system messages may tell you which section the buyer is working on, give section-specific
+instructions, excerpts from an internal knowledge base, and the buyer's current entries.
+Never say the knowledge base is a file; simply use the info when helpful, especially for examples and explanations.
+""".strip()
+
+
+def _knowledge_in_prefix(index: Optional[KnowledgeIndex] = None) -> bool:
+    index = index or get_knowledge_index()
+    return 0 < index.total_tokens <= KNOWLEDGE_STATIC_MAX_TOKENS
+
+
+def _static_system_prompt(index: Optional[KnowledgeIndex] = None) -> CompiledPrefix:
+    """
+    The part of the prompt that is byte-identical for every call, every
+    section and every user: persona, standing instructions and (for a small
+    knowledge base) the whole knowledge text.
+
+    Compiled once per knowledge version and shared (prompt_compiler.py).
+    """
+    index = index or get_knowledge_index()
+    if not _knowledge_in_prefix(index):
+        return compile_prefix(PERSONA_PROMPT, index.content_hash)
+    return compile_prefix(PERSONA_PROMPT, index.content_hash, [chunk["text"] for chunk in index.chunks])
+
+
+def _cache_key(model: str, messages: List[Dict[str, str]]) -> str:
+    """
+    Response cache key; the compiled prefix is keyed by its digest.
+    """
+    prefix = _static_system_prompt()
+    digest = prefix.digest if messages and messages[0] is prefix.message else None
+    return make_cache_key(model, AI_TEMPERATURE, messages, prefix_digest=digest)
+
+
+def _build_messages(
+    user_prompt: str,
     section: Optional[str],
     section_state: Optional[Dict[str, Any]],
-) -> str:
+    system_override: Optional[str],
+    model: str = "gpt-4.1-mini",
+    history: Optional[List[Dict[str, str]]] = None,
+) -> List[Dict[str, str]]:
     """
-    Turn section id + section_state into a short context string for the model.
+    Build the chat messages shared by the blocking and streaming helpers.
+
+    Messages are ordered from most to least shareable so the provider's
+    prompt cache can reuse the longest possible prefix:
+
+    1. static prompt – identical for every call (see _static_system_prompt)
+    2. section id + system_override – identical for everyone in a section
+    3. retrieved knowledge excerpts – depend on the question
+    4. section_state – depends on this user's entries
+    5. earlier turns of this section's conversation (see conversations.py)
+    6. the user question
+
+    The knowledge index is read once per call: a hot reload in between
+    could otherwise put the same knowledge in both the prefix and the
+    excerpts, or in neither.
     """
-    if not section and not section_state:
-        return ""
+    index = get_knowledge_index()
+    prefix = _static_system_prompt(index)
+    messages = [prefix.message]
 
-    parts = []
+    # Section-level instructions (e.g. the default explainer for the section)
+    section_parts = []
     if section:
-        parts.append(f"This conversation is about Section {section} of the CAR RPA.")
+        section_parts.append(f"This conversation is about Section {section} of the CAR RPA.")
+    if system_override:
+        section_parts.append(system_override.strip())
+    if section_parts:
+        messages.append({"role": "system", "content": "\n\n".join(section_parts)})
+
+    # Only the knowledge-base chunks relevant to this question, when the
+    # knowledge base is too big to live in the static prefix
+    if not _knowledge_in_prefix(index):
+        # A follow-up ("and if it doesn't appraise?") is retrieved together
+        # with the question it follows up on
+        query = user_prompt
+        earlier_questions = [m["content"] for m in history or () if m["role"] == "user"]
+        if earlier_questions:
+            query = f"{earlier_questions[-1]}\n{user_prompt}"
+        knowledge_text = retrieve_knowledge(query, section=section, index=index)["text"]
+        if knowledge_text:
+            messages.append(
+                {
+                    "role": "system",
+                    "content": "Relevant knowledge base excerpts:\n\n" + knowledge_text,
+                }
+            )
+
+    # User-specific structured data goes last among the system messages,
+    # trimmed to the model's token budget (see prompt_context.py)
+    section_context = build_section_context(section, section_state, model=model)
+    if section_context:
+        messages.append(
+            {
+                "role": "system",
+                "content": section_context,
+            }
+        )
 
-    if section_state:
-        try:
-            state_json = json.dumps(section_state, indent=2, default=str)
-        except Exception:
-            state_json = str(section_state)
-
-        parts.append(
-            "Here is the current structured data for this section of the offer. "
-            "Use it only as context to tailor your explanation; do not just repeat it verbatim:\n"
-            + state_json
+    # The bounded conversation window (rolling summary + recent turns)
+    if history:
+        messages.extend(history)
+
+    # Finally, the actual user question
+    messages.append(
+        {"role": "user", "content": user_prompt.strip()}
+    )
+
+    return messages
+
+
+def _record_sent_prompt(
+    messages: List[Dict[str, str]],
+    model: str,
+    section: Optional[str],
+    section_state: Optional[Dict[str, Any]],
+) -> None:
+    """
+    Prompt-size stats, only for prompts actually sent upstream (not the ones
+    built for a cache key or a fallback lookup).
+    """
+    prefix = _static_system_prompt()
+    prefix_tokens = prefix.tokens(model) if messages and messages[0] is prefix.message else None
+    record_prompt_size(messages, model=model, prefix_tokens=prefix_tokens, section=section, section_state=section_state)
+
+
+def request_cache_key(
+    user_prompt: str,
+    section: Optional[str] = None,
+    section_state: Optional[Dict[str, Any]] = None,
+    system_override: Optional[str] = None,
+    model: Optional[str] = None,
+) -> Optional[str]:
+    """
+    The cache key the helpers below would use for this request (after
+    routing), or None for locally answered glossary questions. Changes
+    whenever the prompt, knowledge in the prompt, model or temperature do.
+    """
+    route = route_question(user_prompt, section, section_state, system_override, model=model)
+    if route.model is None:
+        return None
+    messages = _build_messages(user_prompt, section, section_state, system_override, model=route.model)
+    return _cache_key(route.model, messages)
+
+
+BACKEND_ERROR_PREFIX = "There was an error talking to the AI backend."
+
+
+def _backend_error_text(e: Exception) -> str:
+    # Friendly error string so the UI can display it
+    return (
+        f"{BACKEND_ERROR_PREFIX} "
+        "Please try again, or check your API key / network.\n\n"
+        f"Technical details: {e}"
+    )
+
+
+SERVICE_UNAVAILABLE_TEXT = (
+    "The AI Realtor is getting too many errors from the AI service right now, "
+    "so we paused new requests for a moment. Please try again in a minute, or use "
+    "\"Connect with a Human Realtor\" if you need help sooner."
+)
+
+
+def _fallback_answer(section: Optional[str]) -> str:
+    """
+    Answer served while the circuit breaker is open: the section's default
+    explainer from the answer pack or the response cache when there is one,
+    else its canned overview, else just the notice.
+    """
+    overview = SECTION_FALLBACKS.get(section)
+    if section in SECTION_EXPLAINERS:
+        request = explainer_request(section)
+        model = route_question(request["user_prompt"], section, None, request["system_override"]).model
+        messages = _build_messages(request["user_prompt"], section, None, request["system_override"], model=model)
+        cache_key = _cache_key(model, messages)
+        cache = get_response_cache()
+        explainer = get_packed_answer(cache_key)
+        if explainer is None and cache is not None:
+            explainer = cache.get(cache_key, section=section)
+        overview = explainer or overview
+    if overview is None:
+        return SERVICE_UNAVAILABLE_TEXT
+    return (
+        SERVICE_UNAVAILABLE_TEXT
+        + "\n\nIn the meantime, here is a general overview of this section:\n\n"
+        + overview
+    )
+
+
+# ------------------------------
+# 4. Latency + prompt-cache tracking (per section)
+# ------------------------------
+
+LATENCY_SAMPLES_PER_SECTION = 500
+
+_latency_lock = threading.Lock()
+_latency: Dict[str, deque] = {}
+
+
+def _record_latency(
+    section: Optional[str],
+    ttft_s: Optional[float],
+    total_s: float,
+    source: str,
+) -> None:
+    with _latency_lock:
+        samples = _latency.setdefault(
+            section or "general",
+            deque(maxlen=LATENCY_SAMPLES_PER_SECTION),
         )
+        samples.append({"ttft_s": ttft_s, "total_s": total_s, "source": source})
+
+
+def get_ai_latency_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Time-to-first-token and total latency per section (seconds),
+    over the most recent LATENCY_SAMPLES_PER_SECTION answers.
+    """
+    with _latency_lock:
+        snapshot = {section: list(samples) for section, samples in _latency.items()}
+
+    report = {}
+    for section, samples in snapshot.items():
+        ttfts = [s["ttft_s"] for s in samples if s["ttft_s"] is not None]
+        totals = [s["total_s"] for s in samples]
+        report[section] = {
+            "count": len(samples),
+            "cache_served": sum(1 for s in samples if s["source"] == "cache"),
+            "coalesced": sum(1 for s in samples if s["source"] == "coalesced"),
+            "faq_served": sum(1 for s in samples if s["source"] == "faq"),
+            "pack_served": sum(1 for s in samples if s["source"] == "pack"),
+            "ttft_p50_s": percentile(ttfts, 50),
+            "ttft_p95_s": percentile(ttfts, 95),
+            "total_p50_s": percentile(totals, 50),
+            "total_p95_s": percentile(totals, 95),
+        }
+    return report
+
+
+_usage_lock = threading.Lock()
+_usage: Dict[str, Dict[str, int]] = {}
+
+
+def _record_usage(section: Optional[str], tokens: Dict[str, int]) -> Dict[str, int]:
+    """
+    `tokens` is ChatResult.usage from gpt_client: prompt / cached /
+    completion token counts, where cached_tokens is how much of the prompt
+    the provider served from its prompt cache.
+    """
+    with _usage_lock:
+        totals = _usage.setdefault(
+            section or "general",
+            {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0},
+        )
+        totals["calls"] += 1
+        for name, value in tokens.items():
+            totals[name] += value
+    return tokens
+
 
-    return "\n\n".join(parts)
+def get_prompt_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Provider-side prompt caching per section: how many prompt tokens were
+    sent and how many of them were billed/served as cached.
+    """
+    with _usage_lock:
+        report = {section: dict(totals) for section, totals in _usage.items()}
+
+    for totals in report.values():
+        prompt_tokens = totals["prompt_tokens"]
+        totals["cached_ratio"] = (totals["cached_tokens"] / prompt_tokens) if prompt_tokens else 0.0
+    return report
 
 
 # ------------------------------
-# 4. Main AI Helper
+# 5. Main AI Helper
 # ------------------------------
 
+# Identical requests (same cache key) in flight at the same time share one
+# upstream call; see single_flight.py.
+_flights = SingleFlight()
+
+
+def get_coalescing_stats() -> Dict[str, Any]:
+    """
+    How many AI requests were answered by joining an identical in-flight call.
+    """
+    return _flights.get_stats()
+
+
+def _faq_scope_for(
+    section: Optional[str],
+    section_state: Optional[Dict[str, Any]],
+    system_override: Optional[str],
+    model: str,
+    history: Optional[List[Dict[str, str]]] = None,
+) -> Optional[str]:
+    """
+    Near-duplicate matching only applies to shareable prompts: answers that
+    depend on the buyer's own section_state or earlier turns are never reused.
+    """
+    if section_state or history or get_faq_cache() is None:
+        return None
+    return faq_scope(section, model, system_override, get_knowledge_version())
+
+
+def _faq_lookup(cache: Any, scope: str, user_prompt: str, section: Optional[str]) -> Optional[str]:
+    faq = get_faq_cache()
+    match = faq.find(scope, user_prompt) if faq is not None else None
+    if match is None or not match["served"]:
+        return None
+
+    answer = cache.get(match["cache_key"], section=section)
+    if answer is None:
+        faq.forget(match["entry_id"])
+    return answer
+
+
+def _store_answer(
+    cache: Any,
+    cache_key: str,
+    answer: str,
+    section: Optional[str],
+    scope: Optional[str],
+    user_prompt: str,
+) -> None:
+    cache.set(cache_key, answer, section=section)
+    faq = get_faq_cache()
+    if scope is not None and faq is not None:
+        faq.add(scope, user_prompt, cache_key)
+
+
+def _meter_call(
+    section: Optional[str],
+    route: Route,
+    started: float,
+    ttft: Optional[float],
+    tokens: Dict[str, int],
+    streamed: bool,
+) -> float:
+    """
+    Price one upstream call and append it to the usage ledger; returns the cost.
+    """
+    cost_usd = estimate_cost(route.model, **tokens)
+    record_call(
+        session_id=current_session_id(),
+        section=section,
+        model=route.model,
+        route=route.name,
+        streamed=streamed,
+        latency_s=time.perf_counter() - started,
+        ttft_s=ttft,
+        cost_usd=cost_usd,
+        **tokens,
+    )
+    return cost_usd
+
+
+def _record_served(
+    section: Optional[str],
+    route: Route,
+    started: float,
+    source: str,
+    ttft: Optional[float] = None,
+    tokens: Optional[Dict[str, int]] = None,
+    streamed: bool = False,
+) -> None:
+    """
+    Latency per section and per route. Answers served in one piece while
+    streaming count their total time as time-to-first-token.
+
+    Upstream calls (`tokens` given) are priced and appended to the usage ledger.
+    """
+    total = time.perf_counter() - started
+    cost_usd = _meter_call(section, route, started, ttft, tokens, streamed) if tokens is not None else 0.0
+
+    if streamed and ttft is None:
+        ttft = total
+    _record_latency(section, ttft, total, source)
+    record_route(route, total, cost_usd)
+
+
+@profiled(kind="ai")
 def call_purchase_agreement_ai(
     user_prompt: str,
     section: str = "7",
     section_state: Optional[Dict[str, Any]] = None,
     system_override: Optional[str] = None,
-    model: str = "gpt-4.1-mini",
+    model: Optional[str] = None,
+    use_cache: bool = True,
+    history: Optional[List[Dict[str, str]]] = None,
 ) -> str:
     """
     Main function all sections will use.
@@ -101,71 +484,297 @@ def call_purchase_agreement_ai(
     - Optionally adds:
         * section_state as structured context
         * system_override as extra system instructions (e.g. default explainer text)
+        * history: earlier turns of the section's conversation, already
+          bounded by conversations.py
+    - Serves default section explainers from the prebuilt answer pack
+      (answer_pack.py) with no API call while its prompt still matches.
+    - Serves repeated questions from the shared response cache, including
+      paraphrases of an earlier question in the same section (faq_cache.py).
+      Pass use_cache=False when the prompt embeds user-specific section_state.
+    - Coalesces identical concurrent requests into one upstream call.
+    - Retries transient errors with jittered backoff within a deadline, and
+      serves a fallback answer while the circuit breaker is open
+      (see ai_resilience.py).
+    - Enforces per-session and global rate limits before any upstream call;
+      raises RateLimitExceeded (with retry_after) when a bucket is empty.
+      The session is charged before joining an identical in-flight call,
+      so only a global limit is ever shared with other callers, and is
+      refunded when the global limit turns the call away.
+    - Picks the model per question (model_router.py) unless `model` is given;
+      glossary questions are answered locally without an API call.
     - Returns the GPT answer as plain text
     """
+    started = time.perf_counter()
+    route = route_question(user_prompt, section, section_state, system_override, model=model)
+    if route.model is None:
+        answer = glossary_answer(user_prompt)
+        _record_served(section, route, started, "glossary")
+        return answer
+    model = route.model
+
+    messages = _build_messages(user_prompt, section, section_state, system_override, model=model, history=history)
+    cache_key = _cache_key(model, messages)
+
+    packed_answer = get_packed_answer(cache_key) if use_cache else None
+    if packed_answer is not None:
+        _record_served(section, route, started, "pack")
+        return packed_answer
+
+    cache = get_response_cache() if use_cache else None
+    if cache is not None:
+        cached_answer = cache.get(cache_key, section=section)
+        if cached_answer is not None:
+            _record_served(section, route, started, "cache")
+            return cached_answer
+
+    scope = _faq_scope_for(section, section_state, system_override, model, history) if cache is not None else None
+    if scope is not None:
+        faq_answer = _faq_lookup(cache, scope, user_prompt, section)
+        if faq_answer is not None:
+            _record_served(section, route, started, "faq")
+            return faq_answer
+
+    estimated_tokens = estimate_call_tokens(messages)
+    acquire_ai_call(estimated_tokens, scope="session")
+
+    api_tokens = None
+
+    def fetch() -> str:
+        nonlocal api_tokens
+
+        # A previous leader may have stored the answer after our cache check.
+        if cache is not None:
+            cached_answer = cache.peek(cache_key)
+            if cached_answer is not None:
+                return cached_answer
+
+        acquire_ai_call(estimated_tokens, scope="global")
+        # Fails fast, outside the retry loop, when no API key is configured
+        get_openai_client()
+        _record_sent_prompt(messages, model, section, section_state)
 
-    client = get_openai_client()
-    knowledge_text = load_knowledge_text()
+        try:
+            result = call_with_resilience(
+                lambda timeout: complete_chat(messages, model=model, temperature=AI_TEMPERATURE, timeout=timeout)
+            )
+            answer = result.text
+            api_tokens = _record_usage(section, result.usage)
+            if cache is not None and answer:
+                _store_answer(cache, cache_key, answer, section, scope, user_prompt)
+            return answer
+        except CircuitOpenError:
+            return _fallback_answer(section)
+        except Exception as e:
+            return _backend_error_text(e)
 
-    # Base persona for AI Realtor
-    base_system_prompt = f"""
-You are an experienced California residential real estate agent and transaction coordinator.
-You help buyers correctly understand and fill out the California Residential Purchase Agreement (CAR RPA).
+    try:
+        answer, shared = _flights.do(cache_key, fetch)
+    except RateLimitExceeded:
+        # Turned away by the global limit inside the flight: nothing was
+        # sent for this caller, so its session charge is given back.
+        release_ai_call(estimated_tokens, scope="session")
+        raise
+    _record_served(section, route, started, "coalesced" if shared else "api", tokens=None if shared else api_tokens)
+    return answer
 
-You do NOT give legal advice, tax advice, or binding lending approvals.
-Always recommend confirming details with a licensed real estate agent, lender, and/or California real estate attorney.
-"""
 
-    # Add knowledge base content if available
-    if knowledge_text:
-        base_system_prompt += f"""
+def stream_purchase_agreement_ai(
+    user_prompt: str,
+    section: str = "7",
+    section_state: Optional[Dict[str, Any]] = None,
+    system_override: Optional[str] = None,
+    model: Optional[str] = None,
+    use_cache: bool = True,
+    history: Optional[List[Dict[str, str]]] = None,
+) -> Iterator[str]:
+    """
+    Streaming variant of call_purchase_agreement_ai.
 
-You also have access to the following internal knowledge base.
-Never say it is a file; simply use the info when helpful, especially for examples and explanations:
+    Yields text chunks as soon as the model produces them (a cached answer is
+    yielded in one piece). Records time-to-first-token and total latency for
+    the section once the stream is finished.
 
-{knowledge_text}
-"""
+    If an identical request is already in flight, waits for it and yields
+    its full answer instead of opening a second upstream stream.
+    """
+    started = time.perf_counter()
+    route = route_question(user_prompt, section, section_state, system_override, model=model)
+    if route.model is None:
+        _record_served(section, route, started, "glossary", streamed=True)
+        yield glossary_answer(user_prompt)
+        return
+    model = route.model
+
+    messages = _build_messages(user_prompt, section, section_state, system_override, model=model, history=history)
+    cache_key = _cache_key(model, messages)
+
+    packed_answer = get_packed_answer(cache_key) if use_cache else None
+    if packed_answer is not None:
+        _record_served(section, route, started, "pack", streamed=True)
+        yield packed_answer
+        return
+
+    cache = get_response_cache() if use_cache else None
+    if cache is not None:
+        cached_answer = cache.get(cache_key, section=section)
+        if cached_answer is not None:
+            _record_served(section, route, started, "cache", streamed=True)
+            yield cached_answer
+            return
+
+    scope = _faq_scope_for(section, section_state, system_override, model, history) if cache is not None else None
+    if scope is not None:
+        faq_answer = _faq_lookup(cache, scope, user_prompt, section)
+        if faq_answer is not None:
+            _record_served(section, route, started, "faq", streamed=True)
+            yield faq_answer
+            return
+
+    # Charged before joining a flight: a waiter is limited by its own session
+    # only, never by the leader's.
+    estimated_tokens = estimate_call_tokens(messages)
+    acquire_ai_call(estimated_tokens, scope="session")
+
+    flight, leader = _flights.begin(cache_key)
+    if not leader:
+        try:
+            answer = flight.wait()
+        except RateLimitExceeded:
+            # Only the global limit is charged inside a flight, and it
+            # applies to this caller just the same. Nothing was sent, so the
+            # session charge is given back.
+            release_ai_call(estimated_tokens, scope="session")
+            raise
+        except Exception as e:
+            yield _backend_error_text(e)
+            return
+        _record_served(section, route, started, "coalesced", streamed=True)
+        yield answer
+        return
 
-    # Add section-specific context
-    section_context = _build_section_context(section, section_state)
+    try:
+        acquire_ai_call(estimated_tokens, scope="global")
+        # Fails fast, outside the retry loop, when no API key is configured
+        get_openai_client()
+        _record_sent_prompt(messages, model, section, section_state)
+    except Exception as e:
+        _flights.finish(flight, error=e)
+        if isinstance(e, RateLimitExceeded):
+            # A queued retry charges the session again; don't bill it twice.
+            release_ai_call(estimated_tokens, scope="session")
+        raise
+
+    def open_stream(timeout: float):
+        # Retries are only possible before anything reaches the UI, so an
+        # attempt counts as successful once its first text chunk arrives.
+        chat = stream_chat(
+            messages,
+            model=model,
+            temperature=AI_TEMPERATURE,
+            timeout=min(timeout, AI_FIRST_TOKEN_TIMEOUT_S),
+        )
+        deltas = iter(chat)
+        try:
+            first = next(deltas, "")
+        except BaseException:
+            # A retried attempt must not keep its connection checked out
+            chat.close()
+            raise
+        return chat, itertools.chain([first] if first else [], deltas)
+
+    ttft = None
+    chat = None
+    chunks = []
+    metered = False
+    finished = False
+    try:
+        try:
+            chat, deltas = call_with_resilience(open_stream)
+            for delta in deltas:
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                chunks.append(delta)
+                yield delta
+        except Exception as e:
+            error_text = _fallback_answer(section) if isinstance(e, CircuitOpenError) else _backend_error_text(e)
+            _flights.finish(flight, result=error_text)
+            finished = True
+            yield ("\n\n" if chunks else "") + error_text
+            return
+
+        tokens = _record_usage(section, chat.result.usage)
+        _record_served(section, route, started, "api", ttft=ttft, tokens=tokens, streamed=True)
+        metered = True
+        answer = "".join(chunks)
+        if cache is not None and answer:
+            _store_answer(cache, cache_key, answer, section, scope, user_prompt)
+        _flights.finish(flight, result=answer)
+        finished = True
+    finally:
+        if chat is not None:
+            chat.close()
+        # A stream cut short (consumer gone or an error mid-answer) was still
+        # billed: meter it from the reported usage or, failing that, an estimate.
+        if chat is not None and not metered:
+            usage = chat.result.usage if chat.result is not None else estimate_usage(messages, "".join(chunks), model)
+            _meter_call(section, route, started, ttft, usage, streamed=True)
+        # The consumer stopped reading mid-stream; release anyone waiting.
+        if not finished:
+            _flights.finish(flight, error=RuntimeError("The AI answer stream was interrupted."))
 
-    messages = [
-        {"role": "system", "content": base_system_prompt.strip()},
-    ]
 
-    if section_context:
-        messages.append(
-            {
-                "role": "system",
-                "content": section_context,
-            }
-        )
+# ------------------------------
+# 6. Streamlit rendering helper
+# ------------------------------
 
-    # Optional extra system instructions (e.g. Section 3 default explainer)
-    if system_override:
-        messages.append(
-            {
-                "role": "system",
-                "content": system_override,
-            }
-        )
+STREAM_RENDER_INTERVAL_S = 0.05
 
-    # Finally, the actual user question
-    messages.append(
-        {"role": "user", "content": user_prompt.strip()}
-    )
+# A global rate-limit wait up to this long is shown as "queued" and waited
+# out once; longer waits (and any per-session limit) ask the buyer to retry.
+RATE_LIMIT_MAX_QUEUE_S = env_float("RATE_LIMIT_MAX_QUEUE_S", 8)
 
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=0.3,
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        # Friendly error string so the UI can display it
-        return (
-            "There was an error talking to the AI backend. "
-            "Please try again, or check your API key / network.\n\n"
-            f"Technical details: {e}"
-        )
+
+@profiled(kind="ai")
+def stream_ai_answer(
+    user_prompt: str,
+    section: str = "7",
+    **kwargs: Any,
+) -> str:
+    """
+    Show the AI answer in the current container while it streams in,
+    then return the full text so the caller can keep it in session_state.
+
+    The temporary placeholder is cleared at the end; sections keep showing
+    the stored `paX_ai_answer` value with their usual st.info block.
+    When rate limited, the returned text says when to try again.
+    """
+    placeholder = st.empty()
+    queued = False
+
+    while True:
+        tokens = stream_purchase_agreement_ai(user_prompt, section=section, **kwargs)
+        try:
+            with st.spinner("Thinking like a California Realtor..."):
+                first = next(tokens, "")
+            break
+        except RateLimitExceeded as e:
+            if queued or e.scope != "global" or e.retry_after > RATE_LIMIT_MAX_QUEUE_S:
+                placeholder.empty()
+                return f"⏳ {e}"
+            queued = True
+            placeholder.info(
+                f"⏳ Queued – many buyers are asking right now. Starting in about {math.ceil(e.retry_after)} s…"
+            )
+            time.sleep(e.retry_after)
+
+    chunks = [first]
+    last_render = 0.0
+    for token in tokens:
+        chunks.append(token)
+        now = time.perf_counter()
+        if now - last_render >= STREAM_RENDER_INTERVAL_S:
+            placeholder.info("".join(chunks) + " ▌")
+            last_render = now
+
+    placeholder.empty()
+    return "".join(chunks)
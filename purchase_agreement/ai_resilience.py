@@ -0,0 +1,279 @@
+# purchase_agreement/ai_resilience.py
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, Any, Callable, TypeVar
+
+import openai
+
+from purchase_agreement.settings import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+# ------------------------------
+# 1. Settings
+# ------------------------------
+
+# Wall-clock budget for one AI answer, retries included.
+AI_CALL_DEADLINE_S = env_float("AI_CALL_DEADLINE_S", 45.0)
+# Seconds to wait for the first streamed token before giving up on an attempt.
+AI_FIRST_TOKEN_TIMEOUT_S = env_float("AI_FIRST_TOKEN_TIMEOUT_S", 20.0)
+
+AI_MAX_RETRIES = env_int("AI_MAX_RETRIES", 2)
+AI_RETRY_BASE_S = env_float("AI_RETRY_BASE_S", 0.5)
+AI_RETRY_MAX_S = env_float("AI_RETRY_MAX_S", 8.0)
+
+# The breaker opens when, over the last BREAKER_WINDOW attempts (and at least
+# BREAKER_MIN_CALLS of them), the failure share reaches BREAKER_ERROR_RATE.
+BREAKER_WINDOW = env_int("AI_BREAKER_WINDOW", 20)
+BREAKER_MIN_CALLS = env_int("AI_BREAKER_MIN_CALLS", 5)
+BREAKER_ERROR_RATE = env_float("AI_BREAKER_ERROR_RATE", 0.5)
+BREAKER_COOLDOWN_S = env_float("AI_BREAKER_COOLDOWN_S", 30.0)
+
+RETRYABLE_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+# ------------------------------
+# 2. Error classification
+# ------------------------------
+
+class DeadlineExceeded(Exception):
+    """
+    The per-call deadline ran out before the backend answered.
+    """
+
+
+class CircuitOpenError(Exception):
+    """
+    The breaker is open; the backend is not called until the cooldown ends.
+    """
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Timeouts, dropped connections, rate limits and 5xx are worth retrying;
+    bad requests and auth errors are not.
+    """
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, DeadlineExceeded)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS
+    return False
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, error: Optional[BaseException] = None) -> float:
+    """
+    Full-jitter exponential backoff: uniform(0, min(max, base * 2^attempt)).
+    A server-sent Retry-After is used as a floor.
+    """
+    ceiling = min(AI_RETRY_MAX_S, AI_RETRY_BASE_S * (2 ** attempt))
+    delay = random.uniform(0, ceiling)
+    hinted = _retry_after(error) if error is not None else None
+    if hinted is not None:
+        delay = max(delay, min(hinted, AI_RETRY_MAX_S))
+    return delay
+
+
+# ------------------------------
+# 3. Circuit breaker
+# ------------------------------
+
+class CircuitBreaker:
+    """
+    closed → open when the recent failure rate spikes;
+    open → half_open after the cooldown, letting one probe through;
+    half_open → closed if the probe succeeds, back to open if it fails.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        window: int = BREAKER_WINDOW,
+        min_calls: int = BREAKER_MIN_CALLS,
+        error_rate: float = BREAKER_ERROR_RATE,
+        cooldown_s: float = BREAKER_COOLDOWN_S,
+    ):
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown_s = cooldown_s
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._outcomes: deque = deque(maxlen=window)
+        self._transitions: Dict[str, int] = {}
+        self._history: deque = deque(maxlen=50)
+        self._rejected = 0
+
+    def _move(self, new_state: str) -> None:
+        """
+        Caller holds the lock.
+        """
+        if new_state == self._state:
+            return
+        name = f"{self._state}->{new_state}"
+        self._transitions[name] = self._transitions.get(name, 0) + 1
+        self._history.append({"at": time.time(), "from": self._state, "to": new_state})
+        logger.warning("AI circuit breaker %s", name)
+
+        self._state = new_state
+        self._probe_in_flight = False
+        if new_state == self.OPEN:
+            self._opened_at = time.monotonic()
+        elif new_state == self.CLOSED:
+            self._outcomes.clear()
+
+    def allow(self) -> bool:
+        """
+        True if a call may go to the backend now.
+        """
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown_s:
+                self._move(self.HALF_OPEN)
+
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+            self._rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._move(self.CLOSED)
+            else:
+                self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._move(self.OPEN)
+                return
+
+            self._outcomes.append(False)
+            calls = len(self._outcomes)
+            failures = calls - sum(self._outcomes)
+            if self._state == self.CLOSED and calls >= self.min_calls and failures / calls >= self.error_rate:
+                self._move(self.OPEN)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = len(self._outcomes)
+            failures = calls - sum(self._outcomes)
+            return {
+                "state": self._state,
+                "recent_calls": calls,
+                "recent_error_rate": (failures / calls) if calls else 0.0,
+                "rejected": self._rejected,
+                "transitions": dict(self._transitions),
+                "history": list(self._history),
+            }
+
+
+# ------------------------------
+# 4. Retry loop
+# ------------------------------
+
+_breaker = CircuitBreaker()
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, int] = {"calls": 0, "attempts": 0, "retries": 0, "deadline_exceeded": 0, "gave_up": 0}
+
+
+def _bump(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def get_breaker() -> CircuitBreaker:
+    return _breaker
+
+
+def call_with_resilience(
+    fn: Callable[[float], T],
+    deadline_s: float = AI_CALL_DEADLINE_S,
+) -> T:
+    """
+    Run fn(timeout_s) under the circuit breaker, retrying retryable errors
+    with jittered backoff until the deadline is spent.
+
+    fn receives the seconds left before the deadline and should pass them on
+    as the request timeout. Raises CircuitOpenError without calling fn while
+    the breaker is open, and the last error once retries are exhausted.
+    """
+    _bump("calls")
+    deadline = time.monotonic() + deadline_s
+    attempt = 0
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            _bump("deadline_exceeded")
+            raise DeadlineExceeded(f"No answer within {deadline_s:.0f}s.")
+
+        if not _breaker.allow():
+            raise CircuitOpenError("The AI backend is temporarily unavailable.")
+
+        _bump("attempts")
+        try:
+            result = fn(remaining)
+        except Exception as e:
+            if not is_retryable(e):
+                # The backend answered; the request itself was bad.
+                _breaker.record_success()
+                raise
+            _breaker.record_failure()
+
+            delay = backoff_delay(attempt, e)
+            if attempt >= AI_MAX_RETRIES or time.monotonic() + delay >= deadline:
+                _bump("gave_up")
+                if isinstance(e, DeadlineExceeded):
+                    _bump("deadline_exceeded")
+                raise
+            attempt += 1
+            _bump("retries")
+            time.sleep(delay)
+            continue
+
+        _breaker.record_success()
+        return result
+
+
+def get_resilience_stats() -> Dict[str, Any]:
+    """
+    Retry counters plus circuit breaker state and transition counts.
+    """
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_stats)
+    stats["breaker"] = _breaker.stats()
+    return stats
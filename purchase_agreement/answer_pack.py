@@ -0,0 +1,146 @@
+# purchase_agreement/answer_pack.py
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from purchase_agreement.settings import env_flag
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------
+# 1. Settings
+# ------------------------------
+
+PACK_ENABLED = env_flag("ANSWER_PACK_ENABLED")
+PACK_PATH = Path(os.environ.get("ANSWER_PACK_PATH", Path(__file__).resolve().parent / "answer_pack.json"))
+
+# Bump when the file layout changes; older packs are ignored.
+PACK_FORMAT = 1
+
+
+# ------------------------------
+# 2. Loading
+# ------------------------------
+
+_lock = threading.Lock()
+_pack: Optional[Dict[str, Any]] = None
+_answers: Dict[str, str] = {}
+_stats: Dict[str, int] = {"served": 0}
+
+
+def load_pack(path: Path = PACK_PATH) -> Dict[str, Any]:
+    """
+    The pack file as a dict, or an empty pack if it is missing or unreadable.
+
+        {"format": 1, "version": "...", "built_at": ..., "entries": {
+            "<section>": {"key": "<response cache key>", "model": "...",
+                          "question": "...", "answer": "..."}}}
+    """
+    empty = {"format": PACK_FORMAT, "version": None, "built_at": None, "entries": {}}
+    if not path.is_file():
+        return empty
+    try:
+        pack = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        logger.exception("Could not read answer pack %s", path)
+        return empty
+    if pack.get("format") != PACK_FORMAT:
+        logger.warning("Ignoring answer pack %s with format %r", path, pack.get("format"))
+        return empty
+    return pack
+
+
+def _ensure_loaded() -> None:
+    global _pack, _answers
+
+    if _pack is None:
+        with _lock:
+            if _pack is None:
+                if PACK_ENABLED and not PACK_PATH.is_file():
+                    logger.warning(
+                        "No answer pack at %s; build it before deploying: python -m tools.build_answer_pack",
+                        PACK_PATH,
+                    )
+                pack = load_pack(PACK_PATH)
+                _answers = {
+                    entry["key"]: entry["answer"]
+                    for entry in pack.get("entries", {}).values()
+                    if entry.get("key") and entry.get("answer")
+                }
+                _pack = pack
+
+
+def get_packed_answer(cache_key: str) -> Optional[str]:
+    """
+    Prebuilt answer for this exact request, or None.
+
+    Entries are keyed by the response cache key, which hashes the model,
+    temperature and every prompt message (including the knowledge text),
+    so an entry stops matching as soon as the prompt or knowledge changes.
+    """
+    if not PACK_ENABLED:
+        return None
+    _ensure_loaded()
+    answer = _answers.get(cache_key)
+    if answer is not None:
+        with _lock:
+            _stats["served"] += 1
+    return answer
+
+
+def reload_pack() -> None:
+    """
+    Forget the loaded pack; the next lookup reads the file again.
+    """
+    global _pack, _answers
+
+    with _lock:
+        _pack = None
+        _answers = {}
+
+
+def get_pack_stats() -> Dict[str, Any]:
+    _ensure_loaded()
+    with _lock:
+        return {
+            "enabled": PACK_ENABLED,
+            "version": _pack.get("version") if _pack else None,
+            "entries": len(_answers),
+            "served": _stats["served"],
+        }
+
+
+# ------------------------------
+# 3. Writing (build time)
+# ------------------------------
+
+def write_pack(entries: Dict[str, Dict[str, Any]], path: Path = PACK_PATH) -> Dict[str, Any]:
+    """
+    Write a new pack atomically (temp file + rename) so the app never reads
+    a half-written file. The version is the build time, UTC.
+    """
+    now = time.time()
+    pack = {
+        "format": PACK_FORMAT,
+        "version": time.strftime("%Y%m%d%H%M%S", time.gmtime(now)),
+        "built_at": now,
+        "entries": dict(sorted(entries.items())),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=".answer_pack-", suffix=".json", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(pack, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    return pack
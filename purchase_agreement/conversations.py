@@ -0,0 +1,309 @@
+# purchase_agreement/conversations.py
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
+
+import streamlit as st
+
+from gpt_client import complete as complete_chat
+from purchase_agreement.ai_helpers import BACKEND_ERROR_PREFIX, SERVICE_UNAVAILABLE_TEXT, stream_ai_answer
+from purchase_agreement.ai_resilience import call_with_resilience
+from purchase_agreement.explainers import EXPLAIN_SECTION_QUESTION, explainer_request
+from purchase_agreement.model_router import MODEL_SMALL, estimate_cost
+from purchase_agreement.rate_limit import acquire_ai_call, current_session_id, estimate_call_tokens
+from purchase_agreement.settings import env_flag, env_float, env_int
+from purchase_agreement.tokens import count_tokens
+from purchase_agreement.usage_ledger import record_call
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------
+# 1. Settings
+# ------------------------------
+
+CONVERSATIONS_ENABLED = env_flag("AI_CONVERSATIONS_ENABLED")
+
+# Question/answer pairs sent verbatim; older ones are folded into the summary.
+WINDOW_TURNS = env_int("AI_CONVERSATION_WINDOW_TURNS", 3)
+# Each answer in the window is clipped to this many tokens.
+TURN_MAX_TOKENS = env_int("AI_CONVERSATION_TURN_TOKENS", 350)
+SUMMARY_MAX_TOKENS = env_int("AI_CONVERSATION_SUMMARY_TOKENS", 250)
+SUMMARY_MODEL = os.environ.get("AI_CONVERSATION_SUMMARY_MODEL", MODEL_SMALL)
+# How long a new question waits for a summary still being written before
+# it goes out with the unsummarized turns instead.
+SUMMARY_WAIT_S = env_float("AI_CONVERSATION_SUMMARY_WAIT_S", 3)
+
+SUMMARY_PROMPT = (
+    "You keep a running summary of a home buyer's conversation with an AI realtor "
+    "about one section of a California purchase agreement. Update the summary with "
+    "the new turns. Keep the buyer's situation, numbers, decisions and open questions; "
+    "drop pleasantries and general explanations. Reply with the summary only, "
+    f"at most {SUMMARY_MAX_TOKENS} tokens."
+)
+
+SESSION_KEY = "pa_conversations"
+
+
+def _clip_tokens(text: str, max_tokens: int) -> str:
+    if count_tokens(text) <= max_tokens:
+        return text
+    # ~4 characters per token is close enough for a clip
+    return text[: max_tokens * 4].rsplit(" ", 1)[0] + " …"
+
+
+def _is_answer(text: str) -> bool:
+    """
+    Errors, fallbacks and rate-limit notices are shown but not remembered.
+    """
+    text = (text or "").lstrip()
+    return bool(text) and not text.startswith(("⏳", BACKEND_ERROR_PREFIX, SERVICE_UNAVAILABLE_TEXT))
+
+
+# ------------------------------
+# 2. Rolling summary (background)
+# ------------------------------
+
+# Summaries are written after the answer is shown, off the request path.
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pa-summary")
+_stats_lock = threading.Lock()
+_stats: Dict[str, int] = {"summaries": 0, "summary_failures": 0, "summary_waits": 0}
+
+
+def summarize_turns(
+    previous_summary: str,
+    turns: List[Dict[str, str]],
+    section: Optional[str] = None,
+    session_id: Optional[str] = None,
+) -> str:
+    """
+    Fold `turns` into `previous_summary` with one small-model call. On any
+    failure, fall back to the old summary plus the folded questions, so
+    follow-ups keep at least the topics.
+    """
+    transcript = "\n\n".join(
+        f"{'Buyer' if t['role'] == 'user' else 'AI realtor'}: {_clip_tokens(t['content'], TURN_MAX_TOKENS)}"
+        for t in turns
+    )
+    messages = [
+        {"role": "system", "content": SUMMARY_PROMPT},
+        {
+            "role": "user",
+            "content": f"Current summary:\n{previous_summary or '(none)'}\n\nNew turns:\n{transcript}",
+        },
+    ]
+
+    started = time.perf_counter()
+    try:
+        acquire_ai_call(estimate_call_tokens(messages), session_id=session_id)
+        result = call_with_resilience(
+            lambda timeout: complete_chat(
+                messages,
+                model=SUMMARY_MODEL,
+                temperature=0,
+                max_tokens=SUMMARY_MAX_TOKENS,
+                timeout=timeout,
+            )
+        )
+        summary = result.text.strip()
+        if not summary:
+            raise ValueError("empty summary")
+    except Exception:
+        logger.exception("Could not summarize the Section %s conversation", section)
+        with _stats_lock:
+            _stats["summary_failures"] += 1
+        questions = "; ".join(t["content"].strip() for t in turns if t["role"] == "user")
+        return _clip_tokens(f"{previous_summary}\nEarlier the buyer also asked: {questions}".strip(), SUMMARY_MAX_TOKENS)
+
+    record_call(
+        session_id=session_id,
+        section=section,
+        model=SUMMARY_MODEL,
+        route="summary",
+        streamed=False,
+        latency_s=time.perf_counter() - started,
+        cost_usd=estimate_cost(SUMMARY_MODEL, **result.usage),
+        **result.usage,
+    )
+    with _stats_lock:
+        _stats["summaries"] += 1
+    return _clip_tokens(summary, SUMMARY_MAX_TOKENS)
+
+
+# ------------------------------
+# 3. Conversation thread
+# ------------------------------
+
+class Conversation:
+    """
+    One section's Q&A thread for one buyer.
+
+    Every turn is kept for display, but only the last WINDOW_TURNS pairs are
+    sent verbatim; older pairs are folded into a rolling summary in the
+    background, so a follow-up's prompt stays roughly the same size however
+    long the thread gets.
+    """
+
+    def __init__(self, section: str):
+        self.section = section
+        self.turns: List[Dict[str, str]] = []
+        self.summary = ""
+        # Number of turns (messages) already folded into the summary
+        self.summarized = 0
+        self._lock = threading.Lock()
+        self._pending: Optional[Future] = None
+        # Bumped by clear(); a fold started before that discards its result
+        self._generation = 0
+
+    def add_turn(self, question: str, answer: str, session_id: Optional[str] = None) -> None:
+        with self._lock:
+            self.turns.append({"role": "user", "content": question.strip()})
+            self.turns.append({"role": "assistant", "content": answer.strip()})
+        self._schedule_summary(session_id)
+
+    def _schedule_summary(self, session_id: Optional[str]) -> None:
+        with self._lock:
+            if self._pending is not None and not self._pending.done():
+                # The running fold reschedules itself when it finishes
+                return
+            fold_until = len(self.turns) - 2 * WINDOW_TURNS
+            if fold_until <= self.summarized:
+                return
+            turns = self.turns[self.summarized:fold_until]
+            previous = self.summary
+            self._pending = _executor.submit(self._fold, previous, turns, fold_until, session_id, self._generation)
+
+    def _fold(
+        self,
+        previous: str,
+        turns: List[Dict[str, str]],
+        fold_until: int,
+        session_id: Optional[str],
+        generation: int,
+    ) -> None:
+        summary = summarize_turns(previous, turns, section=self.section, session_id=session_id)
+        with self._lock:
+            if generation != self._generation:
+                # The thread was cleared meanwhile: this summary belongs to
+                # the old thread, and _pending to a newer fold (or nobody).
+                return
+            if self.summarized < fold_until <= len(self.turns):
+                self.summary = summary
+                self.summarized = fold_until
+            self._pending = None
+        # More turns may have arrived while we were summarizing
+        self._schedule_summary(session_id)
+
+    def history(self) -> List[Dict[str, str]]:
+        """
+        Messages to send before the next question: the rolling summary (if
+        any) and the turns not yet folded into it, answers clipped.
+        """
+        with self._lock:
+            pending = self._pending
+        if pending is not None and not pending.done():
+            with _stats_lock:
+                _stats["summary_waits"] += 1
+            try:
+                pending.result(timeout=SUMMARY_WAIT_S)
+            except Exception:
+                pass
+
+        with self._lock:
+            summary = self.summary
+            recent = [dict(t) for t in self.turns[self.summarized:]]
+
+        messages: List[Dict[str, str]] = []
+        if summary:
+            messages.append(
+                {"role": "system", "content": "Summary of the earlier conversation about this section:\n" + summary}
+            )
+        for turn in recent:
+            if turn["role"] == "assistant":
+                turn["content"] = _clip_tokens(turn["content"], TURN_MAX_TOKENS)
+            messages.append(turn)
+        return messages
+
+    def clear(self) -> None:
+        with self._lock:
+            self.turns = []
+            self.summary = ""
+            self.summarized = 0
+            self._pending = None
+            self._generation += 1
+
+
+def get_conversation(section: str) -> Conversation:
+    """
+    This session's thread for a section, created on first use.
+    """
+    conversations = st.session_state.setdefault(SESSION_KEY, {})
+    if section not in conversations:
+        conversations[section] = Conversation(section)
+    return conversations[section]
+
+
+def get_conversation_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+# ------------------------------
+# 4. Streamlit helpers for sections
+# ------------------------------
+
+def ask_in_conversation(user_prompt: str, section: str, **kwargs: Any) -> str:
+    """
+    stream_ai_answer with the section's earlier turns as context; the new
+    turn is remembered once it has a real answer.
+    """
+    if not CONVERSATIONS_ENABLED:
+        return stream_ai_answer(user_prompt, section=section, **kwargs)
+
+    conversation = get_conversation(section)
+    answer = stream_ai_answer(user_prompt, section=section, history=conversation.history(), **kwargs)
+    if _is_answer(answer):
+        conversation.add_turn(user_prompt, answer, session_id=current_session_id())
+    return answer
+
+
+def explain_in_conversation(section: str) -> str:
+    """
+    The shared "Explain this section" answer (sent without history so it
+    stays cacheable), remembered as a turn so follow-ups can refer to it.
+    """
+    answer = stream_ai_answer(**explainer_request(section))
+    if CONVERSATIONS_ENABLED and _is_answer(answer):
+        get_conversation(section).add_turn(EXPLAIN_SECTION_QUESTION, answer, session_id=current_session_id())
+    return answer
+
+
+def render_conversation(section: str, current_answer: Optional[str] = None) -> None:
+    """
+    Show the earlier turns of the thread (the latest answer is shown by the
+    section itself) and a button to start over.
+    """
+    if not CONVERSATIONS_ENABLED:
+        return
+    conversation = get_conversation(section)
+    turns = list(conversation.turns)
+    if turns and current_answer is not None and turns[-1]["content"] == current_answer.strip():
+        turns = turns[:-2]
+    if not turns:
+        return
+
+    st.markdown("#### 🗂️ Earlier in this conversation")
+    for turn in turns:
+        if turn["role"] == "user":
+            st.markdown(f"**You:** {turn['content']}")
+        else:
+            st.markdown(turn["content"])
+            st.markdown("---")
+
+    if st.button("Start a new conversation", key=f"pa_conv_clear_{section}"):
+        conversation.clear()
+        st.rerun()
@@ -0,0 +1,175 @@
+# purchase_agreement/explainers.py
+
+from typing import Dict, Any
+
+
+# ------------------------------
+# Default "explain this section" context per section
+# ------------------------------
+
+# Sent as system_override, so every question in a section shares them as a
+# prompt prefix. Keys match the `section=` ids passed to the AI helpers.
+SECTION_EXPLAINERS: Dict[str, str] = {
+    "3": (
+        "You are an experienced California residential real estate agent. "
+        "Help the buyer understand how to complete Section 3 – Finance Terms "
+        "in the CAR Residential Purchase Agreement. Explain typical norms for: "
+        "the initial deposit (earnest money) and when it is due, increased deposits, "
+        "all-cash offers and proof of funds, first and second loans, down payment, "
+        "and how the loan and appraisal contingencies protect the buyer. "
+        "Always remind them to confirm numbers with their lender and that practices vary by area."
+    ),
+    "7": (
+        "You are an experienced California residential real estate agent. "
+        "Help the buyer understand Section 7 – Allocation of Costs in the CAR Residential "
+        "Purchase Agreement. Explain who customarily pays for: escrow and title fees, the "
+        "owner's and lender's title policies, county and city transfer taxes, HOA documents "
+        "and transfer fees, inspections and reports, and the home warranty. "
+        "Always remind them that customs differ by county and city and that everything is negotiable."
+    ),
+    "8": (
+        "You are an experienced California residential real estate agent. "
+        "Help the buyer understand how to complete Section 3 – Property Condition & Repairs "
+        "in the CAR Residential Purchase Agreement. Explain typical norms for 'as-is' sales, "
+        "seller repairs, credits in lieu of repairs, and home warranties. "
+        "Always remind them that everything is negotiable and practices vary by area."
+    ),
+    "9": (
+        "You are an experienced California residential real estate agent. "
+        "Help the buyer understand how to complete Section 9 – Closing and Possession "
+        "in the CAR Residential Purchase Agreement. Explain typical norms for: "
+        "close of escrow timing, when the buyer gets possession, seller rent-backs, "
+        "key/remote delivery, and final walkthroughs. "
+        "Always remind them that everything is negotiable and practices vary by area."
+    ),
+    "10-13": (
+        "You are an experienced California residential real estate agent. "
+        "Give the buyer a big-picture overview of Sections 10–13 of the CAR Residential "
+        "Purchase Agreement: the seller's disclosures and reports the buyer receives, the "
+        "buyer's investigation and inspection rights, the seller's duty to give access to the "
+        "property, and what happens with the deposit if a party does not perform. "
+        "Always remind them to read every disclosure and confirm details with their agent or attorney."
+    ),
+    "14": (
+        "You are an experienced California residential real estate agent. "
+        "Help the buyer understand Section 14 – Contingencies, Removal of Contingencies, "
+        "and Cancellation Rights in the CAR Residential Purchase Agreement. Explain: "
+        "what the buyer's contingency period is and how the number of days is counted, "
+        "how and when contingencies are removed in writing, what a Notice to Buyer/Seller "
+        "to Perform is, and when either party may cancel. "
+        "Always remind them that deadlines matter and to confirm details with their agent or attorney."
+    ),
+    "15": (
+        "You are an experienced California residential real estate agent. "
+        "Help the buyer understand Section 15 – Time Periods; Dates; Time of Essence "
+        "in the CAR Residential Purchase Agreement. Explain: "
+        "how the contract counts days (calendar vs. business days, deadlines that land on "
+        "weekends or holidays), what 'time is of the essence' means in practice, "
+        "and why missing a date can have real consequences. "
+        "Always remind them to confirm exact deadlines with their agent or escrow officer."
+    ),
+    "31": (
+        "You are an experienced California residential real estate agent. "
+        "Help the buyer understand Section 31 – Expiration of Offer in the CAR Residential "
+        "Purchase Agreement. Explain how the expiration date and time work, what happens if the "
+        "seller signs after the deadline, how a buyer can withdraw an offer before acceptance, "
+        "and how buyers typically choose a reasonable deadline in a competitive market. "
+        "Always remind them that practices vary by area and to confirm with their agent."
+    ),
+    "21-22": (
+        "You are an experienced California residential real estate agent. "
+        "Explain Sections 21 and 22 of the CAR Residential Purchase Agreement in simple, "
+        "neutral terms. Cover:\n"
+        "- What 'remedies' are available to a buyer or seller if the other party breaches.\n"
+        "- What 'liquidated damages' generally means when both parties initial it.\n"
+        "- The concept of specific performance (especially when a seller breaches).\n"
+        "- How mediation works and why the contract requires attempting it before court.\n"
+        "- What arbitration is, that it is optional and requires separate initials, and that "
+        "it affects the right to a jury trial.\n"
+        "Do not give legal advice or tell the user what they *should* choose; just explain "
+        "the concepts and remind them to consult their own attorney."
+    ),
+    "23-30": (
+        "You are an experienced California residential real estate agent. "
+        "Explain, in simple language, the typical topics covered in Sections 23–30 of the CAR "
+        "Residential Purchase Agreement. At a high level, cover:\n"
+        "- General terms like assignment, successors, and notices.\n"
+        "- Equal housing / fair housing language.\n"
+        "- Attorney’s fees and governing law.\n"
+        "- Additional terms and addenda.\n"
+        "- Broker compensation and confirmation of agency relationships.\n"
+        "- Why these sections matter even though buyers usually don't edit them directly.\n"
+        "Do not give legal advice. Stay neutral and remind the user to consult their own attorney "
+        "for legal interpretation or custom changes."
+    ),
+}
+
+# Short canned overviews, served with no API call while the AI service is
+# unavailable (circuit breaker open). Same keys as SECTION_EXPLAINERS.
+SECTION_FALLBACKS: Dict[str, str] = {
+    "3": (
+        "Section 3 sets out how you will pay: the initial deposit (earnest money) and when it "
+        "is due, any increased deposit, whether the offer is all cash or financed, your loan "
+        "amounts and down payment, and the loan and appraisal contingencies that let you cancel "
+        "if financing or the appraisal falls through. Confirm the numbers with your lender."
+    ),
+    "7": (
+        "Section 7 says who pays which closing costs: escrow and title fees, the title "
+        "policies, transfer taxes, HOA fees and documents, inspections and reports, and the "
+        "home warranty. Local customs differ by county and city, and every item is negotiable."
+    ),
+    "8": (
+        "Section 8 covers the property's condition: whether you buy it as-is, which repairs "
+        "the seller agrees to make, credits instead of repairs, and a home warranty. "
+        "Everything here is negotiable."
+    ),
+    "9": (
+        "Section 9 covers closing and possession: when escrow closes, when you get the keys, "
+        "any seller rent-back after closing, and your final walkthrough before closing."
+    ),
+    "10-13": (
+        "Sections 10–13 cover the seller's disclosures and reports, your right to inspect and "
+        "investigate the property, the seller's duty to give access, and what happens to the "
+        "deposit if a party does not perform. Read every disclosure carefully."
+    ),
+    "14": (
+        "Section 14 sets your contingency period, how contingencies are removed in writing, "
+        "what a Notice to Perform is, and when either party may cancel. Deadlines here matter, "
+        "so confirm them with your agent or attorney."
+    ),
+    "15": (
+        "Section 15 explains how the contract counts days and deadlines, and that time is of "
+        "the essence: a missed date can have real consequences. Confirm exact deadlines with "
+        "your agent or escrow officer."
+    ),
+    "31": (
+        "Section 31 sets when your offer expires. If the seller has not accepted by that date "
+        "and time, the offer lapses, and you can withdraw it any time before acceptance."
+    ),
+    "21-22": (
+        "Sections 21–22 cover remedies if a party breaches, liquidated damages (only if both "
+        "parties initial them), mediation before going to court, and optional arbitration, "
+        "which gives up a jury trial. Consult your own attorney before choosing."
+    ),
+    "23-30": (
+        "Sections 23–30 hold the general terms: assignment, notices, equal housing, "
+        "attorney's fees, governing law, addenda, and broker compensation and agency. "
+        "Buyers rarely edit them, but they still bind you."
+    ),
+}
+
+# The question sent when the buyer clicks "Explain this section".
+EXPLAIN_SECTION_QUESTION = "Please explain this section and how I should think about filling it out."
+
+
+def explainer_request(section: str) -> Dict[str, Any]:
+    """
+    Keyword arguments for call_purchase_agreement_ai / stream_ai_answer that
+    produce the default explainer for a section. The request carries no
+    user data, so its answer is shared by everyone through the cache.
+    """
+    return {
+        "user_prompt": EXPLAIN_SECTION_QUESTION,
+        "section": section,
+        "system_override": SECTION_EXPLAINERS[section],
+    }
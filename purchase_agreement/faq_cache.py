@@ -0,0 +1,344 @@
+# purchase_agreement/faq_cache.py
+
+import hashlib
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+from typing import Optional, Dict, Any, FrozenSet, List, Set, Tuple
+
+from purchase_agreement.knowledge_index import tokenize
+from purchase_agreement.settings import env_flag, env_float, env_int
+
+
+# ------------------------------
+# 1. Settings
+# ------------------------------
+
+FAQ_ENABLED = env_flag("FAQ_CACHE_ENABLED")
+# Minimum Jaccard similarity of two questions' shingle sets to reuse an
+# answer. Numbers and negations must also match exactly (see question_guard).
+FAQ_SIMILARITY_THRESHOLD = env_float("FAQ_SIMILARITY_THRESHOLD", 0.7)
+FAQ_MAX_ENTRIES = env_int("FAQ_MAX_ENTRIES", 2000)
+FAQ_AUDIT_ENTRIES = env_int("FAQ_AUDIT_ENTRIES", 500)
+
+# 32 bands × 2 rows: a pair with Jaccard 0.7 shares at least one band
+# ~100% of the time, a pair at 0.2 only ~70%, and those are then
+# rejected by the exact Jaccard check.
+NUM_PERM = 64
+LSH_BANDS = 32
+LSH_ROWS = NUM_PERM // LSH_BANDS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Spelling variants that should not make two questions look different.
+# The whole app is about California contracts, so naming the state adds
+# nothing and is dropped.
+_SYNONYMS = {
+    "ca": "",
+    "calif": "",
+    "california": "",
+    "coe": "close of escrow",
+    "emd": "deposit",
+    "earnest": "deposit",
+    "contingency": "contingenci",
+}
+
+# Amounts, with their unit ("3%", "$10,000", "21 days" keeps just 21)
+_NUMBER_RE = re.compile(r"(\$?)(\d[\d,]*(?:\.\d+)?)\s*(%|percent\b|k\b)?", re.IGNORECASE)
+_NEGATION_RE = re.compile(
+    r"\b(?:not|no|never|without|cannot|nor|neither|none"
+    r"|(?:do|does|did|ca|wo|is|are|was|were|should|would|could|have|has|had|must|need)n['’]?t)\b",
+    re.IGNORECASE,
+)
+
+
+# ------------------------------
+# 2. Normalizing + shingling
+# ------------------------------
+
+def normalize_question(question: str) -> List[str]:
+    """
+    "What does 'as-is' mean in CA?" → ["asi", "mean"].
+    Lowercased, punctuation-free, stopwords dropped, common variants unified.
+    """
+    text = question.lower()
+    # "as-is" / "as is" would otherwise vanish as two stopwords
+    text = re.sub(r"\bas[\s\-'’\"]*is\b", " asis ", text)
+    text = re.sub(r"(\w)[-'’](\w)", r"\1 \2", text)
+    terms = []
+    for term in tokenize(text):
+        terms.extend(_SYNONYMS.get(term, term).split())
+    return terms
+
+
+def question_guard(question: str) -> Tuple[FrozenSet[str], int]:
+    """
+    What two questions must share exactly before one's answer is reused for
+    the other: the amounts they mention and how many negations they carry.
+    Shingle overlap barely notices either, yet "Should I not remove my loan
+    contingency?" or "Is 10% earnest money normal?" needs a different answer
+    than its near-identical twin.
+    """
+    amounts = set()
+    for dollar, number, unit in _NUMBER_RE.findall(question):
+        unit = (unit or "").lower()
+        amounts.add(dollar + number.replace(",", "") + ("%" if unit.startswith("p") else unit))
+    return frozenset(amounts), len(_NEGATION_RE.findall(question))
+
+
+def shingles(question: str) -> Set[str]:
+    """
+    Word unigrams and bigrams plus character 4-grams of the normalized
+    question, so both reordered words and small spelling changes overlap.
+    """
+    terms = normalize_question(question)
+    result = {f"w:{t}" for t in terms}
+    result.update(f"b:{a}_{b}" for a, b in zip(terms, terms[1:]))
+    joined = " ".join(terms)
+    result.update(f"c:{joined[i:i + 4]}" for i in range(max(len(joined) - 3, 0)))
+    return result
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+# ------------------------------
+# 3. MinHash / LSH index
+# ------------------------------
+
+def _permutations(count: int) -> List[Tuple[int, int]]:
+    """
+    Deterministic (a, b) pairs for h(x) = (a·x + b) mod p.
+    """
+    perms = []
+    for i in range(count):
+        digest = hashlib.blake2b(f"faq-minhash-{i}".encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "big") % (_MERSENNE_PRIME - 1) + 1
+        b = int.from_bytes(digest[8:], "big") % _MERSENNE_PRIME
+        perms.append((a, b))
+    return perms
+
+
+_PERMS = _permutations(NUM_PERM)
+
+
+def minhash(shingle_set: Set[str]) -> Tuple[int, ...]:
+    if not shingle_set:
+        return tuple([_MAX_HASH] * NUM_PERM)
+    hashed = [zlib.crc32(s.encode("utf-8")) for s in shingle_set]
+    return tuple(
+        min(((a * x + b) % _MERSENNE_PRIME) & _MAX_HASH for x in hashed)
+        for a, b in _PERMS
+    )
+
+
+class FAQCache:
+    """
+    Near-duplicate question lookup per scope (section id + the prompt variant).
+
+    Entries point at an answer stored in the response cache by its exact
+    cache key, so answers are not stored twice and expire with the cache.
+    Candidates come from LSH buckets and are confirmed with exact Jaccard
+    on the shingle sets, and only served when their numbers and negations
+    match (question_guard); every lookup that finds a candidate is written
+    to an audit trail, served or not, for tuning the threshold.
+    """
+
+    def __init__(
+        self,
+        threshold: float = FAQ_SIMILARITY_THRESHOLD,
+        max_entries: int = FAQ_MAX_ENTRIES,
+        audit_entries: int = FAQ_AUDIT_ENTRIES,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        # entry id -> (scope, question, shingles, guard, answer cache key, band keys)
+        self._entries: "OrderedDict[int, Tuple[str, str, Set[str], Tuple, str, List[Tuple]]]" = OrderedDict()
+        self._buckets: Dict[Tuple, Set[int]] = {}
+        self._by_key: Dict[Tuple[str, str], int] = {}
+        self._next_id = 0
+        self._audit: deque = deque(maxlen=audit_entries)
+        self._stats = {"lookups": 0, "matches": 0, "near_misses": 0, "guard_rejects": 0, "stale": 0, "added": 0}
+
+    @staticmethod
+    def _band_keys(scope: str, signature: Tuple[int, ...]) -> List[Tuple]:
+        return [
+            (scope, band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS])
+            for band in range(LSH_BANDS)
+        ]
+
+    def _drop(self, entry_id: int) -> None:
+        """
+        Caller holds the lock.
+        """
+        scope, _question, _shingles, _guard, cache_key, band_keys = self._entries.pop(entry_id)
+        self._by_key.pop((scope, cache_key), None)
+        for band_key in band_keys:
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def add(self, scope: str, question: str, cache_key: str) -> None:
+        question_shingles = shingles(question)
+        if not question_shingles:
+            return
+        band_keys = self._band_keys(scope, minhash(question_shingles))
+
+        with self._lock:
+            if (scope, cache_key) in self._by_key:
+                return
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (scope, question, question_shingles, question_guard(question), cache_key, band_keys)
+            self._by_key[(scope, cache_key)] = entry_id
+            for band_key in band_keys:
+                self._buckets.setdefault(band_key, set()).add(entry_id)
+            self._stats["added"] += 1
+
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def find(self, scope: str, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Best stored question in the same scope, or None. The result says
+        whether it clears the threshold ("served").
+        """
+        question_shingles = shingles(question)
+        if not question_shingles:
+            return None
+        guard = question_guard(question)
+        band_keys = self._band_keys(scope, minhash(question_shingles))
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            candidates: Set[int] = set()
+            for band_key in band_keys:
+                candidates.update(self._buckets.get(band_key, ()))
+
+            # Candidates with the same numbers and negations rank first; a
+            # mismatched one is only reported (for the audit), never served.
+            best = None
+            for entry_id in candidates:
+                _scope, stored_question, stored_shingles, stored_guard, cache_key, _bands = self._entries[entry_id]
+                candidate = {
+                    "entry_id": entry_id,
+                    "matched_question": stored_question,
+                    "cache_key": cache_key,
+                    "similarity": jaccard(question_shingles, stored_shingles),
+                    "guard_match": stored_guard == guard,
+                }
+                if best is None or (candidate["guard_match"], candidate["similarity"]) > (
+                    best["guard_match"],
+                    best["similarity"],
+                ):
+                    best = candidate
+
+            if best is None:
+                return None
+
+            above_threshold = best["similarity"] >= self.threshold
+            best["served"] = above_threshold and best["guard_match"]
+            if best["served"]:
+                self._stats["matches"] += 1
+                self._entries.move_to_end(best["entry_id"])
+            elif above_threshold:
+                self._stats["guard_rejects"] += 1
+            else:
+                self._stats["near_misses"] += 1
+            self._audit.append(
+                {
+                    "at": time.time(),
+                    "scope": scope,
+                    "question": question,
+                    "matched_question": best["matched_question"],
+                    "similarity": round(best["similarity"], 4),
+                    "guard_match": best["guard_match"],
+                    "served": best["served"],
+                }
+            )
+            return best
+
+    def forget(self, entry_id: int) -> None:
+        """
+        Drop an entry whose answer is no longer in the response cache.
+        """
+        with self._lock:
+            if entry_id in self._entries:
+                self._drop(entry_id)
+                self._stats["stale"] += 1
+
+    def audit(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._audit)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["lookups"]
+        stats["match_rate"] = (stats["matches"] / lookups) if lookups else 0.0
+        return stats
+
+
+# ------------------------------
+# 4. Shared instance
+# ------------------------------
+
+_faq: Optional[FAQCache] = None
+_faq_lock = threading.Lock()
+
+
+def faq_scope(
+    section: Optional[str],
+    model: str,
+    system_override: Optional[str],
+    knowledge_version: str = "",
+) -> str:
+    """
+    Questions only match within one section and one prompt variant
+    (model + default-context on/off + knowledge base version), since those
+    change the answer.
+    """
+    variant = hashlib.sha256(
+        f"{model}\x00{system_override or ''}\x00{knowledge_version}".encode("utf-8")
+    ).hexdigest()[:16]
+    return f"{section or 'general'}:{variant}"
+
+
+def get_faq_cache() -> Optional[FAQCache]:
+    """
+    Process-wide FAQ cache, or None when FAQ_CACHE_ENABLED=0.
+    """
+    global _faq
+
+    if not FAQ_ENABLED:
+        return None
+    if _faq is None:
+        with _faq_lock:
+            if _faq is None:
+                _faq = FAQCache()
+    return _faq
+
+
+def get_faq_stats() -> Dict[str, Any]:
+    faq = get_faq_cache()
+    return faq.stats() if faq is not None else {}
+
+
+def get_faq_audit() -> List[Dict[str, Any]]:
+    """
+    Recent lookups that found a candidate: the question, the stored question
+    it was compared with, the similarity and whether the answer was served.
+    """
+    faq = get_faq_cache()
+    return faq.audit() if faq is not None else []
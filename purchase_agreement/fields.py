@@ -0,0 +1,181 @@
+# purchase_agreement/fields.py
+
+from dataclasses import fields
+from datetime import datetime
+from typing import Optional, Dict, Any, Callable, Iterable, List, Tuple
+
+from purchase_agreement.models import (
+    SECTION_MODELS,
+    AgencyTerms,
+    ContingencyPeriod,
+    FinanceTerms,
+    OfferExpiration,
+    OfferTerms,
+    PurchaseAgreement,
+    get_agreement,
+)
+
+
+# ------------------------------
+# 1. Canonical terms
+# ------------------------------
+
+Getter = Callable[[PurchaseAgreement], Any]
+
+
+def _field(model: type, attribute: str) -> Getter:
+    def get(agreement: PurchaseAgreement) -> Any:
+        return getattr(agreement.section(model), attribute)
+
+    return get
+
+
+def _buyers(agreement: PurchaseAgreement) -> List[str]:
+    """Section 1 buyer names, split into individual buyers."""
+    names = agreement.section(OfferTerms).buyer_names.replace(" and ", ",").replace("&", ",")
+    return [n.strip() for n in names.split(",") if n.strip()]
+
+
+def _property_address_full(agreement: PurchaseAgreement) -> str:
+    offer = agreement.section(OfferTerms)
+    return ", ".join(p for p in (offer.property_address, offer.city, offer.county, offer.zip_code) if p)
+
+
+def _total_loan_amount(agreement: PurchaseAgreement) -> float:
+    finance = agreement.section(FinanceTerms)
+    return finance.first_loan_amount + finance.second_loan_amount
+
+
+def _expiration(agreement: PurchaseAgreement) -> Optional[datetime]:
+    expiration = agreement.section(OfferExpiration)
+    if not expiration.expiration_date or not expiration.expiration_time:
+        return None
+    return datetime.combine(expiration.expiration_date, expiration.expiration_time)
+
+
+# Terms whose field name alone would be ambiguous (several sections have
+# `notes`) or that are derived from more than one field.
+_NAMED_TERMS: Dict[str, Getter] = {
+    "agency_notes": _field(AgencyTerms, "notes"),
+    "contingency_notes": _field(ContingencyPeriod, "notes"),
+    "expiration_notes": _field(OfferExpiration, "notes"),
+    "buyers": _buyers,
+    "property_address_full": _property_address_full,
+    "total_loan_amount": _total_loan_amount,
+    "expiration": _expiration,
+}
+
+# Older names callers probed session_state with -> canonical term
+_ALIASES: Dict[str, str] = {
+    "pa_buyer_names": "buyer_names",
+    "pa1_buyer_names": "buyer_names",
+    "pa_property_address": "property_address",
+    "pa1_property_address": "property_address",
+    "pa_purchase_price": "purchase_price",
+    "pa1_purchase_price": "purchase_price",
+    "offer_price": "purchase_price",
+    "pa_initial_deposit": "initial_deposit_amount",
+    "earnest_money": "initial_deposit_amount",
+    "loan_amount": "total_loan_amount",
+    "down_payment": "down_payment_balance_amount",
+    "pa_contingency_days": "contingency_days",
+    "pa_contingency_notes": "contingency_notes",
+    "offer_expiration": "expiration",
+}
+
+# Other sections' terms worth giving the AI alongside a section's own data
+_RELATED_TERMS: Dict[str, Tuple[str, ...]] = {
+    "3": ("purchase_price",),
+    "14": ("has_loan_contingency", "loan_contingency_days", "has_appraisal_contingency", "appraisal_contingency_days"),
+    "31": ("property_address_full",),
+}
+
+
+# ------------------------------
+# 2. Index (built once at import)
+# ------------------------------
+
+def _build_index() -> Tuple[Dict[str, Getter], Dict[str, Tuple[str, ...]]]:
+    """
+    term -> getter, and section id -> the terms it owns.
+
+    Every model field is indexed under "<section>.<field>", and under its
+    bare name when no other section uses that name. Named terms and aliases
+    go on top. A duplicate canonical name is a bug, so it raises here rather
+    than silently resolving to whichever section registered last.
+    """
+    index: Dict[str, Getter] = {}
+    section_terms: Dict[str, Tuple[str, ...]] = {}
+
+    owners: Dict[str, List[str]] = {}
+    for section_id, model in SECTION_MODELS.items():
+        for f in fields(model):
+            owners.setdefault(f.name, []).append(section_id)
+
+    for section_id, model in SECTION_MODELS.items():
+        terms = []
+        for f in fields(model):
+            getter = _field(model, f.name)
+            index[f"{section_id}.{f.name}"] = getter
+            if len(owners[f.name]) == 1:
+                index[f.name] = getter
+            terms.append(f.name)
+        section_terms[section_id] = tuple(terms)
+
+    for name, getter in _NAMED_TERMS.items():
+        if name in index:
+            raise ValueError(f"Field term {name!r} is defined twice")
+        index[name] = getter
+    for alias, term in _ALIASES.items():
+        if alias in index:
+            raise ValueError(f"Field alias {alias!r} shadows a canonical term")
+        index[alias] = index[term]
+    for related in _RELATED_TERMS.values():
+        for term in related:
+            if term not in index:
+                raise ValueError(f"Unknown related field term {term!r}")
+
+    return index, section_terms
+
+
+_INDEX, _SECTION_TERMS = _build_index()
+
+
+# ------------------------------
+# 3. Resolving
+# ------------------------------
+
+def resolve(term: str, agreement: Optional[PurchaseAgreement] = None) -> Any:
+    """
+    Current value of one offer term from its owning section model: a single
+    dict lookup, whichever name (canonical, "<section>.<field>" or alias)
+    is used. Unknown terms raise KeyError.
+    """
+    return _INDEX[term](agreement if agreement is not None else get_agreement())
+
+
+def resolve_many(terms: Iterable[str], agreement: Optional[PurchaseAgreement] = None) -> Dict[str, Any]:
+    agreement = agreement if agreement is not None else get_agreement()
+    return {term: _INDEX[term](agreement) for term in terms}
+
+
+def section_state(section: str, agreement: Optional[PurchaseAgreement] = None) -> Dict[str, Any]:
+    """
+    A section's own fields plus the related terms from other sections, as
+    the `section_state` dict passed to the AI helpers.
+    """
+    section = str(section)
+    agreement = agreement if agreement is not None else get_agreement()
+    state: Dict[str, Any] = {}
+    model = SECTION_MODELS.get(section)
+    if model is not None:
+        instance = agreement.section(model)
+        for name in _SECTION_TERMS[section]:
+            state[name] = getattr(instance, name)
+    for term in _RELATED_TERMS.get(section, ()):
+        state[term] = _INDEX[term](agreement)
+    return state
+
+
+def known_terms() -> List[str]:
+    return sorted(_INDEX)
@@ -0,0 +1,577 @@
+# purchase_agreement/knowledge_index.py
+
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Set, Tuple
+
+from purchase_agreement.settings import env_float, env_int
+from purchase_agreement.tokens import count_tokens
+
+# NumPy powers the dense (semantic) index; without it we fall back to BM25 only.
+try:
+    from purchase_agreement.knowledge_vectors import DenseIndex, load_or_build
+except Exception:
+    DenseIndex = None
+    load_or_build = None
+
+
+# ------------------------------
+# 1. Settings
+# ------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _resolve_knowledge_dir() -> Path:
+    """
+    KNOWLEDGE_DIR from the environment, else the repo's knowledge/ folder
+    (the older capitalized Knowledge/ name is still accepted).
+    """
+    configured = os.environ.get("KNOWLEDGE_DIR")
+    if configured:
+        return Path(configured)
+    for name in ("knowledge", "Knowledge"):
+        if (PROJECT_ROOT / name).is_dir():
+            return PROJECT_ROOT / name
+    return PROJECT_ROOT / "knowledge"
+
+
+KNOWLEDGE_DIR = _resolve_knowledge_dir()
+KNOWLEDGE_PATTERNS = ("*.md", "*.txt")
+
+# How often (at most) a lookup re-checks the knowledge files for changes.
+# 0 turns hot reload off: files are read once per process.
+KNOWLEDGE_POLL_INTERVAL_S = env_float("KNOWLEDGE_POLL_INTERVAL_S", 2.0)
+
+CHUNK_MAX_TOKENS = env_int("KNOWLEDGE_CHUNK_TOKENS", 220)
+RETRIEVAL_TOP_K = env_int("KNOWLEDGE_TOP_K", 4)
+RETRIEVAL_TOKEN_BUDGET = env_int("KNOWLEDGE_TOKEN_BUDGET", 1200)
+
+DENSE_MIN_SCORE = 0.15  # ignore semantic matches below this cosine similarity
+RRF_K = 60  # reciprocal rank fusion constant
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+SECTION_BOOST = 0.5  # score multiplier bonus for chunks about the asked section
+
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be but by can do does for from has have how i if in into is it
+    its me my of on or our should so that the their them then there these they this
+    to was we what when where which who why will with would you your
+    """.split()
+)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+_SECTION_REF_RE = re.compile(r"\bsections?\s+(\d+)(?:\s*[-–]\s*(\d+))?", re.IGNORECASE)
+
+
+# ------------------------------
+# 2. Text helpers
+# ------------------------------
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens without stopwords, with a light plural trim
+    ("contingencies" → "contingenci", "fees" → "fee").
+    """
+    terms = []
+    for word in _WORD_RE.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith("es"):
+            word = word[:-2]
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def section_numbers(section: Optional[str]) -> Set[int]:
+    """
+    "8" → {8}; "10-13" → {10, 11, 12, 13}; "21-22" → {21, 22}.
+    """
+    if not section:
+        return set()
+
+    numbers = [int(n) for n in re.findall(r"\d+", str(section))]
+    if len(numbers) == 2 and numbers[0] < numbers[1]:
+        return set(range(numbers[0], numbers[1] + 1))
+    return set(numbers)
+
+
+def _referenced_sections(text: str) -> Set[int]:
+    found = set()
+    for match in _SECTION_REF_RE.finditer(text):
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else start
+        if start <= end <= start + 40:
+            found.update(range(start, end + 1))
+        else:
+            found.add(start)
+    return found
+
+
+# ------------------------------
+# 3. Chunking
+# ------------------------------
+
+def _split_by_headings(text: str) -> List[Tuple[str, str]]:
+    """
+    Split markdown into (heading path, body) blocks.
+    """
+    blocks = []
+    heading_stack: List[str] = []
+    body: List[str] = []
+
+    def flush():
+        content = "\n".join(body).strip()
+        if content:
+            blocks.append((" > ".join(heading_stack), content))
+        body.clear()
+
+    for line in text.splitlines():
+        match = _HEADING_RE.match(line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            heading_stack[:] = heading_stack[: level - 1] + [match.group(2).strip()]
+        else:
+            body.append(line)
+    flush()
+
+    return blocks
+
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?;:])\s+|\n+")
+
+
+def _pack(pieces: List[str], max_tokens: int, separator: str) -> List[str]:
+    """
+    Join consecutive pieces while they fit in max_tokens (a piece that is
+    too big on its own is passed through as is).
+    """
+    packed = []
+    current: List[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        # +1 for the separator, so the joined text stays within max_tokens
+        piece_tokens = count_tokens(piece) + (1 if current else 0)
+        if current and current_tokens + piece_tokens > max_tokens:
+            packed.append(separator.join(current))
+            current, current_tokens = [], 0
+            piece_tokens -= 1
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        packed.append(separator.join(current))
+    return packed
+
+
+def _split_oversized(paragraph: str, max_tokens: int) -> List[str]:
+    """
+    A paragraph longer than max_tokens, cut at sentence ends; a single
+    sentence that is still too long is cut into fixed word windows.
+    Without this such a paragraph became one chunk bigger than the
+    retrieval budget, and could never be retrieved.
+    """
+    pieces = []
+    for sentence in _SENTENCE_END_RE.split(paragraph):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if count_tokens(sentence) <= max_tokens:
+            pieces.append(sentence)
+        else:
+            pieces.extend(_pack(sentence.split(), max_tokens, " "))
+    return _pack(pieces, max_tokens, " ")
+
+
+def chunk_document(text: str, source: str, max_tokens: int = CHUNK_MAX_TOKENS) -> List[Dict[str, Any]]:
+    """
+    Cut one knowledge file into heading-scoped chunks of at most ~max_tokens
+    (heading included), packing whole paragraphs together where they fit
+    and splitting paragraphs that are too long on their own.
+    """
+    chunks = []
+
+    for heading, body in _split_by_headings(text):
+        # The heading is repeated at the top of each of its chunks
+        body_max = max(max_tokens - count_tokens(heading) - 1, max_tokens // 2, 1)
+        paragraphs = []
+        for paragraph in re.split(r"\n\s*\n", body):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if count_tokens(paragraph) > body_max:
+                paragraphs.extend(_split_oversized(paragraph, body_max))
+            else:
+                paragraphs.append(paragraph)
+
+        chunks.extend((heading, chunk_text) for chunk_text in _pack(paragraphs, body_max, "\n\n"))
+
+    result = []
+    for heading, chunk_text in chunks:
+        rendered = f"{heading}\n{chunk_text}" if heading else chunk_text
+        result.append(
+            {
+                "source": source,
+                "heading": heading,
+                "text": rendered,
+                "tokens": count_tokens(rendered),
+                "sections": _referenced_sections(rendered),
+            }
+        )
+    return result
+
+
+# ------------------------------
+# 4. BM25 index
+# ------------------------------
+
+class KnowledgeIndex:
+    """
+    Okapi BM25 over knowledge chunks, with a bonus for chunks that talk
+    about the section the user is asking from.
+    """
+
+    def __init__(self, chunks: List[Dict[str, Any]]):
+        self.chunks = chunks
+        self.total_tokens = sum(c["tokens"] for c in chunks)
+        # Identifies this version of the knowledge base (prompt compiler, caches)
+        digest = hashlib.sha256()
+        for chunk in chunks:
+            digest.update(chunk["source"].encode("utf-8") + b"\x00" + chunk["text"].encode("utf-8") + b"\x00")
+        self.content_hash = digest.hexdigest()[:16]
+
+        # Semantic index aligned with these chunks, attached by the store
+        # before this index is swapped in (None: BM25 only)
+        self.dense: Optional["DenseIndex"] = None
+
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._lengths: List[int] = []
+
+        for idx, chunk in enumerate(chunks):
+            terms = tokenize(chunk["text"])
+            self._lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self._postings.setdefault(term, []).append((idx, tf))
+
+        n_docs = len(chunks)
+        self._avg_length = (sum(self._lengths) / n_docs) if n_docs else 0.0
+        self._idf = {
+            term: math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def search(
+        self,
+        query: str,
+        section: Optional[str] = None,
+        top_k: int = RETRIEVAL_TOP_K,
+    ) -> List[Tuple[int, float]]:
+        """
+        Return up to top_k (chunk index, score) pairs, best first.
+        """
+        if not self.chunks:
+            return []
+
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term]
+            for idx, tf in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[idx] / (self._avg_length or 1))
+                scores[idx] = scores.get(idx, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        wanted_sections = section_numbers(section)
+        if wanted_sections:
+            for idx in scores:
+                if self.chunks[idx]["sections"] & wanted_sections:
+                    scores[idx] *= 1 + SECTION_BOOST
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:top_k]
+
+
+# ------------------------------
+# 5. Hot-reloading knowledge store
+# ------------------------------
+
+class KnowledgeStore:
+    """
+    Watches the knowledge directory and keeps a KnowledgeIndex over every
+    file in it, swapped in whole when something changes.
+
+    - Changes are detected by polling (at most every poll_interval_s, on
+      lookup) with a cheap stat() of each file; only files whose mtime or
+      size moved are re-read, and only those whose content hash changed are
+      re-chunked.
+    - A due check runs on a background thread. The new BM25 index (and,
+      with dense=True, its semantic index) is built there in full and then
+      replaces the old one atomically; requests keep using the previous
+      version until then and never wait for a rebuild.
+    - `version` (the index content hash) changes with the content, so
+      downstream caches keyed on it invalidate themselves.
+    """
+
+    def __init__(self, directory: Path, patterns: Tuple[str, ...], poll_interval_s: float, dense: bool = False):
+        self.directory = directory
+        self.patterns = patterns
+        self.poll_interval_s = poll_interval_s
+        self.dense = dense and load_or_build is not None
+
+        # _reload_lock: one reload at a time; _lock: the swap and its readers
+        self._reload_lock = threading.Lock()
+        self._lock = threading.Lock()
+        # relative path -> {"stamp": (mtime_ns, size), "sha": ..., "text": ..., "chunks": [...]}
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._index: Optional[KnowledgeIndex] = None
+        self._checked_at = 0.0
+        self._stats = {"scans": 0, "reloads": 0, "files_read": 0, "files_rechunked": 0, "last_reload": None}
+
+    def _scan(self) -> Dict[str, Tuple[Path, Tuple[int, int]]]:
+        found = {}
+        if self.directory.is_dir():
+            for pattern in self.patterns:
+                for path in self.directory.rglob(pattern):
+                    try:
+                        info = path.stat()
+                    except OSError:
+                        continue
+                    found[str(path.relative_to(self.directory))] = (path, (info.st_mtime_ns, info.st_size))
+        return found
+
+    def _reload(self) -> bool:
+        """
+        Caller holds _reload_lock. Returns True when a new index was swapped in.
+        """
+        self._checked_at = time.monotonic()
+        found = self._scan()
+        changed = set(self._files) - set(found)
+        files_read = files_rechunked = 0
+
+        files = {name: entry for name, entry in self._files.items() if name in found}
+        for name, (path, stamp) in found.items():
+            entry = files.get(name)
+            if entry is not None and entry["stamp"] == stamp:
+                continue
+            try:
+                text = path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                # Mid-write or unreadable: keep the previous version for now
+                continue
+            files_read += 1
+            sha = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            if entry is not None and entry["sha"] == sha:
+                files[name] = dict(entry, stamp=stamp)
+                continue
+            files_rechunked += 1
+            files[name] = {"stamp": stamp, "sha": sha, "text": text, "chunks": chunk_document(text, source=name)}
+            changed.add(name)
+
+        index = None
+        if self._index is None or changed:
+            chunks = [chunk for name in sorted(files) for chunk in files[name]["chunks"]]
+            index = KnowledgeIndex(chunks)
+            if self.dense and chunks:
+                index.dense = load_or_build([chunk["text"] for chunk in chunks])
+
+        with self._lock:
+            self._files = files
+            self._stats["scans"] += 1
+            self._stats["files_read"] += files_read
+            self._stats["files_rechunked"] += files_rechunked
+            if index is None:
+                return False
+            self._index = index
+            self._stats["reloads"] += 1
+            self._stats["last_reload"] = time.time()
+        return True
+
+    def refresh(self) -> bool:
+        """
+        Check for changes now, on the calling thread.
+        """
+        with self._reload_lock:
+            return self._reload()
+
+    def _reload_in_background(self) -> None:
+        try:
+            self._reload()
+        finally:
+            self._reload_lock.release()
+
+    def index(self) -> KnowledgeIndex:
+        index = self._index
+        if index is None:
+            # First use: there is no previous version to serve meanwhile
+            with self._reload_lock:
+                if self._index is None:
+                    self._reload()
+                return self._index
+
+        due = self.poll_interval_s > 0 and time.monotonic() - self._checked_at >= self.poll_interval_s
+        # One reload at a time, off the request path; everyone keeps using the current index
+        if due and self._reload_lock.acquire(blocking=False):
+            self._checked_at = time.monotonic()
+            try:
+                threading.Thread(target=self._reload_in_background, name="knowledge-reload", daemon=True).start()
+            except RuntimeError:
+                self._reload_lock.release()
+        return index
+
+    def text(self) -> str:
+        """
+        All knowledge files concatenated, in path order.
+        """
+        self.index()
+        with self._lock:
+            return "\n\n".join(self._files[name]["text"] for name in sorted(self._files))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["files"] = len(self._files)
+            stats["version"] = self._index.content_hash if self._index is not None else None
+        stats["directory"] = str(self.directory)
+        return stats
+
+
+_store = KnowledgeStore(KNOWLEDGE_DIR, KNOWLEDGE_PATTERNS, KNOWLEDGE_POLL_INTERVAL_S, dense=True)
+
+
+def get_knowledge_store() -> KnowledgeStore:
+    return _store
+
+
+def get_knowledge_index() -> KnowledgeIndex:
+    """
+    The index over the current version of every knowledge file.
+    """
+    return _store.index()
+
+
+def get_knowledge_version() -> str:
+    """
+    Content hash of the current knowledge base, for caches that must not
+    outlive it.
+    """
+    return _store.index().content_hash
+
+
+def get_dense_index(index: Optional[KnowledgeIndex] = None) -> Optional["DenseIndex"]:
+    """
+    Memory-mapped semantic index aligned with `index.chunks` (default: the
+    current index). The store loads it from .cache/knowledge_vectors when it
+    matches the chunks (see `python -m purchase_agreement.knowledge_vectors
+    build`), or builds it, together with each knowledge version.
+    """
+    index = index or get_knowledge_index()
+    return index.dense
+
+
+def hybrid_search(
+    query: str,
+    section: Optional[str] = None,
+    top_k: int = RETRIEVAL_TOP_K,
+    index: Optional[KnowledgeIndex] = None,
+) -> List[int]:
+    """
+    Fuse BM25 and dense rankings with reciprocal rank fusion, so exact
+    keyword hits and paraphrased questions both surface.
+    Returns chunk indices into `index` (default: the current one), best first.
+    """
+    index = index or get_knowledge_index()
+    candidates = top_k * 3
+    fused: Dict[int, float] = {}
+
+    for rank, (idx, _score) in enumerate(index.search(query, section=section, top_k=candidates)):
+        fused[idx] = fused.get(idx, 0.0) + 1.0 / (RRF_K + rank)
+
+    dense = get_dense_index(index)
+    if dense is not None:
+        for rank, (idx, score) in enumerate(dense.search(query, top_k=candidates)):
+            if score >= DENSE_MIN_SCORE:
+                fused[idx] = fused.get(idx, 0.0) + 1.0 / (RRF_K + rank)
+
+    ranked = sorted(fused.items(), key=lambda item: (-item[1], item[0]))
+    return [idx for idx, _score in ranked[:top_k]]
+
+
+# ------------------------------
+# 6. Retrieval for prompts
+# ------------------------------
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Any] = {
+    "calls": 0,
+    "prompt_tokens_injected": 0,
+    "prompt_tokens_saved": 0,
+    "last_call": None,
+}
+
+
+def retrieve_knowledge(
+    question: str,
+    section: Optional[str] = None,
+    top_k: int = RETRIEVAL_TOP_K,
+    token_budget: int = RETRIEVAL_TOKEN_BUDGET,
+    index: Optional[KnowledgeIndex] = None,
+) -> Dict[str, Any]:
+    """
+    Pick the knowledge chunks most relevant to the question and section,
+    staying within token_budget. Pass `index` to search the same snapshot
+    the rest of the prompt was built from (default: the current one).
+
+    Returns the joined text plus a small report:
+    tokens injected, tokens the full knowledge base would have cost,
+    and tokens saved by not pasting everything.
+    """
+    index = index or get_knowledge_index()
+    picked = []
+    used_tokens = 0
+
+    for idx in hybrid_search(question, section=section, top_k=top_k, index=index):
+        chunk = index.chunks[idx]
+        if used_tokens + chunk["tokens"] > token_budget:
+            continue
+        picked.append(chunk)
+        used_tokens += chunk["tokens"]
+
+    report = {
+        "chunks": len(picked),
+        "sources": sorted({c["source"] for c in picked}),
+        "tokens_injected": used_tokens,
+        "tokens_full_knowledge": index.total_tokens,
+        "tokens_saved": max(index.total_tokens - used_tokens, 0),
+    }
+
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["prompt_tokens_injected"] += used_tokens
+        _stats["prompt_tokens_saved"] += report["tokens_saved"]
+        _stats["last_call"] = report
+
+    return {
+        "text": "\n\n---\n\n".join(c["text"] for c in picked),
+        "report": report,
+    }
+
+
+def get_retrieval_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats = dict(_stats)
+
+    calls = stats["calls"]
+    stats["avg_tokens_saved_per_call"] = (stats["prompt_tokens_saved"] / calls) if calls else 0.0
+    return stats
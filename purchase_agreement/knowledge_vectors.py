@@ -0,0 +1,317 @@
+# purchase_agreement/knowledge_vectors.py
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Optional, List, Tuple
+
+import numpy as np
+
+from purchase_agreement.settings import env_int
+
+
+# ------------------------------
+# 1. Settings
+# ------------------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+VECTOR_DIR = Path(os.environ.get("KNOWLEDGE_VECTOR_DIR", PROJECT_ROOT / ".cache" / "knowledge_vectors"))
+
+# Builds kept in VECTOR_DIR, newest first; older ones are deleted after a save.
+VECTOR_BUILDS_KEPT = env_int("KNOWLEDGE_VECTOR_BUILDS_KEPT", 3)
+
+HASH_DIM = env_int("KNOWLEDGE_HASH_DIM", 2048)
+LSA_DIM = env_int("KNOWLEDGE_LSA_DIM", 256)
+SEARCH_BLOCK_ROWS = 16384
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+# ------------------------------
+# 2. Hashed n-gram features
+# ------------------------------
+
+def _features(text: str) -> List[str]:
+    """
+    Word unigrams, word bigrams and character 4-grams of each word.
+    Char n-grams let "contingencies" / "contingency" / "contingent" overlap.
+    """
+    words = _WORD_RE.findall(text.lower())
+    feats = ["w:" + w for w in words]
+    feats += ["b:" + a + "_" + b for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f"<{w}>"
+        if len(padded) <= 4:
+            feats.append("c:" + padded)
+        else:
+            feats += ["c:" + padded[i:i + 4] for i in range(len(padded) - 3)]
+    return feats
+
+
+def hash_counts(texts: List[str], dim: int = HASH_DIM) -> np.ndarray:
+    """
+    Signed feature hashing → (len(texts), dim) float32 term counts.
+    crc32 keeps bucket ids stable across processes (unlike hash()).
+    """
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for feat in _features(text):
+            h = zlib.crc32(feat.encode("utf-8"))
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            matrix[row, h % dim] += sign
+    return matrix
+
+
+def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+# ------------------------------
+# 3. Dense index
+# ------------------------------
+
+class DenseIndex:
+    """
+    TF-IDF over hashed n-grams, optionally projected with LSA (truncated SVD),
+    stored as a memory-mapped float32 matrix of unit vectors.
+    """
+
+    def __init__(self, vectors: np.ndarray, idf: np.ndarray, projection: Optional[np.ndarray]):
+        self.vectors = vectors
+        self.idf = idf
+        self.projection = projection
+
+    # ---- building ----
+
+    @classmethod
+    def build(cls, texts: List[str], lsa_dim: int = LSA_DIM) -> "DenseIndex":
+        counts = hash_counts(texts)
+        tf = np.sign(counts) * np.log1p(np.abs(counts))
+
+        doc_freq = np.count_nonzero(counts, axis=0).astype(np.float32)
+        idf = (np.log((1 + len(texts)) / (1 + doc_freq)) + 1.0).astype(np.float32)
+        weighted = _l2_normalize(tf * idf)
+
+        projection = None
+        # LSA only pays off once there are clearly more chunks than latent dims.
+        if lsa_dim and len(texts) > 2 * lsa_dim:
+            projection = _randomized_svd_basis(weighted, lsa_dim)
+            weighted = _l2_normalize(weighted @ projection)
+
+        return cls(weighted, idf, projection)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        counts = hash_counts(texts, dim=self.idf.shape[0])
+        tf = np.sign(counts) * np.log1p(np.abs(counts))
+        weighted = _l2_normalize(tf * self.idf)
+        if self.projection is not None:
+            weighted = _l2_normalize(weighted @ self.projection)
+        return weighted
+
+    # ---- search ----
+
+    def search_batch(self, queries: List[str], top_k: int = 5) -> List[List[Tuple[int, float]]]:
+        """
+        Cosine top-k for several queries at once.
+        Scans the matrix in row blocks so memory stays flat at 100k+ chunks.
+        """
+        n_rows = self.vectors.shape[0]
+        if n_rows == 0 or not queries or top_k <= 0:
+            return [[] for _ in queries]
+
+        q = self.embed(queries)
+        k = min(top_k, n_rows)
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+
+        for start in range(0, n_rows, SEARCH_BLOCK_ROWS):
+            block = np.asarray(self.vectors[start:start + SEARCH_BLOCK_ROWS])
+            scores = q @ block.T
+            kk = min(k, scores.shape[1])
+            part = np.argpartition(-scores, kk - 1, axis=1)[:, :kk]
+
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, part, axis=1)], axis=1)
+            best_ids = np.concatenate([best_ids, part + start], axis=1)
+
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_ids = np.take_along_axis(best_ids, keep, axis=1)
+
+        results = []
+        for row in range(len(queries)):
+            order = np.argsort(-best_scores[row], kind="stable")
+            results.append([(int(best_ids[row, i]), float(best_scores[row, i])) for i in order])
+        return results
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:
+        return self.search_batch([query], top_k=top_k)[0]
+
+    # ---- persistence ----
+
+    def save(self, directory: Path, fingerprint: str) -> Path:
+        """
+        Publish the index under its own build directory, directory/<fingerprint>.
+
+        The files are written to a temporary directory next to it and renamed
+        into place, and a published build is never written again: other
+        processes may have its vectors.npy memory-mapped, and truncating a
+        mapped file crashes them (SIGBUS) on their next search.
+        """
+        target = build_dir(directory, fingerprint)
+        if (target / "meta.json").exists():
+            return target
+
+        directory.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".building-", dir=directory))
+        try:
+            np.save(staging / "vectors.npy", np.ascontiguousarray(self.vectors, dtype=np.float32))
+            np.save(staging / "idf.npy", self.idf)
+            if self.projection is not None:
+                np.save(staging / "projection.npy", self.projection)
+
+            meta = {
+                "fingerprint": fingerprint,
+                "rows": int(self.vectors.shape[0]),
+                "dim": int(self.vectors.shape[1]) if self.vectors.ndim == 2 else 0,
+                "hash_dim": int(self.idf.shape[0]),
+                "lsa": self.projection is not None,
+            }
+            (staging / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+            try:
+                os.replace(staging, target)
+            except OSError:
+                # Another process published the same build first
+                if not (target / "meta.json").exists():
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return target
+
+    @classmethod
+    def load(cls, directory: Path, fingerprint: str) -> Optional["DenseIndex"]:
+        """
+        Memory-map a saved index, or return None if no build of these
+        knowledge chunks was published.
+        """
+        target = build_dir(directory, fingerprint)
+        meta_path = target / "meta.json"
+        if not meta_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("fingerprint") != fingerprint:
+                return None
+            vectors = np.load(target / "vectors.npy", mmap_mode="r")
+            idf = np.load(target / "idf.npy")
+            projection = np.load(target / "projection.npy") if meta.get("lsa") else None
+        except (OSError, ValueError):
+            return None
+        return cls(vectors, idf, projection)
+
+
+def build_dir(directory: Path, fingerprint: str) -> Path:
+    return directory / fingerprint[:16]
+
+
+def prune_builds(directory: Path, keep: int = VECTOR_BUILDS_KEPT) -> None:
+    """
+    Delete all but the `keep` newest builds. A process still mapping a
+    deleted build keeps reading it: the files are only unlinked, never
+    truncated (where unlinking a mapped file fails, the build stays).
+    """
+    builds = []
+    try:
+        for path in directory.iterdir():
+            if (path / "meta.json").exists():
+                builds.append((path.stat().st_mtime, path))
+    except OSError:
+        return
+    builds.sort(reverse=True)
+    for _mtime, path in builds[max(keep, 1):]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _randomized_svd_basis(matrix: np.ndarray, rank: int, oversample: int = 10, n_iter: int = 4) -> np.ndarray:
+    """
+    Top right-singular vectors of `matrix` (Halko et al. randomized SVD),
+    returned as a (n_features, rank) float32 projection.
+    """
+    rng = np.random.default_rng(0)
+    n_features = matrix.shape[1]
+    probe = rng.standard_normal((n_features, rank + oversample)).astype(np.float32)
+
+    basis = matrix @ probe
+    for _ in range(n_iter):
+        basis, _ = np.linalg.qr(basis)
+        basis = matrix @ (matrix.T @ basis)
+    basis, _ = np.linalg.qr(basis)
+
+    small = basis.T @ matrix
+    _, _, vt = np.linalg.svd(small, full_matrices=False)
+    return vt[:rank].T.astype(np.float32)
+
+
+def chunks_fingerprint(texts: List[str]) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"hash_dim={HASH_DIM};lsa_dim={LSA_DIM}".encode("utf-8"))
+    for text in texts:
+        digest.update(b"\x00")
+        digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_or_build(texts: List[str], directory: Path = VECTOR_DIR) -> DenseIndex:
+    """
+    Reuse the on-disk index when it matches these chunks; otherwise build it
+    and try to persist it for the next process.
+    """
+    fingerprint = chunks_fingerprint(texts)
+    index = DenseIndex.load(directory, fingerprint)
+    if index is not None:
+        return index
+
+    index = DenseIndex.build(texts)
+    try:
+        index.save(directory, fingerprint)
+        prune_builds(directory)
+    except OSError:
+        pass
+    return index
+
+
+# ------------------------------
+# 4. Offline build entry point
+# ------------------------------
+
+def main(argv: List[str]) -> int:
+    """
+    python -m purchase_agreement.knowledge_vectors build
+    """
+    if argv[:1] != ["build"]:
+        print("usage: python -m purchase_agreement.knowledge_vectors build")
+        return 2
+
+    from purchase_agreement.knowledge_index import KNOWLEDGE_DIR, KNOWLEDGE_PATTERNS, KnowledgeStore
+
+    # A store of its own, so the index is built once here and not also by the app's store
+    store = KnowledgeStore(KNOWLEDGE_DIR, KNOWLEDGE_PATTERNS, poll_interval_s=0)
+    texts = [chunk["text"] for chunk in store.index().chunks]
+    index = DenseIndex.build(texts)
+    target = index.save(VECTOR_DIR, chunks_fingerprint(texts))
+    prune_builds(VECTOR_DIR)
+    print(f"Built dense index: {index.vectors.shape[0]} chunks × {index.vectors.shape[1]} dims → {target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,279 @@
+# purchase_agreement/model_router.py
+
+import os
+import re
+import threading
+from collections import deque
+from typing import Optional, Dict, Any, List, NamedTuple
+
+from purchase_agreement.settings import env_flag, percentile
+
+
+# ------------------------------
+# 1. Models + prices
+# ------------------------------
+
+MODEL_SMALL = os.environ.get("AI_MODEL_SMALL", "gpt-4.1-nano")
+MODEL_DEFAULT = os.environ.get("AI_MODEL_DEFAULT", "gpt-4.1-mini")
+MODEL_LARGE = os.environ.get("AI_MODEL_LARGE", "gpt-4.1")
+
+ROUTER_ENABLED = env_flag("AI_ROUTER_ENABLED")
+
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICES: Dict[str, tuple] = {
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+    """
+    Cost of one call in USD; cached prompt tokens are billed at the cached rate.
+    Unknown models are priced like the default model.
+    """
+    input_price, cached_price, output_price = MODEL_PRICES.get(model, MODEL_PRICES["gpt-4.1-mini"])
+    uncached = max(prompt_tokens - cached_tokens, 0)
+    return (uncached * input_price + cached_tokens * cached_price + completion_tokens * output_price) / 1_000_000
+
+
+# ------------------------------
+# 2. Precomputed glossary answers
+# ------------------------------
+
+GLOSSARY_NOTE = "\n\n_This is a general definition, not legal advice. Confirm details with your agent._"
+
+GLOSSARY: Dict[str, str] = {
+    "apn": "**APN (Assessor's Parcel Number)** is the number the county assessor uses to identify a "
+           "parcel of land for property-tax purposes. It appears on the tax bill and the preliminary "
+           "title report, and the purchase agreement uses it to identify the property.",
+    "coe": "**COE (Close of Escrow)** is the day the deed is recorded and the sale is complete. Many "
+           "contract deadlines (and possession) are counted from or tied to COE.",
+    "emd": "**EMD (Earnest Money Deposit)** is the buyer's initial deposit, usually wired to escrow "
+           "within 3 business days of acceptance. It is credited toward the purchase price at closing.",
+    "rpa": "**RPA** is the California Residential Purchase Agreement (the CAR form this app walks "
+           "through). It is the main contract between buyer and seller.",
+    "hoa": "**HOA (Homeowners Association)** manages common areas in a condo or planned development. "
+           "The seller must provide HOA documents (CC&Rs, budget, minutes) for the buyer to review.",
+    "tds": "**TDS (Transfer Disclosure Statement)** is the seller's required disclosure of known "
+           "conditions and defects of the property.",
+    "spq": "**SPQ (Seller Property Questionnaire)** is a CAR form where the seller answers additional "
+           "questions about the property beyond the TDS.",
+    "nhd": "**NHD (Natural Hazard Disclosure)** tells the buyer whether the property is in zones such as "
+           "flood, fire, or earthquake fault hazard areas.",
+    "cc&r": "**CC&Rs (Covenants, Conditions & Restrictions)** are the recorded rules that govern how "
+            "properties in a development or HOA may be used.",
+    "avid": "**AVID (Agent Visual Inspection Disclosure)** is the agent's written report of what they "
+            "noticed during a visual, non-invasive inspection of the accessible areas.",
+    "ltv": "**LTV (Loan-to-Value)** is the loan amount divided by the property's value or price. "
+           "An 80% LTV means a 20% down payment.",
+    "dti": "**DTI (Debt-to-Income ratio)** is your monthly debt payments divided by gross monthly "
+           "income. Lenders use it to decide how much you can borrow.",
+    "piti": "**PITI** stands for Principal, Interest, Taxes and Insurance, the parts of a typical "
+            "monthly mortgage payment.",
+    "heloc": "**HELOC (Home Equity Line of Credit)** is a revolving credit line secured by a home's equity.",
+    "nbp": "**NBP (Notice to Buyer to Perform)** is a written notice the seller can send after a "
+           "deadline passes, giving the buyer at least 2 days to act before the seller may cancel.",
+    "nsp": "**NSP (Notice to Seller to Perform)** is the buyer's version: it gives the seller at least "
+           "2 days to perform before the buyer may cancel.",
+    "rr": "**RR (Request for Repair)** is the form a buyer uses to ask the seller for repairs or "
+          "credits after inspections.",
+}
+
+_GLOSSARY_ALIASES = {
+    "earnest money": "emd",
+    "earnest money deposit": "emd",
+    "assessor's parcel number": "apn",
+    "assessor parcel number": "apn",
+    "close of escrow": "coe",
+    "ccr": "cc&r",
+    "cc&rs": "cc&r",
+    "ccrs": "cc&r",
+    "request for repair": "rr",
+}
+
+_DEFINITION_RE = re.compile(
+    r"^\s*(?:what(?:'s| is| are| does)|define|meaning of|explain)\s+(?:an?\s+|the\s+)?"
+    r"(?P<term>[a-z&' ]{2,40}?)\s*(?:mean|stand for)?\s*\??\s*$",
+    re.IGNORECASE,
+)
+
+
+def glossary_answer(question: str) -> Optional[str]:
+    """
+    Precomputed answer for short "what is an APN?"-style questions, or None.
+    """
+    match = _DEFINITION_RE.match(question)
+    if not match:
+        return None
+    raw = match.group("term").strip().lower()
+    for candidate in (raw, raw.rstrip("s")):
+        term = _GLOSSARY_ALIASES.get(candidate, candidate)
+        if term in GLOSSARY:
+            return GLOSSARY[term] + GLOSSARY_NOTE
+    return None
+
+
+# ------------------------------
+# 3. Question classifier
+# ------------------------------
+
+class Route(NamedTuple):
+    name: str              # "glossary" | "simple" | "standard" | "complex" | "pinned"
+    model: Optional[str]   # None for the glossary route (no API call)
+    score: float
+    reasons: List[str]
+
+
+_COMPLEX_TERMS = re.compile(
+    r"\b(arbitrat\w*|liquidated damages|specific performance|breach\w*|sue|lawsuit|litigat\w*|"
+    r"attorney|legal|remed\w*|mediat\w*|default\w*|cancel\w*|terminat\w*|dispute\w*|"
+    r"1031|trust|probate|estate sale|short sale|foreclos\w*|tenant\w*|rent ?back|lien\w*|"
+    r"contingenc\w*|appraisal gap|backup offer)\b",
+    re.IGNORECASE,
+)
+_REASONING_TERMS = re.compile(
+    r"\b(should|what if|what happens|compare|versus|vs\.?|pros and cons|trade-?offs?|"
+    r"strategy|risk\w*|negotiat\w*|recommend\w*|better to|how do i decide)\b",
+    re.IGNORECASE,
+)
+_SIMPLE_OPENERS = re.compile(
+    r"^\s*(what is|what's|what does|define|who pays|when is|when does|how many days|is it normal)\b",
+    re.IGNORECASE,
+)
+
+# Sections whose questions are usually legal / multi-step.
+SECTION_WEIGHTS = {"21-22": 1.5, "14": 0.5, "23-30": 0.5, "9": 0.3}
+
+SIMPLE_MAX_SCORE = 0.0
+COMPLEX_MIN_SCORE = 2.5
+
+
+def classify_question(
+    question: str,
+    section: Optional[str] = None,
+    section_state: Optional[Dict[str, Any]] = None,
+    system_override: Optional[str] = None,
+) -> Route:
+    """
+    Score a question with cheap local features and pick a route:
+    <= SIMPLE_MAX_SCORE → small model, >= COMPLEX_MIN_SCORE → large model,
+    otherwise the default model.
+    """
+    if glossary_answer(question) is not None:
+        return Route("glossary", None, -10.0, ["glossary term"])
+
+    reasons: List[str] = []
+    score = 0.0
+    words = len(question.split())
+
+    if words > 40:
+        score += 1.5
+        reasons.append("long question")
+    elif words > 20:
+        score += 0.75
+        reasons.append("medium question")
+    elif words <= 10:
+        score -= 0.5
+
+    complex_hits = len(set(m.lower() for m in _COMPLEX_TERMS.findall(question)))
+    if complex_hits:
+        score += min(complex_hits, 3)
+        reasons.append(f"{complex_hits} legal/complex term(s)")
+
+    if _REASONING_TERMS.search(question):
+        score += 1.0
+        reasons.append("asks for judgement")
+
+    if question.count("?") > 1:
+        score += 0.5
+        reasons.append("several questions")
+
+    if _SIMPLE_OPENERS.match(question) and not complex_hits:
+        score -= 1.0
+        reasons.append("definitional")
+
+    weight = SECTION_WEIGHTS.get(str(section), 0.0)
+    if weight:
+        score += weight
+        reasons.append(f"section {section}")
+
+    if system_override:
+        # Default explainers ask for a multi-topic overview of the section
+        score += 0.75
+        reasons.append("section briefing")
+
+    if section_state:
+        score += 0.25
+
+    if score >= COMPLEX_MIN_SCORE:
+        return Route("complex", MODEL_LARGE, score, reasons)
+    if score <= SIMPLE_MAX_SCORE:
+        return Route("simple", MODEL_SMALL, score, reasons)
+    return Route("standard", MODEL_DEFAULT, score, reasons)
+
+
+def route_question(
+    question: str,
+    section: Optional[str] = None,
+    section_state: Optional[Dict[str, Any]] = None,
+    system_override: Optional[str] = None,
+    model: Optional[str] = None,
+) -> Route:
+    """
+    An explicit model always wins; otherwise classify (or use the default
+    model when AI_ROUTER_ENABLED=0).
+    """
+    if model:
+        return Route("pinned", model, 0.0, ["model pinned by caller"])
+    if not ROUTER_ENABLED:
+        return Route("standard", MODEL_DEFAULT, 0.0, ["router disabled"])
+    return classify_question(question, section, section_state, system_override)
+
+
+# ------------------------------
+# 4. Per-route metrics
+# ------------------------------
+
+ROUTE_LATENCY_SAMPLES = 500
+
+_stats_lock = threading.Lock()
+_route_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def record_route(route: Route, latency_s: float, cost_usd: float = 0.0) -> None:
+    with _stats_lock:
+        stats = _route_stats.setdefault(
+            route.name,
+            {"requests": 0, "cost_usd": 0.0, "latencies": deque(maxlen=ROUTE_LATENCY_SAMPLES)},
+        )
+        stats["requests"] += 1
+        stats["cost_usd"] += cost_usd
+        stats["latencies"].append(latency_s)
+
+
+def get_router_stats() -> Dict[str, Any]:
+    """
+    Requests, latency and estimated cost per route, plus the escalation rate
+    (share of routed questions sent to the large model).
+    """
+    with _stats_lock:
+        snapshot = {name: dict(stats, latencies=list(stats["latencies"])) for name, stats in _route_stats.items()}
+
+    routes = {}
+    for name, stats in snapshot.items():
+        requests = stats["requests"]
+        routes[name] = {
+            "requests": requests,
+            "cost_usd": stats["cost_usd"],
+            "avg_cost_usd": (stats["cost_usd"] / requests) if requests else 0.0,
+            "latency_p50_s": percentile(stats["latencies"], 50),
+            "latency_p95_s": percentile(stats["latencies"], 95),
+        }
+
+    routed = sum(r["requests"] for name, r in routes.items() if name != "pinned")
+    escalated = routes.get("complex", {}).get("requests", 0)
+    return {
+        "routes": routes,
+        "escalation_rate": (escalated / routed) if routed else 0.0,
+    }
@@ -0,0 +1,416 @@
+# purchase_agreement/models.py
+
+import logging
+from dataclasses import asdict, dataclass, field, fields
+from datetime import date, time
+from typing import Optional, Dict, Any, Callable, Sequence, Type, TypeVar
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+# ------------------------------
+# 1. Registry + schema version
+# ------------------------------
+
+# Bump when a field is renamed, removed or changes meaning, and add a
+# migration from the previous version to _MIGRATIONS.
+SCHEMA_VERSION = 1
+
+# version -> function upgrading a serialized agreement from it to version + 1
+_MIGRATIONS: Dict[int, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+
+# section id -> model class (and back)
+SECTION_MODELS: Dict[str, Type] = {}
+_SECTION_IDS: Dict[Type, str] = {}
+
+# Serialized as ISO strings
+_TEMPORAL_PARSERS: Dict[Any, Callable[[str], Any]] = {
+    Optional[date]: date.fromisoformat,
+    Optional[time]: time.fromisoformat,
+}
+
+
+def register_section(section: str) -> Callable[[Type[T]], Type[T]]:
+    def decorate(cls: Type[T]) -> Type[T]:
+        SECTION_MODELS[section] = cls
+        _SECTION_IDS[cls] = section
+        return cls
+
+    return decorate
+
+
+def section_to_dict(model: Any) -> Dict[str, Any]:
+    """
+    Plain dict of the model's fields; dates and times stay Python objects
+    (for prompts and the final review). See PurchaseAgreement.to_dict for
+    the JSON-safe form.
+    """
+    return asdict(model)
+
+
+# ------------------------------
+# 2. Section models
+# ------------------------------
+
+@register_section("1")
+@dataclass(slots=True)
+class OfferTerms:
+    """Section 1 – Offer: who is buying, what property, price, close of escrow."""
+
+    buyer_names: str = ""
+    property_address: str = ""
+    city: str = ""
+    county: str = ""
+    zip_code: str = ""
+    apn: str = ""
+    purchase_price: Optional[int] = None
+    close_type: str = "days_after_acceptance"  # or "specific_date"
+    close_days_after: Optional[int] = 30
+    close_date: Optional[date] = None
+    human_summary: str = ""  # plain-English summary we generate
+
+
+@register_section("2")
+@dataclass(slots=True)
+class AgencyTerms:
+    """Section 2 – Agency. For now we assume no agent."""
+
+    has_agent: bool = False
+    notes: str = "User assumed to have no agent; broker representation sections skipped for now."
+
+
+@register_section("3")
+@dataclass(slots=True)
+class FinanceTerms:
+    """Section 3 – Finance terms, deposits, loans and the related contingencies."""
+
+    # 3A – Initial Deposit
+    initial_deposit_amount: float = 0.0
+    initial_deposit_method: str = "Direct to escrow holder"
+    initial_deposit_instrument: str = "Wire transfer"
+    initial_deposit_days: int = 3
+    show_deposit_explanation: bool = False
+
+    # 3B – Increased Deposit
+    has_increased_deposit: bool = False
+    increased_deposit_amount: float = 0.0
+    increased_deposit_days: int = 10
+
+    # 3C–3E – All-Cash / Loans
+    is_all_cash: bool = False
+    proof_of_funds_days: int = 3
+
+    first_loan_amount: float = 0.0
+    first_loan_type: str = "Conventional"
+    first_loan_fixed_or_arm: str = "Fixed rate"
+    first_loan_max_rate: float = 8.0
+    first_loan_max_points: float = 1.0
+
+    has_second_loan: bool = False
+    second_loan_amount: float = 0.0
+    second_loan_type: str = "Conventional"
+    second_loan_fixed_or_arm: str = "Fixed rate"
+    second_loan_max_rate: float = 9.0
+    second_loan_max_points: float = 1.0
+
+    additional_financing_terms: str = ""
+
+    # 3F / 3G / 3H
+    purchase_price_total_manual: float = 0.0  # fallback if Section 1 has no price
+    down_payment_balance_amount: float = 0.0
+    verification_funds_days: int = 3
+
+    # 3I – Appraisal Contingency
+    has_appraisal_contingency: bool = True
+    appraisal_contingency_days: int = 17
+
+    # 3J – Loan Application / Letter
+    loan_letter_days: int = 3
+    loan_preapproval_attached: bool = False
+
+    # 3K – Loan Contingency
+    has_loan_contingency: bool = True
+    loan_contingency_days: int = 21
+
+
+@register_section("4")
+@dataclass(slots=True)
+class SaleOfBuyerProperty:
+    """Section 4 – Sale of Buyer's Property (A/B choice) and related addenda."""
+
+    is_contingent_on_sale: bool = False  # False = Option A, True = Option B
+
+    # If contingent (Option B):
+    buyer_property_address: str = ""
+    buyer_property_status: str = "Not listed"
+    buyer_property_notes: str = ""
+
+    # Section 5 – Addenda & Advisories (related to this contingency)
+    other_addenda_notes: str = ""
+
+
+@register_section("6")
+@dataclass(slots=True)
+class OtherTerms:
+    """Section 6 – Other terms."""
+
+    other_terms: str = ""
+
+
+@register_section("7")
+@dataclass(slots=True)
+class AllocationOfCosts:
+    """Section 7 – Who pays for inspections, escrow, title, HOA and transfer fees."""
+
+    # 7A – Inspections, reports and certificates
+    general_inspection_party: str = "Buyer"
+    general_inspection_other: str = ""
+    pest_inspection_party: str = "Buyer"
+    pest_inspection_other: str = ""
+    gov_reports_party: str = "Buyer"
+    gov_reports_notes: str = ""
+
+    # 7B – Escrow and title
+    escrow_fees_party: str = "Buyer"
+    escrow_fees_other: str = ""
+    owner_title_party: str = "Buyer"
+    owner_title_other: str = ""
+    lender_title_party: str = "Buyer"
+    lender_title_other: str = ""
+    title_escrow_notes: str = ""
+
+    # 7C – HOA fees and documents
+    hoa_transfer_fee_party: str = "Buyer"
+    hoa_transfer_fee_other: str = ""
+    hoa_move_fees_party: str = "Buyer"
+    hoa_move_fees_other: str = ""
+    hoa_docs_party: str = "Buyer"
+    hoa_notes: str = ""
+
+    # 7D – Transfer taxes and fees
+    county_transfer_tax_party: str = "Buyer"
+    county_transfer_tax_other: str = ""
+    city_transfer_tax_party: str = "Buyer"
+    city_transfer_tax_other: str = ""
+    private_transfer_fee_party: str = "Buyer"
+    private_transfer_fee_other: str = ""
+    other_cost_notes: str = ""
+
+
+@register_section("8")
+@dataclass(slots=True)
+class PropertyCondition:
+    """Section 8 – As-is condition, seller repairs, repair credits and home warranty."""
+
+    # 8A – As-is
+    sold_as_is: bool = True
+    as_is_exceptions: str = ""
+    buyer_condition_concerns: str = ""
+
+    # 8B – Seller repairs before close
+    seller_repairs: str = ""
+    repair_cap: float = 0.0  # 0 = no cap
+    repair_notes: str = ""
+
+    # 8C – Credit in lieu of repairs
+    repair_credit_amount: float = 0.0
+    repair_credit_reason: str = ""
+
+    # 8D – Home warranty
+    has_home_warranty: bool = False
+    home_warranty_party: str = "Buyer"
+    home_warranty_other: str = ""
+    home_warranty_cap: float = 0.0  # 0 = no cap
+    home_warranty_company: str = ""
+    no_home_warranty_notes: str = ""
+
+    # 8E – Free-form
+    other_condition_terms: str = ""
+
+
+@register_section("9")
+@dataclass(slots=True)
+class ClosingAndPossession:
+    """Section 9 – Closing date, possession, keys and final verification."""
+
+    # 9A – Closing date
+    target_closing_date: Optional[date] = None
+    close_timing: str = "On the date specified above"
+    allow_closing_extension: bool = False
+    closing_notes: str = ""
+
+    # 9B – Buyer possession
+    buyer_possession: str = "At close of escrow"
+    buyer_possession_other: str = ""
+    buyer_possession_notes: str = ""
+
+    # 9C – Seller remaining in possession
+    seller_possession: str = "No – Seller will deliver vacant possession at close"
+    seller_possession_sip: bool = False
+    seller_possession_rlas: bool = False
+    seller_possession_other_agreement: bool = False
+    seller_possession_details: str = ""
+
+    # 9D – Keys and access devices
+    key_delivery_timing: str = "At close of escrow"
+    key_items: str = ""
+    key_delivery_notes: str = ""
+
+    # 9E – Final verification of condition
+    final_verification: str = "Buyer will perform final verification (recommended)"
+    walkthrough_date: Optional[date] = None
+    walkthrough_contact: str = ""
+    final_verification_notes: str = ""
+
+
+@register_section("14")
+@dataclass(slots=True)
+class ContingencyPeriod:
+    """Section 14 – Overall contingency period (14B(1))."""
+
+    contingency_days: int = 17
+    notes: str = ""
+
+
+@register_section("15")
+@dataclass(slots=True)
+class TimingPreferences:
+    """Section 15 – The buyer's timing preferences (the section's legal text is standard)."""
+
+    closing_flexibility: str = "I need a very specific closing date"
+    signing_preference: str = "No strong preference"
+    timing_notes: str = ""
+
+
+@register_section("21-22")
+@dataclass(slots=True)
+class RemediesAndDisputes:
+    """Sections 21–22 – How the buyer feels about liquidated damages and arbitration."""
+
+    liquidated_damages_comfort: str = "I need to talk to an attorney before signing"
+    arbitration_comfort: str = "I need to talk to an attorney before deciding"
+    remedies_notes: str = ""
+
+
+@register_section("23-30")
+@dataclass(slots=True)
+class GeneralTermsNotes:
+    """Sections 23–30 – The buyer's notes on the general terms, brokers and addenda."""
+
+    general_terms_notes: str = ""
+
+
+@register_section("31")
+@dataclass(slots=True)
+class OfferExpiration:
+    """Section 31 – When the offer expires."""
+
+    expiration_date: Optional[date] = None
+    expiration_time: Optional[time] = None
+    notes: str = ""
+
+
+# ------------------------------
+# 3. Whole agreement
+# ------------------------------
+
+@dataclass(slots=True)
+class PurchaseAgreement:
+    """
+    All section models for one buyer, created lazily per section.
+    Sections read and write fields by attribute:
+
+        offer = get_section(OfferTerms)
+        offer.purchase_price = st.number_input(..., value=offer.purchase_price or 0)
+    """
+
+    sections: Dict[str, Any] = field(default_factory=dict)
+
+    def section(self, model: Type[T]) -> T:
+        section_id = _SECTION_IDS[model]
+        instance = self.sections.get(section_id)
+        if instance is None:
+            instance = self.sections[section_id] = model()
+        return instance
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-safe form, tagged with SCHEMA_VERSION (dates and times as ISO
+        strings). Sections never opened are left out.
+        """
+        sections = {}
+        for section_id, instance in sorted(self.sections.items()):
+            sections[section_id] = {
+                f.name: (value.isoformat() if isinstance(value, (date, time)) else value)
+                for f in fields(instance)
+                for value in (getattr(instance, f.name),)
+            }
+        return {"schema_version": SCHEMA_VERSION, "sections": sections}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PurchaseAgreement":
+        """
+        Inverse of to_dict. Older schema versions are migrated first;
+        unknown sections and fields are dropped (and logged), missing ones
+        take their defaults.
+        """
+        version = int(data.get("schema_version", 1))
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"Purchase agreement schema {version} is newer than supported ({SCHEMA_VERSION})")
+        while version < SCHEMA_VERSION:
+            data = _MIGRATIONS[version](data)
+            version += 1
+
+        agreement = cls()
+        for section_id, values in (data.get("sections") or {}).items():
+            model = SECTION_MODELS.get(section_id)
+            if model is None:
+                logger.warning("Dropping unknown purchase agreement section %r", section_id)
+                continue
+            known = {f.name: f for f in fields(model)}
+            unknown = set(values) - set(known)
+            if unknown:
+                logger.warning("Dropping unknown fields %s from section %s", sorted(unknown), section_id)
+            kwargs = {}
+            for name, value in values.items():
+                if name not in known:
+                    continue
+                parser = _TEMPORAL_PARSERS.get(known[name].type)
+                kwargs[name] = parser(value) if parser is not None and isinstance(value, str) else value
+            agreement.sections[section_id] = model(**kwargs)
+        return agreement
+
+
+# ------------------------------
+# 4. Session access
+# ------------------------------
+
+AGREEMENT_KEY = "pa_agreement"
+
+
+def get_agreement() -> PurchaseAgreement:
+    """
+    This session's agreement, created on first use. It is the only
+    session_state entry holding section data; widget keys stay as
+    Streamlit's own widget state.
+    """
+    agreement = st.session_state.get(AGREEMENT_KEY)
+    if agreement is None:
+        agreement = st.session_state[AGREEMENT_KEY] = PurchaseAgreement()
+    return agreement
+
+
+def get_section(model: Type[T]) -> T:
+    return get_agreement().section(model)
+
+
+def option_index(options: Sequence[Any], value: Any) -> int:
+    """
+    Position of a stored field value among a radio/selectbox's options, or
+    0 when it is not one of them (e.g. an option was reworded since).
+    """
+    return options.index(value) if value in options else 0
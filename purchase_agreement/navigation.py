@@ -0,0 +1,183 @@
+# purchase_agreement/navigation.py
+
+import copy
+import functools
+import os
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import streamlit as st
+
+from purchase_agreement.settings import env_flag
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:  # older Streamlit
+    get_script_run_ctx = None
+
+
+# ------------------------------
+# 1. Settings
+# ------------------------------
+
+# "sections": a section picker; only the chosen page's renderer runs per rerun.
+# "tabs": every page inside st.tabs (Streamlit runs every tab body each rerun).
+NAV_MODES = ("sections", "tabs")
+NAV_MODE = os.environ.get("PA_NAV_MODE", "sections")
+# Run sections and their AI helper blocks as fragments (partial reruns)
+FRAGMENTS_ENABLED = env_flag("PA_FRAGMENTS_ENABLED")
+
+# Session overrides (used by tools/nav_benchmark.py to compare the modes)
+NAV_MODE_KEY = "pa_nav_mode"
+PAGE_KEY = "pa_nav_page"
+# page label -> session_state keys first set while that page was rendering
+PAGE_STATE_KEYS = "pa_nav_page_state_keys"
+
+
+class Page(NamedTuple):
+    label: str
+    render: Callable[[], None]
+
+
+def get_nav_mode() -> str:
+    mode = st.session_state.get(NAV_MODE_KEY, NAV_MODE)
+    return mode if mode in NAV_MODES else NAV_MODES[0]
+
+
+# ------------------------------
+# 2. Keeping hidden pages' state
+# ------------------------------
+
+def _preserve_hidden_pages(active: str) -> None:
+    """
+    Streamlit forgets the value of a keyed widget that is not rendered in a
+    run, so leaving a page would reset its inputs. Re-assigning the keys of
+    every hidden page through st.session_state keeps them until the page is
+    shown again (the documented workaround).
+
+    Keys the active page also uses are skipped: its widgets are created in
+    this run, and a value set through the API in the same run would clash.
+    """
+    page_keys: Dict[str, Set[str]] = st.session_state.get(PAGE_STATE_KEYS, {})
+    active_keys = page_keys.get(active, set())
+    for label, keys in page_keys.items():
+        if label == active:
+            continue
+        for key in keys - active_keys:
+            if key in st.session_state:
+                st.session_state[key] = st.session_state[key]
+
+
+def _render_tracked(label: str, render: Callable[[], Any]) -> Any:
+    """
+    Run `render` and remember which session_state keys it created under the
+    page `label`, so they can be preserved while another page is shown.
+    """
+    before = set(st.session_state.keys())
+    result = render()
+    new_keys = {k for k in st.session_state.keys() if k not in before and not k.startswith("pa_nav_")}
+    if new_keys:
+        page_keys = st.session_state.setdefault(PAGE_STATE_KEYS, {})
+        page_keys.setdefault(label, set()).update(new_keys)
+    return result
+
+
+# ------------------------------
+# 3. Rendering
+# ------------------------------
+
+def render_pages(pages: List[Page]) -> None:
+    """
+    Show the purchase agreement pages in the current navigation mode.
+
+    In "sections" mode a horizontal picker selects one page and only that
+    page's renderer runs, so typing in Section 1 no longer re-executes the
+    other sections, the final review and the PDF export on every rerun.
+    """
+    if get_nav_mode() == "tabs":
+        for tab, page in zip(st.tabs([p.label for p in pages]), pages):
+            with tab:
+                page.render()
+        return
+
+    labels = [p.label for p in pages]
+    if st.session_state.get(PAGE_KEY) not in labels:
+        st.session_state.pop(PAGE_KEY, None)
+    active = st.radio(
+        "Section",
+        labels,
+        horizontal=True,
+        key=PAGE_KEY,
+        label_visibility="collapsed",
+    )
+    _preserve_hidden_pages(active)
+
+    st.markdown("---")
+    page = pages[labels.index(active)]
+    _render_tracked(page.label, page.render)
+
+    index = labels.index(active)
+    if index + 1 < len(pages):
+        st.button(
+            f"Next: {labels[index + 1]} →",
+            key=f"pa_nav_next_{index}",
+            on_click=_go_to,
+            args=(labels[index + 1],),
+        )
+
+
+def _go_to(label: str) -> None:
+    # Runs as a widget callback, before the picker is created in the next run
+    st.session_state[PAGE_KEY] = label
+
+
+# ------------------------------
+# 4. Fragments (partial reruns)
+# ------------------------------
+
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+
+def _in_fragment_rerun() -> bool:
+    """
+    True when only fragments are rerunning, not the whole script.
+    """
+    ctx = get_script_run_ctx() if get_script_run_ctx is not None else None
+    return bool(getattr(ctx, "fragment_ids_this_run", None))
+
+
+def section_fragment(render: Optional[Callable] = None, *, publishes: Tuple[str, ...] = ()):
+    """
+    Decorator: run a section renderer (or one of its AI helper blocks) as a
+    Streamlit fragment, so an interaction inside it reruns only that
+    function instead of the whole app.py script.
+
+    `publishes` lists session_state keys other sections on the same page
+    read (Section 1's offer, used by Section 3 for the price). When a
+    fragment rerun changes one of them, the whole app reruns so those
+    sections are not left stale.
+
+    Only used in "sections" mode: in tabs mode the Final Review tab renders
+    on every run and reads every section's state, so it must see each change.
+    Without fragment support in Streamlit, the renderer runs as before.
+    """
+    def decorate(render: Callable) -> Callable:
+        @functools.wraps(render)
+        def body(*args: Any, **kwargs: Any) -> None:
+            before = {key: copy.deepcopy(st.session_state.get(key)) for key in publishes}
+            # Widgets first shown during a fragment rerun belong to the page too
+            _render_tracked(st.session_state.get(PAGE_KEY, ""), lambda: render(*args, **kwargs))
+            if _in_fragment_rerun() and any(st.session_state.get(key) != before[key] for key in publishes):
+                st.rerun()
+
+        fragment = _fragment(body) if _fragment is not None else None
+
+        @functools.wraps(render)
+        def run(*args: Any, **kwargs: Any) -> None:
+            if fragment is None or not FRAGMENTS_ENABLED or get_nav_mode() != "sections":
+                render(*args, **kwargs)
+            else:
+                fragment(*args, **kwargs)
+
+        return run
+
+    return decorate(render) if render is not None else decorate
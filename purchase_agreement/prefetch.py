@@ -0,0 +1,76 @@
+# purchase_agreement/prefetch.py
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any
+
+from purchase_agreement.ai_helpers import call_purchase_agreement_ai
+from purchase_agreement.explainers import explainer_request
+from purchase_agreement.settings import env_flag
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------
+# 1. Settings
+# ------------------------------
+
+PREFETCH_ENABLED = env_flag("AI_PREFETCH_ENABLED")
+
+# Sections whose default explainer is most often opened first.
+PREFETCH_SECTIONS = ("3", "8", "14", "15")
+
+
+# ------------------------------
+# 2. Background worker
+# ------------------------------
+
+# One worker: prefetches are low priority and should never compete with
+# the buyer's own questions for connections or rate limit.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pa-prefetch")
+_lock = threading.Lock()
+_futures: Dict[str, Future] = {}
+_stats: Dict[str, int] = {"submitted": 0, "completed": 0, "failed": 0, "skipped": 0}
+
+
+def _warm_explainer(section: str) -> None:
+    try:
+        # The explainer carries no user data, so the answer lands in the
+        # shared response cache and the first "Explain this section" click
+        # is served from there.
+        call_purchase_agreement_ai(**explainer_request(section))
+        outcome = "completed"
+    except Exception:
+        logger.exception("Prefetch of the Section %s explainer failed", section)
+        outcome = "failed"
+
+    with _lock:
+        _stats[outcome] += 1
+
+
+def prefetch_default_explainers() -> None:
+    """
+    Warm the response cache with the default explainers in the background.
+
+    Safe to call on every rerun: sections with a prefetch still in flight
+    are skipped, and finished ones are cache hits on the next pass.
+    """
+    if not PREFETCH_ENABLED:
+        return
+
+    with _lock:
+        for section in PREFETCH_SECTIONS:
+            pending = _futures.get(section)
+            if pending is not None and not pending.done():
+                _stats["skipped"] += 1
+                continue
+            _futures[section] = _executor.submit(_warm_explainer, section)
+            _stats["submitted"] += 1
+
+
+def get_prefetch_stats() -> Dict[str, Any]:
+    with _lock:
+        stats: Dict[str, Any] = dict(_stats)
+        stats["in_flight"] = sum(1 for f in _futures.values() if not f.done())
+    return stats
@@ -0,0 +1,260 @@
+# purchase_agreement/profiler.py
+
+import csv
+import functools
+import io
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Callable, Iterator
+
+import streamlit as st
+
+from purchase_agreement.settings import env_flag, env_int, percentile
+
+
+# ------------------------------
+# 1. Settings
+# ------------------------------
+
+PROFILER_ENABLED = env_flag("RENDER_PROFILER_ENABLED")
+# Also count allocated bytes with tracemalloc. Off by default: tracing
+# every allocation slows the whole process down noticeably.
+PROFILER_TRACE_MALLOC = env_flag("RENDER_PROFILER_TRACE_MALLOC", default=False)
+# Most recent timings kept per span for the percentiles
+PROFILER_SAMPLES_PER_SPAN = env_int("RENDER_PROFILER_SAMPLES", 500)
+
+# The panel is shown when the page is opened with ?admin=<PA_ADMIN_TOKEN>.
+ADMIN_TOKEN = os.environ.get("PA_ADMIN_TOKEN", "")
+
+EXPORT_COLUMNS = (
+    "name",
+    "kind",
+    "count",
+    "errors",
+    "p50_ms",
+    "p95_ms",
+    "mean_ms",
+    "max_ms",
+    "self_p50_ms",
+    "self_p95_ms",
+    "alloc_blocks_mean",
+    "alloc_kib_mean",
+)
+
+if PROFILER_ENABLED and PROFILER_TRACE_MALLOC and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+# ------------------------------
+# 2. Spans
+# ------------------------------
+
+_lock = threading.Lock()
+_spans: Dict[str, Dict[str, Any]] = {}
+# Per thread: child time accumulated by the spans currently open, so each
+# span can also report its own ("self") time without its nested spans.
+_local = threading.local()
+
+
+def _record(name: str, kind: str, total_s: float, self_s: float, blocks: int, traced: Optional[int], failed: bool) -> None:
+    with _lock:
+        span = _spans.get(name)
+        if span is None:
+            span = _spans[name] = {
+                "kind": kind,
+                "count": 0,
+                "errors": 0,
+                "samples": deque(maxlen=PROFILER_SAMPLES_PER_SPAN),
+            }
+        span["count"] += 1
+        span["errors"] += int(failed)
+        span["samples"].append((total_s, self_s, blocks, traced))
+
+
+@contextmanager
+def profile_span(name: str, kind: str = "render") -> Iterator[None]:
+    """
+    Time the block with perf_counter and count what it allocated.
+
+    Allocation counters are process-wide deltas (net allocated blocks, plus
+    net traced bytes when RENDER_PROFILER_TRACE_MALLOC is on), so with
+    several sessions rendering at once they also include the others' work;
+    read them as a rough per-span signal, not an exact figure.
+    """
+    if not PROFILER_ENABLED:
+        yield
+        return
+
+    stack: List[float] = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(0.0)
+
+    tracing = tracemalloc.is_tracing()
+    traced_before = tracemalloc.get_traced_memory()[0] if tracing else None
+    blocks_before = sys.getallocatedblocks()
+    started = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except BaseException as e:
+        # st.rerun / st.stop unwind through renderers; they are not errors
+        failed = not type(e).__name__.endswith(("RerunException", "StopException"))
+        raise
+    finally:
+        total_s = time.perf_counter() - started
+        blocks = sys.getallocatedblocks() - blocks_before
+        traced = tracemalloc.get_traced_memory()[0] - traced_before if tracing else None
+        children_s = stack.pop()
+        if stack:
+            stack[-1] += total_s
+        _record(name, kind, total_s, total_s - children_s, blocks, traced, failed)
+
+
+def profiled(name: Optional[str] = None, kind: str = "render") -> Callable:
+    """
+    Decorator form of profile_span; the span is named after the function
+    unless `name` is given.
+    """
+    def decorate(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with profile_span(span_name, kind):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# ------------------------------
+# 3. Report + export
+# ------------------------------
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+def get_profile_report() -> List[Dict[str, Any]]:
+    """
+    One row per span, across every session in this process, slowest p95
+    first. Percentiles cover the last PROFILER_SAMPLES_PER_SPAN calls.
+    """
+    with _lock:
+        snapshot = {
+            name: {**span, "samples": list(span["samples"])}
+            for name, span in _spans.items()
+        }
+
+    rows = []
+    for name, span in snapshot.items():
+        totals = [s[0] for s in span["samples"]]
+        selfs = [s[1] for s in span["samples"]]
+        blocks = [s[2] for s in span["samples"]]
+        traced = [s[3] for s in span["samples"] if s[3] is not None]
+        rows.append({
+            "name": name,
+            "kind": span["kind"],
+            "count": span["count"],
+            "errors": span["errors"],
+            "p50_ms": _ms(percentile(totals, 50)),
+            "p95_ms": _ms(percentile(totals, 95)),
+            "mean_ms": _ms(sum(totals) / len(totals)) if totals else None,
+            "max_ms": _ms(max(totals)) if totals else None,
+            "self_p50_ms": _ms(percentile(selfs, 50)),
+            "self_p95_ms": _ms(percentile(selfs, 95)),
+            "alloc_blocks_mean": round(sum(blocks) / len(blocks), 1) if blocks else None,
+            "alloc_kib_mean": round(sum(traced) / len(traced) / 1024, 1) if traced else None,
+        })
+    rows.sort(key=lambda r: r["p95_ms"] or 0.0, reverse=True)
+    return rows
+
+
+def export_profile_json() -> str:
+    return json.dumps(
+        {
+            "generated_at": time.time(),
+            "trace_malloc": tracemalloc.is_tracing(),
+            "samples_per_span": PROFILER_SAMPLES_PER_SPAN,
+            "spans": get_profile_report(),
+        },
+        indent=2,
+    )
+
+
+def export_profile_csv() -> str:
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    writer.writerows(get_profile_report())
+    return out.getvalue()
+
+
+def reset_profile() -> None:
+    with _lock:
+        _spans.clear()
+
+
+# ------------------------------
+# 4. Admin panel
+# ------------------------------
+
+def is_admin() -> bool:
+    """
+    Admin views need PA_ADMIN_TOKEN set and ?admin=<token> in the URL.
+    """
+    if not ADMIN_TOKEN:
+        return False
+    try:
+        return st.query_params.get("admin") == ADMIN_TOKEN
+    except Exception:
+        return False
+
+
+def render_profiler_panel() -> None:
+    """
+    Sidebar panel with the render/AI/PDF timings and JSON/CSV downloads.
+    Shown to admins only; the figures are from the runs before this one.
+    """
+    if not PROFILER_ENABLED or not is_admin():
+        return
+
+    with st.expander("⏱️ Render profile (admin)", expanded=False):
+        rows = get_profile_report()
+        if not rows:
+            st.caption("No timings yet. Open a Purchase Agreement section first.")
+            return
+
+        st.caption(
+            "p50/p95 per renderer, AI call and PDF build, across all sessions "
+            f"(last {PROFILER_SAMPLES_PER_SPAN} calls each). Self time excludes nested spans."
+        )
+        st.dataframe(
+            [{k: r[k] for k in ("name", "kind", "count", "p50_ms", "p95_ms", "self_p95_ms", "alloc_blocks_mean")} for r in rows],
+            hide_index=True,
+        )
+        st.download_button(
+            "Download JSON",
+            data=export_profile_json(),
+            file_name="render_profile.json",
+            mime="application/json",
+            key="pa_profile_json",
+        )
+        st.download_button(
+            "Download CSV",
+            data=export_profile_csv(),
+            file_name="render_profile.csv",
+            mime="text/csv",
+            key="pa_profile_csv",
+        )
+        if st.button("Reset timings", key="pa_profile_reset"):
+            reset_profile()
+            st.rerun()
@@ -0,0 +1,130 @@
+# purchase_agreement/prompt_compiler.py
+
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+from purchase_agreement.tokens import count_tokens
+
+
+# ------------------------------
+# 1. Compiled prefix
+# ------------------------------
+
+# Old versions are kept briefly so in-flight requests can finish with them.
+MAX_COMPILED_VERSIONS = 4
+
+
+class CompiledPrefix:
+    """
+    The static system message, built once per (persona, knowledge version)
+    and shared read-only by every session and thread.
+
+    - `message` is the one {"role": "system", ...} dict put at the start of
+      every prompt; callers must not mutate it.
+    - `digest` stands in for the text in response cache keys, so the
+      knowledge text is not re-serialized and re-hashed per call.
+    - Token counts are memoized per model.
+    """
+
+    __slots__ = ("knowledge_hash", "text", "message", "digest", "compile_s", "_tokens")
+
+    def __init__(self, knowledge_hash: str, text: str, compile_s: float):
+        self.knowledge_hash = knowledge_hash
+        self.text = sys.intern(text)
+        self.message = {"role": "system", "content": self.text}
+        self.digest = hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+        self.compile_s = compile_s
+        self._tokens: Dict[str, int] = {}
+
+    def tokens(self, model: str) -> int:
+        count = self._tokens.get(model)
+        if count is None:
+            count = self._tokens[model] = count_tokens(self.text, model)
+        return count
+
+
+def _assemble(persona: str, knowledge_text: str) -> str:
+    if not knowledge_text:
+        return persona
+    return persona + "\n\nInternal knowledge base:\n\n" + knowledge_text
+
+
+# ------------------------------
+# 2. Compiler
+# ------------------------------
+
+_lock = threading.Lock()
+_compiled: "OrderedDict[tuple, CompiledPrefix]" = OrderedDict()
+_stats: Dict[str, Any] = {"compiles": 0, "hits": 0, "compile_s_total": 0.0}
+# What one uncompiled call used to cost (measured on the latest compile)
+_per_call: Dict[str, Any] = {"bytes": 0, "cpu_s": 0.0}
+
+
+def compile_prefix(persona: str, knowledge_hash: str, knowledge_chunks: Optional[list] = None) -> CompiledPrefix:
+    """
+    The compiled prefix for this persona and knowledge version. Pass the
+    chunk texts to inline the knowledge base (small bases); they are only
+    read when this version has not been compiled yet.
+    """
+    key = (persona, knowledge_hash, knowledge_chunks is not None)
+    compiled = _compiled.get(key)
+    if compiled is not None:
+        with _lock:
+            _stats["hits"] += 1
+        return compiled
+
+    with _lock:
+        compiled = _compiled.get(key)
+        if compiled is not None:
+            _stats["hits"] += 1
+            return compiled
+
+        started = time.process_time()
+        knowledge_text = "\n\n---\n\n".join(knowledge_chunks) if knowledge_chunks else ""
+        compiled = CompiledPrefix(knowledge_hash, _assemble(persona, knowledge_text), 0.0)
+        compiled.tokens("gpt-4.1-mini")
+        compiled.compile_s = time.process_time() - started
+
+        _compiled[key] = compiled
+        while len(_compiled) > MAX_COMPILED_VERSIONS:
+            _compiled.popitem(last=False)
+
+        _stats["compiles"] += 1
+        _stats["compile_s_total"] += compiled.compile_s
+        # Per call, the uncompiled path joined the knowledge into a new
+        # string, counted its tokens and hashed it for the cache key: the
+        # same work the compile just did once.
+        _per_call["bytes"] = len(compiled.text.encode("utf-8"))
+        _per_call["cpu_s"] = compiled.compile_s
+        return compiled
+
+
+def get_prompt_compiler_stats(requests_per_day: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Compiles vs reuses, plus the string copying and CPU each reuse avoided.
+    The CPU figure is the measured compile cost, a lower bound: the old path
+    also JSON-encoded the whole prefix for every cache key.
+    `requests_per_day` adds a projection at that volume.
+    """
+    with _lock:
+        stats: Dict[str, Any] = dict(_stats)
+        per_call = dict(_per_call)
+        latest = next(reversed(_compiled.values()), None)
+
+    stats["knowledge_hash"] = latest.knowledge_hash if latest else None
+    stats["prefix_chars"] = len(latest.text) if latest else 0
+    stats["saved_bytes_per_call"] = per_call["bytes"]
+    stats["saved_cpu_s_per_call"] = per_call["cpu_s"]
+    stats["saved_bytes_total"] = per_call["bytes"] * stats["hits"]
+    stats["saved_cpu_s_total"] = per_call["cpu_s"] * stats["hits"]
+    if requests_per_day:
+        stats["projected_per_day"] = {
+            "requests": requests_per_day,
+            "bytes_not_copied": per_call["bytes"] * requests_per_day,
+            "cpu_s_saved": per_call["cpu_s"] * requests_per_day,
+        }
+    return stats
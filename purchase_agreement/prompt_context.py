@@ -0,0 +1,209 @@
+# purchase_agreement/prompt_context.py
+
+import json
+import threading
+from typing import Optional, Dict, Any, List, Tuple, Iterable
+
+from purchase_agreement.settings import env_int
+from purchase_agreement.tokens import count_tokens, counts_are_exact
+
+
+# ------------------------------
+# 1. Per-model budgets
+# ------------------------------
+
+# Max tokens the structured section data may take up in one prompt.
+SECTION_CONTEXT_BUDGETS = {
+    "gpt-4.1-nano": 300,
+    "gpt-4.1-mini": 600,
+    "gpt-4.1": 1200,
+}
+DEFAULT_SECTION_CONTEXT_BUDGET = env_int("SECTION_CONTEXT_BUDGET", 600)
+
+# One sent prompt in this many also measures what the old indent=2 dump of
+# its section_state would have cost (the dump is too costly to build per call).
+PROMPT_SIZE_SAMPLE_EVERY = max(1, env_int("PROMPT_SIZE_SAMPLE_EVERY", 10))
+
+MAX_STRING_CHARS = 400
+
+CONTEXT_PREAMBLE = (
+    "Here is the current structured data for this section of the offer "
+    "(only fields the buyer changed from the form defaults are listed). "
+    "Use it only as context to tailor your explanation; do not just repeat it verbatim:\n"
+)
+
+
+# ------------------------------
+# 2. Section registry
+# ------------------------------
+
+# section id -> {"defaults": {...}, "ignore": set(...), "gates": [...]}
+_SECTION_PROFILES: Dict[str, Dict[str, Any]] = {}
+
+
+def register_section_context(
+    section: str,
+    defaults: Optional[Dict[str, Any]] = None,
+    ignore: Iterable[str] = (),
+    gates: Iterable[Tuple[str, Any, Tuple[str, ...]]] = (),
+) -> None:
+    """
+    Describe how a section's state dict should be trimmed for prompts.
+
+    - defaults: fields still equal to these values are left out
+    - ignore:   UI-only fields that never help the model
+    - gates:    (flag, value, prefixes) – when state[flag] == value, every
+                field starting with one of the prefixes is irrelevant
+                (e.g. second_loan_* while has_second_loan is False)
+    """
+    _SECTION_PROFILES[str(section)] = {
+        "defaults": dict(defaults or {}),
+        "ignore": set(ignore),
+        "gates": list(gates),
+    }
+
+
+def _relevant_fields(section: Optional[str], section_state: Dict[str, Any]) -> Dict[str, Any]:
+    profile = _SECTION_PROFILES.get(str(section)) if section else None
+    if profile is None:
+        return {k: v for k, v in section_state.items() if v not in (None, "", [], {})}
+
+    dropped_prefixes: List[str] = []
+    for flag, value, prefixes in profile["gates"]:
+        if section_state.get(flag) == value:
+            dropped_prefixes.extend(prefixes)
+
+    defaults = profile["defaults"]
+    kept = {}
+    for key, value in section_state.items():
+        if key in profile["ignore"]:
+            continue
+        if any(key.startswith(prefix) for prefix in dropped_prefixes):
+            continue
+        if key in defaults and defaults[key] == value:
+            continue
+        if value in (None, "", [], {}):
+            continue
+        kept[key] = value
+    return kept
+
+
+# ------------------------------
+# 3. Compact, budgeted serialization
+# ------------------------------
+
+def _compact_json(data: Dict[str, Any]) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _clip(value: Any) -> Any:
+    if isinstance(value, str) and len(value) > MAX_STRING_CHARS:
+        return value[:MAX_STRING_CHARS] + "…"
+    return value
+
+
+def _fit_to_budget(fields: Dict[str, Any], budget: int, model: str) -> Dict[str, Any]:
+    """
+    Deterministically drop fields from the end (state dicts are declared in
+    form order, so later sub-sections go first) until the JSON fits.
+    """
+    fields = {key: _clip(value) for key, value in fields.items()}
+    keys = list(fields)
+    while keys and count_tokens(_compact_json({k: fields[k] for k in keys}), model) > budget:
+        keys.pop()
+
+    trimmed = {k: fields[k] for k in keys}
+    omitted = len(fields) - len(keys)
+    if omitted:
+        trimmed["_omitted_fields"] = omitted
+    return trimmed
+
+
+def build_section_context(
+    section: Optional[str],
+    section_state: Optional[Dict[str, Any]],
+    model: str = "gpt-4.1-mini",
+) -> str:
+    """
+    Turn section_state into a compact context string for the model:
+    no defaults, no irrelevant fields, compact JSON, within the model's budget.
+    """
+    if not section_state:
+        return ""
+
+    budget = SECTION_CONTEXT_BUDGETS.get(model, DEFAULT_SECTION_CONTEXT_BUDGET)
+    fields = _fit_to_budget(_relevant_fields(section, section_state), budget, model)
+    if not fields:
+        return ""
+
+    return CONTEXT_PREAMBLE + _compact_json(fields)
+
+
+# ------------------------------
+# 4. Prompt size stats
+# ------------------------------
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, int] = {
+    "calls": 0,
+    "prompt_tokens_after": 0,
+    "sampled_calls": 0,
+    "context_tokens_before": 0,
+    "context_tokens_after": 0,
+}
+
+
+def record_prompt_size(
+    messages: List[Dict[str, str]],
+    model: str = "gpt-4.1-mini",
+    prefix_tokens: Optional[int] = None,
+    section: Optional[str] = None,
+    section_state: Optional[Dict[str, Any]] = None,
+) -> int:
+    """
+    Count a prompt that is being sent and add it to the running averages.
+    Call it once per request actually sent upstream, not for prompts built
+    only for a cache key. `prefix_tokens` is the already known size of
+    messages[0].
+    """
+    if prefix_tokens is None:
+        tokens = sum(count_tokens(m["content"], model) for m in messages)
+    else:
+        tokens = prefix_tokens + sum(count_tokens(m["content"], model) for m in messages[1:])
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["prompt_tokens_after"] += tokens
+        sampled = (_stats["calls"] - 1) % PROMPT_SIZE_SAMPLE_EVERY == 0
+
+    if sampled:
+        before = after = 0
+        if section_state:
+            # What the old pretty-printed dump of the full dict would have cost
+            legacy = CONTEXT_PREAMBLE + json.dumps(section_state, indent=2, default=str)
+            before = count_tokens(legacy, model)
+            after = count_tokens(build_section_context(section, section_state, model=model), model)
+        with _stats_lock:
+            _stats["sampled_calls"] += 1
+            _stats["context_tokens_before"] += before
+            _stats["context_tokens_after"] += after
+    return tokens
+
+
+def get_prompt_size_stats() -> Dict[str, Any]:
+    """
+    Average prompt size per sent call, and what it would have been with the
+    old indent=2 dump of the full section_state (extrapolated from one call
+    in PROMPT_SIZE_SAMPLE_EVERY). Token counts are exact with tiktoken
+    installed and ~4 characters per token estimates otherwise
+    (`exact_token_counts`).
+    """
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_stats)
+
+    calls = stats["calls"]
+    sampled = stats["sampled_calls"]
+    saved_per_call = ((stats["context_tokens_before"] - stats["context_tokens_after"]) / sampled) if sampled else 0.0
+    stats["avg_prompt_tokens_after"] = (stats["prompt_tokens_after"] / calls) if calls else 0.0
+    stats["avg_prompt_tokens_before"] = (stats["avg_prompt_tokens_after"] + saved_per_call) if calls else 0.0
+    stats["exact_token_counts"] = counts_are_exact()
+    return stats
@@ -0,0 +1,470 @@
+# purchase_agreement/rate_limit.py
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List, NamedTuple, Tuple
+
+from purchase_agreement.ai_cache import CACHE_DIR
+from purchase_agreement.settings import env_flag, env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------
+# 1. Settings
+# ------------------------------
+
+RATE_LIMIT_ENABLED = env_flag("RATE_LIMIT_ENABLED")
+
+# memory (one process) | sqlite (replicas on one host) | redis (any number of hosts)
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_REDIS_URL = os.environ.get("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+RATE_LIMIT_DB = Path(os.environ.get("RATE_LIMIT_DB", CACHE_DIR / "rate_limits.sqlite3"))
+
+# Per-minute budgets. Burst capacity equals one minute's budget.
+SESSION_REQUESTS_PER_MIN = env_float("RATE_LIMIT_SESSION_RPM", 8)
+SESSION_TOKENS_PER_MIN = env_float("RATE_LIMIT_SESSION_TPM", 40_000)
+GLOBAL_REQUESTS_PER_MIN = env_float("RATE_LIMIT_GLOBAL_RPM", 300)
+GLOBAL_TOKENS_PER_MIN = env_float("RATE_LIMIT_GLOBAL_TPM", 1_000_000)
+
+# Tokens charged for the answer before we know its real size.
+COMPLETION_TOKEN_ESTIMATE = env_int("RATE_LIMIT_COMPLETION_ESTIMATE", 500)
+
+# How often the memory and SQLite stores drop buckets that have refilled
+# completely (one per session that ever asked, otherwise kept forever).
+PRUNE_INTERVAL_S = 60.0
+
+
+class RateLimitExceeded(Exception):
+    """
+    A bucket is empty. `retry_after` is how long until the request would fit;
+    `scope` is "session" or "global".
+    """
+
+    def __init__(self, retry_after: float, scope: str):
+        retry_after = min(retry_after, 3600.0)
+        self.retry_after = retry_after
+        self.scope = scope
+        who = "You are" if scope == "session" else "The AI Realtor is"
+        super().__init__(
+            f"{who} sending questions faster than we can answer them. "
+            f"Please try again in {max(1, round(retry_after))} s."
+        )
+
+
+class Bucket(NamedTuple):
+    key: str
+    capacity: float
+    refill_per_s: float
+    amount: float
+    scope: str
+
+
+def _refill(tokens: float, updated: float, bucket: Bucket, now: float) -> float:
+    return min(bucket.capacity, tokens + (now - updated) * bucket.refill_per_s)
+
+
+def _full_at(level: float, bucket: Bucket, now: float) -> float:
+    """
+    When the bucket will be full again if nothing else is taken. From then
+    on its stored state equals a brand-new bucket's, so it can be dropped.
+    """
+    if bucket.refill_per_s <= 0:
+        return float("inf")
+    return now + max(bucket.capacity - level, 0.0) / bucket.refill_per_s
+
+
+def _wait_for(level: float, bucket: Bucket) -> float:
+    if level >= bucket.amount:
+        return 0.0
+    if bucket.amount > bucket.capacity or bucket.refill_per_s <= 0:
+        return float("inf")
+    return (bucket.amount - level) / bucket.refill_per_s
+
+
+# ------------------------------
+# 2. Bucket stores
+# ------------------------------
+
+class MemoryBucketStore:
+    """
+    Token buckets in this process only.
+    """
+
+    def __init__(self, prune_interval_s: float = PRUNE_INTERVAL_S):
+        self._lock = threading.Lock()
+        # key -> (tokens, updated, full_at)
+        self._levels: Dict[str, tuple] = {}
+        self._prune_interval_s = prune_interval_s
+        self._pruned_at = time.time()
+
+    def _prune_locked(self, now: float) -> None:
+        if now - self._pruned_at < self._prune_interval_s:
+            return
+        self._pruned_at = now
+        for key in [key for key, (_tokens, _updated, full_at) in self._levels.items() if full_at <= now]:
+            del self._levels[key]
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    def acquire(self, buckets: List[Bucket]) -> Optional[Tuple[Bucket, float]]:
+        """
+        Take from every bucket, or from none. Returns None on success, else
+        the bucket with the longest wait and that wait in seconds.
+        """
+        now = time.time()
+        with self._lock:
+            self._prune_locked(now)
+            levels = {}
+            blocked, longest = None, 0.0
+            for bucket in buckets:
+                tokens, updated, _ = self._levels.get(bucket.key, (bucket.capacity, now, now))
+                level = _refill(tokens, updated, bucket, now)
+                levels[bucket.key] = level
+                wait = _wait_for(level, bucket)
+                if wait > longest:
+                    blocked, longest = bucket, wait
+            if blocked is not None:
+                return blocked, longest
+
+            for bucket in buckets:
+                left = levels[bucket.key] - bucket.amount
+                self._levels[bucket.key] = (left, now, _full_at(left, bucket, now))
+            return None
+
+    def release(self, buckets: List[Bucket]) -> None:
+        """
+        Give back what an acquire took, up to each bucket's capacity.
+        """
+        now = time.time()
+        with self._lock:
+            for bucket in buckets:
+                state = self._levels.get(bucket.key)
+                if state is None:
+                    continue
+                tokens, updated, _ = state
+                level = min(bucket.capacity, _refill(tokens, updated, bucket, now) + bucket.amount)
+                self._levels[bucket.key] = (level, now, _full_at(level, bucket, now))
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets in a shared SQLite file, so app replicas on the same host
+    share one budget. BEGIN IMMEDIATE makes each acquire atomic.
+    """
+
+    def __init__(self, path: Path, prune_interval_s: float = PRUNE_INTERVAL_S):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(buckets)")}
+        if "full_at" not in columns:
+            # Files created before pruning existed; their rows get full_at
+            # on their next write.
+            self._conn.execute("ALTER TABLE buckets ADD COLUMN full_at REAL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS buckets_full_at ON buckets (full_at)")
+        self._prune_interval_s = prune_interval_s
+        self._pruned_at = time.time()
+
+    def _prune_locked(self, now: float) -> None:
+        """
+        Caller holds the lock, outside a transaction. Rows without full_at
+        (older files) are dropped once they have been idle for an hour.
+        """
+        if now - self._pruned_at < self._prune_interval_s:
+            return
+        self._pruned_at = now
+        self._conn.execute(
+            "DELETE FROM buckets WHERE full_at <= ? OR (full_at IS NULL AND updated < ?)",
+            (now, now - 3600),
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+
+    def acquire(self, buckets: List[Bucket]) -> Optional[Tuple[Bucket, float]]:
+        now = time.time()
+        with self._lock:
+            self._prune_locked(now)
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                levels = {}
+                blocked, longest = None, 0.0
+                for bucket in buckets:
+                    row = self._conn.execute(
+                        "SELECT tokens, updated FROM buckets WHERE key = ?", (bucket.key,)
+                    ).fetchone()
+                    tokens, updated = row if row else (bucket.capacity, now)
+                    level = _refill(tokens, updated, bucket, now)
+                    levels[bucket.key] = level
+                    wait = _wait_for(level, bucket)
+                    if wait > longest:
+                        blocked, longest = bucket, wait
+
+                if blocked is None:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)",
+                        [
+                            (b.key, levels[b.key] - b.amount, now, _full_at(levels[b.key] - b.amount, b, now))
+                            for b in buckets
+                        ],
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return (blocked, longest) if blocked is not None else None
+
+    def release(self, buckets: List[Bucket]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for bucket in buckets:
+                    row = self._conn.execute(
+                        "SELECT tokens, updated FROM buckets WHERE key = ?", (bucket.key,)
+                    ).fetchone()
+                    if row is None:
+                        continue
+                    level = min(bucket.capacity, _refill(row[0], row[1], bucket, now) + bucket.amount)
+                    self._conn.execute(
+                        "UPDATE buckets SET tokens = ?, updated = ?, full_at = ? WHERE key = ?",
+                        (level, now, _full_at(level, bucket, now), bucket.key),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+# All-or-nothing acquire across KEYS. ARGV: now, then (capacity, rate, amount)
+# per key. Returns {blocked index (1-based, 0 = ok), wait seconds as string}.
+_REDIS_ACQUIRE = """
+local now = tonumber(ARGV[1])
+local levels = {}
+local blocked, longest = 0, 0
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 3 - 1])
+  local rate = tonumber(ARGV[i * 3])
+  local amount = tonumber(ARGV[i * 3 + 1])
+  local state = redis.call('HMGET', key, 'tokens', 'updated')
+  local tokens = tonumber(state[1]) or capacity
+  local updated = tonumber(state[2]) or now
+  local level = math.min(capacity, tokens + (now - updated) * rate)
+  levels[i] = level
+  if level < amount then
+    local wait = (amount - level) / rate
+    if amount > capacity then wait = 1e9 end
+    if wait > longest then blocked, longest = i, wait end
+  end
+end
+if blocked > 0 then return {blocked, tostring(longest)} end
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 3 - 1])
+  local rate = tonumber(ARGV[i * 3])
+  local amount = tonumber(ARGV[i * 3 + 1])
+  redis.call('HSET', key, 'tokens', levels[i] - amount, 'updated', now)
+  redis.call('EXPIRE', key, math.ceil(capacity / rate) + 60)
+end
+return {0, '0'}
+"""
+
+
+# Give back ARGV: now, then (capacity, rate, amount) per key, up to capacity.
+_REDIS_RELEASE = """
+local now = tonumber(ARGV[1])
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 3 - 1])
+  local rate = tonumber(ARGV[i * 3])
+  local amount = tonumber(ARGV[i * 3 + 1])
+  local state = redis.call('HMGET', key, 'tokens', 'updated')
+  if state[1] then
+    local level = math.min(capacity, tonumber(state[1]) + (now - tonumber(state[2])) * rate + amount)
+    redis.call('HSET', key, 'tokens', level, 'updated', now)
+  end
+end
+return 0
+"""
+
+
+class RedisBucketStore:
+    """
+    Token buckets in Redis, shared by every replica. Needs the optional
+    `redis` package.
+    """
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_ACQUIRE)
+        self._release_script = self._client.register_script(_REDIS_RELEASE)
+
+    @staticmethod
+    def _args(buckets: List[Bucket]) -> List[Any]:
+        args: List[Any] = [time.time()]
+        for bucket in buckets:
+            args.extend([bucket.capacity, bucket.refill_per_s, bucket.amount])
+        return args
+
+    def acquire(self, buckets: List[Bucket]) -> Optional[Tuple[Bucket, float]]:
+        index, wait = self._script(keys=[f"pa:rl:{b.key}" for b in buckets], args=self._args(buckets))
+        if int(index) == 0:
+            return None
+        return buckets[int(index) - 1], float(wait)
+
+    def release(self, buckets: List[Bucket]) -> None:
+        self._release_script(keys=[f"pa:rl:{b.key}" for b in buckets], args=self._args(buckets))
+
+
+_store: Optional[Any] = None
+_store_lock = threading.Lock()
+
+
+def _get_store() -> Any:
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                try:
+                    if RATE_LIMIT_BACKEND == "redis":
+                        _store = RedisBucketStore(RATE_LIMIT_REDIS_URL)
+                    elif RATE_LIMIT_BACKEND == "sqlite":
+                        _store = SQLiteBucketStore(RATE_LIMIT_DB)
+                except Exception:
+                    logger.exception("Rate limit backend %r unavailable; using in-memory buckets", RATE_LIMIT_BACKEND)
+                if _store is None:
+                    _store = MemoryBucketStore()
+    return _store
+
+
+# ------------------------------
+# 3. Limiter
+# ------------------------------
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, int] = {"allowed": 0, "limited_session": 0, "limited_global": 0, "refunded": 0}
+
+
+def current_session_id() -> Optional[str]:
+    """
+    Streamlit session id of the running script, or None outside a session
+    (background prefetch, load tests), which only counts against global limits.
+    """
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except Exception:
+        return None
+    try:
+        ctx = get_script_run_ctx(suppress_warning=True)
+    except TypeError:
+        # Older Streamlit without the suppress_warning flag
+        ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def estimate_call_tokens(messages: List[Dict[str, str]]) -> int:
+    """
+    Rough prompt size (~4 characters per token) plus the expected answer.
+    """
+    return sum(len(m["content"]) for m in messages) // 4 + COMPLETION_TOKEN_ESTIMATE
+
+
+def _buckets(estimated_tokens: int, session_id: Optional[str], scope: Optional[str]) -> List[Bucket]:
+    # A single prompt bigger than a whole bucket still goes through once the
+    # bucket is full, instead of being rejected forever.
+    global_tokens = min(estimated_tokens, GLOBAL_TOKENS_PER_MIN)
+    session_tokens = min(estimated_tokens, SESSION_TOKENS_PER_MIN)
+
+    buckets = []
+    if scope in (None, "global"):
+        buckets += [
+            Bucket("global:requests", GLOBAL_REQUESTS_PER_MIN, GLOBAL_REQUESTS_PER_MIN / 60, 1, "global"),
+            Bucket("global:tokens", GLOBAL_TOKENS_PER_MIN, GLOBAL_TOKENS_PER_MIN / 60, global_tokens, "global"),
+        ]
+    if session_id and scope in (None, "session"):
+        buckets += [
+            Bucket(f"session:{session_id}:requests", SESSION_REQUESTS_PER_MIN, SESSION_REQUESTS_PER_MIN / 60, 1, "session"),
+            Bucket(
+                f"session:{session_id}:tokens",
+                SESSION_TOKENS_PER_MIN,
+                SESSION_TOKENS_PER_MIN / 60,
+                session_tokens,
+                "session",
+            ),
+        ]
+    return buckets
+
+
+def acquire_ai_call(
+    estimated_tokens: int,
+    session_id: Optional[str] = None,
+    scope: Optional[str] = None,
+) -> None:
+    """
+    Charge one request and `estimated_tokens` against the session and global
+    buckets, or raise RateLimitExceeded without charging anything.
+
+    `scope` ("session" or "global") charges only that pair of buckets. The
+    AI helpers charge the session before joining a coalesced request and the
+    global budget inside it, so one session's limit never fails the others
+    waiting on the same call.
+    """
+    if not RATE_LIMIT_ENABLED:
+        return
+
+    buckets = _buckets(estimated_tokens, session_id or current_session_id(), scope)
+    if not buckets:
+        return
+
+    blocked = _get_store().acquire(buckets)
+    with _stats_lock:
+        if blocked is None:
+            _stats["allowed"] += 1
+        else:
+            _stats[f"limited_{blocked[0].scope}"] += 1
+    if blocked is not None:
+        bucket, wait = blocked
+        raise RateLimitExceeded(wait, bucket.scope)
+
+
+def release_ai_call(
+    estimated_tokens: int,
+    session_id: Optional[str] = None,
+    scope: Optional[str] = None,
+) -> None:
+    """
+    Refund an acquire_ai_call whose request was never sent, e.g. the
+    session charge of a call the global limit then turned away, so a buyer
+    who is queued or asked to retry is not charged for it.
+    """
+    if not RATE_LIMIT_ENABLED:
+        return
+
+    buckets = _buckets(estimated_tokens, session_id or current_session_id(), scope)
+    if not buckets:
+        return
+
+    _get_store().release(buckets)
+    with _stats_lock:
+        _stats["refunded"] += 1
+
+
+def get_rate_limit_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_stats)
+    stats["backend"] = type(_get_store()).__name__
+    return stats
@@ -1,22 +1,16 @@
 # purchase_agreement/section10_13_overview.py
 
 import streamlit as st
-from purchase_agreement.ai_helpers import call_purchase_agreement_ai  # adjust path if needed
+from purchase_agreement.conversations import ask_in_conversation, explain_in_conversation, render_conversation
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
 
 
-def render_section10_13_overview():
+@section_fragment
+def _render_section10_13_ai_helper():
     """
-    Overview hub for Sections 10–13:
-    - Short summaries
-    - AI helper for questions
-    - Expanders to read full section content later
+    "Ask AI Realtor" / "Connect with a Human Realtor" block for Sections 10–13.
     """
-
-    st.markdown("## Other Disclosures, Rules & Rights")
-
-     # ---------------------------
-    # 🔹 GPT / AI Realtor – overview for 10–13
-    # ---------------------------
     with st.expander("💬 Need help? Ask AI Realtor", expanded=True):
         st.markdown(
             "Use this assistant to understand the big picture for disclosures, inspections, "
@@ -45,34 +39,50 @@ def render_section10_13_overview():
                 "Connect with a Human Realtor",
                 use_container_width=True,
             )
+            explain_clicked_1013 = st.form_submit_button(
+                "Explain this section",
+                use_container_width=True,
+            )
 
         # Handle Ask AI
         if ask_clicked_1013:
             if not user_prompt_1013.strip():
                 st.warning("Please enter a question or description first.")
             else:
-                with st.spinner("Thinking like a California Realtor..."):
-                    try:
-                        answer_1013 = call_purchase_agreement_ai(
-                            user_prompt_1013.strip(),
-                            section="10-13",
-                            # If you later add state for 10–13, pass it here:
-                            # section_state=st.session_state[SECTION_1013_KEY],
-                        )
-                    except Exception as e:
-                        answer_1013 = (
-                            "There was an error calling the AI backend for Sections 10–13.\n\n"
-                            f"Details: {e}"
-                        )
-
-                    st.session_state["pa_10_13_ai_answer"] = answer_1013
+                try:
+                    answer_1013 = ask_in_conversation(
+                        user_prompt_1013.strip(),
+                        section="10-13",
+                        # If you later add state for 10–13, pass it here:
+                        # section_state=st.session_state[SECTION_1013_KEY],
+                    )
+                except Exception as e:
+                    answer_1013 = (
+                        "There was an error calling the AI backend for Sections 10–13.\n\n"
+                        f"Details: {e}"
+                    )
+
+                st.session_state["pa_10_13_ai_answer"] = answer_1013
 
         # Handle Connect with Human Realtor
         if connect_clicked_1013:
             st.session_state["pa_10_13_show_human_realtor_form"] = True
 
+        # Handle "Explain this section" – the same answer for everyone, served
+        # from the shipped answer pack when it is up to date.
+        if explain_clicked_1013:
+            try:
+                answer_1013 = explain_in_conversation("10-13")
+            except Exception as e:
+                answer_1013 = (
+                    "There was an error calling the AI backend for Sections 10–13.\n\n"
+                    f"Details: {e}"
+                )
+            st.session_state["pa_10_13_ai_answer"] = answer_1013
+
         # Show AI answer if we have one
         if "pa_10_13_ai_answer" in st.session_state:
+            render_conversation("10-13", st.session_state["pa_10_13_ai_answer"])
             st.markdown("#### 🧠 AI Realtor Suggestion (Sections 10–13)")
             st.info(st.session_state["pa_10_13_ai_answer"])
 
@@ -110,6 +120,24 @@ def render_section10_13_overview():
                         "Your request has been recorded. A human realtor will reach out to you using the contact info you provided."
                     )
 
+
+@section_fragment
+@profiled()
+def render_section10_13_overview():
+    """
+    Overview hub for Sections 10–13:
+    - Short summaries
+    - AI helper for questions
+    - Expanders to read full section content later
+    """
+
+    st.markdown("## Other Disclosures, Rules & Rights")
+
+     # ---------------------------
+    # 🔹 GPT / AI Realtor – overview for 10–13
+    # ---------------------------
+    _render_section10_13_ai_helper()
+
     st.markdown("---")
 
 
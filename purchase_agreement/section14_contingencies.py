@@ -1,24 +1,18 @@
 # purchase_agreement/section14_contingencies.py
 
 import streamlit as st
-from purchase_agreement.ai_helpers import call_purchase_agreement_ai  # adjust path if needed
+from purchase_agreement.conversations import ask_in_conversation, explain_in_conversation, render_conversation
+from purchase_agreement.fields import section_state
+from purchase_agreement.models import ContingencyPeriod, get_section
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
 
 
-def render_section14_contingencies():
+@section_fragment
+def _render_section14_ai_helper():
     """
-    Render Section 4 – Contingencies; Removal of Contingencies; Cancellation Rights.
-
-    UX design:
-    - Top expander: Ask AI Realtor + Connect with Human Realtor.
-    - User only edits 14B(1) (number of days for buyer contingencies + notes).
-    - 14B(2), 14B(3), 14B(4) shown as plain-English explanations and tables.
+    "Ask AI Realtor" / "Connect with a Human Realtor" block for Section 14.
     """
-
-    st.markdown("## 4. Contingencies, Removal of Contingencies, and Cancellation Rights")
-
-       # ---------------------------
-    # 💬 GPT / AI Realtor + Human Realtor — Top Helper for Section 14
-    # ---------------------------
     with st.expander("💬 Need help with contingencies?", expanded=True):
 
         st.markdown(
@@ -48,29 +42,46 @@ def render_section14_contingencies():
                 "Connect with a Human Realtor",
                 use_container_width=True,
             )
+            explain_clicked_14_top = st.form_submit_button(
+                "Explain this section",
+                use_container_width=True,
+            )
 
         # --- Handle Ask AI ---
         if ask_clicked_14_top:
             if not user_prompt_14.strip():
                 st.warning("Please type something to ask the AI Realtor.")
             else:
-                with st.spinner("Thinking like a California Realtor..."):
-                    try:
-                        answer_14 = call_purchase_agreement_ai(
-                            user_prompt_14.strip(),
-                            section="14",
-                            # If you have a Section 14 state dict, you can pass it here:
-                            # section_state=st.session_state[SECTION14_KEY],
-                        )
-                    except Exception as e:
-                        answer_14 = (
-                            "There was an error calling the AI backend for Section 14.\n\n"
-                            f"Details: {e}"
-                        )
-                    st.session_state["pa14_ai_answer_top"] = answer_14
+                try:
+                    answer_14 = ask_in_conversation(
+                        user_prompt_14.strip(),
+                        section="14",
+                        section_state=section_state("14"),
+                        # Answer depends on this user's data, so don't share it via the cache
+                        use_cache=False,
+                    )
+                except Exception as e:
+                    answer_14 = (
+                        "There was an error calling the AI backend for Section 14.\n\n"
+                        f"Details: {e}"
+                    )
+                st.session_state["pa14_ai_answer_top"] = answer_14
+
+        # Handle "Explain this section" – a shared, no-user-data request that is
+        # usually already answered by the background prefetch.
+        if explain_clicked_14_top:
+            try:
+                answer_14 = explain_in_conversation("14")
+            except Exception as e:
+                answer_14 = (
+                    "There was an error calling the AI backend for Section 14.\n\n"
+                    f"Details: {e}"
+                )
+            st.session_state["pa14_ai_answer_top"] = answer_14
 
         # --- Show AI Answer ---
         if "pa14_ai_answer_top" in st.session_state:
+            render_conversation("14", st.session_state["pa14_ai_answer_top"])
             st.markdown("#### 🧠 AI Realtor Suggestion")
             st.info(st.session_state["pa14_ai_answer_top"])
 
@@ -116,6 +127,26 @@ def render_section14_contingencies():
                         "Your request has been recorded. A human realtor will reach out to you using the contact info you provided."
                     )
 
+
+@section_fragment
+@profiled()
+def render_section14_contingencies():
+    """
+    Render Section 4 – Contingencies; Removal of Contingencies; Cancellation Rights.
+
+    UX design:
+    - Top expander: Ask AI Realtor + Connect with Human Realtor.
+    - User only edits 14B(1) (number of days for buyer contingencies + notes).
+    - 14B(2), 14B(3), 14B(4) shown as plain-English explanations and tables.
+    """
+
+    st.markdown("## 4. Contingencies, Removal of Contingencies, and Cancellation Rights")
+
+       # ---------------------------
+    # 💬 GPT / AI Realtor + Human Realtor — Top Helper for Section 14
+    # ---------------------------
+    _render_section14_ai_helper()
+
     st.markdown("---")
 
     # ---------------------------
@@ -149,10 +180,11 @@ def render_section14_contingencies():
         "your offer less attractive to the seller. Talk to your agent about what’s typical in your area."
     )
 
+    period = get_section(ContingencyPeriod)
     col_days, col_notes = st.columns([1, 2])
 
     with col_days:
-        contingency_days = st.number_input(
+        period.contingency_days = st.number_input(
             "Total days after acceptance for buyer contingencies",
             min_value=0,
             max_value=60,
@@ -167,7 +199,7 @@ def render_section14_contingencies():
         )
 
     with col_notes:
-        st.text_area(
+        period.notes = st.text_area(
             "Notes or preferences about your contingency period (optional)",
             key="pa14B1_notes",
             placeholder=(
@@ -177,7 +209,7 @@ def render_section14_contingencies():
         )
 
     st.info(
-        f"You've selected **{contingency_days} day(s)** after acceptance for your buyer contingencies."
+        f"You've selected **{period.contingency_days} day(s)** after acceptance for your buyer contingencies."
     )
 
     st.markdown("---")
@@ -1,24 +1,28 @@
 # purchase_agreement/section15_time_dates.py
 
 import streamlit as st
-from purchase_agreement.ai_helpers import call_purchase_agreement_ai  # adjust path if needed
-
-
-def render_section15_time_dates():
+from purchase_agreement.conversations import ask_in_conversation, explain_in_conversation, render_conversation
+from purchase_agreement.models import TimingPreferences, get_section, option_index
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
+
+CLOSING_FLEXIBILITY_OPTIONS = [
+    "I need a very specific closing date",
+    "I can be a little flexible (± 3–5 days)",
+    "I am flexible within about 1–2 weeks",
+]
+SIGNING_PREFERENCE_OPTIONS = [
+    "No strong preference",
+    "Prefer earlier in the day",
+    "Prefer later in the day",
+]
+
+
+@section_fragment
+def _render_section15_ai_helper():
     """
-    Render Section 15 – Time Periods; Dates; Time of Essence.
-
-    UX design:
-    - Top expander: Ask AI Realtor + Connect with Human Realtor.
-    - Plain-English explanation of what 'time is of the essence' means.
-    - Light user inputs: notes about flexibility/preferences on dates.
+    "Ask AI Realtor" / "Connect with a Human Realtor" block for Section 15.
     """
-
-    st.markdown("## 5. Time Periods; Dates; Time of Essence")
-
-      # ---------------------------
-    # 💬 GPT / AI Realtor + Human Realtor — Top Helper for Section 15
-    # ---------------------------
     with st.expander("💬 Need help with Section 15 – Time Periods & Dates?", expanded=True):
 
         st.markdown(
@@ -48,29 +52,45 @@ def render_section15_time_dates():
                 "Connect with a Human Realtor",
                 use_container_width=True,
             )
+            explain_clicked_15_top = st.form_submit_button(
+                "Explain this section",
+                use_container_width=True,
+            )
 
         # --- Handle Ask AI ---
         if ask_clicked_15_top:
             if not user_prompt_15.strip():
                 st.warning("Please type something to ask the AI Realtor.")
             else:
-                with st.spinner("Thinking like a California Realtor..."):
-                    try:
-                        answer_15 = call_purchase_agreement_ai(
-                            user_prompt_15.strip(),
-                            section="15",
-                            # If you later add Section 15 state, pass it here:
-                            # section_state=st.session_state[SECTION15_KEY],
-                        )
-                    except Exception as e:
-                        answer_15 = (
-                            "There was an error calling the AI backend for Section 15.\n\n"
-                            f"Details: {e}"
-                        )
+                try:
+                    answer_15 = ask_in_conversation(
+                        user_prompt_15.strip(),
+                        section="15",
+                        # If you later add Section 15 state, pass it here:
+                        # section_state=st.session_state[SECTION15_KEY],
+                    )
+                except Exception as e:
+                    answer_15 = (
+                        "There was an error calling the AI backend for Section 15.\n\n"
+                        f"Details: {e}"
+                    )
                 st.session_state["pa15_ai_answer_top"] = answer_15
 
+        # Handle "Explain this section" – a shared, no-user-data request that is
+        # usually already answered by the background prefetch.
+        if explain_clicked_15_top:
+            try:
+                answer_15 = explain_in_conversation("15")
+            except Exception as e:
+                answer_15 = (
+                    "There was an error calling the AI backend for Section 15.\n\n"
+                    f"Details: {e}"
+                )
+            st.session_state["pa15_ai_answer_top"] = answer_15
+
         # --- Show AI Answer ---
         if "pa15_ai_answer_top" in st.session_state:
+            render_conversation("15", st.session_state["pa15_ai_answer_top"])
             st.markdown("#### 🧠 AI Realtor Suggestion")
             st.info(st.session_state["pa15_ai_answer_top"])
 
@@ -116,6 +136,27 @@ def render_section15_time_dates():
                         "using the contact info you provided."
                     )
 
+
+@section_fragment
+@profiled()
+def render_section15_time_dates():
+    """
+    Render Section 15 – Time Periods; Dates; Time of Essence.
+
+    UX design:
+    - Top expander: Ask AI Realtor + Connect with Human Realtor.
+    - Plain-English explanation of what 'time is of the essence' means.
+    - Light user inputs: notes about flexibility/preferences on dates.
+    """
+    data = get_section(TimingPreferences)
+
+    st.markdown("## 5. Time Periods; Dates; Time of Essence")
+
+      # ---------------------------
+    # 💬 GPT / AI Realtor + Human Realtor — Top Helper for Section 15
+    # ---------------------------
+    _render_section15_ai_helper()
+
     st.markdown("---")
 
 
@@ -149,30 +190,25 @@ def render_section15_time_dates():
     col_timing1, col_timing2 = st.columns(2)
 
     with col_timing1:
-        timing_flexibility = st.selectbox(
+        data.closing_flexibility = st.selectbox(
             "How flexible are you on closing date?",
-            options=[
-                "I need a very specific closing date",
-                "I can be a little flexible (± 3–5 days)",
-                "I am flexible within about 1–2 weeks",
-            ],
+            options=CLOSING_FLEXIBILITY_OPTIONS,
+            index=option_index(CLOSING_FLEXIBILITY_OPTIONS, data.closing_flexibility),
             key="pa15_timing_flexibility",
         )
 
     with col_timing2:
-        morning_evening_pref = st.selectbox(
+        data.signing_preference = st.selectbox(
             "Do you have a preference for signings / key handoff?",
-            options=[
-                "No strong preference",
-                "Prefer earlier in the day",
-                "Prefer later in the day",
-            ],
+            options=SIGNING_PREFERENCE_OPTIONS,
+            index=option_index(SIGNING_PREFERENCE_OPTIONS, data.signing_preference),
             key="pa15_signing_pref",
         )
 
-    timing_notes = st.text_area(
+    data.timing_notes = st.text_area(
         "Any notes about dates, travel, or scheduling that might affect your timing?",
         key="pa15_timing_notes",
+        value=data.timing_notes,
         placeholder=(
             "Example: I’m traveling during the last week of the month; prefer to avoid closing then.\n"
             "Example: My lease ends on the 30th, so I need to close before then or arrange a short-term overlap."
@@ -1,5 +1,9 @@
 import streamlit as st
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
 
+@section_fragment
+@profiled()
 def render_section16_20_info():
     """
     Combined info view for Sections 16–20.
@@ -2,16 +2,19 @@
 
 import streamlit as st
 from datetime import date, timedelta
-from purchase_agreement.state import init_purchase_agreement_state  # absolute import
+from purchase_agreement.models import AGREEMENT_KEY, OfferTerms, get_section
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
 
 
+@section_fragment(publishes=(AGREEMENT_KEY,))
+@profiled()
 def render_section_1_offer():
     """
     Main entry for Section 1 – Offer.
     Simple linear flow (no mode selector).
     """
-    init_purchase_agreement_state()
-    s1 = st.session_state.purchase_agreement["section_1"]
+    s1 = get_section(OfferTerms)
 
     st.markdown("### California Purchase Agreement – Section 1: Offer")
     # Anchor for "back to top" link
@@ -27,7 +30,7 @@ def render_section_1_offer():
     # (We removed the old Live Summary on purpose)
 
 
-def _render_section_1_form(s1: dict):
+def _render_section_1_form(s1: OfferTerms):
     """Single, guided form for Section 1."""
 
     # --- Step 1: Buyer names ---
@@ -62,9 +65,9 @@ def _render_section_1_form(s1: dict):
             "- If you’re buying with a partner or spouse, list everyone who should be on title."
         )
 
-    s1["buyer_names"] = st.text_input(
+    s1.buyer_names = st.text_input(
         "Buyer full legal name(s)",
-        value=s1.get("buyer_names", ""),
+        value=s1.buyer_names,
         placeholder="e.g. Jane Liu and David Chen",
     )
 
@@ -81,32 +84,32 @@ def _render_section_1_form(s1: dict):
 
     col1, col2 = st.columns(2)
     with col1:
-        s1["property_address"] = st.text_input(
+        s1.property_address = st.text_input(
             "Property street address",
-            value=s1.get("property_address", ""),
+            value=s1.property_address,
             placeholder="123 Any Street #502",
         )
-        s1["city"] = st.text_input(
+        s1.city = st.text_input(
             "City",
-            value=s1.get("city", ""),
+            value=s1.city,
             placeholder="San Francisco",
         )
     with col2:
-        s1["county"] = st.text_input(
+        s1.county = st.text_input(
             "County",
-            value=s1.get("county", ""),
+            value=s1.county,
             placeholder="San Francisco",
         )
-        s1["zip_code"] = st.text_input(
+        s1.zip_code = st.text_input(
             "ZIP Code",
-            value=s1.get("zip_code", ""),
+            value=s1.zip_code,
             max_chars=10,
             placeholder="94107",
         )
 
-    s1["apn"] = st.text_input(
+    s1.apn = st.text_input(
         "APN (Assessor’s Parcel Number) – optional",
-        value=s1.get("apn", ""),
+        value=s1.apn,
         placeholder="Leave blank if unknown",
     )
 
@@ -124,10 +127,10 @@ def _render_section_1_form(s1: dict):
         "Offer price (USD)",
         min_value=0,
         step=1000,
-        value=s1.get("purchase_price") or 0,
+        value=s1.purchase_price or 0,
         format="%d",
     )
-    s1["purchase_price"] = int(purchase_price) if purchase_price else None
+    s1.purchase_price = int(purchase_price) if purchase_price else None
 
     # --- Step 4: Close of escrow ---
     st.markdown("#### Step 4: Close of escrow timing")
@@ -146,7 +149,7 @@ def _render_section_1_form(s1: dict):
         "How do you want to define the close of escrow for Section 1?",
         options=["Days after acceptance", "Specific calendar date"],
         index=0
-        if s1.get("close_type", "days_after_acceptance") == "days_after_acceptance"
+        if s1.close_type == "days_after_acceptance"
         else 1,
     )
 
@@ -156,39 +159,17 @@ def _render_section_1_form(s1: dict):
             min_value=5,
             max_value=90,
             step=1,
-            value=s1.get("close_days_after", 30),
+            value=s1.close_days_after,
         )
-        s1["close_type"] = "days_after_acceptance"
-        s1["close_days_after"] = int(close_days)
-        s1["close_date"] = None
+        s1.close_type = "days_after_acceptance"
+        s1.close_days_after = int(close_days)
+        s1.close_date = None
     else:
-        default_date = s1.get("close_date") or (date.today() + timedelta(days=30))
+        default_date = s1.close_date or (date.today() + timedelta(days=30))
         close_date = st.date_input(
             "Target closing date",
             value=default_date,
         )
-        s1["close_type"] = "specific_date"
-        s1["close_date"] = close_date
-        s1["close_days_after"] = None
-
-    # 👉 NEW: sync a clean snapshot into st.session_state["pa_section1_offer"]
-    _sync_section1_snapshot(s1)
-
-
-def _sync_section1_snapshot(s1: dict):
-    """
-    Store a clean snapshot of Section 1 in a dedicated key so other sections
-    (Section 3, Final Review, etc.) can read it reliably.
-    """
-    st.session_state["pa_section1_offer"] = {
-        "buyer_names": s1.get("buyer_names"),
-        "property_address": s1.get("property_address"),
-        "city": s1.get("city"),
-        "county": s1.get("county"),
-        "zip_code": s1.get("zip_code"),
-        "apn": s1.get("apn"),
-        "purchase_price": s1.get("purchase_price"),
-        "close_type": s1.get("close_type"),
-        "close_days_after": s1.get("close_days_after"),
-        "close_date": s1.get("close_date"),
-    }
+        s1.close_type = "specific_date"
+        s1.close_date = close_date
+        s1.close_days_after = None
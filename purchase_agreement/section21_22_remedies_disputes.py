@@ -1,29 +1,29 @@
 # purchase_agreement/section21_22_remedies_disputes.py
 
 import streamlit as st
-from purchase_agreement.ai_helpers import call_purchase_agreement_ai  # adjust path if needed
-
-
-def render_section21_22_remedies_disputes():
+from purchase_agreement.conversations import ask_in_conversation, explain_in_conversation, render_conversation
+from purchase_agreement.explainers import SECTION_EXPLAINERS
+from purchase_agreement.models import RemediesAndDisputes, get_section, option_index
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
+
+LIQUIDATED_DAMAGES_COMFORT_OPTIONS = [
+    "I need to talk to an attorney before signing",
+    "I understand the general idea but still have questions",
+    "I feel reasonably comfortable with the concept",
+]
+ARBITRATION_COMFORT_OPTIONS = [
+    "I need to talk to an attorney before deciding",
+    "I have mixed feelings / I'm not sure",
+    "I feel generally comfortable with arbitration",
+]
+
+
+@section_fragment
+def _render_section21_22_ai_helper():
     """
-    Combined view for Sections 21–22 of the CAR Residential Purchase Agreement.
-
-    Focus:
-    - Section 21: Remedies for buyer and seller if one party breaches.
-    - Section 22: Mediation and arbitration (how disputes are resolved).
-
-    UX:
-    - Top helper with Ask AI Realtor + Connect with Human Realtor.
-    - Clear, plain-English explanation of remedies and dispute resolution.
-    - Expanders for more detail and simple tables.
-    - User can add personal notes (e.g., how they feel about arbitration or risk).
+    "Ask AI Realtor" / "Connect with a Human Realtor" block for Sections 21–22.
     """
-
-    st.markdown("## Sections 21–22 – Remedies & Dispute Resolution")
-
-    # --------------------------------------------------
-    # 💬 GPT / AI Realtor + Human Realtor – Top Helper
-    # --------------------------------------------------
     with st.expander("💬 Need help with remedies & dispute resolution (Sections 21–22)?", expanded=True):
         st.markdown(
             "These sections explain **what can happen if someone breaches the contract** and "
@@ -33,20 +33,6 @@ def render_section21_22_remedies_disputes():
             "remedies, mediation, or arbitration."
         )
 
-        default_prompt_21_22 = (
-            "You are an experienced California residential real estate agent. "
-            "Explain Sections 21 and 22 of the CAR Residential Purchase Agreement in simple, "
-            "neutral terms. Cover:\n"
-            "- What 'remedies' are available to a buyer or seller if the other party breaches.\n"
-            "- What 'liquidated damages' generally means when both parties initial it.\n"
-            "- The concept of specific performance (especially when a seller breaches).\n"
-            "- How mediation works and why the contract requires attempting it before court.\n"
-            "- What arbitration is, that it is optional and requires separate initials, and that "
-            "it affects the right to a jury trial.\n"
-            "Do not give legal advice or tell the user what they *should* choose; just explain "
-            "the concepts and remind them to consult their own attorney."
-        )
-
         with st.form("pa21_22_ai_form"):
             user_prompt_21_22 = st.text_input(
                 "What do you want help with in Sections 21–22?",
@@ -78,36 +64,45 @@ def render_section21_22_remedies_disputes():
                     "Connect with a Human Realtor",
                     use_container_width=True,
                 )
+                explain_clicked_21_22 = st.form_submit_button(
+                    "Explain this section",
+                    use_container_width=True,
+                )
 
         # Handle Ask AI
         if ask_clicked_21_22:
             if not user_prompt_21_22.strip():
                 st.warning("Please enter a question or description first.")
             else:
-                full_prompt_21_22 = user_prompt_21_22.strip()
-                if use_context_21_22:
-                    full_prompt_21_22 = (
-                        default_prompt_21_22
-                        + "\n\nUser question:\n"
-                        + user_prompt_21_22.strip()
+                try:
+                    answer_21_22 = ask_in_conversation(
+                        user_prompt_21_22.strip(),
+                        section="21-22",
+                        system_override=SECTION_EXPLAINERS["21-22"] if use_context_21_22 else None,
+                    )
+                except Exception as e:
+                    answer_21_22 = (
+                        "There was an error calling the AI backend for Sections 21–22.\n\n"
+                        f"Details: {e}"
                     )
 
-                with st.spinner("Thinking like a California Realtor..."):
-                    try:
-                        answer_21_22 = call_purchase_agreement_ai(
-                            full_prompt_21_22,
-                            section="21-22",
-                        )
-                    except Exception as e:
-                        answer_21_22 = (
-                            "There was an error calling the AI backend for Sections 21–22.\n\n"
-                            f"Details: {e}"
-                        )
-
-                    st.session_state["pa21_22_ai_answer"] = answer_21_22
+                st.session_state["pa21_22_ai_answer"] = answer_21_22
+
+        # Handle "Explain this section" – the same answer for everyone, served
+        # from the shipped answer pack when it is up to date.
+        if explain_clicked_21_22:
+            try:
+                answer_21_22 = explain_in_conversation("21-22")
+            except Exception as e:
+                answer_21_22 = (
+                    "There was an error calling the AI backend for Sections 21–22.\n\n"
+                    f"Details: {e}"
+                )
+            st.session_state["pa21_22_ai_answer"] = answer_21_22
 
         # Show AI answer
         if "pa21_22_ai_answer" in st.session_state:
+            render_conversation("21-22", st.session_state["pa21_22_ai_answer"])
             st.markdown("#### 🧠 AI Realtor Suggestion")
             st.info(st.session_state["pa21_22_ai_answer"])
 
@@ -152,6 +147,32 @@ def render_section21_22_remedies_disputes():
                         "Your request has been recorded. A human realtor will reach out to you using the contact info you provided."
                     )
 
+
+@section_fragment
+@profiled()
+def render_section21_22_remedies_disputes():
+    """
+    Combined view for Sections 21–22 of the CAR Residential Purchase Agreement.
+
+    Focus:
+    - Section 21: Remedies for buyer and seller if one party breaches.
+    - Section 22: Mediation and arbitration (how disputes are resolved).
+
+    UX:
+    - Top helper with Ask AI Realtor + Connect with Human Realtor.
+    - Clear, plain-English explanation of remedies and dispute resolution.
+    - Expanders for more detail and simple tables.
+    - User can add personal notes (e.g., how they feel about arbitration or risk).
+    """
+    data = get_section(RemediesAndDisputes)
+
+    st.markdown("## Sections 21–22 – Remedies & Dispute Resolution")
+
+    # --------------------------------------------------
+    # 💬 GPT / AI Realtor + Human Realtor – Top Helper
+    # --------------------------------------------------
+    _render_section21_22_ai_helper()
+
     st.markdown("---")
 
     # --------------------------------------------------
@@ -241,30 +262,25 @@ def render_section21_22_remedies_disputes():
     col_notes_1, col_notes_2 = st.columns(2)
 
     with col_notes_1:
-        comfort_level_liquidated = st.selectbox(
+        data.liquidated_damages_comfort = st.selectbox(
             "How do you feel about the idea that your deposit may be at risk if you breach?",
-            options=[
-                "I need to talk to an attorney before signing",
-                "I understand the general idea but still have questions",
-                "I feel reasonably comfortable with the concept",
-            ],
+            options=LIQUIDATED_DAMAGES_COMFORT_OPTIONS,
+            index=option_index(LIQUIDATED_DAMAGES_COMFORT_OPTIONS, data.liquidated_damages_comfort),
             key="pa21_liquidated_comfort",
         )
 
     with col_notes_2:
-        comfort_level_arbitration = st.selectbox(
+        data.arbitration_comfort = st.selectbox(
             "How do you feel about arbitration instead of a court/jury trial?",
-            options=[
-                "I need to talk to an attorney before deciding",
-                "I have mixed feelings / I'm not sure",
-                "I feel generally comfortable with arbitration",
-            ],
+            options=ARBITRATION_COMFORT_OPTIONS,
+            index=option_index(ARBITRATION_COMFORT_OPTIONS, data.arbitration_comfort),
             key="pa22_arbitration_comfort",
         )
 
-    user_notes_21_22 = st.text_area(
+    data.remedies_notes = st.text_area(
         "Any notes, concerns, or questions you want to remember about remedies or dispute resolution?",
         key="pa21_22_user_notes",
+        value=data.remedies_notes,
         height=140,
         placeholder=(
             "Examples:\n"
@@ -1,12 +1,16 @@
 # purchase_agreement/section23_30_overview.py
 
 import streamlit as st
+from purchase_agreement.explainers import SECTION_EXPLAINERS
+from purchase_agreement.models import GeneralTermsNotes, get_section
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
 
 # Try to import the shared AI helper; fall back gracefully if not available
 try:
-    from purchase_agreement.ai_helpers import call_purchase_agreement_ai
+    from purchase_agreement.conversations import ask_in_conversation, explain_in_conversation, render_conversation
 except Exception:
-    def call_purchase_agreement_ai(prompt, section=None):
+    def ask_in_conversation(user_prompt=None, section=None, **kwargs):
         """
         Fallback stub so this module still imports even if ai_helpers is missing.
         """
@@ -15,25 +19,18 @@ except Exception:
             "Please check your configuration or try again later."
         )
 
+    def explain_in_conversation(section=None):
+        return ask_in_conversation(section=section)
 
-def render_section23_30_overview():
-    """
-    Combined view for Sections 23–30 of the CAR Residential Purchase Agreement.
+    def render_conversation(section=None, current_answer=None):
+        pass
 
-    These are mostly 'general terms' and knowledge sections:
-    - Assignment / who can step into the contract
-    - Equal housing / fair housing language
-    - Attorney’s fees, governing law, and notices
-    - Additional terms, addenda, and counter-offers
-    - Broker compensation, agency relationships, and other confirmations
-    - Miscellaneous boilerplate that matters but usually isn’t edited by buyers
-    """
 
-    st.markdown("## General Terms, Brokers & Other Legal Details")
-
-    # --------------------------------------------------
-    # 💬 GPT / AI Realtor + Human Realtor – Top Helper
-    # --------------------------------------------------
+@section_fragment
+def _render_section23_30_ai_helper():
+    """
+    "Ask AI Realtor" / "Connect with a Human Realtor" block for Sections 23–30.
+    """
     with st.expander("💬 Need help with? Ask AI Realtor", expanded=True):
         st.markdown(
             "These sections cover **general legal terms, broker relationships, and other fine print** "
@@ -42,20 +39,6 @@ def render_section23_30_overview():
             "broker or attorney if you have questions about these clauses."
         )
 
-        default_prompt_2330 = (
-            "You are an experienced California residential real estate agent. "
-            "Explain, in simple language, the typical topics covered in Sections 23–30 of the CAR "
-            "Residential Purchase Agreement. At a high level, cover:\n"
-            "- General terms like assignment, successors, and notices.\n"
-            "- Equal housing / fair housing language.\n"
-            "- Attorney’s fees and governing law.\n"
-            "- Additional terms and addenda.\n"
-            "- Broker compensation and confirmation of agency relationships.\n"
-            "- Why these sections matter even though buyers usually don't edit them directly.\n"
-            "Do not give legal advice. Stay neutral and remind the user to consult their own attorney "
-            "for legal interpretation or custom changes."
-        )
-
         with st.form("pa23_30_ai_form"):
             user_prompt_2330 = st.text_input(
                 "What do you want help with?",
@@ -87,29 +70,32 @@ def render_section23_30_overview():
                     "Connect with a Human Realtor",
                     use_container_width=True,
                 )
+                explain_clicked_2330 = st.form_submit_button(
+                    "Explain this section",
+                    use_container_width=True,
+                )
 
         # Handle Ask AI
         if ask_clicked_2330:
             if not user_prompt_2330.strip():
                 st.warning("Please enter a question or description first.")
             else:
-                full_prompt_2330 = user_prompt_2330.strip()
-                if use_context_2330:
-                    full_prompt_2330 = (
-                        default_prompt_2330
-                        + "\n\nUser question:\n"
-                        + user_prompt_2330.strip()
-                    )
+                answer_2330 = ask_in_conversation(
+                    user_prompt_2330.strip(),
+                    section="23-30",
+                    system_override=SECTION_EXPLAINERS["23-30"] if use_context_2330 else None,
+                )
+                st.session_state["pa23_30_ai_answer"] = answer_2330
 
-                with st.spinner("Thinking like a California Realtor..."):
-                    answer_2330 = call_purchase_agreement_ai(
-                        full_prompt_2330,
-                        section="23-30",
-                    )
-                    st.session_state["pa23_30_ai_answer"] = answer_2330
+        # Handle "Explain this section" – the same answer for everyone, served
+        # from the shipped answer pack when it is up to date.
+        if explain_clicked_2330:
+            answer_2330 = explain_in_conversation("23-30")
+            st.session_state["pa23_30_ai_answer"] = answer_2330
 
         # Show AI answer
         if "pa23_30_ai_answer" in st.session_state:
+            render_conversation("23-30", st.session_state["pa23_30_ai_answer"])
             st.markdown("#### 🧠 AI Realtor Suggestion")
             st.info(st.session_state["pa23_30_ai_answer"])
 
@@ -154,6 +140,30 @@ def render_section23_30_overview():
                         "Your request has been recorded. A human realtor will reach out to you using the contact info you provided."
                     )
 
+
+@section_fragment
+@profiled()
+def render_section23_30_overview():
+    """
+    Combined view for Sections 23–30 of the CAR Residential Purchase Agreement.
+
+    These are mostly 'general terms' and knowledge sections:
+    - Assignment / who can step into the contract
+    - Equal housing / fair housing language
+    - Attorney’s fees, governing law, and notices
+    - Additional terms, addenda, and counter-offers
+    - Broker compensation, agency relationships, and other confirmations
+    - Miscellaneous boilerplate that matters but usually isn’t edited by buyers
+    """
+    data = get_section(GeneralTermsNotes)
+
+    st.markdown("## General Terms, Brokers & Other Legal Details")
+
+    # --------------------------------------------------
+    # 💬 GPT / AI Realtor + Human Realtor – Top Helper
+    # --------------------------------------------------
+    _render_section23_30_ai_helper()
+
     st.markdown("---")
 
     # --------------------------------------------------
@@ -259,9 +269,10 @@ def render_section23_30_overview():
     # --------------------------------------------------
     st.markdown("### Your notes about these general terms (optional)")
 
-    st.text_area(
+    data.general_terms_notes = st.text_area(
         "Any notes or questions you want to remember about general terms, brokers, or addenda?",
         key="pa23_30_user_notes",
+        value=data.general_terms_notes,
         height=140,
         placeholder=(
             "Examples:\n"
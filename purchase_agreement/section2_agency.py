@@ -1,15 +1,18 @@
 # purchase_agreement/section2_agency.py
 
 import streamlit as st
-from purchase_agreement.state import init_purchase_agreement_state
+from purchase_agreement.models import AgencyTerms, get_section
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
 
 SNAPSHOT_IMAGE_PATH = "assets/section2_agency_snapshot.png"  # optional image path
 
 
+@section_fragment
+@profiled()
 def render_section_2_agency():
     """Section 5 – Agency / Broker Representation. For now we assume no agent."""
-    init_purchase_agreement_state()
-    s2 = st.session_state.purchase_agreement["section_2"]
+    s2 = get_section(AgencyTerms)
 
     #st.markdown("### Section 2 – Agency and Brokerage (Assuming No Agent)")
 
@@ -65,8 +68,8 @@ def render_section_2_agency():
     )
 
     # For now we just lock it to "no agent"
-    s2["has_agent"] = False
-    s2["notes"] = (
+    s2.has_agent = False
+    s2.notes = (
         "User is proceeding as an unrepresented buyer. "
         "Broker/agent fields to be completed later by a licensed real estate professional."
     )
@@ -2,21 +2,18 @@
 
 import streamlit as st
 from datetime import datetime, timedelta
-from purchase_agreement.ai_helpers import call_purchase_agreement_ai
+from purchase_agreement.conversations import ask_in_conversation, explain_in_conversation, render_conversation
+from purchase_agreement.fields import section_state
+from purchase_agreement.models import OfferExpiration, get_section
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
 
-SECTION31_KEY = "pa_section31_offer_expiration"
 
-def render_section31_expiration():
+@section_fragment
+def _render_section31_ai_helper():
     """
-    Section 4 – Expiration of Offer
-    Buyer sets the exact date/time their offer expires.
+    "Ask AI Realtor" / "Connect with a Human Realtor" block for Section 31.
     """
-
-    #st.markdown("## 31. Expiration of Offer")
-
-      # --------------------------------------------------
-    # 💬 GPT + Human Realtor Helper (Top)
-    # --------------------------------------------------
     with st.expander("💬 Need help with Offer Expiration ?", expanded=True):
         st.markdown(
             "This section controls **when your offer automatically expires** if the seller does "
@@ -45,30 +42,47 @@ def render_section31_expiration():
                 "Connect with a Human Realtor",
                 use_container_width=True,
             )
+            explain_clicked = st.form_submit_button(
+                "Explain this section",
+                use_container_width=True,
+            )
 
         # Handle Ask AI (always uses GPT)
         if ask_ai_clicked:
             if not user_prompt_31.strip():
                 st.warning("Please enter a question first.")
             else:
-                with st.spinner("Thinking like a California Realtor..."):
-                    try:
-                        answer_31 = call_purchase_agreement_ai(
-                            user_prompt_31.strip(),
-                            section="31",
-                            # If you have a Section 31 state dict, pass it here:
-                            section_state=st.session_state.get(SECTION31_KEY, None),
-                        )
-                    except Exception as e:
-                        answer_31 = (
-                            "There was an error calling the AI backend for Section 31.\n\n"
-                            f"Details: {e}"
-                        )
+                try:
+                    answer_31 = ask_in_conversation(
+                        user_prompt_31.strip(),
+                        section="31",
+                        section_state=section_state("31"),
+                        # Answer depends on this user's data, so don't share it via the cache
+                        use_cache=False,
+                    )
+                except Exception as e:
+                    answer_31 = (
+                        "There was an error calling the AI backend for Section 31.\n\n"
+                        f"Details: {e}"
+                    )
 
                 st.session_state["pa31_ai_answer"] = answer_31
 
+        # Handle "Explain this section" – the same answer for everyone, served
+        # from the shipped answer pack when it is up to date.
+        if explain_clicked:
+            try:
+                answer_31 = explain_in_conversation("31")
+            except Exception as e:
+                answer_31 = (
+                    "There was an error calling the AI backend for Section 31.\n\n"
+                    f"Details: {e}"
+                )
+            st.session_state["pa31_ai_answer"] = answer_31
+
         # Show AI answer
         if "pa31_ai_answer" in st.session_state:
+            render_conversation("31", st.session_state["pa31_ai_answer"])
             st.markdown("#### 🧠 AI Realtor Suggestion")
             st.info(st.session_state["pa31_ai_answer"])
 
@@ -112,6 +126,22 @@ def render_section31_expiration():
                         "Your request has been sent. A human realtor will reach out to you."
                     )
 
+
+@section_fragment
+@profiled()
+def render_section31_expiration():
+    """
+    Section 4 – Expiration of Offer
+    Buyer sets the exact date/time their offer expires.
+    """
+
+    #st.markdown("## 31. Expiration of Offer")
+
+      # --------------------------------------------------
+    # 💬 GPT + Human Realtor Helper (Top)
+    # --------------------------------------------------
+    _render_section31_ai_helper()
+
     st.markdown("---")
 
     # --------------------------------------------------
@@ -158,6 +188,8 @@ def render_section31_expiration():
             key="pa31_time",
         )
 
+    expiration = get_section(OfferExpiration)
+    expiration.expiration_date, expiration.expiration_time = exp_date, exp_time
     expiration_dt = datetime.combine(exp_date, exp_time)
 
     # Warning if expiration is unreasonable
@@ -184,7 +216,7 @@ def render_section31_expiration():
     # --------------------------------------------------
     st.markdown("### Notes (optional)")
 
-    st.text_area(
+    expiration.notes = st.text_area(
         "Anything you want to ask AI Realtor or need involve an human realtor about offer timing?",
         key="pa31_notes",
         height=100,
@@ -1,94 +1,54 @@
 # purchase_agreement/section3_finance.py
 
 import streamlit as st
-from purchase_agreement.ai_helpers import call_purchase_agreement_ai
-
-SECTION3_KEY = "pa_section3_finance"
-
-
-def _init_section3_state():
-    if SECTION3_KEY not in st.session_state:
-        st.session_state[SECTION3_KEY] = {
-            # 3A – Initial Deposit
-            "initial_deposit_amount": 0.0,
-            "initial_deposit_method": "Direct to escrow holder",
-            "initial_deposit_instrument": "Wire transfer",
-            "initial_deposit_days": 3,
-            "show_deposit_explanation": False,
-
-            # 3B – Increased Deposit
-            "has_increased_deposit": False,
-            "increased_deposit_amount": 0.0,
-            "increased_deposit_days": 10,
-
-            # 3C–3E – All-Cash / Loans
-            "is_all_cash": False,
-            "proof_of_funds_days": 3,
-
-            "first_loan_amount": 0.0,
-            "first_loan_type": "Conventional",
-            "first_loan_fixed_or_arm": "Fixed rate",
-            "first_loan_max_rate": 8.0,
-            "first_loan_max_points": 1.0,
-
-            "has_second_loan": False,
-            "second_loan_amount": 0.0,
-            "second_loan_type": "Conventional",
-            "second_loan_fixed_or_arm": "Fixed rate",
-            "second_loan_max_rate": 9.0,
-            "second_loan_max_points": 1.0,
-
-            "additional_financing_terms": "",
-
-            # 3F / 3G / 3H
-            "purchase_price_total_manual": 0.0,  # fallback if we can't read Section 1
-            "down_payment_balance_amount": 0.0,
-            "verification_funds_days": 3,
-
-            # 3I – Appraisal Contingency
-            "has_appraisal_contingency": True,
-            "appraisal_contingency_days": 17,
-
-            # 3J – Loan Application / Letter
-            "loan_letter_days": 3,
-            "loan_preapproval_attached": False,
-
-            # 3K – Loan Contingency
-            "has_loan_contingency": True,
-            "loan_contingency_days": 21,
-        }
+from purchase_agreement.conversations import ask_in_conversation, explain_in_conversation, render_conversation
+from purchase_agreement.fields import resolve, section_state
+from purchase_agreement.models import FinanceTerms, get_section, section_to_dict
+from purchase_agreement.prompt_context import register_section_context
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
+
+# Tell the AI context builder which fields matter for a given set of answers
+register_section_context(
+    "3",
+    defaults=section_to_dict(FinanceTerms()),
+    ignore=("show_deposit_explanation",),
+    gates=(
+        ("has_increased_deposit", False, ("increased_deposit_",)),
+        ("has_second_loan", False, ("second_loan_",)),
+        ("has_appraisal_contingency", False, ("appraisal_contingency_",)),
+        ("has_loan_contingency", False, ("loan_contingency_",)),
+        ("is_all_cash", False, ("proof_of_funds_",)),
+        (
+            "is_all_cash",
+            True,
+            (
+                "first_loan_",
+                "second_loan_",
+                "has_second_loan",
+                "loan_letter_",
+                "loan_preapproval_",
+                "has_loan_contingency",
+                "loan_contingency_",
+            ),
+        ),
+    ),
+)
 
 
 def _get_purchase_price_from_section1() -> float:
     """
-    Try to pull Purchase Price from Section 1 state if available.
-    If not found, return 0.0 and let user enter manually.
+    Purchase Price from Section 1, or 0.0 if not entered yet (the user can
+    then enter it manually).
     """
-    possible_keys = [
-        "pa_section1_offer",
-        "section1_offer",
-        "purchase_agreement_section1",
-    ]
-    for key in possible_keys:
-        sec = st.session_state.get(key)
-        if isinstance(sec, dict) and "purchase_price" in sec:
-            try:
-                return float(sec["purchase_price"])
-            except Exception:
-                return 0.0
-    return 0.0
-
+    return float(resolve("purchase_price") or 0)
 
-def render_section3_finance():
-    # init state
-    _init_section3_state()
-    data = st.session_state[SECTION3_KEY]
 
-    # Header
-    st.markdown("### Section 3 – Finance Terms")
-    # ---------------------------
-    # 💬 GPT / AI Realtor – Finance Terms helper
-    # ---------------------------
+@section_fragment
+def _render_section3_ai_helper():
+    """
+    "Ask AI Realtor" / "Connect with a Human Realtor" block for Section 3.
+    """
     with st.expander("💬 Need help with Section 3? Ask AI Realtor", expanded=True):
         st.markdown(
             "Use this assistant to better understand **how your financing terms work** in a California offer:\n"
@@ -121,29 +81,47 @@ def render_section3_finance():
                 "Connect with a Human Realtor",
                 use_container_width=True,
             )
+            explain_clicked_3 = st.form_submit_button(
+                "Explain this section",
+                use_container_width=True,
+            )
 
         # Handle Ask AI (simple, clean)
         if ask_clicked_3:
             if not user_prompt_3.strip():
                 st.warning("Please enter a question first.")
             else:
-                with st.spinner("Thinking like a California Realtor..."):
-                    try:
-                        answer_3 = call_purchase_agreement_ai(
-                            user_prompt_3.strip(),
-                            section="3",
-                            section_state=st.session_state[SECTION3_KEY],
-                        )
-                    except Exception as e:
-                        answer_3 = (
-                            "There was an error calling the AI backend for Section 3.\n\n"
-                            f"Details: {e}"
-                        )
-
-                    st.session_state["pa3_ai_answer"] = answer_3
+                try:
+                    answer_3 = ask_in_conversation(
+                        user_prompt_3.strip(),
+                        section="3",
+                        section_state=section_state("3"),
+                        # Answer depends on this user's data, so don't share it via the cache
+                        use_cache=False,
+                    )
+                except Exception as e:
+                    answer_3 = (
+                        "There was an error calling the AI backend for Section 3.\n\n"
+                        f"Details: {e}"
+                    )
+
+                st.session_state["pa3_ai_answer"] = answer_3
+
+        # Handle "Explain this section" – a shared, no-user-data request that is
+        # usually already answered by the background prefetch.
+        if explain_clicked_3:
+            try:
+                answer_3 = explain_in_conversation("3")
+            except Exception as e:
+                answer_3 = (
+                    "There was an error calling the AI backend for Section 3.\n\n"
+                    f"Details: {e}"
+                )
+            st.session_state["pa3_ai_answer"] = answer_3
 
         # Show AI answer
         if "pa3_ai_answer" in st.session_state:
+            render_conversation("3", st.session_state["pa3_ai_answer"])
             st.markdown("#### 🧠 AI Realtor – Finance Terms Suggestion")
             st.info(st.session_state["pa3_ai_answer"])
 
@@ -188,6 +166,19 @@ def render_section3_finance():
                         "Your request has been recorded. A human realtor will reach out to you using the contact info you provided."
                     )
 
+
+@section_fragment
+@profiled()
+def render_section3_finance():
+    data = get_section(FinanceTerms)
+
+    # Header
+    st.markdown("### Section 3 – Finance Terms")
+    # ---------------------------
+    # 💬 GPT / AI Realtor – Finance Terms helper
+    # ---------------------------
+    _render_section3_ai_helper()
+
     # ---------------------------
     # Existing Section 3 UI
     # ---------------------------
@@ -203,18 +194,18 @@ def render_section3_finance():
 
     col1, col2 = st.columns(2)
     with col1:
-        data["initial_deposit_amount"] = st.number_input(
+        data.initial_deposit_amount = st.number_input(
             "Initial deposit amount ($)",
             min_value=0.0,
-            value=float(data["initial_deposit_amount"]),
+            value=float(data.initial_deposit_amount),
             step=1000.0,
             format="%.2f",
         )
     with col2:
-        data["initial_deposit_days"] = st.number_input(
+        data.initial_deposit_days = st.number_input(
             "Days After Acceptance to deliver deposit",
             min_value=0,
-            value=int(data["initial_deposit_days"]),
+            value=int(data.initial_deposit_days),
             step=1,
         )
 
@@ -223,11 +214,11 @@ def render_section3_finance():
         "Direct to escrow holder",
         "Given to buyer’s agent to hold then deliver to escrow",
     ]
-    current_method = data.get("initial_deposit_method", deposit_method_options[0])
+    current_method = data.initial_deposit_method
     if current_method not in deposit_method_options:
         current_method = deposit_method_options[0]
 
-    data["initial_deposit_method"] = st.selectbox(
+    data.initial_deposit_method = st.selectbox(
         "How will the deposit be delivered?",
         deposit_method_options,
         index=deposit_method_options.index(current_method),
@@ -240,11 +231,11 @@ def render_section3_finance():
         "Personal check",
         "Other",
     ]
-    curr_instr = data.get("initial_deposit_instrument", instrument_options[0])
+    curr_instr = data.initial_deposit_instrument
     if curr_instr not in instrument_options:
         curr_instr = instrument_options[0]
 
-    data["initial_deposit_instrument"] = st.selectbox(
+    data.initial_deposit_instrument = st.selectbox(
         "Form of deposit",
         instrument_options,
         index=instrument_options.index(curr_instr),
@@ -262,9 +253,9 @@ def render_section3_finance():
     )
 
     # Explain in details / Close explanation toggle
-    if not data.get("show_deposit_explanation", False):
+    if not data.show_deposit_explanation:
         if st.button("Explain in details", key="btn_show_deposit_details"):
-            data["show_deposit_explanation"] = True
+            data.show_deposit_explanation = True
     else:
         st.markdown("#### When is my deposit at risk in California?")
         st.markdown(
@@ -301,32 +292,32 @@ def render_section3_finance():
             "attorney.*"
         )
         if st.button("Close explanation", key="btn_hide_deposit_details"):
-            data["show_deposit_explanation"] = False
+            data.show_deposit_explanation = False
 
     st.markdown("---")
 
     # --- 3B. Increased Deposit ---
     st.markdown("### 3.B. Increased Deposit (optional)")
-    data["has_increased_deposit"] = st.checkbox(
+    data.has_increased_deposit = st.checkbox(
         "Will there be an additional increased deposit?",
-        value=bool(data["has_increased_deposit"]),
+        value=bool(data.has_increased_deposit),
     )
 
-    if data["has_increased_deposit"]:
+    if data.has_increased_deposit:
         col1, col2 = st.columns(2)
         with col1:
-            data["increased_deposit_amount"] = st.number_input(
+            data.increased_deposit_amount = st.number_input(
                 "Increased deposit amount ($)",
                 min_value=0.0,
-                value=float(data["increased_deposit_amount"]),
+                value=float(data.increased_deposit_amount),
                 step=1000.0,
                 format="%.2f",
             )
         with col2:
-            data["increased_deposit_days"] = st.number_input(
+            data.increased_deposit_days = st.number_input(
                 "Days After Acceptance to deliver increased deposit",
                 min_value=0,
-                value=int(data["increased_deposit_days"]),
+                value=int(data.increased_deposit_days),
                 step=1,
             )
         st.caption(
@@ -339,16 +330,16 @@ def render_section3_finance():
     # --- 3C–3E. All-Cash / Loan Terms ---
     st.markdown("### 3.C–3.E All-Cash / Loan Terms")
 
-    data["is_all_cash"] = st.checkbox(
+    data.is_all_cash = st.checkbox(
         "All-cash offer (Buyer does not need a loan to close)",
-        value=bool(data["is_all_cash"]),
+        value=bool(data.is_all_cash),
     )
 
-    if data["is_all_cash"]:
-        data["proof_of_funds_days"] = st.number_input(
+    if data.is_all_cash:
+        data.proof_of_funds_days = st.number_input(
             "Days After Acceptance for Buyer to provide proof of funds",
             min_value=0,
-            value=int(data["proof_of_funds_days"]),
+            value=int(data.proof_of_funds_days),
             step=1,
         )
         st.info(
@@ -361,10 +352,10 @@ def render_section3_finance():
         st.markdown("#### First Loan")
         col1, col2 = st.columns(2)
         with col1:
-            data["first_loan_amount"] = st.number_input(
+            data.first_loan_amount = st.number_input(
                 "First loan amount ($)",
                 min_value=0.0,
-                value=float(data["first_loan_amount"]),
+                value=float(data.first_loan_amount),
                 step=10000.0,
                 format="%.2f",
             )
@@ -377,11 +368,11 @@ def render_section3_finance():
                 "Assumed financing",
                 "Other",
             ]
-            cur_type = data.get("first_loan_type", first_loan_type_options[0])
+            cur_type = data.first_loan_type
             if cur_type not in first_loan_type_options:
                 cur_type = first_loan_type_options[0]
 
-            data["first_loan_type"] = st.selectbox(
+            data.first_loan_type = st.selectbox(
                 "First loan type",
                 first_loan_type_options,
                 index=first_loan_type_options.index(cur_type),
@@ -390,46 +381,46 @@ def render_section3_finance():
         col1, col2 = st.columns(2)
         with col1:
             structure_options = ["Fixed rate", "Adjustable rate (ARM)"]
-            cur_struct = data.get("first_loan_fixed_or_arm", structure_options[0])
+            cur_struct = data.first_loan_fixed_or_arm
             if cur_struct not in structure_options:
                 cur_struct = structure_options[0]
 
-            data["first_loan_fixed_or_arm"] = st.selectbox(
+            data.first_loan_fixed_or_arm = st.selectbox(
                 "First loan structure",
                 structure_options,
                 index=structure_options.index(cur_struct),
             )
         with col2:
-            data["first_loan_max_rate"] = st.number_input(
+            data.first_loan_max_rate = st.number_input(
                 "Maximum initial interest rate (%)",
                 min_value=0.0,
-                value=float(data["first_loan_max_rate"]),
+                value=float(data.first_loan_max_rate),
                 step=0.125,
                 format="%.3f",
             )
 
-        data["first_loan_max_points"] = st.number_input(
+        data.first_loan_max_points = st.number_input(
             "Maximum points Buyer will pay (% of loan amount)",
             min_value=0.0,
-            value=float(data["first_loan_max_points"]),
+            value=float(data.first_loan_max_points),
             step=0.25,
             format="%.2f",
         )
 
         # Second Loan
         st.markdown("#### Second Loan (optional)")
-        data["has_second_loan"] = st.checkbox(
+        data.has_second_loan = st.checkbox(
             "Add a second loan?",
-            value=bool(data["has_second_loan"]),
+            value=bool(data.has_second_loan),
         )
 
-        if data["has_second_loan"]:
+        if data.has_second_loan:
             col1, col2 = st.columns(2)
             with col1:
-                data["second_loan_amount"] = st.number_input(
+                data.second_loan_amount = st.number_input(
                     "Second loan amount ($)",
                     min_value=0.0,
-                    value=float(data["second_loan_amount"]),
+                    value=float(data.second_loan_amount),
                     step=10000.0,
                     format="%.2f",
                 )
@@ -440,13 +431,11 @@ def render_section3_finance():
                     "Assumed financing",
                     "Other",
                 ]
-                cur_type2 = data.get(
-                    "second_loan_type", second_loan_type_options[0]
-                )
+                cur_type2 = data.second_loan_type
                 if cur_type2 not in second_loan_type_options:
                     cur_type2 = second_loan_type_options[0]
 
-                data["second_loan_type"] = st.selectbox(
+                data.second_loan_type = st.selectbox(
                     "Second loan type",
                     second_loan_type_options,
                     index=second_loan_type_options.index(cur_type2),
@@ -454,36 +443,34 @@ def render_section3_finance():
 
             col1, col2 = st.columns(2)
             with col1:
-                cur_struct2 = data.get(
-                    "second_loan_fixed_or_arm", structure_options[0]
-                )
+                cur_struct2 = data.second_loan_fixed_or_arm
                 if cur_struct2 not in structure_options:
                     cur_struct2 = structure_options[0]
 
-                data["second_loan_fixed_or_arm"] = st.selectbox(
+                data.second_loan_fixed_or_arm = st.selectbox(
                     "Second loan structure",
                     structure_options,
                     index=structure_options.index(cur_struct2),
                 )
             with col2:
-                data["second_loan_max_rate"] = st.number_input(
+                data.second_loan_max_rate = st.number_input(
                     "Maximum initial interest rate for second loan (%)",
                     min_value=0.0,
-                    value=float(data["second_loan_max_rate"]),
+                    value=float(data.second_loan_max_rate),
                     step=0.125,
                     format="%.3f",
                 )
 
-            data["second_loan_max_points"] = st.number_input(
+            data.second_loan_max_points = st.number_input(
                 "Maximum points on second loan (% of loan amount)",
                 min_value=0.0,
-                value=float(data["second_loan_max_points"]),
+                value=float(data.second_loan_max_points),
                 step=0.25,
                 format="%.2f",
             )
 
         # FHA/VA paragraph – only if first loan is FHA or VA
-        if data["first_loan_type"] in ("FHA", "VA"):
+        if data.first_loan_type in ("FHA", "VA"):
             st.markdown("#### FHA / VA Loans")
             st.markdown(
                 "> **FHA/VA:** For any FHA or VA loan specified in 3D(1), Buyer has "
@@ -497,9 +484,9 @@ def render_section3_finance():
 
     # Additional Financing Terms
     st.markdown("### 3.E. Additional Financing Terms (optional)")
-    data["additional_financing_terms"] = st.text_area(
+    data.additional_financing_terms = st.text_area(
         "Additional terms related to financing, credits, rate buydown, or special structures:",
-        value=data["additional_financing_terms"],
+        value=data.additional_financing_terms,
         height=120,
         placeholder=(
             "Example: Seller to credit Buyer up to $10,000 toward recurring and "
@@ -519,12 +506,12 @@ def render_section3_finance():
             "update Section 1 – Offer Terms."
         )
         st.write(f"**Purchase Price (Total):** ${auto_price:,.2f}")
-        data["purchase_price_total_manual"] = auto_price
+        data.purchase_price_total_manual = auto_price
     else:
-        data["purchase_price_total_manual"] = st.number_input(
+        data.purchase_price_total_manual = st.number_input(
             "Purchase Price (Total) – should match Section 1",
             min_value=0.0,
-            value=float(data["purchase_price_total_manual"]),
+            value=float(data.purchase_price_total_manual),
             step=10000.0,
             format="%.2f",
         )
@@ -533,10 +520,10 @@ def render_section3_finance():
 
     # --- 3G. Balance of Down Payment ---
     st.markdown("### 3.G. Balance of Down Payment")
-    data["down_payment_balance_amount"] = st.number_input(
+    data.down_payment_balance_amount = st.number_input(
         "Balance of down payment or purchase price to be deposited with escrow ($)",
         min_value=0.0,
-        value=float(data["down_payment_balance_amount"]),
+        value=float(data.down_payment_balance_amount),
         step=10000.0,
         format="%.2f",
         help="Typically Purchase Price – Deposits – Loan Amount(s).",
@@ -546,10 +533,10 @@ def render_section3_finance():
 
     # --- 3H. Verification of Down Payment and Closing Costs ---
     st.markdown("### 3.H. Verification of Down Payment and Closing Costs")
-    data["verification_funds_days"] = st.number_input(
+    data.verification_funds_days = st.number_input(
         "Days After Acceptance for Buyer to provide verification of funds",
         min_value=0,
-        value=int(data["verification_funds_days"]),
+        value=int(data.verification_funds_days),
         step=1,
     )
     st.caption(
@@ -562,16 +549,16 @@ def render_section3_finance():
     # --- 3I. Appraisal Contingency ---
     st.markdown("### 3.I. Appraisal Contingency")
 
-    data["has_appraisal_contingency"] = st.checkbox(
+    data.has_appraisal_contingency = st.checkbox(
         "Include appraisal contingency (property must appraise at or above purchase price)",
-        value=bool(data["has_appraisal_contingency"]),
+        value=bool(data.has_appraisal_contingency),
     )
 
-    if data["has_appraisal_contingency"]:
-        data["appraisal_contingency_days"] = st.number_input(
+    if data.has_appraisal_contingency:
+        data.appraisal_contingency_days = st.number_input(
             "Days After Acceptance to remove appraisal contingency",
             min_value=0,
-            value=int(data["appraisal_contingency_days"]),
+            value=int(data.appraisal_contingency_days),
             step=1,
         )
     else:
@@ -588,16 +575,16 @@ def render_section3_finance():
 
     col1, col2 = st.columns(2)
     with col1:
-        data["loan_letter_days"] = st.number_input(
+        data.loan_letter_days = st.number_input(
             "Days After Acceptance to Deliver prequalification / preapproval letter",
             min_value=0,
-            value=int(data["loan_letter_days"]),
+            value=int(data.loan_letter_days),
             step=1,
         )
     with col2:
-        data["loan_preapproval_attached"] = st.checkbox(
+        data.loan_preapproval_attached = st.checkbox(
             "Pre-approval / pre-qualification letter attached",
-            value=bool(data["loan_preapproval_attached"]),
+            value=bool(data.loan_preapproval_attached),
         )
 
     st.markdown(
@@ -613,9 +600,9 @@ def render_section3_finance():
     # --- 3K. Loan Contingency ---
     st.markdown("### 3.K. Loan Contingency")
 
-    data["has_loan_contingency"] = st.checkbox(
+    data.has_loan_contingency = st.checkbox(
         "Include loan contingency (Buyer’s obligation is contingent on obtaining the specified loan)",
-        value=bool(data["has_loan_contingency"]),
+        value=bool(data.has_loan_contingency),
     )
 
     st.markdown(
@@ -624,11 +611,11 @@ def render_section3_finance():
         "cooperating with the lender throughout the loan process."
     )
 
-    if data["has_loan_contingency"]:
-        data["loan_contingency_days"] = st.number_input(
+    if data.has_loan_contingency:
+        data.loan_contingency_days = st.number_input(
             "Days After Acceptance to remove loan contingency",
             min_value=0,
-            value=int(data["loan_contingency_days"]),
+            value=int(data.loan_contingency_days),
             step=1,
         )
         st.caption(
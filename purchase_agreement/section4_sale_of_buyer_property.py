@@ -1,29 +1,14 @@
 # purchase_agreement/section4_sale_of_buyer_property.py
 
 import streamlit as st
+from purchase_agreement.models import SaleOfBuyerProperty, get_section
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
 
-SECTION4_KEY = "pa_section4_sale_of_buyer_property"
-
-
-def _init_section4_state():
-    if SECTION4_KEY not in st.session_state:
-        st.session_state[SECTION4_KEY] = {
-            # Section 4 – Sale of Buyer’s Property (A/B choice)
-            "is_contingent_on_sale": False,  # False = Option A, True = Option B
-
-            # If contingent (Option B):
-            "buyer_property_address": "",
-            "buyer_property_status": "Not listed",
-            "buyer_property_notes": "",
-
-            # Section 5 – Addenda & Advisories (related to this contingency)
-            "other_addenda_notes": "",
-        }
-
-
+@section_fragment
+@profiled()
 def render_section4_sale_of_buyer_property():
-    _init_section4_state()
-    data = st.session_state[SECTION4_KEY]
+    data = get_section(SaleOfBuyerProperty)
 
     # st.subheader("Section 4 & 5 – Subject to Sale of Buyer’s Property")
 
@@ -54,7 +39,7 @@ def render_section4_sale_of_buyer_property():
         ),
     }
 
-    current_option = "B" if data.get("is_contingent_on_sale") else "A"
+    current_option = "B" if data.is_contingent_on_sale else "A"
 
     selected = st.radio(
         label="",
@@ -63,9 +48,9 @@ def render_section4_sale_of_buyer_property():
         index=0 if current_option == "A" else 1,
     )
 
-    data["is_contingent_on_sale"] = (selected == "B")
+    data.is_contingent_on_sale = (selected == "B")
 
-    if not data["is_contingent_on_sale"]:
+    if not data.is_contingent_on_sale:
         st.info(
             "You’ve selected **Option A**. The purchase is NOT contingent on the sale "
             "of any other property owned by Buyer."
@@ -79,9 +64,9 @@ def render_section4_sale_of_buyer_property():
 
         st.markdown("#### Buyer’s Other Property Details")
 
-        data["buyer_property_address"] = st.text_input(
+        data.buyer_property_address = st.text_input(
             "Buyer’s property address (required for contingency):",
-            value=data["buyer_property_address"],
+            value=data.buyer_property_address,
             placeholder="e.g., 1234 Main Street, San Francisco, CA 94107",
         )
 
@@ -92,19 +77,19 @@ def render_section4_sale_of_buyer_property():
             "Pending close",
             "Recently closed (proceeds not received)",
         ]
-        cur_status = data.get("buyer_property_status", status_options[0])
+        cur_status = data.buyer_property_status
         if cur_status not in status_options:
             cur_status = status_options[0]
 
-        data["buyer_property_status"] = st.selectbox(
+        data.buyer_property_status = st.selectbox(
             "Status of Buyer’s property:",
             status_options,
             index=status_options.index(cur_status),
         )
 
-        data["buyer_property_notes"] = st.text_area(
+        data.buyer_property_notes = st.text_area(
             "Additional notes (optional):",
-            value=data["buyer_property_notes"],
+            value=data.buyer_property_notes,
             height=100,
             placeholder=(
                 "Example: Property is listed at $1,200,000 with ABC Realty. "
@@ -125,7 +110,7 @@ def render_section4_sale_of_buyer_property():
     # ------------------------------------------
     st.markdown("### 3.1 Addenda and Advisories (Related to Sale of Buyer’s Property)")
 
-    if data["is_contingent_on_sale"]:
+    if data.is_contingent_on_sale:
         st.markdown(
             "- ✅ **C.A.R. Form COP – Contingency for Sale of Buyer’s Property**  "
             " *(Required because you selected Option B above.)*"
@@ -136,9 +121,9 @@ def render_section4_sale_of_buyer_property():
             " *(Not required because you selected Option A above.)*"
         )
 
-    data["other_addenda_notes"] = st.text_area(
+    data.other_addenda_notes = st.text_area(
         "Other addenda / advisories related to Buyer’s sale (optional):",
-        value=data["other_addenda_notes"],
+        value=data.other_addenda_notes,
         height=100,
         placeholder=(
             "Example: Note if the Seller also requires a particular advisory, or if "
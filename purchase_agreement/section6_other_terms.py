@@ -1,18 +1,12 @@
 import streamlit as st
+from purchase_agreement.models import OtherTerms, get_section
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
 
-SECTION6_KEY = "pa_section6_other_terms"
-
-
-def _init_section6_state():
-    if SECTION6_KEY not in st.session_state:
-        st.session_state[SECTION6_KEY] = {
-            "other_terms": "",
-        }
-
-
+@section_fragment
+@profiled()
 def render_section6_other_terms():
-    _init_section6_state()
-    data = st.session_state[SECTION6_KEY]
+    data = get_section(OtherTerms)
 
     st.subheader("Section 3 – Other Terms")
 
@@ -22,9 +16,9 @@ def render_section6_other_terms():
         "not already captured in Sections 1–5."
     )
 
-    data["other_terms"] = st.text_area(
+    data.other_terms = st.text_area(
         "Other terms and conditions (optional):",
-        value=data["other_terms"],
+        value=data.other_terms,
         height=200,
         key="sec6_other_terms_input",
         placeholder=(
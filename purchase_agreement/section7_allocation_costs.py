@@ -1,18 +1,22 @@
 import streamlit as st
-from purchase_agreement.ai_helpers import call_purchase_agreement_ai
+from purchase_agreement.conversations import ask_in_conversation, explain_in_conversation, render_conversation
+from purchase_agreement.models import AllocationOfCosts, get_section, option_index
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
 
+PAYER_OPTIONS = ["Buyer", "Seller", "Split", "Other"]
+ESCROW_PAYER_OPTIONS = ["Buyer", "Seller", "50/50", "Other"]
+LENDER_TITLE_PAYER_OPTIONS = PAYER_OPTIONS + ["N/A – no loan"]
+HOA_PAYER_OPTIONS = PAYER_OPTIONS + ["N/A – no HOA"]
+MOVE_FEE_PAYER_OPTIONS = PAYER_OPTIONS + ["N/A"]
+TRANSFER_TAX_PAYER_OPTIONS = PAYER_OPTIONS + ["Not applicable"]
 
-def render_section7_allocation_costs():
+
+@section_fragment
+def _render_section7_ai_helper():
     """
-    Render Section 7 – Allocation of Costs.
-    All Streamlit calls stay inside this function.
+    "Ask AI Realtor" / "Connect with a Human Realtor" block for Section 7.
     """
-
-    st.markdown("## Section 2 – Allocation of Costs")
-
-        # ---------------------------
-    # 🔹 GPT / AI Realtor – at the top of Section 7
-    # ---------------------------
     with st.expander("💬 Need help with Section 7? Ask AI Realtor", expanded=True):
         st.markdown(
             "Use this assistant to understand typical cost allocations in California "
@@ -39,34 +43,50 @@ def render_section7_allocation_costs():
                 "Connect with a Human Realtor",
                 use_container_width=True,
             )
+            explain_clicked = st.form_submit_button(
+                "Explain this section",
+                use_container_width=True,
+            )
 
         # Handle Ask AI (form submit or Enter)
         if ask_clicked:
             if not user_prompt.strip():
                 st.warning("Please enter a question or description first.")
             else:
-                with st.spinner("Thinking like a California Realtor..."):
-                    try:
-                        answer = call_purchase_agreement_ai(
-                            user_prompt.strip(),
-                            section="7",
-                            # if you have a Section 7 state dict and want to pass it:
-                            # section_state=st.session_state[SECTION7_KEY],
-                        )
-                    except Exception as e:
-                        answer = (
-                            "There was an error calling the AI backend for Section 7.\n\n"
-                            f"Details: {e}"
-                        )
-
-                    st.session_state["pa7_ai_answer"] = answer
+                try:
+                    answer = ask_in_conversation(
+                        user_prompt.strip(),
+                        section="7",
+                        # if you have a Section 7 state dict and want to pass it:
+                        # section_state=st.session_state[SECTION7_KEY],
+                    )
+                except Exception as e:
+                    answer = (
+                        "There was an error calling the AI backend for Section 7.\n\n"
+                        f"Details: {e}"
+                    )
+
+                st.session_state["pa7_ai_answer"] = answer
 
         # Handle Connect with Human Realtor
         if connect_clicked:
             st.session_state["pa7_show_human_realtor_form"] = True
 
+        # Handle "Explain this section" – the same answer for everyone, served
+        # from the shipped answer pack when it is up to date.
+        if explain_clicked:
+            try:
+                answer = explain_in_conversation("7")
+            except Exception as e:
+                answer = (
+                    "There was an error calling the AI backend for Section 7.\n\n"
+                    f"Details: {e}"
+                )
+            st.session_state["pa7_ai_answer"] = answer
+
         # Show AI answer if we have one
         if "pa7_ai_answer" in st.session_state:
+            render_conversation("7", st.session_state["pa7_ai_answer"])
             st.markdown("#### 🧠 AI Realtor Suggestion")
             st.info(st.session_state["pa7_ai_answer"])
 
@@ -106,6 +126,23 @@ def render_section7_allocation_costs():
                         "using the contact info you provided."
                     )
 
+
+@section_fragment
+@profiled()
+def render_section7_allocation_costs():
+    """
+    Render Section 7 – Allocation of Costs.
+    All Streamlit calls stay inside this function.
+    """
+    data = get_section(AllocationOfCosts)
+
+    st.markdown("## Section 2 – Allocation of Costs")
+
+        # ---------------------------
+    # 🔹 GPT / AI Realtor – at the top of Section 7
+    # ---------------------------
+    _render_section7_ai_helper()
+
     st.markdown("---")
 
     # ---------------------------
@@ -123,42 +160,48 @@ def render_section7_allocation_costs():
 
     with col_7a_1:
         st.markdown("**General Property Inspection**")
-        st.radio(
+        data.general_inspection_party = st.radio(
             "Who pays?",
-            options=["Buyer", "Seller", "Split", "Other"],
+            options=PAYER_OPTIONS,
+            index=option_index(PAYER_OPTIONS, data.general_inspection_party),
             key="pa7a_general_inspection_party",
             horizontal=True,
         )
-        st.text_input(
+        data.general_inspection_other = st.text_input(
             "If Split/Other, describe:",
             key="pa7a_general_inspection_other",
+            value=data.general_inspection_other,
             placeholder="e.g., 50/50 split; or Buyer up to $500, remainder Seller.",
         )
 
         st.markdown("**Wood Destroying Pest Inspection**")
-        st.radio(
+        data.pest_inspection_party = st.radio(
             "Who pays?",
-            options=["Buyer", "Seller", "Split", "Other"],
+            options=PAYER_OPTIONS,
+            index=option_index(PAYER_OPTIONS, data.pest_inspection_party),
             key="pa7a_pest_inspection_party",
             horizontal=True,
         )
-        st.text_input(
+        data.pest_inspection_other = st.text_input(
             "If Split/Other, describe:",
             key="pa7a_pest_inspection_other",
+            value=data.pest_inspection_other,
             placeholder="e.g., Seller up to $2,000, remainder Buyer.",
         )
 
     with col_7a_2:
         st.markdown("**Government-Required Reports/Certificates**")
-        st.radio(
+        data.gov_reports_party = st.radio(
             "Who pays for required local reports/certificates?",
-            options=["Buyer", "Seller", "Split", "Other"],
+            options=PAYER_OPTIONS,
+            index=option_index(PAYER_OPTIONS, data.gov_reports_party),
             key="pa7a_gov_reports_party",
             horizontal=True,
         )
-        st.text_area(
+        data.gov_reports_notes = st.text_area(
             "Details / Notes",
             key="pa7a_gov_reports_notes",
+            value=data.gov_reports_notes,
             height=80,
             placeholder="e.g., Seller pays city sewer lateral inspection; Buyer pays re-inspection if repairs required.",
         )
@@ -179,48 +222,55 @@ def render_section7_allocation_costs():
 
     with col_7b_1:
         st.markdown("**Escrow Fees**")
-        st.radio(
+        data.escrow_fees_party = st.radio(
             "Escrow fees paid by:",
-            options=["Buyer", "Seller", "50/50", "Other"],
+            options=ESCROW_PAYER_OPTIONS,
+            index=option_index(ESCROW_PAYER_OPTIONS, data.escrow_fees_party),
             key="pa7b_escrow_fees_party",
             horizontal=True,
         )
-        st.text_input(
+        data.escrow_fees_other = st.text_input(
             "If Other, describe:",
             key="pa7b_escrow_fees_other",
+            value=data.escrow_fees_other,
             placeholder="e.g., Split 60/40 in favor of Buyer.",
         )
 
         st.markdown("**Owner’s Title Insurance Policy**")
-        st.radio(
+        data.owner_title_party = st.radio(
             "Owner’s title policy paid by:",
-            options=["Buyer", "Seller", "Split", "Other"],
+            options=PAYER_OPTIONS,
+            index=option_index(PAYER_OPTIONS, data.owner_title_party),
             key="pa7b_owner_title_party",
             horizontal=True,
         )
-        st.text_input(
+        data.owner_title_other = st.text_input(
             "If Split/Other, describe:",
             key="pa7b_owner_title_other",
+            value=data.owner_title_other,
             placeholder="e.g., Seller pays CLTA policy; Buyer pays extended coverage.",
         )
 
     with col_7b_2:
         st.markdown("**Lender’s Title Policy (if any)**")
-        st.radio(
+        data.lender_title_party = st.radio(
             "Lender’s title policy paid by:",
-            options=["Buyer", "Seller", "Split", "Other", "N/A – no loan"],
+            options=LENDER_TITLE_PAYER_OPTIONS,
+            index=option_index(LENDER_TITLE_PAYER_OPTIONS, data.lender_title_party),
             key="pa7b_lender_title_party",
             horizontal=True,
         )
-        st.text_input(
+        data.lender_title_other = st.text_input(
             "If Split/Other, describe:",
             key="pa7b_lender_title_other",
+            value=data.lender_title_other,
             placeholder="e.g., Buyer pays lender’s title policy in full.",
         )
 
-        st.text_area(
+        data.title_escrow_notes = st.text_area(
             "Additional Title/Escrow Notes (optional)",
             key="pa7b_additional_notes",
+            value=data.title_escrow_notes,
             height=80,
             placeholder="Any special title endorsements, escrow fee caps, or prorations you want to note.",
         )
@@ -241,42 +291,48 @@ def render_section7_allocation_costs():
 
     with col_7c_1:
         st.markdown("**HOA Transfer Fee**")
-        st.radio(
+        data.hoa_transfer_fee_party = st.radio(
             "HOA transfer fee paid by:",
-            options=["Buyer", "Seller", "Split", "Other", "N/A – no HOA"],
+            options=HOA_PAYER_OPTIONS,
+            index=option_index(HOA_PAYER_OPTIONS, data.hoa_transfer_fee_party),
             key="pa7c_transfer_fee_party",
             horizontal=True,
         )
-        st.text_input(
+        data.hoa_transfer_fee_other = st.text_input(
             "If Split/Other, describe:",
             key="pa7c_transfer_fee_other",
+            value=data.hoa_transfer_fee_other,
             placeholder="e.g., Split 50/50 between Buyer and Seller.",
         )
 
         st.markdown("**HOA Move-In / Move-Out Fees**")
-        st.radio(
+        data.hoa_move_fees_party = st.radio(
             "Move-in / move-out fees paid by:",
-            options=["Buyer", "Seller", "Split", "Other", "N/A"],
+            options=MOVE_FEE_PAYER_OPTIONS,
+            index=option_index(MOVE_FEE_PAYER_OPTIONS, data.hoa_move_fees_party),
             key="pa7c_move_fees_party",
             horizontal=True,
         )
-        st.text_input(
+        data.hoa_move_fees_other = st.text_input(
             "If Split/Other, describe:",
             key="pa7c_move_fees_other",
+            value=data.hoa_move_fees_other,
             placeholder="e.g., Buyer pays move-in, Seller pays move-out.",
         )
 
     with col_7c_2:
         st.markdown("**HOA Document Package**")
-        st.radio(
+        data.hoa_docs_party = st.radio(
             "HOA docs (CC&Rs, bylaws, budget, etc.) paid by:",
-            options=["Buyer", "Seller", "Split", "Other", "N/A – no HOA"],
+            options=HOA_PAYER_OPTIONS,
+            index=option_index(HOA_PAYER_OPTIONS, data.hoa_docs_party),
             key="pa7c_docs_party",
             horizontal=True,
         )
-        st.text_area(
+        data.hoa_notes = st.text_area(
             "HOA-related Notes (optional)",
             key="pa7c_notes",
+            value=data.hoa_notes,
             height=80,
             placeholder="e.g., Seller to order HOA docs within 5 days of acceptance.",
         )
@@ -299,49 +355,56 @@ def render_section7_allocation_costs():
     # Left column: county + city transfer tax/fee
     with col_7d_1:
         st.markdown("**County Transfer Tax / Fee**")
-        st.radio(
+        data.county_transfer_tax_party = st.radio(
             "County transfer tax / fee paid by:",
-            options=["Buyer", "Seller", "Split", "Other", "Not applicable"],
+            options=TRANSFER_TAX_PAYER_OPTIONS,
+            index=option_index(TRANSFER_TAX_PAYER_OPTIONS, data.county_transfer_tax_party),
             key="pa7d_county_transfer_party",
             horizontal=True,
         )
-        st.text_input(
+        data.county_transfer_tax_other = st.text_input(
             "If Split/Other, describe:",
             key="pa7d_county_transfer_other",
+            value=data.county_transfer_tax_other,
             placeholder="e.g., Seller pays first $5,000; remainder Buyer.",
         )
 
         st.markdown("**City Transfer Tax / Fee**")
-        st.radio(
+        data.city_transfer_tax_party = st.radio(
             "City transfer tax / fee paid by:",
-            options=["Buyer", "Seller", "Split", "Other", "Not applicable"],
+            options=TRANSFER_TAX_PAYER_OPTIONS,
+            index=option_index(TRANSFER_TAX_PAYER_OPTIONS, data.city_transfer_tax_party),
             key="pa7d_city_transfer_party",
             horizontal=True,
         )
-        st.text_input(
+        data.city_transfer_tax_other = st.text_input(
             "If Split/Other, describe:",
             key="pa7d_city_transfer_other",
+            value=data.city_transfer_tax_other,
             placeholder="e.g., Buyer and Seller split 50/50.",
         )
 
     # Right column: private transfer fee + notes
     with col_7d_2:
         st.markdown("**Private Transfer Fee**")
-        st.radio(
+        data.private_transfer_fee_party = st.radio(
             "Private transfer fee paid by:",
-            options=["Buyer", "Seller", "Split", "Other", "Not applicable"],
+            options=TRANSFER_TAX_PAYER_OPTIONS,
+            index=option_index(TRANSFER_TAX_PAYER_OPTIONS, data.private_transfer_fee_party),
             key="pa7d_private_transfer_party",
             horizontal=True,
         )
-        st.text_input(
+        data.private_transfer_fee_other = st.text_input(
             "If Split/Other, describe:",
             key="pa7d_private_transfer_other",
+            value=data.private_transfer_fee_other,
             placeholder="e.g., Buyer pays HOA private transfer fee in full.",
         )
 
-        st.text_area(
+        data.other_cost_notes = st.text_area(
             "Other specific cost allocations or notes for Section 7D (optional)",
             key="pa7d_other_notes",
+            value=data.other_cost_notes,
             height=100,
             placeholder="Example: Seller to pay county transfer tax; Buyer to pay city transfer tax. "
                         "Any special city/HOA rules about transfer fees.",
@@ -1,17 +1,18 @@
 import streamlit as st
-from purchase_agreement.ai_helpers import call_purchase_agreement_ai
+from purchase_agreement.conversations import ask_in_conversation, explain_in_conversation, render_conversation
+from purchase_agreement.explainers import SECTION_EXPLAINERS
+from purchase_agreement.models import PropertyCondition, get_section, option_index
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
 
+WARRANTY_PAYER_OPTIONS = ["Buyer", "Seller", "Split", "Other"]
 
-def render_section8_property_condition():
+
+@section_fragment
+def _render_section8_ai_helper():
     """
-    Section 8 – Property Condition & Repairs
+    "Ask AI Realtor" / "Connect with a Human Realtor" block for Section 8.
     """
-
-    st.markdown("## Section 3 – Property Condition & Repairs")
-
-    # ---------------------------
-    # 🔹 GPT / AI Realtor – at the top of Section 8
-    # ---------------------------
     with st.expander("💬 Need help with Section 3? Ask AI Realtor", expanded=True):
         st.markdown(
             "Use this assistant to understand how \"as-is\" condition, repairs, and "
@@ -19,14 +20,6 @@ def render_section8_property_condition():
             "**Reminder:** This is not legal advice. Always confirm with your broker or attorney."
         )
 
-        default_prompt = (
-            "You are an experienced California residential real estate agent. "
-            "Help the buyer understand how to complete Section 3 – Property Condition & Repairs "
-            "in the CAR Residential Purchase Agreement. Explain typical norms for 'as-is' sales, "
-            "seller repairs, credits in lieu of repairs, and home warranties. "
-            "Always remind them that everything is negotiable and practices vary by area."
-        )
-
         # Use a form so pressing Enter in the text input will submit (Ask AI)
         with st.form("pa8_ai_form"):
             user_prompt = st.text_input(
@@ -54,33 +47,51 @@ def render_section8_property_condition():
                     "Connect with a Human Realtor",
                     use_container_width=True,
                 )
+                explain_clicked = st.form_submit_button(
+                    "Explain this section",
+                    use_container_width=True,
+                )
 
         # Handle Ask AI (form submit or Enter)
         if ask_clicked:
             if not user_prompt.strip():
                 st.warning("Please enter a question or description first.")
             else:
-                full_prompt = user_prompt.strip()
-                if use_context:
-                    full_prompt = default_prompt + "\n\nUser question:\n" + user_prompt.strip()
-
-                with st.spinner("Thinking like a California Realtor..."):
-                    try:
-                        answer = call_purchase_agreement_ai(full_prompt, section="8")
-                    except Exception as e:
-                        answer = (
-                            "There was an error calling the AI backend for Section 8.\n\n"
-                            f"Details: {e}"
-                        )
+                # The default context is sent as a section-level system message
+                # so every Section 8 question shares the same prompt prefix.
+                try:
+                    answer = ask_in_conversation(
+                        user_prompt.strip(),
+                        section="8",
+                        system_override=SECTION_EXPLAINERS["8"] if use_context else None,
+                    )
+                except Exception as e:
+                    answer = (
+                        "There was an error calling the AI backend for Section 8.\n\n"
+                        f"Details: {e}"
+                    )
 
-                    st.session_state["pa8_ai_answer"] = answer
+                st.session_state["pa8_ai_answer"] = answer
 
         # Handle Connect with Human Realtor
         if connect_clicked:
             st.session_state["pa8_show_human_realtor_form"] = True
 
+        # Handle "Explain this section" – a shared, no-user-data request that is
+        # usually already answered by the background prefetch.
+        if explain_clicked:
+            try:
+                answer = explain_in_conversation("8")
+            except Exception as e:
+                answer = (
+                    "There was an error calling the AI backend for Section 8.\n\n"
+                    f"Details: {e}"
+                )
+            st.session_state["pa8_ai_answer"] = answer
+
         # Show AI answer if we have one
         if "pa8_ai_answer" in st.session_state:
+            render_conversation("8", st.session_state["pa8_ai_answer"])
             st.markdown("#### 🧠 AI Realtor Suggestion")
             st.info(st.session_state["pa8_ai_answer"])
 
@@ -121,6 +132,22 @@ def render_section8_property_condition():
                     )
 
 
+@section_fragment
+@profiled()
+def render_section8_property_condition():
+    """
+    Section 8 – Property Condition & Repairs
+    """
+    data = get_section(PropertyCondition)
+
+    st.markdown("## Section 3 – Property Condition & Repairs")
+
+    # ---------------------------
+    # 🔹 GPT / AI Realtor – at the top of Section 8
+    # ---------------------------
+    _render_section8_ai_helper()
+
+
 
 
     # ---------------------------
@@ -137,24 +164,26 @@ def render_section8_property_condition():
     col_8a_1, col_8a_2 = st.columns(2)
 
     with col_8a_1:
-        st.checkbox(
+        data.sold_as_is = st.checkbox(
             "Property is sold in its present physical condition ('as-is'), "
             "subject to buyer's inspection and investigation rights.",
             key="pa8a_as_is_checkbox",
-            value=True,
+            value=data.sold_as_is,
         )
 
-        st.text_area(
+        data.as_is_exceptions = st.text_area(
             "Any exceptions or special condition agreements (optional)",
             key="pa8a_exceptions",
+            value=data.as_is_exceptions,
             height=80,
             placeholder="Example: Roof to be free of active leaks; pool equipment to be in working order.",
         )
 
     with col_8a_2:
-        st.text_area(
+        data.buyer_condition_concerns = st.text_area(
             "Buyer’s key concerns about property condition (optional)",
             key="pa8a_buyer_condition_concerns",
+            value=data.buyer_condition_concerns,
             height=80,
             placeholder="Example: foundation movement, past water intrusion, unpermitted work.",
         )
@@ -175,27 +204,30 @@ def render_section8_property_condition():
 
     with col_8b_1:
         st.markdown("**Specific Repairs Seller Agrees to Complete**")
-        st.text_area(
+        data.seller_repairs = st.text_area(
             "Repairs to be completed by Seller before Close of Escrow",
             key="pa8b_seller_repairs",
+            value=data.seller_repairs,
             height=100,
             placeholder="Example: Repair active leak under kitchen sink; service HVAC; replace broken window in bedroom.",
         )
 
     with col_8b_2:
         st.markdown("**Repair Cost Limits / Caps (if any)**")
-        st.number_input(
+        data.repair_cap = st.number_input(
             "Optional cap on Seller’s total repair costs (USD)",
             key="pa8b_repair_cap",
+            value=float(data.repair_cap),
             min_value=0.0,
             step=500.0,
             format="%.0f",
             help="Leave as 0 if no specific cap is being agreed to.",
         )
 
-        st.text_area(
+        data.repair_notes = st.text_area(
             "Additional notes about repair standards and timing (optional)",
             key="pa8b_repair_notes",
+            value=data.repair_notes,
             height=80,
             placeholder="Example: Repairs to be done by licensed contractors with receipts provided to Buyer.",
         )
@@ -216,9 +248,10 @@ def render_section8_property_condition():
 
     with col_8c_1:
         st.markdown("**Buyer Credit Amount (if any)**")
-        st.number_input(
+        data.repair_credit_amount = st.number_input(
             "Credit to Buyer at Close of Escrow (USD)",
             key="pa8c_credit_amount",
+            value=float(data.repair_credit_amount),
             min_value=0.0,
             step=500.0,
             format="%.0f",
@@ -226,9 +259,10 @@ def render_section8_property_condition():
         )
 
     with col_8c_2:
-        st.text_area(
+        data.repair_credit_reason = st.text_area(
             "Reason / scope covered by the credit",
             key="pa8c_credit_reason",
+            value=data.repair_credit_reason,
             height=80,
             placeholder="Example: Credit in lieu of Seller repairing roof and updating electrical panel.",
         )
@@ -251,42 +285,49 @@ def render_section8_property_condition():
         provide_warranty = st.radio(
             "Will a home warranty plan be provided?",
             options=["No", "Yes"],
+            index=1 if data.has_home_warranty else 0,
             key="pa8d_warranty_provided",
             horizontal=True,
         )
+        data.has_home_warranty = (provide_warranty == "Yes")
 
-        if provide_warranty == "Yes":
-            st.radio(
+        if data.has_home_warranty:
+            data.home_warranty_party = st.radio(
                 "Home warranty plan paid by:",
-                options=["Buyer", "Seller", "Split", "Other"],
+                options=WARRANTY_PAYER_OPTIONS,
+                index=option_index(WARRANTY_PAYER_OPTIONS, data.home_warranty_party),
                 key="pa8d_warranty_party",
                 horizontal=True,
             )
-            st.text_input(
+            data.home_warranty_other = st.text_input(
                 "If Split/Other, describe:",
                 key="pa8d_warranty_other",
+                value=data.home_warranty_other,
                 placeholder="e.g., Seller pays first $600, remainder Buyer.",
             )
 
     with col_8d_2:
-        if provide_warranty == "Yes":
-            st.number_input(
+        if data.has_home_warranty:
+            data.home_warranty_cap = st.number_input(
                 "Maximum cost for home warranty plan (USD)",
                 key="pa8d_warranty_cap",
+                value=float(data.home_warranty_cap),
                 min_value=0.0,
                 step=100.0,
                 format="%.0f",
                 help="Enter 0 if there is no specific cost cap.",
             )
-            st.text_input(
+            data.home_warranty_company = st.text_input(
                 "Preferred home warranty company (optional)",
                 key="pa8d_warranty_company",
+                value=data.home_warranty_company,
                 placeholder="Example: First American, Old Republic, etc.",
             )
         else:
-            st.text_area(
+            data.no_home_warranty_notes = st.text_area(
                 "Notes about why no home warranty is being provided (optional)",
                 key="pa8d_no_warranty_notes",
+                value=data.no_home_warranty_notes,
                 height=80,
                 placeholder="Example: Buyer prefers to choose and pay for their own coverage after closing.",
             )
@@ -303,9 +344,10 @@ def render_section8_property_condition():
         "you want to capture for Section 8."
     )
 
-    st.text_area(
+    data.other_condition_terms = st.text_area(
         "Other specific terms or clarifications for Section 8",
         key="pa8_other_terms_freeform",
+        value=data.other_condition_terms,
         height=120,
         placeholder="Example: Seller to complete city-required retrofit work prior to Close of Escrow. "
                     "Buyer acknowledges existing cosmetic wear consistent with age of property.",
@@ -1,23 +1,43 @@
 # purchase_agreement/section9_closing_possession.py
 
+from datetime import date
+
 import streamlit as st
-from purchase_agreement.ai_helpers import call_purchase_agreement_ai
+from purchase_agreement.conversations import ask_in_conversation, explain_in_conversation, render_conversation
+from purchase_agreement.explainers import SECTION_EXPLAINERS
+from purchase_agreement.models import ClosingAndPossession, get_section, option_index
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
 
 # ⬇️ IMPORTANT:
-# Make sure to import call_purchase_agreement_ai the same way you do in Section 8, e.g.:
-# from purchase_agreement.ai_helpers import call_purchase_agreement_ai
-
-
-def render_section9_closing_possession():
+# Make sure to import stream_ai_answer the same way you do in Section 8, e.g.:
+# from purchase_agreement.ai_helpers import stream_ai_answer
+
+CLOSE_TIMING_OPTIONS = [
+    "On the date specified above",
+    "On or before the date specified above",
+]
+HANDOVER_OPTIONS = [
+    "At close of escrow",
+    "Upon recordation of the deed",
+    "Other (describe below)",
+]
+SELLER_POSSESSION_OPTIONS = [
+    "No – Seller will deliver vacant possession at close",
+    "Yes – Short-term seller possession (few days)",
+    "Yes – Longer-term leaseback (30+ days)",
+]
+FINAL_VERIFICATION_OPTIONS = [
+    "Buyer will perform final verification (recommended)",
+    "Buyer waives final verification (not recommended)",
+]
+
+
+@section_fragment
+def _render_section9_ai_helper():
     """
-    Render Section 9 – Closing and Possession of the Purchase Agreement.
+    "Ask AI Realtor" / "Connect with a Human Realtor" block for Section 9.
     """
-
-    st.markdown("## 9. Closing and Possession")
-
-    # ---------------------------
-    # 🔹 GPT / AI Realtor – at the top of Section 9
-    # ---------------------------
     with st.expander("💬 Need help with Section 9? Ask AI Realtor", expanded=True):
         st.markdown(
             "Use this assistant to understand closing timelines, possession, rent-backs, "
@@ -25,15 +45,6 @@ def render_section9_closing_possession():
             "**Reminder:** This is not legal advice. Always confirm with your broker or attorney."
         )
 
-        default_prompt_9 = (
-            "You are an experienced California residential real estate agent. "
-            "Help the buyer understand how to complete Section 9 – Closing and Possession "
-            "in the CAR Residential Purchase Agreement. Explain typical norms for: "
-            "close of escrow timing, when the buyer gets possession, seller rent-backs, "
-            "key/remote delivery, and final walkthroughs. "
-            "Always remind them that everything is negotiable and practices vary by area."
-        )
-
         # Use a form so pressing Enter in the text input will submit (Ask AI)
         with st.form("pa9_ai_form"):
             user_prompt_9 = st.text_input(
@@ -62,40 +73,50 @@ def render_section9_closing_possession():
                     "Connect with a Human Realtor",
                     use_container_width=True,
                 )
+                explain_clicked_9 = st.form_submit_button(
+                    "Explain this section",
+                    use_container_width=True,
+                )
 
         # Handle Ask AI (form submit or Enter)
         if ask_clicked_9:
             if not user_prompt_9.strip():
                 st.warning("Please enter a question or description first.")
             else:
-                full_prompt_9 = user_prompt_9.strip()
-                if use_context_9:
-                    full_prompt_9 = (
-                        default_prompt_9
-                        + "\n\nUser question:\n"
-                        + user_prompt_9.strip()
+                try:
+                    # 🔹 Same backend call as Section 8, but with section="9"
+                    answer_9 = ask_in_conversation(
+                        user_prompt_9.strip(),
+                        section="9",
+                        system_override=SECTION_EXPLAINERS["9"] if use_context_9 else None,
+                    )
+                except Exception as e:
+                    answer_9 = (
+                        "There was an error calling the AI backend for Section 9.\n\n"
+                        f"Details: {e}"
                     )
 
-                with st.spinner("Thinking like a California Realtor..."):
-                    try:
-                        # 🔹 Same backend call as Section 8, but with section="9"
-                        answer_9 = call_purchase_agreement_ai(
-                            full_prompt_9, section="9"
-                        )
-                    except Exception as e:
-                        answer_9 = (
-                            "There was an error calling the AI backend for Section 9.\n\n"
-                            f"Details: {e}"
-                        )
-
-                    st.session_state["pa9_ai_answer"] = answer_9
+                st.session_state["pa9_ai_answer"] = answer_9
 
         # Handle Connect with Human Realtor
         if connect_clicked_9:
             st.session_state["pa9_show_human_realtor_form"] = True
 
+        # Handle "Explain this section" – the same answer for everyone, served
+        # from the shipped answer pack when it is up to date.
+        if explain_clicked_9:
+            try:
+                answer_9 = explain_in_conversation("9")
+            except Exception as e:
+                answer_9 = (
+                    "There was an error calling the AI backend for Section 9.\n\n"
+                    f"Details: {e}"
+                )
+            st.session_state["pa9_ai_answer"] = answer_9
+
         # Show AI answer if we have one
         if "pa9_ai_answer" in st.session_state:
+            render_conversation("9", st.session_state["pa9_ai_answer"])
             st.markdown("#### 🧠 AI Realtor Suggestion (Section 9)")
             st.info(st.session_state["pa9_ai_answer"])
 
@@ -134,6 +155,22 @@ def render_section9_closing_possession():
                         "Your request has been recorded. A human realtor will reach out to you using the contact info you provided."
                     )
 
+
+@section_fragment
+@profiled()
+def render_section9_closing_possession():
+    """
+    Render Section 9 – Closing and Possession of the Purchase Agreement.
+    """
+    data = get_section(ClosingAndPossession)
+
+    st.markdown("## 9. Closing and Possession")
+
+    # ---------------------------
+    # 🔹 GPT / AI Realtor – at the top of Section 9
+    # ---------------------------
+    _render_section9_ai_helper()
+
     st.markdown("---")
 
     # -------------------------------
@@ -144,30 +181,31 @@ def render_section9_closing_possession():
     col_date, col_timing = st.columns([1, 1.2])
 
     with col_date:
-        st.date_input(
+        data.target_closing_date = st.date_input(
             "Target closing date",
             key="pa_9A_closing_date",
+            value=data.target_closing_date or date.today(),
             help="Select the target close of escrow date.",
         )
 
     with col_timing:
-        st.radio(
+        data.close_timing = st.radio(
             "Close of escrow timing",
-            options=[
-                "On the date specified above",
-                "On or before the date specified above",
-            ],
+            options=CLOSE_TIMING_OPTIONS,
+            index=option_index(CLOSE_TIMING_OPTIONS, data.close_timing),
             key="pa_9A_close_timing",
         )
 
-    st.checkbox(
+    data.allow_closing_extension = st.checkbox(
         "Allow a short automatic extension if needed for loan funding or recording (e.g., up to 5 days)",
         key="pa_9A_allow_extension",
+        value=data.allow_closing_extension,
     )
 
-    st.text_area(
+    data.closing_notes = st.text_area(
         "Notes or special instructions about the closing date (optional)",
         key="pa_9A_notes",
+        value=data.closing_notes,
         placeholder=(
             "Example: Buyer and Seller agree that if lender or title needs extra time, "
             "the closing date may be extended up to 5 calendar days..."
@@ -181,26 +219,25 @@ def render_section9_closing_possession():
     # -------------------------------
     st.markdown("### 9B. Buyer Possession")
 
-    possession_choice = st.radio(
+    data.buyer_possession = st.radio(
         "Buyer to take possession:",
-        options=[
-            "At close of escrow",
-            "Upon recordation of the deed",
-            "Other (describe below)",
-        ],
+        options=HANDOVER_OPTIONS,
+        index=option_index(HANDOVER_OPTIONS, data.buyer_possession),
         key="pa_9B_possession_choice",
     )
 
-    if possession_choice == "Other (describe below)":
-        st.text_input(
+    if data.buyer_possession == "Other (describe below)":
+        data.buyer_possession_other = st.text_input(
             "Describe possession terms",
             key="pa_9B_possession_other",
+            value=data.buyer_possession_other,
             placeholder="Example: Buyer to take possession 3 days after close of escrow...",
         )
 
-    st.text_area(
+    data.buyer_possession_notes = st.text_area(
         "Any additional details about buyer possession (optional)",
         key="pa_9B_notes",
+        value=data.buyer_possession_notes,
         placeholder=(
             "Example: Buyer may access property for measurements or contractor bids at "
             "reasonable times with notice..."
@@ -214,17 +251,14 @@ def render_section9_closing_possession():
     # -------------------------------
     st.markdown("### 9C. Seller Remaining in Possession After Close of Escrow")
 
-    seller_possession = st.radio(
+    data.seller_possession = st.radio(
         "Will the seller remain in possession after close of escrow?",
-        options=[
-            "No – Seller will deliver vacant possession at close",
-            "Yes – Short-term seller possession (few days)",
-            "Yes – Longer-term leaseback (30+ days)",
-        ],
+        options=SELLER_POSSESSION_OPTIONS,
+        index=option_index(SELLER_POSSESSION_OPTIONS, data.seller_possession),
         key="pa_9C_seller_possession",
     )
 
-    if seller_possession != "No – Seller will deliver vacant possession at close":
+    if data.seller_possession != SELLER_POSSESSION_OPTIONS[0]:
         st.markdown(
             "_If Seller stays after close, a separate written agreement is typically "
             "required (e.g., SIP or RLAS)._"
@@ -232,27 +266,31 @@ def render_section9_closing_possession():
 
         col_forms = st.columns(3)
         with col_forms[0]:
-            st.checkbox(
+            data.seller_possession_sip = st.checkbox(
                 "Seller in Possession (SIP)",
                 key="pa_9C_form_SIP",
+                value=data.seller_possession_sip,
                 help="Short-term occupancy after close (typically 30 days or less).",
             )
         with col_forms[1]:
-            st.checkbox(
+            data.seller_possession_rlas = st.checkbox(
                 "Residential Lease After Sale (RLAS)",
                 key="pa_9C_form_RLAS",
+                value=data.seller_possession_rlas,
                 help="Longer-term leaseback after closing.",
             )
         with col_forms[2]:
-            st.checkbox(
+            data.seller_possession_other_agreement = st.checkbox(
                 "Other agreement",
                 key="pa_9C_form_other",
+                value=data.seller_possession_other_agreement,
                 help="Any other written agreement regarding seller’s occupancy.",
             )
 
-        st.text_area(
+        data.seller_possession_details = st.text_area(
             "Key details for seller remaining in possession",
             key="pa_9C_details",
+            value=data.seller_possession_details,
             placeholder=(
                 "Example: Seller to remain in possession up to 7 days after close at no cost. "
                 "Seller responsible for utilities and property condition during occupancy..."
@@ -266,28 +304,27 @@ def render_section9_closing_possession():
     # -------------------------------
     st.markdown("### 9D. Keys, Garage Remotes and Access Devices")
 
-    st.radio(
+    data.key_delivery_timing = st.radio(
         "Timing for delivery of keys and access devices",
-        options=[
-            "At close of escrow",
-            "Upon recordation of the deed",
-            "Other (describe below)",
-        ],
+        options=HANDOVER_OPTIONS,
+        index=option_index(HANDOVER_OPTIONS, data.key_delivery_timing),
         key="pa_9D_delivery_timing",
     )
 
-    st.text_area(
+    data.key_items = st.text_area(
         "Included keys, remotes and access items (optional)",
         key="pa_9D_items",
+        value=data.key_items,
         placeholder=(
             "Example: Front door keys (2 sets), mailbox key, building fob(s), "
             "garage remotes (2), pool key, storage room key..."
         ),
     )
 
-    st.text_area(
+    data.key_delivery_notes = st.text_area(
         "Any exceptions or special instructions (optional)",
         key="pa_9D_notes",
+        value=data.key_delivery_notes,
         placeholder=(
             "Example: One mailbox key currently missing; HOA to re-key mailbox at buyer’s "
             "expense..."
@@ -301,33 +338,34 @@ def render_section9_closing_possession():
     # -------------------------------
     st.markdown("### 9E. Final Verification of Property Condition")
 
-    final_verification_choice = st.radio(
+    data.final_verification = st.radio(
         "Final verification of property condition:",
-        options=[
-            "Buyer will perform final verification (recommended)",
-            "Buyer waives final verification (not recommended)",
-        ],
+        options=FINAL_VERIFICATION_OPTIONS,
+        index=option_index(FINAL_VERIFICATION_OPTIONS, data.final_verification),
         key="pa_9E_verification_choice",
     )
 
-    if final_verification_choice == "Buyer will perform final verification (recommended)":
+    if data.final_verification == FINAL_VERIFICATION_OPTIONS[0]:
         col_vp = st.columns([1, 1])
         with col_vp[0]:
-            st.date_input(
+            data.walkthrough_date = st.date_input(
                 "Target date for final walkthrough",
                 key="pa_9E_walkthrough_date",
+                value=data.walkthrough_date or date.today(),
                 help="Typically scheduled just before close of escrow.",
             )
         with col_vp[1]:
-            st.text_input(
+            data.walkthrough_contact = st.text_input(
                 "Who will coordinate access?",
                 key="pa_9E_walkthrough_contact",
+                value=data.walkthrough_contact,
                 placeholder="Example: Listing agent / Seller / Combo lockbox",
             )
 
-    st.text_area(
+    data.final_verification_notes = st.text_area(
         "Notes about final verification (optional)",
         key="pa_9E_notes",
+        value=data.final_verification_notes,
         placeholder=(
             "Example: Buyer to confirm repairs are complete and property is in substantially "
             "the same condition as when offer was accepted..."
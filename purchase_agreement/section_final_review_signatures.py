@@ -1,42 +1,55 @@
 # purchase_agreement/section_final_review_signatures.py
 
 import streamlit as st
-from purchase_agreement.state import init_purchase_agreement_state
-
-
+from purchase_agreement.fields import resolve_many, section_state
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
+
+
+# Offer terms shown in the review, resolved from their section models
+REVIEW_TERMS = (
+    "buyer_names",
+    "property_address_full",
+    "purchase_price",
+    "close_type",
+    "close_days_after",
+    "close_date",
+    "is_all_cash",
+    "initial_deposit_amount",
+    "total_loan_amount",
+    "has_loan_contingency",
+    "loan_contingency_days",
+    "has_appraisal_contingency",
+    "appraisal_contingency_days",
+    "expiration",
+)
+
+
+@section_fragment
+@profiled()
 def render_final_review_signatures():
     """
-    Final Review – pull key info from:
-    - Section 1 (offer basics) via purchase_agreement["section_1"]
-    - Section 3 (finance) via pa_section3_finance
-    - (Optional) contingencies + expiration if available
+    Final Review – pull key info through the shared field resolver:
+    - Section 1 (offer basics)
+    - Section 3 (finance)
+    - Offer expiration (Section 31)
     """
-    # Ensure the purchase_agreement structure exists, same as Section 1 does
-    init_purchase_agreement_state()
-
     st.markdown("## Final Review – Key Terms Snapshot")
 
-    # ---- Section 1: who & what ----
-    pa = st.session_state.get("purchase_agreement", {})
-    s1 = pa.get("section_1", {})
+    terms = resolve_many(REVIEW_TERMS)
 
-    buyer_names = s1.get("buyer_names") or "Not entered yet"
+    # ---- Section 1: who & what ----
+    buyer_names = terms["buyer_names"] or "Not entered yet"
 
-    address_parts = [
-        s1.get("property_address") or "",
-        s1.get("city") or "",
-        s1.get("county") or "",
-        s1.get("zip_code") or "",
-    ]
-    address_str = ", ".join([p for p in address_parts if p])
+    address_str = terms["property_address_full"]
 
-    price = s1.get("purchase_price")
+    price = terms["purchase_price"]
     price_text = f"${price:,.0f}" if price else "Not entered yet"
 
-    if s1.get("close_type") == "days_after_acceptance" and s1.get("close_days_after"):
-        coe_text = f"{s1['close_days_after']} days after acceptance"
-    elif s1.get("close_type") == "specific_date" and s1.get("close_date"):
-        coe_text = s1["close_date"].strftime("%B %d, %Y")
+    if terms["close_type"] == "days_after_acceptance" and terms["close_days_after"]:
+        coe_text = f"{terms['close_days_after']} days after acceptance"
+    elif terms["close_type"] == "specific_date" and terms["close_date"]:
+        coe_text = terms["close_date"].strftime("%B %d, %Y")
     else:
         coe_text = "Not specified yet"
 
@@ -51,15 +64,11 @@ def render_final_review_signatures():
     st.markdown("---")
 
     # ---- Section 3: finance snapshot ----
-    s3 = st.session_state.get("pa_section3_finance", {})
-
-    is_all_cash = bool(s3.get("is_all_cash"))
-    initial_deposit = s3.get("initial_deposit_amount") or 0
+    is_all_cash = terms["is_all_cash"]
+    initial_deposit = terms["initial_deposit_amount"]
     initial_deposit_text = f"${initial_deposit:,.0f}" if initial_deposit else "Not entered yet"
 
-    first_loan_amount = s3.get("first_loan_amount") or 0
-    second_loan_amount = s3.get("second_loan_amount") or 0
-    total_loans = first_loan_amount + second_loan_amount
+    total_loans = terms["total_loan_amount"]
 
     if is_all_cash:
         financing_summary = "All-cash offer (no loan needed to close)."
@@ -81,10 +90,10 @@ def render_final_review_signatures():
     st.markdown("---")
 
     # ---- Contingencies (from Section 3, since you already track them there) ----
-    has_loan_cont = s3.get("has_loan_contingency")
-    has_appraisal_cont = s3.get("has_appraisal_contingency")
-    loan_cont_days = s3.get("loan_contingency_days")
-    appr_cont_days = s3.get("appraisal_contingency_days")
+    has_loan_cont = terms["has_loan_contingency"]
+    has_appraisal_cont = terms["has_appraisal_contingency"]
+    loan_cont_days = terms["loan_contingency_days"]
+    appr_cont_days = terms["appraisal_contingency_days"]
 
     contingencies_lines = []
     if has_loan_cont is True:
@@ -111,11 +120,15 @@ def render_final_review_signatures():
 
     st.markdown("---")
 
-    # ---- Offer expiration – placeholder wiring for Section 31 ----
-    s31 = st.session_state.get("pa_section31_expiration", {})
-    expiration_summary = s31.get("expiration_summary") or (
-        "Expiration details will appear here once wired from Section 31."
-    )
+    # ---- Offer expiration (Section 31) ----
+    expiration = terms["expiration"]
+    if expiration is not None:
+        expiration_summary = (
+            f"The offer expires on **{expiration.strftime('%B %d, %Y')} "
+            f"at {expiration.strftime('%I:%M %p')}** unless accepted earlier."
+        )
+    else:
+        expiration_summary = "Expiration not set yet – see Expiration of Offer under Core Deal Terms."
 
     st.markdown("### 4. Offer Expiration (high-level)")
     st.write(expiration_summary)
@@ -127,7 +140,7 @@ def render_final_review_signatures():
 
     # Optional: tiny debug expander so you can see what state exists
     with st.expander("🔍 Debug – raw state (only for you as builder)", expanded=False):
-        st.write("**purchase_agreement['section_1']**")
-        st.json(s1)
-        st.write("**pa_section3_finance**")
-        st.json(s3)
+        st.write("**OfferTerms (Section 1)**")
+        st.json(section_state("1"))
+        st.write("**FinanceTerms (Section 3)**")
+        st.json(section_state("3"))
@@ -1,43 +1,39 @@
 # purchase_agreement/section_signatures_export.py
 
 import streamlit as st
-from datetime import datetime, date
+from datetime import date
 from io import BytesIO
+from purchase_agreement.fields import resolve, resolve_many
+from purchase_agreement.navigation import section_fragment
+from purchase_agreement.profiler import profiled
 
 
-def _get_value(*keys, default="Not provided yet"):
-    """
-    Helper: safely pull the first non-empty value from st.session_state by
-    trying multiple possible keys.
-    """
-    for key in keys:
-        if key in st.session_state and st.session_state.get(key):
-            return st.session_state.get(key)
-    return default
+def _money(amount, default="Not provided yet"):
+    return f"${amount:,.0f}" if amount else default
 
 
-def _format_expiration():
+def _format_expiration(expiration=None):
     """Format the expiration date/time from Section 31."""
-    exp_date = st.session_state.get("pa31_date")
-    exp_time = st.session_state.get("pa31_time")
-
-    if not exp_date or not exp_time:
+    if expiration is None:
         return "Not set yet"
-
-    try:
-        if isinstance(exp_date, datetime):
-            d = exp_date.date()
-        else:
-            d = exp_date
-        if isinstance(exp_time, datetime):
-            t = exp_time.time()
-        else:
-            t = exp_time
-
-        dt = datetime.combine(d, t)
-        return dt.strftime("%B %d, %Y at %I:%M %p")
-    except Exception:
-        return "Unable to format expiration – please double-check Section 31."
+    return expiration.strftime("%B %d, %Y at %I:%M %p")
+
+
+# Offer terms shown in the summary, resolved from their section models
+SUMMARY_TERMS = (
+    "buyers",
+    "property_address_full",
+    "purchase_price",
+    "initial_deposit_amount",
+    "is_all_cash",
+    "first_loan_type",
+    "first_loan_fixed_or_arm",
+    "total_loan_amount",
+    "down_payment_balance_amount",
+    "contingency_days",
+    "contingency_notes",
+    "expiration",
+)
 
 
 def _build_offer_summary_text() -> str:
@@ -45,59 +41,30 @@ def _build_offer_summary_text() -> str:
     Build a plain-text summary of the key deal terms.
     This is used for PDF export and for email content.
     """
+    terms = resolve_many(SUMMARY_TERMS)
 
-    buyer_1 = _get_value("pa_buyer_1_name", "buyer_1_name")
-    buyer_2 = _get_value("pa_buyer_2_name", "buyer_2_name", default="(No second buyer)")
-
-    property_address = _get_value(
-        "pa_property_address",
-        "property_address",
-        "pa1_property_address",
-    )
-
-    purchase_price = _get_value(
-        "pa_purchase_price",
-        "offer_price",
-        "pa1_purchase_price",
-    )
-
-    earnest_money = _get_value(
-        "pa_earnest_money_amount",
-        "earnest_money_amount",
-        "pa1_earnest_deposit",
-    )
+    buyers = terms["buyers"]
+    buyer_1 = buyers[0] if buyers else "Not provided yet"
+    buyer_2 = ", ".join(buyers[1:]) or "(No second buyer)"
 
-    financing_type = _get_value(
-        "pa_financing_type",
-        "financing_type",
-        default="Not specified yet (cash vs financing not clearly set)",
-    )
+    property_address = terms["property_address_full"] or "Not provided yet"
 
-    loan_amount = _get_value(
-        "pa_loan_amount",
-        "loan_amount",
-        default="Not specified",
-    )
+    purchase_price = _money(terms["purchase_price"])
+    earnest_money = _money(terms["initial_deposit_amount"])
 
-    down_payment = _get_value(
-        "pa_down_payment_amount",
-        "down_payment_amount",
-        default="Not specified",
-    )
+    if terms["is_all_cash"]:
+        financing_type = "All cash"
+        loan_amount = "None (all-cash offer)"
+    else:
+        financing_type = f"Financed – {terms['first_loan_type']}, {terms['first_loan_fixed_or_arm'].lower()}"
+        loan_amount = _money(terms["total_loan_amount"], default="Not specified")
 
-    contingency_days = _get_value(
-        "pa14B1_contingency_days",
-        "contingency_days",
-        default="Not set yet",
-    )
+    down_payment = _money(terms["down_payment_balance_amount"], default="Not specified")
 
-    contingency_notes = _get_value(
-        "pa14B1_notes",
-        "contingency_notes",
-        default="(No additional notes were recorded.)",
-    )
+    contingency_days = terms["contingency_days"]
+    contingency_notes = terms["contingency_notes"].strip() or "(No additional notes were recorded.)"
 
-    expiration_display = _format_expiration()
+    expiration_display = _format_expiration(terms["expiration"])
 
     lines = [
         "OFFER SUMMARY",
@@ -130,6 +97,7 @@ def _build_offer_summary_text() -> str:
     return "\n".join(lines)
 
 
+@profiled(kind="pdf")
 def _create_offer_summary_pdf(summary_text: str):
     """
     Create a simple PDF from the summary text.
@@ -161,6 +129,8 @@ def _create_offer_summary_pdf(summary_text: str):
     return buffer.getvalue()
 
 
+@section_fragment
+@profiled()
 def render_signatures_export():
     """
     Final step: Signatures & Export.
@@ -209,7 +179,7 @@ def render_signatures_export():
         buyer1_sig_name = st.text_input(
             "Buyer 1 – Name as it will appear on the contract",
             key="pa_sig_buyer1_name",
-            value=_get_value("pa_buyer_1_name", "buyer_1_name", default=""),
+            value=next(iter(resolve("buyers")), ""),
         )
         buyer1_sig_date = st.date_input(
             "Buyer 1 – Signing Date",
@@ -221,7 +191,7 @@ def render_signatures_export():
         buyer2_sig_name = st.text_input(
             "Buyer 2 – Name (if any)",
             key="pa_sig_buyer2_name",
-            value=_get_value("pa_buyer_2_name", "buyer_2_name", default=""),
+            value=", ".join(resolve("buyers")[1:]),
         )
         buyer2_sig_date = st.date_input(
             "Buyer 2 – Signing Date (if any)",
@@ -0,0 +1,48 @@
+# purchase_agreement/settings.py
+
+import os
+from typing import Optional, List
+
+
+# ------------------------------
+# 1. Environment settings
+# ------------------------------
+
+# Module-level knobs are read at import, so a malformed value falls back to
+# the default instead of taking the whole app down.
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_flag(name: str, default: bool = True) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off", "")
+
+
+# ------------------------------
+# 2. Stats
+# ------------------------------
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    Nearest-rank percentile (pct in 0-100) of the values, or None when
+    there are none.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round(pct / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
@@ -0,0 +1,113 @@
+# purchase_agreement/single_flight.py
+
+import threading
+from typing import Optional, Dict, Any, Callable, Tuple
+
+
+# ------------------------------
+# 1. One in-flight call
+# ------------------------------
+
+class Flight:
+    """
+    A call that other threads can wait on. The leader finishes it with
+    resolve() or fail(); every waiter gets the same result or exception.
+    """
+
+    __slots__ = ("key", "_done", "_result", "_error", "waiters")
+
+    def __init__(self, key: str):
+        self.key = key
+        self._done = threading.Event()
+        self._result: Any = None
+        self._error: Optional[BaseException] = None
+        self.waiters = 0
+
+    def resolve(self, result: Any) -> None:
+        self._result = result
+        self._done.set()
+
+    def fail(self, error: BaseException) -> None:
+        self._error = error
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Timed out waiting for in-flight request {self.key[:12]}…")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+# ------------------------------
+# 2. Coalescing registry
+# ------------------------------
+
+class SingleFlight:
+    """
+    Process-wide request coalescing: while a call for a key is running,
+    identical calls wait for it instead of starting their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, Flight] = {}
+        self._stats = {"leaders": 0, "coalesced": 0, "failures": 0}
+
+    def begin(self, key: str) -> Tuple[Flight, bool]:
+        """
+        Join the flight for key, or start one. Returns (flight, is_leader);
+        the leader must call finish() when done.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                self._stats["coalesced"] += 1
+                return flight, False
+
+            flight = Flight(key)
+            self._flights[key] = flight
+            self._stats["leaders"] += 1
+            return flight, True
+
+    def finish(self, flight: Flight, result: Any = None, error: Optional[BaseException] = None) -> None:
+        """
+        Publish the leader's outcome and let the next identical call start fresh.
+        """
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+            if error is not None:
+                self._stats["failures"] += 1
+
+        if error is not None:
+            flight.fail(error)
+        else:
+            flight.resolve(result)
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        Run fn() once per key at a time. Returns (result, shared), where
+        shared is True when the result came from another thread's call.
+        """
+        flight, leader = self.begin(key)
+        if not leader:
+            return flight.wait(timeout), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(flight, error=e)
+            raise
+        self.finish(flight, result=result)
+        return result, False
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["in_flight"] = len(self._flights)
+
+        total = stats["leaders"] + stats["coalesced"]
+        stats["coalesced_rate"] = (stats["coalesced"] / total) if total else 0.0
+        return stats
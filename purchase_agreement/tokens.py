@@ -0,0 +1,57 @@
+# purchase_agreement/tokens.py
+
+import math
+from functools import lru_cache
+from typing import Optional, Any
+
+
+# ------------------------------
+# Local token counting
+# ------------------------------
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str) -> Optional[Any]:
+    """
+    Return a tiktoken encoding for the model, or None if tiktoken is not
+    installed (or can't load its tables). Callers then fall back to a
+    character-based estimate.
+    """
+    try:
+        import tiktoken
+    except Exception:
+        return None
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception:
+        return None
+
+    try:
+        # gpt-4o / gpt-4.1 family tokenizer
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4.1-mini") -> int:
+    """
+    Count prompt tokens locally (no API call).
+    Exact with tiktoken; otherwise ~4 characters per token.
+    """
+    if not text:
+        return 0
+
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+
+    return max(1, math.ceil(len(text) / 4))
+
+
+def counts_are_exact(model: str = "gpt-4.1-mini") -> bool:
+    """
+    False when count_tokens falls back to the character estimate.
+    """
+    return _get_encoding(model) is not None
@@ -0,0 +1,195 @@
+# purchase_agreement/usage_ledger.py
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Sequence
+
+from purchase_agreement.ai_cache import CACHE_DIR
+from purchase_agreement.settings import env_flag
+from purchase_agreement.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------
+# 1. Settings
+# ------------------------------
+
+LEDGER_ENABLED = env_flag("USAGE_LEDGER_ENABLED")
+LEDGER_PATH = Path(os.environ.get("USAGE_LEDGER_PATH", CACHE_DIR / "usage_ledger.sqlite3"))
+
+# Columns the aggregation API may group by.
+GROUP_COLUMNS = ("section", "session_id", "day", "model", "route")
+
+
+# ------------------------------
+# 2. Append-only ledger
+# ------------------------------
+
+class UsageLedger:
+    """
+    One row per upstream chat.completions call, never updated or deleted.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS usage (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts REAL NOT NULL,
+                day TEXT NOT NULL,
+                session_id TEXT,
+                section TEXT,
+                model TEXT NOT NULL,
+                route TEXT,
+                streamed INTEGER NOT NULL,
+                prompt_tokens INTEGER NOT NULL,
+                cached_tokens INTEGER NOT NULL,
+                completion_tokens INTEGER NOT NULL,
+                latency_s REAL NOT NULL,
+                ttft_s REAL,
+                cost_usd REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS usage_day ON usage (day)")
+        self._conn.commit()
+
+    def append(self, row: Dict[str, Any]) -> None:
+        now = row.get("ts") or time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO usage (ts, day, session_id, section, model, route, streamed,
+                                   prompt_tokens, cached_tokens, completion_tokens,
+                                   latency_s, ttft_s, cost_usd)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    now,
+                    time.strftime("%Y-%m-%d", time.gmtime(now)),
+                    row.get("session_id"),
+                    row.get("section"),
+                    row["model"],
+                    row.get("route"),
+                    int(bool(row.get("streamed"))),
+                    row.get("prompt_tokens", 0),
+                    row.get("cached_tokens", 0),
+                    row.get("completion_tokens", 0),
+                    row["latency_s"],
+                    row.get("ttft_s"),
+                    row.get("cost_usd", 0.0),
+                ),
+            )
+            self._conn.commit()
+
+    def aggregate(self, by: Sequence[str] = ("section",), since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Calls, tokens, cost and latency grouped by any of GROUP_COLUMNS,
+        most expensive group first. `since` is a unix timestamp.
+        """
+        columns = [c for c in by if c in GROUP_COLUMNS]
+        if len(columns) != len(by) or not columns:
+            raise ValueError(f"Group by must use {GROUP_COLUMNS}, got {tuple(by)}")
+
+        group = ", ".join(columns)
+        where, params = ("WHERE ts >= ?", (since,)) if since is not None else ("", ())
+        query = f"""
+            SELECT {group},
+                   COUNT(*), SUM(prompt_tokens), SUM(cached_tokens), SUM(completion_tokens),
+                   SUM(cost_usd), AVG(latency_s), MAX(latency_s), AVG(ttft_s)
+            FROM usage {where}
+            GROUP BY {group}
+            ORDER BY SUM(cost_usd) DESC
+        """
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        names = columns + [
+            "calls",
+            "prompt_tokens",
+            "cached_tokens",
+            "completion_tokens",
+            "cost_usd",
+            "avg_latency_s",
+            "max_latency_s",
+            "avg_ttft_s",
+        ]
+        return [dict(zip(names, row)) for row in rows]
+
+
+# ------------------------------
+# 3. Shared ledger
+# ------------------------------
+
+_ledger: Optional[UsageLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger() -> Optional[UsageLedger]:
+    """
+    Process-wide ledger, or None if disabled (USAGE_LEDGER_ENABLED=0) or
+    the file can't be opened.
+    """
+    global _ledger
+
+    if not LEDGER_ENABLED:
+        return None
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                try:
+                    _ledger = UsageLedger(LEDGER_PATH)
+                except (OSError, sqlite3.Error):
+                    return None
+    return _ledger
+
+
+def record_call(**row: Any) -> None:
+    """
+    Append one upstream call. Metering must never break an answer, so
+    failures are logged and dropped.
+    """
+    ledger = get_usage_ledger()
+    if ledger is None:
+        return
+    try:
+        ledger.append(row)
+    except Exception:
+        logger.exception("Could not write usage ledger row")
+
+
+def estimate_usage(messages: List[Dict[str, str]], completion: str, model: str) -> Dict[str, int]:
+    """
+    Token counts for a streamed call that ended before the provider reported
+    usage (the buyer navigated away, or the stream failed mid-answer): the
+    prompt and the text received so far, counted locally, none of it cached.
+    """
+    return {
+        "prompt_tokens": sum(count_tokens(m["content"], model) for m in messages),
+        "cached_tokens": 0,
+        "completion_tokens": count_tokens(completion, model),
+    }
+
+
+def cost_by_section(since: Optional[float] = None) -> List[Dict[str, Any]]:
+    ledger = get_usage_ledger()
+    return ledger.aggregate(("section",), since) if ledger is not None else []
+
+
+def cost_by_session(since: Optional[float] = None) -> List[Dict[str, Any]]:
+    ledger = get_usage_ledger()
+    return ledger.aggregate(("session_id",), since) if ledger is not None else []
+
+
+def cost_by_day(since: Optional[float] = None) -> List[Dict[str, Any]]:
+    ledger = get_usage_ledger()
+    return ledger.aggregate(("day",), since) if ledger is not None else []
@@ -0,0 +1,15 @@
+# tests/conftest.py
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Before any app module is imported: keep caches, ledgers and rate-limit
+# files out of the project tree, and never start background AI work.
+os.environ.setdefault("AI_CACHE_DIR", tempfile.mkdtemp(prefix="pa-tests-"))
+os.environ.setdefault("KNOWLEDGE_VECTOR_DIR", os.path.join(os.environ["AI_CACHE_DIR"], "knowledge_vectors"))
+os.environ.setdefault("AI_PREFETCH_ENABLED", "0")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
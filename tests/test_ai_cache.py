@@ -0,0 +1,94 @@
+# tests/test_ai_cache.py
+
+import pytest
+
+from purchase_agreement import ai_cache
+from purchase_agreement.ai_cache import ResponseCache, make_cache_key
+
+MESSAGES = [{"role": "system", "content": "You explain purchase agreements."}, {"role": "user", "content": "Deposit?"}]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(ai_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_cache_key_depends_on_everything_that_shapes_the_answer():
+    key = make_cache_key("gpt-4.1-mini", 0.2, MESSAGES)
+    assert key == make_cache_key("gpt-4.1-mini", 0.2, [dict(m) for m in MESSAGES])
+    assert key != make_cache_key("gpt-4.1", 0.2, MESSAGES)
+    assert key != make_cache_key("gpt-4.1-mini", 0.3, MESSAGES)
+    assert key != make_cache_key("gpt-4.1-mini", 0.2, MESSAGES[:1] + [{"role": "user", "content": "Deposit!"}])
+    # A compiled prefix is keyed by its digest, not its text
+    assert make_cache_key("gpt-4.1-mini", 0.2, MESSAGES, prefix_digest="abc") == make_cache_key(
+        "gpt-4.1-mini", 0.2, [{"role": "system", "content": "changed"}] + MESSAGES[1:], prefix_digest="abc"
+    )
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "cache.sqlite3", ttl_seconds=60)
+    cache.set("k", "Usually 3%.", section="3")
+    assert cache.get("k", section="3") == "Usually 3%."
+    assert cache.peek("k") == "Usually 3%."
+
+    clock[0] += 61
+    assert cache.peek("k") is None
+    assert cache.get("k", section="3") is None
+    stats = cache.stats()["3"]
+    assert stats["hits"] == 1 and stats["memory_hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == pytest.approx(0.5)
+
+
+def test_disk_store_evicts_least_recently_used(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "cache.sqlite3", max_entries=2, memory_entries=1)
+    cache.set("a", "A")
+    clock[0] += 1
+    cache.set("b", "B")
+    clock[0] += 1
+    # Reading "a" from disk makes "b" the least recently used row
+    assert cache.get("a") == "A"
+    clock[0] += 1
+    cache.set("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+
+
+def test_disk_store_respects_the_byte_limit(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "cache.sqlite3", max_bytes=10)
+    cache.set("a", "x" * 6)
+    clock[0] += 1
+    cache.set("b", "y" * 6)
+    assert cache.peek("a") is None
+    assert cache.get("a") is None and cache.get("b") == "y" * 6
+
+
+def test_memory_layer_is_bounded(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "cache.sqlite3", memory_entries=2)
+    for key in "abc":
+        cache.set(key, key.upper())
+    assert cache.peek("a") is None
+    assert cache.peek("b") == "B" and cache.peek("c") == "C"
+
+
+def test_entries_survive_a_new_process(tmp_path, clock):
+    path = tmp_path / "cache.sqlite3"
+    ResponseCache(path).set("k", "Persisted.", section="8")
+
+    reopened = ResponseCache(path)
+    assert reopened.peek("k") is None
+    assert reopened.get("k", section="8") == "Persisted."
+    assert reopened.stats()["8"]["disk_hits"] == 1
+    # The disk hit is promoted to memory
+    assert reopened.peek("k") == "Persisted."
+
+    reopened.clear()
+    assert ResponseCache(path).get("k") is None
+
+
+def test_disabled_cache_is_none(monkeypatch):
+    monkeypatch.setattr(ai_cache, "CACHE_ENABLED", False)
+    assert ai_cache.get_response_cache() is None
+    assert ai_cache.get_cache_stats() == {}
@@ -0,0 +1,303 @@
+# tests/test_ai_helpers.py
+
+import threading
+from contextlib import nullcontext
+
+import httpx
+import openai
+import pytest
+
+from gpt_client import ChatResult
+from purchase_agreement import ai_helpers, ai_resilience, knowledge_index, rate_limit
+from purchase_agreement.explainers import SECTION_EXPLAINERS, SECTION_FALLBACKS
+from purchase_agreement.knowledge_index import KnowledgeIndex, chunk_document
+from purchase_agreement.rate_limit import MemoryBucketStore, RateLimitExceeded
+
+QUESTION = "How does my loan contingency interact with the appraisal contingency here?"
+USAGE = {"prompt_tokens": 100, "cached_tokens": 0, "completion_tokens": 20}
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    """
+    Per-thread Streamlit session ids, a fresh in-memory rate limiter with a
+    one-request session budget, and no response cache.
+    """
+    local = threading.local()
+    monkeypatch.setattr(rate_limit, "current_session_id", lambda: getattr(local, "session_id", None))
+    monkeypatch.setattr(ai_helpers, "current_session_id", lambda: getattr(local, "session_id", None))
+    monkeypatch.setattr(rate_limit, "_store", MemoryBucketStore())
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "SESSION_REQUESTS_PER_MIN", 1.0)
+    monkeypatch.setattr(ai_helpers, "get_response_cache", lambda: None)
+    monkeypatch.setattr(ai_helpers, "get_openai_client", lambda: None)
+    return local
+
+
+def test_session_limit_of_one_caller_is_not_shared_with_coalesced_callers(sessions, monkeypatch):
+    upstream_started = threading.Event()
+    release = threading.Event()
+
+    def fake_complete(messages, model, temperature, timeout):
+        upstream_started.set()
+        release.wait(5)
+        return ChatResult("shared answer", model, dict(USAGE), 0.1)
+
+    monkeypatch.setattr(ai_helpers, "complete_chat", fake_complete)
+
+    def ask(session_id, results):
+        sessions.session_id = session_id
+        try:
+            results[session_id] = ai_helpers.call_purchase_agreement_ai(QUESTION, section="3", model="gpt-4.1-mini")
+        except RateLimitExceeded as e:
+            results[session_id] = e
+
+    # Session "busy" already used its one request
+    rate_limit.acquire_ai_call(1, session_id="busy", scope="session")
+
+    results = {}
+    leader = threading.Thread(target=ask, args=("leader", results))
+    leader.start()
+    assert upstream_started.wait(5)
+
+    # The busy session is turned away before it can join the flight...
+    ask("busy", results)
+    assert isinstance(results["busy"], RateLimitExceeded)
+    assert results["busy"].scope == "session"
+
+    # ...while a fresh session joins it and gets the shared answer.
+    waiter = threading.Thread(target=ask, args=("waiter", results))
+    waiter.start()
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+    assert results["leader"] == "shared answer"
+    assert results["waiter"] == "shared answer"
+
+
+def test_streaming_leader_over_its_session_limit_never_leads(sessions, monkeypatch):
+    monkeypatch.setattr(ai_helpers, "stream_chat", lambda *a, **k: pytest.fail("no upstream call expected"))
+    sessions.session_id = "busy"
+    rate_limit.acquire_ai_call(1, session_id="busy", scope="session")
+
+    with pytest.raises(RateLimitExceeded):
+        next(ai_helpers.stream_purchase_agreement_ai(QUESTION, section="3", model="gpt-4.1-mini"))
+    assert ai_helpers.get_coalescing_stats()["in_flight"] == 0
+
+
+@pytest.mark.parametrize("streamed", [False, True], ids=["call", "stream"])
+def test_global_rejection_refunds_the_session_charge(sessions, monkeypatch, streamed):
+    monkeypatch.setattr(rate_limit, "GLOBAL_REQUESTS_PER_MIN", 1.0)
+    monkeypatch.setattr(ai_helpers, "complete_chat", lambda *a, **k: pytest.fail("no upstream call expected"))
+    monkeypatch.setattr(ai_helpers, "stream_chat", lambda *a, **k: pytest.fail("no upstream call expected"))
+    rate_limit.acquire_ai_call(1, scope="global")
+    sessions.session_id = "queued"
+
+    for _ in range(2):
+        with pytest.raises(RateLimitExceeded) as exc:
+            if streamed:
+                next(ai_helpers.stream_purchase_agreement_ai(QUESTION, section="3", model="gpt-4.1-mini"))
+            else:
+                ai_helpers.call_purchase_agreement_ai(QUESTION, section="3", model="gpt-4.1-mini")
+        # Still the global limit, not the buyer's own one-request budget
+        assert exc.value.scope == "global"
+    rate_limit.acquire_ai_call(1, scope="session")
+
+
+class FakeStream:
+    """
+    gpt_client.ChatStream stand-in: `result` is only set once every part
+    has been read, and `fail_after` raises mid-stream.
+    """
+
+    def __init__(self, parts, fail_after=None):
+        self.result = None
+        self.closed = False
+        self._parts = parts
+        self._fail_after = fail_after
+
+    def close(self):
+        self.closed = True
+
+    def __iter__(self):
+        for i, part in enumerate(self._parts):
+            if i == self._fail_after:
+                raise ConnectionError("connection reset")
+            yield part
+        self.result = ChatResult("".join(self._parts), "gpt-4.1-mini", dict(USAGE), 0.1)
+
+
+@pytest.fixture
+def ledger_rows(sessions, monkeypatch):
+    rows = []
+    monkeypatch.setattr(ai_helpers, "record_call", lambda **row: rows.append(row))
+    return rows
+
+
+def _stream(question):
+    return ai_helpers.stream_purchase_agreement_ai(question, section="3", model="gpt-4.1-mini")
+
+
+def test_completed_stream_is_metered_once_with_reported_usage(ledger_rows, monkeypatch):
+    monkeypatch.setattr(ai_helpers, "stream_chat", lambda *a, **k: FakeStream(["Usually ", "3%."]))
+    assert "".join(_stream(QUESTION)) == "Usually 3%."
+    assert len(ledger_rows) == 1
+    assert ledger_rows[0]["prompt_tokens"] == USAGE["prompt_tokens"]
+
+
+def test_abandoned_stream_is_metered_with_an_estimate(ledger_rows, monkeypatch):
+    chat = FakeStream(["Usually ", "3%", " but..."])
+    monkeypatch.setattr(ai_helpers, "stream_chat", lambda *a, **k: chat)
+    answer = _stream(QUESTION)
+    assert next(answer) == "Usually "
+    answer.close()
+    assert chat.closed
+
+    assert len(ledger_rows) == 1
+    row = ledger_rows[0]
+    assert row["streamed"] and row["model"] == "gpt-4.1-mini"
+    assert row["prompt_tokens"] > 0 and row["cached_tokens"] == 0
+    assert row["completion_tokens"] >= 1
+    assert row["cost_usd"] > 0
+    assert ai_helpers.get_coalescing_stats()["in_flight"] == 0
+
+
+def test_stream_failing_mid_answer_is_metered(ledger_rows, monkeypatch):
+    monkeypatch.setattr(ai_helpers, "stream_chat", lambda *a, **k: FakeStream(["Usually ", "3%."], fail_after=1))
+    parts = list(_stream(QUESTION + " (failing)"))
+    assert parts[0] == "Usually " and "connection reset" in parts[-1]
+    assert len(ledger_rows) == 1
+    assert ledger_rows[0]["completion_tokens"] >= 1
+
+
+def test_build_messages_reads_one_knowledge_snapshot(monkeypatch):
+    small = KnowledgeIndex(chunk_document("# Deposits\n\nWire the deposit within 3 days.", source="kb.md"))
+    large = KnowledgeIndex(
+        chunk_document("# Deposits\n\n" + "Wire the deposit within 3 days of acceptance. " * 3000, source="kb.md")
+    )
+    assert ai_helpers._knowledge_in_prefix(small) and not ai_helpers._knowledge_in_prefix(large)
+
+    # A hot reload lands between every read of the index
+    versions = iter([small, large, large, large])
+    monkeypatch.setattr(ai_helpers, "get_knowledge_index", lambda: next(versions))
+    monkeypatch.setattr(knowledge_index, "get_knowledge_index", lambda: next(versions))
+    monkeypatch.setattr(knowledge_index, "get_dense_index", lambda index=None: None)
+
+    messages = ai_helpers._build_messages("When is the deposit due?", "3", None, None)
+    assert "Wire the deposit within 3 days." in messages[0]["content"]
+    assert not any("Relevant knowledge base excerpts" in m["content"] for m in messages)
+
+
+def test_open_circuit_serves_the_sections_canned_overview(sessions, monkeypatch):
+    def circuit_open(fn, **kwargs):
+        raise ai_helpers.CircuitOpenError("open")
+
+    monkeypatch.setattr(ai_helpers, "call_with_resilience", circuit_open)
+    answer = ai_helpers.call_purchase_agreement_ai(QUESTION + " (circuit open)", section="14", model="gpt-4.1-mini")
+    assert answer.startswith(ai_helpers.SERVICE_UNAVAILABLE_TEXT)
+    assert answer.endswith(SECTION_FALLBACKS["14"])
+
+    assert ai_helpers._fallback_answer("no-such-section") == ai_helpers.SERVICE_UNAVAILABLE_TEXT
+
+
+def test_every_explained_section_has_a_canned_fallback():
+    assert set(SECTION_FALLBACKS) == set(SECTION_EXPLAINERS)
+
+
+class FirstTokenTimeout(FakeStream):
+    """
+    An attempt whose first chunk never arrives in time.
+    """
+
+    def __iter__(self):
+        raise openai.APITimeoutError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+        yield
+
+
+def test_stream_retries_a_slow_first_token_and_closes_the_attempt(ledger_rows, monkeypatch):
+    monkeypatch.setattr(ai_resilience, "_breaker", ai_resilience.CircuitBreaker())
+    monkeypatch.setattr(ai_resilience.time, "sleep", lambda seconds: None)
+    attempts = [FirstTokenTimeout([]), FakeStream(["Usually ", "3%."])]
+    timeouts = []
+
+    def fake_stream(messages, model, temperature, timeout):
+        timeouts.append(timeout)
+        return attempts[len(timeouts) - 1]
+
+    monkeypatch.setattr(ai_helpers, "stream_chat", fake_stream)
+    assert list(_stream(QUESTION + " (slow first token)")) == ["Usually ", "3%."]
+    assert attempts[0].closed and attempts[1].closed
+    assert all(t <= ai_resilience.AI_FIRST_TOKEN_TIMEOUT_S for t in timeouts)
+    # Only the attempt that answered is metered
+    assert len(ledger_rows) == 1
+
+
+class FakePlaceholder:
+    def __init__(self):
+        self.shown = []
+
+    def info(self, text):
+        self.shown.append(text)
+
+    def empty(self):
+        self.shown.append(None)
+
+
+@pytest.fixture
+def placeholder(monkeypatch):
+    placeholder = FakePlaceholder()
+    fake_st = type("FakeStreamlit", (), {"empty": lambda: placeholder, "spinner": lambda text: nullcontext()})
+    monkeypatch.setattr(ai_helpers, "st", fake_st)
+    monkeypatch.setattr(ai_helpers, "STREAM_RENDER_INTERVAL_S", 0.0)
+    return placeholder
+
+
+def test_stream_ai_answer_renders_deltas_and_returns_the_answer(placeholder, monkeypatch):
+    monkeypatch.setattr(ai_helpers, "stream_purchase_agreement_ai", lambda prompt, section, **kwargs: iter(["Usually ", "3%."]))
+    assert ai_helpers.stream_ai_answer(QUESTION, section="3") == "Usually 3%."
+    assert placeholder.shown == ["Usually 3%. ▌", None]
+
+
+def test_stream_ai_answer_queues_once_for_a_short_global_wait(placeholder, monkeypatch):
+    waits = []
+    monkeypatch.setattr(ai_helpers.time, "sleep", waits.append)
+
+    def rate_limited(prompt, section, **kwargs):
+        raise RateLimitExceeded(2.0, "global")
+        yield
+
+    monkeypatch.setattr(ai_helpers, "stream_purchase_agreement_ai", rate_limited)
+    answer = ai_helpers.stream_ai_answer(QUESTION, section="3")
+    assert waits == [2.0]
+    assert placeholder.shown[0].startswith("⏳ Queued")
+    assert answer.startswith("⏳ The AI Realtor is sending questions faster")
+
+
+def test_prompt_prefix_is_byte_identical_across_sections_and_buyers(monkeypatch):
+    index = KnowledgeIndex(chunk_document("# Deposits\n\nWire the deposit within 3 days.", source="kb.md"))
+    monkeypatch.setattr(ai_helpers, "get_knowledge_index", lambda: index)
+    first = ai_helpers._build_messages("When is the deposit due?", "3", {"first_loan_amount": 800000}, None)
+    second = ai_helpers._build_messages("Is as-is common?", "8", {"notes": "roof leak"}, "Explain Section 8.")
+
+    # The same shared dict, so the provider's prompt cache sees the same bytes
+    assert first[0] is second[0]
+    assert "800000" not in first[0]["content"] and "Section 3" not in first[0]["content"]
+    # Most shareable first: prefix, section instructions, buyer state, question
+    assert [m["role"] for m in first] == ["system", "system", "system", "user"]
+    assert "800000" in first[2]["content"]
+
+    # The cache key follows everything after the prefix
+    key = ai_helpers._cache_key("gpt-4.1-mini", first)
+    assert key == ai_helpers._cache_key("gpt-4.1-mini", list(first))
+    changed = ai_helpers._build_messages("When is the deposit due?", "3", {"first_loan_amount": 900000}, None)
+    assert ai_helpers._cache_key("gpt-4.1-mini", changed) != key
+
+
+def test_cached_prompt_tokens_are_reported_per_section(monkeypatch):
+    monkeypatch.setattr(ai_helpers, "_usage", {})
+    ai_helpers._record_usage("3", {"prompt_tokens": 1000, "cached_tokens": 0, "completion_tokens": 50})
+    ai_helpers._record_usage("3", {"prompt_tokens": 1000, "cached_tokens": 800, "completion_tokens": 50})
+
+    stats = ai_helpers.get_prompt_cache_stats()["3"]
+    assert stats["calls"] == 2 and stats["cached_tokens"] == 800
+    assert stats["cached_ratio"] == pytest.approx(0.4)
@@ -0,0 +1,179 @@
+# tests/test_ai_resilience.py
+
+import httpx
+import openai
+import pytest
+
+from purchase_agreement import ai_resilience
+from purchase_agreement.ai_resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    call_with_resilience,
+    is_retryable,
+)
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def _status_error(status, headers=None):
+    response = httpx.Response(status, request=REQUEST, headers=headers)
+    return openai.APIStatusError(f"HTTP {status}", response=response, body=None)
+
+
+class Clock:
+    """
+    Stand-in for time.monotonic / time.sleep: sleeping advances the clock.
+    """
+
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ai_resilience.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(ai_resilience.time, "sleep", clock.sleep)
+    return clock
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(window=4, min_calls=4, error_rate=0.5, cooldown_s=30)
+    monkeypatch.setattr(ai_resilience, "_breaker", breaker)
+    monkeypatch.setattr(ai_resilience, "_stats", {k: 0 for k in ai_resilience._stats})
+    monkeypatch.setattr(ai_resilience, "AI_MAX_RETRIES", 2)
+    monkeypatch.setattr(ai_resilience.random, "uniform", lambda low, high: high)
+    return breaker
+
+
+def test_transient_errors_are_retryable_and_request_errors_are_not():
+    assert is_retryable(openai.APITimeoutError(request=REQUEST))
+    assert is_retryable(openai.APIConnectionError(request=REQUEST))
+    assert is_retryable(DeadlineExceeded())
+    assert is_retryable(_status_error(429)) and is_retryable(_status_error(503))
+    assert not is_retryable(_status_error(400)) and not is_retryable(_status_error(401))
+    assert not is_retryable(ValueError("bad prompt"))
+
+
+def test_backoff_grows_is_capped_and_honours_retry_after(monkeypatch):
+    monkeypatch.setattr(ai_resilience.random, "uniform", lambda low, high: high)
+    monkeypatch.setattr(ai_resilience, "AI_RETRY_BASE_S", 0.5)
+    monkeypatch.setattr(ai_resilience, "AI_RETRY_MAX_S", 8.0)
+    assert [ai_resilience.backoff_delay(n) for n in range(6)] == [0.5, 1.0, 2.0, 4.0, 8.0, 8.0]
+
+    monkeypatch.setattr(ai_resilience.random, "uniform", lambda low, high: low)
+    assert ai_resilience.backoff_delay(0, _status_error(429, {"retry-after": "3"})) == 3.0
+    assert ai_resilience.backoff_delay(0, _status_error(429, {"retry-after": "60"})) == 8.0
+
+
+def test_breaker_opens_probes_and_closes(clock):
+    breaker = CircuitBreaker(window=4, min_calls=4, error_rate=0.5, cooldown_s=30)
+    for ok in (True, True, False):
+        breaker.record_success() if ok else breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    stats = breaker.stats()
+    assert stats["rejected"] == 2 and stats["recent_calls"] == 0
+    assert stats["transitions"] == {"closed->open": 1, "open->half_open": 1, "half_open->closed": 1}
+
+
+def test_failed_probe_reopens_the_breaker(clock):
+    breaker = CircuitBreaker(window=2, min_calls=2, error_rate=1.0, cooldown_s=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_retryable_errors_are_retried_within_the_deadline(clock, breaker):
+    timeouts = []
+
+    def flaky(timeout_s):
+        timeouts.append(timeout_s)
+        if len(timeouts) < 3:
+            raise openai.APIConnectionError(request=REQUEST)
+        return "answer"
+
+    assert call_with_resilience(flaky, deadline_s=45) == "answer"
+    assert clock.slept == [0.5, 1.0]
+    # Each attempt gets only what is left of the deadline
+    assert timeouts == [45, 44.5, 43.5]
+    stats = ai_resilience.get_resilience_stats()
+    assert stats["attempts"] == 3 and stats["retries"] == 2 and stats["gave_up"] == 0
+
+
+def test_fatal_errors_are_raised_at_once_and_do_not_trip_the_breaker(clock, breaker):
+    calls = []
+
+    def bad_request(timeout_s):
+        calls.append(timeout_s)
+        raise _status_error(400)
+
+    for _ in range(5):
+        with pytest.raises(openai.APIStatusError):
+            call_with_resilience(bad_request)
+    assert len(calls) == 5 and clock.slept == []
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retries_stop_after_the_limit(clock, breaker):
+    def down(timeout_s):
+        raise _status_error(503)
+
+    with pytest.raises(openai.APIStatusError):
+        call_with_resilience(down)
+    stats = ai_resilience.get_resilience_stats()
+    assert stats["attempts"] == 3 and stats["gave_up"] == 1
+
+
+def test_no_retry_is_started_that_would_overrun_the_deadline(clock, breaker):
+    def slow(timeout_s):
+        clock.now += timeout_s
+        raise DeadlineExceeded()
+
+    with pytest.raises(DeadlineExceeded):
+        call_with_resilience(slow, deadline_s=5)
+    stats = ai_resilience.get_resilience_stats()
+    assert stats["attempts"] == 1 and stats["deadline_exceeded"] == 1 and clock.slept == []
+
+
+def test_open_breaker_rejects_without_calling(clock, breaker):
+    def down(timeout_s):
+        raise openai.APITimeoutError(request=REQUEST)
+
+    with pytest.raises(openai.APITimeoutError):
+        call_with_resilience(down)
+    # The fourth failure opens the breaker, so the retry is rejected
+    with pytest.raises(CircuitOpenError):
+        call_with_resilience(down)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    called = []
+    with pytest.raises(CircuitOpenError):
+        call_with_resilience(lambda timeout_s: called.append(timeout_s))
+    assert called == []
+    assert ai_resilience.get_resilience_stats()["breaker"]["rejected"] == 2
@@ -0,0 +1,69 @@
+# tests/test_answer_pack.py
+
+import json
+
+import pytest
+
+from purchase_agreement import ai_helpers, answer_pack
+from purchase_agreement.answer_pack import PACK_FORMAT, get_pack_stats, get_packed_answer, load_pack, write_pack
+from purchase_agreement.explainers import explainer_request
+from tools import build_answer_pack
+
+
+@pytest.fixture
+def pack_path(tmp_path, monkeypatch):
+    path = tmp_path / "answer_pack.json"
+    monkeypatch.setattr(answer_pack, "PACK_PATH", path)
+    monkeypatch.setattr(answer_pack, "PACK_ENABLED", True)
+    monkeypatch.setattr(answer_pack, "_stats", {"served": 0})
+    answer_pack.reload_pack()
+    yield path
+    answer_pack.reload_pack()
+
+
+def _entry(section, answer="Packed explainer."):
+    return {"key": ai_helpers.request_cache_key(**explainer_request(section)), "answer": answer}
+
+
+def test_written_pack_is_served_by_cache_key(pack_path):
+    pack = write_pack({"3": {"key": "k3", "answer": "Deposits are usually 3%."}}, pack_path)
+    assert load_pack(pack_path)["version"] == pack["version"]
+    assert not list(pack_path.parent.glob(".answer_pack-*"))
+
+    assert get_packed_answer("k3") == "Deposits are usually 3%."
+    assert get_packed_answer("other") is None
+    stats = get_pack_stats()
+    assert stats["entries"] == 1 and stats["served"] == 1
+
+
+def test_missing_unreadable_or_old_format_pack_is_empty(pack_path):
+    assert load_pack(pack_path)["entries"] == {}
+    pack_path.write_text("{not json", encoding="utf-8")
+    assert load_pack(pack_path)["entries"] == {}
+    pack_path.write_text(json.dumps({"format": PACK_FORMAT + 1, "entries": {"3": {}}}), encoding="utf-8")
+    assert load_pack(pack_path)["entries"] == {}
+
+
+def test_disabled_pack_serves_nothing(pack_path, monkeypatch):
+    write_pack({"3": {"key": "k3", "answer": "a"}}, pack_path)
+    monkeypatch.setattr(answer_pack, "PACK_ENABLED", False)
+    assert get_packed_answer("k3") is None
+
+
+def test_build_regenerates_only_stale_sections(pack_path, monkeypatch):
+    write_pack({"3": _entry("3"), "7": {"key": "outdated", "answer": "old"}}, pack_path)
+    assert build_answer_pack.stale_sections(["3", "7", "8"], pack_path) == ["7", "8"]
+
+    monkeypatch.setattr(build_answer_pack, "_generate", lambda section: _entry(section, f"new {section}"))
+    result = build_answer_pack.build_pack(["3", "7", "8"], pack_path)
+    assert result["kept"] == ["3"] and result["regenerated"] == ["7", "8"]
+    assert load_pack(pack_path)["entries"]["7"]["answer"] == "new 7"
+    assert build_answer_pack.stale_sections(["3", "7", "8"], pack_path) == []
+
+
+def test_open_circuit_falls_back_to_the_packed_explainer(pack_path, monkeypatch):
+    monkeypatch.setattr(ai_helpers, "get_response_cache", lambda: None)
+    write_pack({"8": _entry("8", "As-is sales are common.")}, pack_path)
+    answer = ai_helpers._fallback_answer("8")
+    assert answer.startswith(ai_helpers.SERVICE_UNAVAILABLE_TEXT)
+    assert answer.endswith("As-is sales are common.")
@@ -0,0 +1,89 @@
+# tests/test_chat_utils.py
+
+import pytest
+
+from core import chat_utils
+from core.chat_utils import ChatNotice, build_chat_messages, stream_chat_reply, write_stream
+from gpt_client import ChatResult
+from purchase_agreement.rate_limit import RateLimitExceeded
+
+HISTORY = [{"role": "user", "content": "Is now a good time to buy?"}]
+
+
+class FakeStream:
+    def __init__(self, parts):
+        self._parts = parts
+        usage = {"prompt_tokens": 10, "cached_tokens": 0, "completion_tokens": 5}
+        self.result = ChatResult("".join(parts), "gpt-4.1-mini", usage, 0.1)
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self._parts)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def no_limits(monkeypatch):
+    monkeypatch.setattr(chat_utils, "acquire_ai_call", lambda tokens: None)
+
+
+def test_model_reply_is_plain_text(monkeypatch):
+    monkeypatch.setattr(chat_utils, "stream_chat", lambda *a, **k: FakeStream(["It ", "depends."]))
+    reply = write_stream(stream_chat_reply("free_chat", HISTORY))
+    assert reply == "It depends."
+    assert not isinstance(reply, ChatNotice)
+
+
+def test_abandoned_reply_is_still_metered(monkeypatch):
+    class Unfinished(FakeStream):
+        def __init__(self, parts):
+            super().__init__(parts)
+            self.result = None
+
+    rows = []
+    chat = Unfinished(["It ", "depends."])
+    monkeypatch.setattr(chat_utils, "record_call", lambda **row: rows.append(row))
+    monkeypatch.setattr(chat_utils, "stream_chat", lambda *a, **k: chat)
+    reply = stream_chat_reply("free_chat", HISTORY)
+    assert next(reply) == "It "
+    reply.close()
+
+    assert chat.closed
+    assert len(rows) == 1
+    assert rows[0]["route"] == "free_chat"
+    assert rows[0]["prompt_tokens"] > 0 and rows[0]["completion_tokens"] >= 1
+
+
+def test_rate_limit_notice_is_marked(monkeypatch):
+    def limited(tokens):
+        raise RateLimitExceeded(12, "session")
+
+    monkeypatch.setattr(chat_utils, "acquire_ai_call", limited)
+    reply = write_stream(stream_chat_reply("free_chat", HISTORY))
+    assert isinstance(reply, ChatNotice)
+    assert reply.startswith("⏳")
+
+
+def test_backend_error_is_marked(monkeypatch):
+    def broken(*args, **kwargs):
+        raise ValueError("bad request")
+
+    monkeypatch.setattr(chat_utils, "stream_chat", broken)
+    reply = write_stream(stream_chat_reply("free_chat", HISTORY))
+    assert isinstance(reply, ChatNotice)
+    assert "bad request" in reply
+
+
+def test_reply_cut_off_by_an_error_is_marked():
+    reply = write_stream(iter(["Partial answer", ChatNotice("\n\nThere was an error.")]))
+    assert isinstance(reply, ChatNotice)
+
+
+def test_history_is_bounded(monkeypatch):
+    monkeypatch.setattr(chat_utils, "CHAT_HISTORY_MESSAGES", 2)
+    history = [{"role": "user", "content": str(i)} for i in range(5)]
+    messages = build_chat_messages("education", history)
+    assert messages[0]["role"] == "system" and "new to buying" in messages[0]["content"]
+    assert [m["content"] for m in messages[1:]] == ["3", "4"]
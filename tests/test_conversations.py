@@ -0,0 +1,89 @@
+# tests/test_conversations.py
+
+import threading
+
+import pytest
+
+from purchase_agreement import conversations
+from purchase_agreement.conversations import Conversation
+
+
+@pytest.fixture
+def folds(monkeypatch):
+    """
+    summarize_turns replaced by a fake that blocks until the test releases
+    the fold started from a given question.
+    """
+    release = {}
+
+    def fake_summarize(previous, turns, section=None, session_id=None):
+        first = turns[0]["content"]
+        release.setdefault(first, threading.Event()).wait(5)
+        return f"summary of {first}"
+
+    def gate(question):
+        return release.setdefault(question, threading.Event())
+
+    monkeypatch.setattr(conversations, "summarize_turns", fake_summarize)
+    monkeypatch.setattr(conversations, "WINDOW_TURNS", 1)
+    return gate
+
+
+def _wait(conversation):
+    pending = conversation._pending
+    if pending is not None:
+        pending.result(timeout=5)
+
+
+def test_older_turns_are_folded_into_the_summary(folds):
+    conversation = Conversation("3")
+    folds("q1").set()
+    conversation.add_turn("q1", "a1")
+    conversation.add_turn("q2", "a2")
+    _wait(conversation)
+
+    history = conversation.history()
+    assert history[0]["role"] == "system" and history[0]["content"].endswith("summary of q1")
+    assert [m["content"] for m in history[1:]] == ["q2", "a2"]
+
+
+def test_answers_in_the_window_are_clipped(folds, monkeypatch):
+    monkeypatch.setattr(conversations, "TURN_MAX_TOKENS", 5)
+    conversation = Conversation("3")
+    conversation.add_turn("q1", "word " * 100)
+    answer = conversation.history()[1]["content"]
+    assert answer.endswith("…") and len(answer) < 40
+
+
+def test_clear_discards_a_fold_still_running(folds):
+    conversation = Conversation("3")
+    conversation.add_turn("old q1", "old a1")
+    conversation.add_turn("old q2", "old a2")
+    old_fold = conversation._pending
+    assert old_fold is not None and not old_fold.done()
+
+    conversation.clear()
+    conversation.add_turn("new q1", "new a1")
+    conversation.add_turn("new q2", "new a2")
+    new_fold = conversation._pending
+    assert new_fold is not None and new_fold is not old_fold
+
+    folds("old q1").set()
+    old_fold.result(timeout=5)
+    # The old thread's summary is not installed, and the newer fold is
+    # still tracked as pending
+    assert conversation.summary == ""
+    assert conversation.summarized == 0
+    assert conversation._pending is new_fold
+
+    folds("new q1").set()
+    new_fold.result(timeout=5)
+    assert conversation.summary == "summary of new q1"
+    assert conversation.summarized == 2
+
+
+def test_errors_and_notices_are_not_remembered():
+    assert conversations._is_answer("A real answer.")
+    assert not conversations._is_answer("⏳ Please try again in 5 s.")
+    assert not conversations._is_answer(conversations.BACKEND_ERROR_PREFIX + " details")
+    assert not conversations._is_answer("   ")
@@ -0,0 +1,96 @@
+# tests/test_faq_cache.py
+
+import pytest
+
+from purchase_agreement.faq_cache import FAQCache, faq_scope, jaccard, normalize_question, question_guard, shingles
+
+SCOPE = faq_scope("3", "gpt-4.1-mini", None, "kb-v1")
+
+
+@pytest.fixture
+def faq():
+    return FAQCache(threshold=0.7, max_entries=10)
+
+
+def test_normalize_keeps_as_is_and_drops_state_names():
+    assert normalize_question("What does 'as-is' mean in CA?") == ["asi", "mean"]
+    assert normalize_question("What does as is mean in California?") == ["asi", "mean"]
+
+
+@pytest.mark.parametrize(
+    "stored, asked",
+    [
+        ("What does as-is mean?", "What does as is mean in California?"),
+        ("Who pays for escrow fees?", "Who pays escrow fees?"),
+        ("How long is the loan contingency period?", "How long is the loan contingency?"),
+        ("Is 3% earnest money normal?", "Is 3% earnest money normal in California?"),
+    ],
+)
+def test_paraphrases_are_served(faq, stored, asked):
+    faq.add(SCOPE, stored, "key-1")
+    match = faq.find(SCOPE, asked)
+    assert match is not None and match["served"]
+    assert match["cache_key"] == "key-1"
+
+
+@pytest.mark.parametrize(
+    "stored, asked",
+    [
+        ("Should I remove my loan contingency?", "Should I not remove my loan contingency?"),
+        ("Do I need a home inspection before I remove contingencies?", "Don't I need a home inspection before I remove contingencies?"),
+        ("Is 3% earnest money normal?", "Is 10% earnest money normal?"),
+        ("Is $10,000 earnest money enough?", "Is $1,000 earnest money enough?"),
+    ],
+)
+def test_near_misses_with_different_numbers_or_negation_are_not_served(stored, asked):
+    # Similar enough on shingles alone to clear the threshold
+    assert jaccard(shingles(stored), shingles(asked)) >= 0.7
+
+    # Neither question is served the other's answer
+    for cached, question in ((stored, asked), (asked, stored)):
+        faq = FAQCache(threshold=0.7)
+        faq.add(SCOPE, cached, "key-1")
+        match = faq.find(SCOPE, question)
+        assert match is not None and not match["served"]
+
+
+def test_guard_mismatch_is_audited(faq):
+    faq.add(SCOPE, "Is 3% earnest money normal?", "key-3")
+    match = faq.find(SCOPE, "Is 10% earnest money normal?")
+    assert match is not None
+    assert not match["served"] and not match["guard_match"]
+    assert faq.stats()["guard_rejects"] == 1
+    assert faq.audit()[-1]["guard_match"] is False
+
+
+def test_matching_guard_wins_over_higher_similarity(faq):
+    faq.add(SCOPE, "Is 3% earnest money normal?", "key-3")
+    faq.add(SCOPE, "Is 10% earnest money normal in my area?", "key-10")
+    match = faq.find(SCOPE, "Is 10% earnest money normal?")
+    assert match["served"]
+    assert match["cache_key"] == "key-10"
+
+
+def test_question_guard():
+    assert question_guard("Is $10,000 down ok with 21 days?") == (frozenset({"$10000", "21"}), 0)
+    assert question_guard("Is 10 percent normal?") == (frozenset({"10%"}), 0)
+    assert question_guard("Can't I skip it?")[1] == 1
+    assert question_guard("What about the tenant's notice period?")[1] == 0
+
+
+def test_scopes_do_not_share_answers(faq):
+    faq.add(SCOPE, "What does as-is mean?", "key-1")
+    other_scope = faq_scope("8", "gpt-4.1-mini", None, "kb-v1")
+    assert faq.find(other_scope, "What does as-is mean?") is None
+
+
+def test_forget_and_eviction(faq):
+    faq.add(SCOPE, "What does as-is mean?", "key-1")
+    match = faq.find(SCOPE, "What does as is mean?")
+    faq.forget(match["entry_id"])
+    assert faq.find(SCOPE, "What does as is mean?") is None
+    assert faq.stats()["stale"] == 1
+
+    for i in range(15):
+        faq.add(SCOPE, f"Question number {i} about section {i} fees", f"key-{i}")
+    assert faq.stats()["entries"] == 10
@@ -0,0 +1,78 @@
+# tests/test_fields.py
+
+from datetime import date, time, datetime
+
+import pytest
+
+from purchase_agreement import fields
+from purchase_agreement.models import (
+    AgencyTerms,
+    ContingencyPeriod,
+    FinanceTerms,
+    OfferExpiration,
+    OfferTerms,
+    PurchaseAgreement,
+    TimingPreferences,
+)
+
+
+@pytest.fixture
+def agreement():
+    agreement = PurchaseAgreement()
+    offer = agreement.section(OfferTerms)
+    offer.buyer_names = "Ana Diaz and Sam Lee"
+    offer.property_address = "12 Oak St"
+    offer.city = "Oakland"
+    offer.zip_code = "94610"
+    offer.purchase_price = 1_000_000
+    finance = agreement.section(FinanceTerms)
+    finance.first_loan_amount = 700_000
+    finance.second_loan_amount = 100_000
+    finance.initial_deposit_amount = 30_000
+    agreement.section(ContingencyPeriod).notes = "17 days"
+    agreement.section(AgencyTerms).notes = "No agent"
+    expiration = agreement.section(OfferExpiration)
+    expiration.expiration_date = date(2026, 11, 1)
+    expiration.expiration_time = time(17, 0)
+    agreement.section(TimingPreferences).timing_notes = "Lease ends on the 30th"
+    return agreement
+
+
+def test_canonical_aliases_and_qualified_names_resolve_the_same_field(agreement):
+    for term in ("purchase_price", "offer_price", "pa1_purchase_price", "1.purchase_price"):
+        assert fields.resolve(term, agreement) == 1_000_000
+    assert fields.resolve("earnest_money", agreement) == 30_000
+    assert fields.resolve("timing_notes", agreement) == "Lease ends on the 30th"
+
+
+def test_ambiguous_names_need_a_section(agreement):
+    assert "notes" not in fields.known_terms()
+    assert fields.resolve("14.notes", agreement) == "17 days"
+    assert fields.resolve("contingency_notes", agreement) == "17 days"
+    assert fields.resolve("agency_notes", agreement) == "No agent"
+
+
+def test_derived_terms(agreement):
+    assert fields.resolve("buyers", agreement) == ["Ana Diaz", "Sam Lee"]
+    assert fields.resolve("property_address_full", agreement) == "12 Oak St, Oakland, 94610"
+    assert fields.resolve("loan_amount", agreement) == 800_000
+    assert fields.resolve("expiration", agreement) == datetime(2026, 11, 1, 17, 0)
+
+
+def test_unknown_terms_raise(agreement):
+    with pytest.raises(KeyError):
+        fields.resolve("pa_nonexistent", agreement)
+
+
+def test_section_state_adds_related_terms(agreement):
+    state = fields.section_state("3", agreement)
+    assert state["first_loan_amount"] == 700_000
+    assert state["purchase_price"] == 1_000_000
+    assert fields.section_state("21-22", agreement)["remedies_notes"] == ""
+    assert fields.section_state("16-20", agreement) == {}
+
+
+def test_duplicate_terms_fail_at_build(monkeypatch):
+    monkeypatch.setitem(fields._NAMED_TERMS, "purchase_price", lambda agreement: 0)
+    with pytest.raises(ValueError):
+        fields._build_index()
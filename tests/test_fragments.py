@@ -0,0 +1,88 @@
+# tests/test_fragments.py
+
+from types import SimpleNamespace
+
+import pytest
+
+from purchase_agreement import navigation
+from purchase_agreement.navigation import PAGE_KEY, PAGE_STATE_KEYS, section_fragment
+
+
+@pytest.fixture
+def st(monkeypatch):
+    """
+    Streamlit stand-in: plain-dict session_state, a fragment decorator that
+    records which functions it wraps, and st.rerun() calls counted.
+    """
+    fake = SimpleNamespace(session_state={"pa_nav_mode": "sections", PAGE_KEY: "Core Deal Terms"}, reruns=0, fragments=[])
+
+    def fragment(body):
+        def run(*args, **kwargs):
+            fake.fragments.append(body.__name__)
+            return body(*args, **kwargs)
+
+        return run
+
+    def rerun():
+        fake.reruns += 1
+
+    fake.rerun = rerun
+    monkeypatch.setattr(navigation, "st", fake)
+    monkeypatch.setattr(navigation, "_fragment", fragment)
+    monkeypatch.setattr(navigation, "FRAGMENTS_ENABLED", True)
+    monkeypatch.setattr(navigation, "_in_fragment_rerun", lambda: False)
+    return fake
+
+
+def test_sections_run_as_fragments_only_in_sections_mode(st, monkeypatch):
+    calls = []
+
+    @section_fragment
+    def render_offer(label):
+        calls.append(label)
+
+    render_offer("a")
+    assert calls == ["a"] and st.fragments == ["render_offer"]
+
+    st.session_state["pa_nav_mode"] = "tabs"
+    render_offer("b")
+    monkeypatch.setattr(navigation, "FRAGMENTS_ENABLED", False)
+    st.session_state["pa_nav_mode"] = "sections"
+    render_offer("c")
+    assert calls == ["a", "b", "c"] and st.fragments == ["render_offer"]
+
+
+def test_streamlit_without_fragments_renders_directly(st, monkeypatch):
+    monkeypatch.setattr(navigation, "_fragment", None)
+
+    @section_fragment
+    def render_offer():
+        st.session_state["offer_price"] = 800000
+
+    render_offer()
+    assert st.session_state["offer_price"] == 800000 and st.fragments == []
+
+
+def test_changing_a_published_key_in_a_fragment_rerun_reruns_the_app(st, monkeypatch):
+    @section_fragment(publishes=("offer_price",))
+    def render_offer(price):
+        st.session_state["offer_price"] = price
+
+    render_offer(800000)
+    # A full run already shows every section the new value
+    assert st.reruns == 0
+
+    monkeypatch.setattr(navigation, "_in_fragment_rerun", lambda: True)
+    render_offer(800000)
+    assert st.reruns == 0
+    render_offer(900000)
+    assert st.reruns == 1
+
+
+def test_keys_first_set_in_a_fragment_belong_to_the_page(st):
+    @section_fragment
+    def render_offer():
+        st.session_state["offer_notes"] = "cash offer"
+
+    render_offer()
+    assert st.session_state[PAGE_STATE_KEYS] == {"Core Deal Terms": {"offer_notes"}}
@@ -0,0 +1,168 @@
+# tests/test_gpt_client.py
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import gpt_client
+from gpt_client import ChatStream
+
+
+class FakeChunks:
+    """
+    openai.Stream stand-in: iterates chunks and records close().
+    """
+
+    def __init__(self, texts, usage=None, fail_after=None):
+        self.closed = False
+        self._texts = texts
+        self._usage = usage
+        self._fail_after = fail_after
+
+    def __iter__(self):
+        for i, text in enumerate(self._texts):
+            if i == self._fail_after:
+                raise ConnectionError("connection reset")
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+        yield SimpleNamespace(choices=[], usage=self._usage)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fresh_request_stats(monkeypatch):
+    monkeypatch.setattr(gpt_client, "_request_stats", {})
+
+
+@pytest.fixture
+def fresh_client(monkeypatch):
+    monkeypatch.setattr(gpt_client, "_client", None)
+    monkeypatch.setattr(gpt_client, "_stats", dict.fromkeys(gpt_client._stats, 0))
+    yield
+    gpt_client.reset_shared_client()
+
+
+class FakeCompletions:
+    def __init__(self, text="Usually 3%."):
+        self.calls = []
+        self._text = text
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        usage = SimpleNamespace(prompt_tokens=12, completion_tokens=3, prompt_tokens_details=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self._text))], usage=usage)
+
+
+class DictCache:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+def _stream(chunks):
+    return ChatStream("stream", "gpt-4.1-mini", chunks, gpt_client.time.perf_counter())
+
+
+def test_finished_stream_has_a_result_and_is_closed():
+    usage = SimpleNamespace(prompt_tokens=12, completion_tokens=3, prompt_tokens_details=None)
+    chunks = FakeChunks(["Usually ", "3%."], usage=usage)
+    chat = _stream(chunks)
+    assert "".join(chat) == "Usually 3%."
+
+    assert chunks.closed
+    assert chat.result.text == "Usually 3%."
+    assert chat.result.usage == {"prompt_tokens": 12, "cached_tokens": 0, "completion_tokens": 3}
+    stats = gpt_client.get_request_stats()["stream"]
+    assert stats["calls"] == 1 and stats["aborted"] == 0 and stats["errors"] == 0
+
+
+def test_consumer_leaving_early_closes_and_records_the_stream():
+    chunks = FakeChunks(["Usually ", "3%", " but..."])
+    chat = _stream(chunks)
+    deltas = iter(chat)
+    assert next(deltas) == "Usually "
+    deltas.close()
+
+    assert chunks.closed
+    assert chat.result is None
+    stats = gpt_client.get_request_stats()["stream"]
+    assert stats["calls"] == 1 and stats["aborted"] == 1
+    assert stats["latency_p50_s"] is None
+
+
+def test_stream_never_iterated_is_closed_as_aborted():
+    chunks = FakeChunks(["Usually "])
+    chat = _stream(chunks)
+    chat.close()
+    chat.close()
+    assert chunks.closed
+    assert gpt_client.get_request_stats()["stream"]["aborted"] == 1
+
+
+def test_failing_stream_is_closed_and_counted_as_an_error():
+    chunks = FakeChunks(["Usually ", "3%."], fail_after=1)
+    chat = _stream(chunks)
+    with pytest.raises(ConnectionError):
+        list(chat)
+    assert chunks.closed
+    stats = gpt_client.get_request_stats()["stream"]
+    assert stats["calls"] == 1 and stats["errors"] == 1 and stats["aborted"] == 0
+
+
+def test_every_thread_shares_one_client(fresh_client):
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(gpt_client.get_shared_client())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert len(clients) == 8 and all(c is clients[0] for c in clients)
+    # The SDK's own retries are off; ai_resilience owns the retry policy
+    assert clients[0].max_retries == 0
+    stats = gpt_client.get_pool_stats()
+    assert stats["client_builds"] == 1 and stats["client_reuses"] == 7
+
+
+def test_reset_builds_a_fresh_client(fresh_client):
+    first = gpt_client.get_shared_client()
+    gpt_client.reset_shared_client()
+    assert first._client.is_closed
+    assert gpt_client.get_shared_client() is not first
+    assert gpt_client.get_pool_stats()["client_builds"] == 2
+
+
+def test_reuse_rate_counts_requests_without_a_new_connection(fresh_client):
+    for _ in range(4):
+        gpt_client._on_request(gpt_client.httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    gpt_client._trace_connection("connection.connect_tcp.complete", {})
+    gpt_client._trace_connection("connection.start_tls.complete", {})
+
+    stats = gpt_client.get_pool_stats()
+    assert stats["requests"] == 4 and stats["tls_handshakes"] == 1
+    assert stats["reused_connections"] == 3 and stats["connection_reuse_rate"] == pytest.approx(0.75)
+
+
+def test_complete_uses_the_shared_client_and_cache_hook(monkeypatch):
+    completions = FakeCompletions()
+    monkeypatch.setattr(gpt_client, "get_shared_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    cache = DictCache()
+    messages = [{"role": "user", "content": "Deposit?"}]
+
+    result = gpt_client.complete(messages, timeout=7, max_tokens=50, cache=cache, cache_key="k")
+    assert result.text == "Usually 3%." and not result.cached
+    assert completions.calls[0]["timeout"] == 7 and completions.calls[0]["max_tokens"] == 50
+    assert cache.values == {"k": "Usually 3%."}
+
+    again = gpt_client.complete(messages, cache=cache, cache_key="k")
+    assert again.cached and again.text == "Usually 3%."
+    assert len(completions.calls) == 1
+    stats = gpt_client.get_request_stats()["sync"]
+    assert stats["calls"] == 2 and stats["cache_hits"] == 1
@@ -0,0 +1,111 @@
+# tests/test_knowledge_index.py
+
+import threading
+import time
+
+import pytest
+
+from purchase_agreement import knowledge_index
+from purchase_agreement.knowledge_index import KnowledgeStore, chunk_document, retrieve_knowledge, section_numbers
+
+FILLER = "The buyer and seller agree on the usual terms for this part of the contract. "
+
+
+def _words(text):
+    return text.replace("\n", " ").split()
+
+
+def test_small_paragraphs_are_packed_under_their_heading():
+    text = "# Deposits\n\nFirst paragraph.\n\nSecond paragraph.\n\n## Timing\n\nWire within 3 days."
+    chunks = chunk_document(text, source="kb.md", max_tokens=200)
+    assert [c["heading"] for c in chunks] == ["Deposits", "Deposits > Timing"]
+    assert chunks[0]["text"] == "Deposits\nFirst paragraph.\n\nSecond paragraph."
+
+
+@pytest.mark.parametrize(
+    "paragraph",
+    [
+        FILLER * 60,  # many sentences
+        ("word " * 900).strip(),  # one endless sentence
+    ],
+)
+def test_oversized_paragraph_is_split_within_max_tokens(paragraph):
+    text = f"# Section 3 Finance\n\n{paragraph}"
+    chunks = chunk_document(text, source="kb.md", max_tokens=120)
+
+    assert len(chunks) > 1
+    assert all(c["tokens"] <= 120 for c in chunks)
+    # Nothing is lost, every piece keeps the heading and its section refs
+    body_words = [w for c in chunks for w in _words(c["text"])[3:]]
+    assert body_words == _words(paragraph)
+    assert all(c["text"].startswith("Section 3 Finance\n") for c in chunks)
+    assert all(c["sections"] == {3} for c in chunks)
+
+
+def test_content_of_an_oversized_paragraph_can_be_retrieved(tmp_path, monkeypatch):
+    (tmp_path / "kb.md").write_text(
+        "# Liquidated damages\n\n" + FILLER * 80 + "The zebracorn clause caps damages at the deposit.",
+        encoding="utf-8",
+    )
+    store = KnowledgeStore(tmp_path, ("*.md",), poll_interval_s=0)
+    monkeypatch.setattr(knowledge_index, "_store", store)
+    monkeypatch.setattr(knowledge_index, "get_dense_index", lambda index=None: None)
+
+    result = retrieve_knowledge("What is the zebracorn clause?", token_budget=300)
+    assert "zebracorn" in result["text"]
+    assert result["report"]["tokens_injected"] <= 300
+
+
+def test_store_reloads_changed_files_only(tmp_path):
+    (tmp_path / "a.md").write_text("# A\n\nAlpha text.", encoding="utf-8")
+    (tmp_path / "b.md").write_text("# B\n\nBeta text.", encoding="utf-8")
+    store = KnowledgeStore(tmp_path, ("*.md",), poll_interval_s=0)
+    first = store.index()
+    assert store.refresh() is False
+
+    (tmp_path / "b.md").write_text("# B\n\nBeta text, revised at length.", encoding="utf-8")
+    assert store.refresh() is True
+    second = store.index()
+    assert second is not first
+    assert second.content_hash != first.content_hash
+    assert store.stats()["files_rechunked"] == 3
+
+
+def test_reload_builds_off_the_request_path(tmp_path, monkeypatch):
+    (tmp_path / "a.md").write_text("# A\n\nAlpha text.", encoding="utf-8")
+    release = threading.Event()
+    builds = []
+
+    def slow_build(texts):
+        builds.append(texts)
+        if len(builds) > 1:
+            release.wait(5)
+        return "dense-%d" % len(builds)
+
+    monkeypatch.setattr(knowledge_index, "load_or_build", slow_build)
+    store = KnowledgeStore(tmp_path, ("*.md",), poll_interval_s=0.01, dense=True)
+    first = store.index()
+    assert knowledge_index.get_dense_index(first) == "dense-1"
+
+    (tmp_path / "a.md").write_text("# A\n\nAlpha text, revised.", encoding="utf-8")
+    time.sleep(0.02)
+    # The reload runs in the background; requests keep the previous version
+    assert store.index() is first
+    deadline = time.monotonic() + 5
+    while len(builds) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.index() is first
+
+    release.set()
+    while store.index() is first and time.monotonic() < deadline:
+        time.sleep(0.01)
+    second = store.index()
+    assert second is not first and second.dense == "dense-2"
+    # Readers of the old snapshot keep its own dense index
+    assert first.dense == "dense-1"
+
+
+def test_section_numbers():
+    assert section_numbers("8") == {8}
+    assert section_numbers("10-13") == {10, 11, 12, 13}
+    assert section_numbers(None) == set()
@@ -0,0 +1,71 @@
+# tests/test_knowledge_vectors.py
+
+import os
+
+import numpy as np
+
+from purchase_agreement.knowledge_vectors import (
+    DenseIndex,
+    build_dir,
+    chunks_fingerprint,
+    load_or_build,
+    prune_builds,
+)
+
+TEXTS = [
+    "The initial deposit is wired to escrow within three business days.",
+    "The loan contingency lets the buyer cancel if financing falls through.",
+    "The seller delivers disclosures within seven days after acceptance.",
+]
+REVISED = TEXTS + ["The appraisal contingency covers a low appraisal."]
+
+
+def test_search_ranks_the_paraphrased_chunk_first():
+    index = DenseIndex.build(TEXTS)
+    assert index.search("when is the deposit due to escrow", top_k=2)[0][0] == 0
+    assert index.search("", top_k=0) == []
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = DenseIndex.build(TEXTS)
+    fingerprint = chunks_fingerprint(TEXTS)
+    assert index.save(tmp_path, fingerprint) == build_dir(tmp_path, fingerprint)
+
+    loaded = DenseIndex.load(tmp_path, fingerprint)
+    assert isinstance(loaded.vectors, np.memmap)
+    np.testing.assert_array_equal(loaded.vectors, index.vectors)
+    assert loaded.search("financing falls through") == index.search("financing falls through")
+
+    assert DenseIndex.load(tmp_path, chunks_fingerprint(REVISED)) is None
+    # No staging directories are left behind
+    assert [p.name for p in tmp_path.iterdir()] == [build_dir(tmp_path, fingerprint).name]
+
+
+def test_a_new_build_never_rewrites_a_mapped_one(tmp_path):
+    old = load_or_build(TEXTS, directory=tmp_path)
+    live = DenseIndex.load(tmp_path, chunks_fingerprint(TEXTS))
+    old_file = build_dir(tmp_path, chunks_fingerprint(TEXTS)) / "vectors.npy"
+    stamp = old_file.stat().st_mtime_ns
+
+    new = load_or_build(REVISED, directory=tmp_path)
+    # Publishing the same build again is a no-op
+    new.save(tmp_path, chunks_fingerprint(REVISED))
+    DenseIndex.build(TEXTS).save(tmp_path, chunks_fingerprint(TEXTS))
+
+    assert old_file.stat().st_mtime_ns == stamp
+    assert live.search("deposit escrow") == old.search("deposit escrow")
+    assert DenseIndex.load(tmp_path, chunks_fingerprint(REVISED)).vectors.shape[0] == 4
+
+
+def test_prune_keeps_the_newest_builds(tmp_path):
+    for count in range(1, 4):
+        texts = TEXTS[:count]
+        target = DenseIndex.build(texts).save(tmp_path, chunks_fingerprint(texts))
+        os.utime(target, (count, count))
+    live = DenseIndex.load(tmp_path, chunks_fingerprint(TEXTS[:1]))
+
+    prune_builds(tmp_path, keep=1)
+    assert DenseIndex.load(tmp_path, chunks_fingerprint(TEXTS[:1])) is None
+    assert DenseIndex.load(tmp_path, chunks_fingerprint(TEXTS)) is not None
+    # A process that still maps a pruned build keeps working
+    assert live.search("deposit")[0][0] == 0
@@ -0,0 +1,105 @@
+# tests/test_load_test.py
+
+import argparse
+
+import openai
+import pytest
+
+import gpt_client
+from purchase_agreement import ai_helpers, ai_resilience, rate_limit
+from purchase_agreement.single_flight import SingleFlight
+from tools import load_test, mock_openai_server
+from tools.mock_openai_server import LatencyModel, MockSettings, start_mock_server
+
+FAST = {"latency": "fixed:0", "tokens_per_s": 10000.0, "completion_tokens": 8}
+
+
+@pytest.fixture
+def mock_server(monkeypatch):
+    monkeypatch.setattr(mock_openai_server, "_stats", dict.fromkeys(mock_openai_server._stats, 0))
+    monkeypatch.setattr(mock_openai_server, "_seen_prefixes", set())
+    servers = []
+
+    def start(**settings):
+        server = start_mock_server(settings=MockSettings(**{**FAST, **settings}))
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/v1"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def _client(base_url):
+    return openai.OpenAI(base_url=base_url, api_key="mock", max_retries=0)
+
+
+def test_latency_specs():
+    assert LatencyModel("fixed:0.5").sample() == 0.5
+    assert 0.2 <= LatencyModel("uniform:0.2,1.5").sample() <= 1.5
+    assert LatencyModel("normal:0.8,0.2").sample() >= 0
+    with pytest.raises(ValueError):
+        LatencyModel("pareto:1")
+
+
+def test_only_long_repeated_prefixes_count_as_cached(mock_server):
+    long_prefix = {"role": "system", "content": "word " * 2000}
+    first = mock_openai_server._prompt_usage([long_prefix, {"role": "user", "content": "Deposit?"}], "gpt-4.1-mini")
+    second = mock_openai_server._prompt_usage([long_prefix, {"role": "user", "content": "As-is?"}], "gpt-4.1-mini")
+    assert first[1] == 0
+    assert second[1] >= mock_openai_server.PROMPT_CACHE_MIN_TOKENS and second[1] < second[0]
+
+    short = [{"role": "system", "content": "short"}, {"role": "user", "content": "Deposit?"}]
+    mock_openai_server._prompt_usage(short, "gpt-4.1-mini")
+    assert mock_openai_server._prompt_usage(short, "gpt-4.1-mini")[1] == 0
+
+
+def test_mock_server_answers_like_the_api(mock_server):
+    client = _client(mock_server())
+    messages = [{"role": "user", "content": "How big should my deposit be?"}]
+
+    response = client.chat.completions.create(model="gpt-4.1-mini", messages=messages)
+    assert response.choices[0].message.content.startswith("Mock answer about: How big")
+    assert response.usage.completion_tokens == FAST["completion_tokens"]
+
+    stream = client.chat.completions.create(
+        model="gpt-4.1-mini", messages=messages, stream=True, stream_options={"include_usage": True}
+    )
+    chunks = list(stream)
+    assert "".join(c.choices[0].delta.content or "" for c in chunks if c.choices) == response.choices[0].message.content
+    assert chunks[-1].usage.completion_tokens == FAST["completion_tokens"]
+
+    stats = mock_openai_server.get_mock_stats()
+    assert stats["requests"] == 2 and stats["streams"] == 1
+
+
+def test_mock_server_injects_errors(mock_server):
+    client = _client(mock_server(error_rate=1.0, error_status=429))
+    with pytest.raises(openai.RateLimitError) as exc:
+        client.chat.completions.create(model="gpt-4.1-mini", messages=[{"role": "user", "content": "Hi"}])
+    assert exc.value.response.headers["retry-after"] == "1"
+    assert mock_openai_server.get_mock_stats()["errors_injected"] == 1
+
+
+def test_load_test_reports_latency_and_throughput(mock_server, monkeypatch):
+    monkeypatch.setenv("OPENAI_BASE_URL", mock_server())
+    monkeypatch.setattr(ai_helpers, "_flights", SingleFlight())
+    monkeypatch.setattr(ai_resilience, "_breaker", ai_resilience.CircuitBreaker())
+    monkeypatch.setattr(rate_limit, "_store", rate_limit.MemoryBucketStore())
+    gpt_client.reset_shared_client()
+    args = argparse.Namespace(
+        sessions=3, requests=2, sections="3,8", explain_share=0.5, stream=True,
+        no_cache=True, think_time=0.0, seed=7,
+    )
+    try:
+        report = load_test.run_load_test(args)
+    finally:
+        gpt_client.reset_shared_client()
+
+    assert report["requests"] == 6 and report["sessions"] == 3
+    assert report["throughput_rps"] > 0
+    assert report["latency_p50_s"] <= report["latency_p95_s"]
+    assert report["ttft_p50_s"] is not None
+    assert report["error_rate"] == 0.0
+    # Every request reached the mock server, or joined one that did
+    assert mock_openai_server.get_mock_stats()["streams"] + report["coalescing"]["coalesced"] == 6
@@ -0,0 +1,69 @@
+# tests/test_model_router.py
+
+import pytest
+
+from purchase_agreement import model_router
+from purchase_agreement.model_router import (
+    MODEL_DEFAULT,
+    MODEL_LARGE,
+    MODEL_SMALL,
+    Route,
+    classify_question,
+    estimate_cost,
+    glossary_answer,
+    route_question,
+)
+
+
+@pytest.mark.parametrize("question", ["What is an APN?", "what's the COE", "Define earnest money", "What are CC&Rs?"])
+def test_glossary_questions_need_no_model(question):
+    assert glossary_answer(question).endswith(model_router.GLOSSARY_NOTE)
+    route = classify_question(question)
+    assert route.name == "glossary" and route.model is None
+
+
+def test_unknown_terms_are_not_answered_from_the_glossary():
+    assert glossary_answer("What is a rent back?") is None
+    assert glossary_answer("What is an APN and who pays the transfer tax?") is None
+
+
+def test_questions_route_by_complexity():
+    assert classify_question("Who pays escrow fees?").model == MODEL_SMALL
+    assert classify_question("How big should my initial deposit be for this house?", section="3").model == MODEL_DEFAULT
+
+    hard = classify_question(
+        "If the seller is in default and I want to cancel, should I go to mediation or "
+        "arbitration, and what about liquidated damages?",
+        section="21-22",
+    )
+    assert hard.name == "complex" and hard.model == MODEL_LARGE
+    assert hard.score >= model_router.COMPLEX_MIN_SCORE
+
+
+def test_pinned_model_and_disabled_router(monkeypatch):
+    assert route_question("Who pays escrow fees?", model="gpt-4.1") == Route(
+        "pinned", "gpt-4.1", 0.0, ["model pinned by caller"]
+    )
+    monkeypatch.setattr(model_router, "ROUTER_ENABLED", False)
+    assert route_question("Who pays escrow fees?").model == MODEL_DEFAULT
+
+
+def test_estimate_cost_bills_cached_tokens_at_the_cached_rate():
+    assert estimate_cost("gpt-4.1-mini", 1_000_000, 0, 0) == pytest.approx(0.40)
+    assert estimate_cost("gpt-4.1-mini", 1_000_000, 1_000_000, 0) == pytest.approx(0.10)
+    assert estimate_cost("gpt-4.1", 0, 0, 1_000_000) == pytest.approx(8.00)
+    assert estimate_cost("unknown-model", 1_000_000, 0, 0) == estimate_cost("gpt-4.1-mini", 1_000_000, 0, 0)
+
+
+def test_router_stats(monkeypatch):
+    monkeypatch.setattr(model_router, "_route_stats", {})
+    for latency in (1.0, 2.0, 3.0):
+        model_router.record_route(Route("standard", MODEL_DEFAULT, 1.0, []), latency, cost_usd=0.01)
+    model_router.record_route(Route("complex", MODEL_LARGE, 3.0, []), 5.0, cost_usd=0.05)
+    model_router.record_route(Route("pinned", "gpt-4.1", 0.0, []), 5.0)
+
+    stats = model_router.get_router_stats()
+    assert stats["routes"]["standard"]["latency_p50_s"] == 2.0
+    assert stats["routes"]["standard"]["avg_cost_usd"] == pytest.approx(0.01)
+    # Pinned calls were not routed, so they don't count toward escalation
+    assert stats["escalation_rate"] == pytest.approx(0.25)
@@ -0,0 +1,105 @@
+# tests/test_models.py
+
+import logging
+from dataclasses import fields
+from datetime import date, time
+
+import pytest
+
+from purchase_agreement import models
+from purchase_agreement.models import (
+    SECTION_MODELS,
+    ClosingAndPossession,
+    FinanceTerms,
+    OfferExpiration,
+    OfferTerms,
+    PurchaseAgreement,
+    RemediesAndDisputes,
+    option_index,
+)
+
+
+@pytest.mark.parametrize("section_id", sorted(SECTION_MODELS))
+def test_every_section_model_is_slotted_with_defaults(section_id):
+    instance = SECTION_MODELS[section_id]()
+    assert not hasattr(instance, "__dict__")
+    with pytest.raises(AttributeError):
+        instance.misspelled_field = 1
+
+
+def test_sections_with_buyer_input_have_models():
+    assert {"1", "2", "3", "4", "6", "7", "8", "9", "14", "15", "21-22", "23-30", "31"} <= set(SECTION_MODELS)
+
+
+def test_round_trip_keeps_values_dates_and_times():
+    agreement = PurchaseAgreement()
+    offer = agreement.section(OfferTerms)
+    offer.buyer_names = "Ana Diaz"
+    offer.purchase_price = 950_000
+    offer.close_date = date(2026, 12, 1)
+    agreement.section(OfferExpiration).expiration_time = time(17, 0)
+    closing = agreement.section(ClosingAndPossession)
+    closing.walkthrough_date = date(2026, 11, 28)
+    closing.seller_possession_rlas = True
+    agreement.section(RemediesAndDisputes).remedies_notes = "Ask about arbitration"
+
+    data = agreement.to_dict()
+    assert data["schema_version"] == models.SCHEMA_VERSION
+    assert data["sections"]["9"]["walkthrough_date"] == "2026-11-28"
+    assert set(data["sections"]) == {"1", "9", "21-22", "31"}
+
+    restored = PurchaseAgreement.from_dict(data)
+    assert restored.to_dict() == data
+    assert restored.section(OfferTerms).close_date == date(2026, 12, 1)
+    assert restored.section(OfferExpiration).expiration_time == time(17, 0)
+    assert restored.section(ClosingAndPossession).seller_possession_rlas is True
+
+
+def test_unknown_sections_and_fields_are_dropped(caplog):
+    data = {
+        "schema_version": 1,
+        "sections": {
+            "3": {"first_loan_amount": 700_000, "retired_field": "x"},
+            "99": {"anything": 1},
+        },
+    }
+    with caplog.at_level(logging.WARNING, logger=models.__name__):
+        agreement = PurchaseAgreement.from_dict(data)
+    assert agreement.section(FinanceTerms).first_loan_amount == 700_000
+    assert agreement.section(FinanceTerms).loan_contingency_days == 21
+    assert "99" not in agreement.sections
+    assert "retired_field" in caplog.text and "'99'" in caplog.text
+
+
+def test_older_schemas_are_migrated_and_newer_ones_refused(monkeypatch):
+    def rename_price(data):
+        section = data["sections"]["1"]
+        section["purchase_price"] = section.pop("price")
+        return data
+
+    monkeypatch.setattr(models, "SCHEMA_VERSION", 2)
+    monkeypatch.setitem(models._MIGRATIONS, 1, rename_price)
+    agreement = PurchaseAgreement.from_dict({"schema_version": 1, "sections": {"1": {"price": 800_000}}})
+    assert agreement.section(OfferTerms).purchase_price == 800_000
+
+    with pytest.raises(ValueError):
+        PurchaseAgreement.from_dict({"schema_version": 3, "sections": {}})
+
+
+def test_option_index():
+    options = ["Buyer", "Seller", "Split"]
+    assert option_index(options, "Seller") == 1
+    assert option_index(options, "Reworded option") == 0
+
+
+def test_model_defaults_are_widget_options():
+    from purchase_agreement import section7_allocation_costs as s7, section9_closing_possession as s9
+
+    costs = models.AllocationOfCosts()
+    for f in fields(costs):
+        if f.name.endswith("_party"):
+            assert getattr(costs, f.name) in s7.PAYER_OPTIONS
+    closing = ClosingAndPossession()
+    assert closing.close_timing == s9.CLOSE_TIMING_OPTIONS[0]
+    assert closing.seller_possession == s9.SELLER_POSSESSION_OPTIONS[0]
+    assert closing.final_verification == s9.FINAL_VERIFICATION_OPTIONS[0]
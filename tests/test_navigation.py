@@ -0,0 +1,63 @@
+# tests/test_navigation.py
+
+from streamlit.testing.v1 import AppTest
+
+
+def _app():
+    import streamlit as st
+
+    from purchase_agreement.navigation import Page, render_pages
+
+    def page(name):
+        def render():
+            runs = st.session_state.setdefault("runs", {})
+            runs[name] = runs.get(name, 0) + 1
+            st.text_input(f"{name} notes", key=f"{name}_notes")
+
+        return Page(name, render)
+
+    render_pages([page("offer"), page("costs"), page("review")])
+
+
+def _started(mode="sections"):
+    at = AppTest.from_function(_app)
+    at.session_state["pa_nav_mode"] = mode
+    return at.run()
+
+
+def test_only_the_active_page_renders():
+    at = _started()
+    assert at.session_state["runs"] == {"offer": 1}
+
+    at.text_input(key="offer_notes").input("cash offer").run()
+    assert at.session_state["runs"] == {"offer": 2}
+
+
+def test_hidden_pages_keep_their_inputs():
+    at = _started()
+    at.text_input(key="offer_notes").input("cash offer").run()
+
+    at.radio(key="pa_nav_page").set_value("costs").run()
+    assert at.session_state["runs"]["costs"] == 1
+    assert [w.key for w in at.text_input] == ["costs_notes"]
+    # Another rerun while the offer page is hidden
+    at.run()
+
+    at.radio(key="pa_nav_page").set_value("offer").run()
+    assert at.text_input(key="offer_notes").value == "cash offer"
+
+
+def test_next_button_moves_to_the_following_page():
+    at = _started()
+    at.button(key="pa_nav_next_0").click().run()
+    assert at.radio(key="pa_nav_page").value == "costs"
+    assert at.session_state["runs"] == {"offer": 1, "costs": 1}
+    # The last page has no "Next" button
+    at.radio(key="pa_nav_page").set_value("review").run()
+    assert not [b for b in at.button if b.key and b.key.startswith("pa_nav_next_")]
+
+
+def test_tabs_mode_renders_every_page():
+    at = _started("tabs")
+    assert at.session_state["runs"] == {"offer": 1, "costs": 1, "review": 1}
+    assert len(at.tabs) == 3
@@ -0,0 +1,67 @@
+# tests/test_prefetch.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from purchase_agreement import prefetch
+from purchase_agreement.explainers import SECTION_EXPLAINERS, explainer_request
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(prefetch, "PREFETCH_ENABLED", True)
+    monkeypatch.setattr(prefetch, "_executor", executor)
+    monkeypatch.setattr(prefetch, "_futures", {})
+    monkeypatch.setattr(prefetch, "_stats", dict.fromkeys(prefetch._stats, 0))
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def test_each_default_explainer_is_warmed_once_per_pass(worker, monkeypatch):
+    release = threading.Event()
+    asked = []
+
+    def fake_call(**request):
+        asked.append(request)
+        release.wait(5)
+        return "answer"
+
+    monkeypatch.setattr(prefetch, "call_purchase_agreement_ai", fake_call)
+    prefetch.prefetch_default_explainers()
+    # A rerun while the first pass is still running adds nothing
+    prefetch.prefetch_default_explainers()
+    stats = prefetch.get_prefetch_stats()
+    assert stats["submitted"] == len(prefetch.PREFETCH_SECTIONS)
+    assert stats["skipped"] == len(prefetch.PREFETCH_SECTIONS)
+
+    release.set()
+    worker.shutdown(wait=True)
+    assert asked == [explainer_request(section) for section in prefetch.PREFETCH_SECTIONS]
+    stats = prefetch.get_prefetch_stats()
+    assert stats["completed"] == len(prefetch.PREFETCH_SECTIONS) and stats["in_flight"] == 0
+
+
+def test_failed_prefetch_is_counted_not_raised(worker, monkeypatch):
+    def down(**request):
+        raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(prefetch, "call_purchase_agreement_ai", down)
+    prefetch.prefetch_default_explainers()
+    worker.shutdown(wait=True)
+    assert prefetch.get_prefetch_stats()["failed"] == len(prefetch.PREFETCH_SECTIONS)
+
+
+def test_disabled_prefetch_submits_nothing(worker, monkeypatch):
+    monkeypatch.setattr(prefetch, "PREFETCH_ENABLED", False)
+    prefetch.prefetch_default_explainers()
+    assert prefetch.get_prefetch_stats()["submitted"] == 0
+
+
+def test_prefetched_sections_have_explainers():
+    for section in prefetch.PREFETCH_SECTIONS:
+        request = explainer_request(section)
+        assert request["section"] == section
+        assert request["system_override"] == SECTION_EXPLAINERS[section]
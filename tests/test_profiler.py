@@ -0,0 +1,111 @@
+# tests/test_profiler.py
+
+import csv
+import io
+import json
+
+import pytest
+
+from purchase_agreement import profiler
+from purchase_agreement.profiler import (
+    EXPORT_COLUMNS,
+    export_profile_csv,
+    export_profile_json,
+    get_profile_report,
+    profile_span,
+    profiled,
+)
+
+
+class Clock:
+    """
+    Stand-in for time.perf_counter that only moves when told to.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(profiler, "PROFILER_ENABLED", True)
+    monkeypatch.setattr(profiler, "_spans", {})
+    monkeypatch.setattr(profiler.time, "perf_counter", clock)
+    return clock
+
+
+def _rows():
+    return {row["name"]: row for row in get_profile_report()}
+
+
+def test_nested_spans_report_total_and_self_time(clock):
+    with profile_span("section_3"):
+        clock.now += 0.010
+        with profile_span("ai_call", kind="ai"):
+            clock.now += 0.040
+        clock.now += 0.005
+
+    rows = _rows()
+    assert rows["ai_call"]["kind"] == "ai"
+    assert rows["ai_call"]["p50_ms"] == pytest.approx(40.0)
+    assert rows["section_3"]["p50_ms"] == pytest.approx(55.0)
+    assert rows["section_3"]["self_p50_ms"] == pytest.approx(15.0)
+    # Slowest p95 first
+    assert [row["name"] for row in get_profile_report()] == ["section_3", "ai_call"]
+
+
+def test_percentiles_and_errors_per_span(clock):
+    @profiled(kind="pdf")
+    def build_pdf(ms, fail=False):
+        clock.now += ms / 1000
+        if fail:
+            raise ValueError("bad field")
+
+    for ms in range(1, 21):
+        build_pdf(ms)
+    with pytest.raises(ValueError):
+        build_pdf(100, fail=True)
+
+    row = _rows()["build_pdf"]
+    assert row["kind"] == "pdf" and row["count"] == 21 and row["errors"] == 1
+    assert row["max_ms"] == pytest.approx(100.0)
+    assert row["p50_ms"] < row["p95_ms"] <= row["max_ms"]
+
+
+def test_reruns_are_not_counted_as_errors(clock):
+    class RerunException(Exception):
+        pass
+
+    with pytest.raises(RerunException):
+        with profile_span("section_1"):
+            raise RerunException()
+    assert _rows()["section_1"]["errors"] == 0
+
+
+def test_disabled_profiler_records_nothing(clock, monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILER_ENABLED", False)
+    with profile_span("section_3"):
+        clock.now += 1
+    assert get_profile_report() == []
+
+
+def test_exports_carry_every_column(clock):
+    with profile_span("section_3"):
+        clock.now += 0.002
+
+    exported = json.loads(export_profile_json())
+    assert set(exported) == {"generated_at", "trace_malloc", "samples_per_span", "spans"}
+    assert exported["spans"] == get_profile_report()
+
+    rows = list(csv.DictReader(io.StringIO(export_profile_csv())))
+    assert tuple(rows[0]) == EXPORT_COLUMNS
+    assert rows[0]["name"] == "section_3" and float(rows[0]["p50_ms"]) == pytest.approx(2.0)
+
+
+def test_admin_panel_needs_a_token(monkeypatch):
+    monkeypatch.setattr(profiler, "ADMIN_TOKEN", "")
+    assert not profiler.is_admin()
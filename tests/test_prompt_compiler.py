@@ -0,0 +1,55 @@
+# tests/test_prompt_compiler.py
+
+import pytest
+
+from purchase_agreement import prompt_compiler
+from purchase_agreement.prompt_compiler import compile_prefix, get_prompt_compiler_stats
+
+PERSONA = "You are a helpful California real estate agent."
+
+
+@pytest.fixture(autouse=True)
+def fresh_compiler(monkeypatch):
+    monkeypatch.setattr(prompt_compiler, "_compiled", prompt_compiler.OrderedDict())
+    monkeypatch.setattr(prompt_compiler, "_stats", {"compiles": 0, "hits": 0, "compile_s_total": 0.0})
+    monkeypatch.setattr(prompt_compiler, "_per_call", {"bytes": 0, "cpu_s": 0.0})
+
+
+def test_one_compile_per_knowledge_version():
+    first = compile_prefix(PERSONA, "v1", ["Deposit: 3%.", "Escrow: 30 days."])
+    again = compile_prefix(PERSONA, "v1", ["chunks are not read again"])
+    assert again is first
+    assert first.message == {"role": "system", "content": first.text}
+    assert first.text.startswith(PERSONA) and "Deposit: 3%.\n\n---\n\nEscrow: 30 days." in first.text
+
+    stats = get_prompt_compiler_stats(requests_per_day=1000)
+    assert stats["compiles"] == 1 and stats["hits"] == 1
+    assert stats["knowledge_hash"] == "v1"
+    assert stats["saved_bytes_total"] == len(first.text.encode("utf-8"))
+    assert stats["projected_per_day"]["bytes_not_copied"] == 1000 * stats["saved_bytes_per_call"]
+
+
+def test_new_versions_and_retrieval_mode_compile_separately():
+    inline = compile_prefix(PERSONA, "v1", ["Deposit: 3%."])
+    retrieval = compile_prefix(PERSONA, "v1")
+    assert retrieval is not inline
+    assert retrieval.text == PERSONA
+
+    newer = compile_prefix(PERSONA, "v2", ["Deposit: 2%."])
+    assert newer.digest != inline.digest
+    assert get_prompt_compiler_stats()["knowledge_hash"] == "v2"
+
+
+def test_old_versions_are_evicted(monkeypatch):
+    monkeypatch.setattr(prompt_compiler, "MAX_COMPILED_VERSIONS", 2)
+    oldest = compile_prefix(PERSONA, "v1", ["a"])
+    compile_prefix(PERSONA, "v2", ["b"])
+    compile_prefix(PERSONA, "v3", ["c"])
+    assert len(prompt_compiler._compiled) == 2
+    assert compile_prefix(PERSONA, "v1", ["a"]) is not oldest
+
+
+def test_token_counts_are_memoized_per_model(monkeypatch):
+    compiled = compile_prefix(PERSONA, "v1", ["Deposit: 3%."])
+    monkeypatch.setattr(prompt_compiler, "count_tokens", lambda text, model: pytest.fail("recounted"))
+    assert compiled.tokens("gpt-4.1-mini") > 0
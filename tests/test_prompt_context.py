@@ -0,0 +1,96 @@
+# tests/test_prompt_context.py
+
+import json
+
+import pytest
+
+from gpt_client import ChatResult
+from purchase_agreement import ai_helpers, prompt_context
+from purchase_agreement.prompt_context import (
+    CONTEXT_PREAMBLE,
+    build_section_context,
+    get_prompt_size_stats,
+    record_prompt_size,
+    register_section_context,
+)
+
+USAGE = {"prompt_tokens": 100, "cached_tokens": 0, "completion_tokens": 20}
+STATE = {
+    "is_all_cash": False,
+    "first_loan_amount": 800000,
+    "has_second_loan": False,
+    "second_loan_amount": 0,
+    "second_loan_type": "Conventional",
+    "show_help": True,
+    "notes": "",
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(
+        prompt_context,
+        "_stats",
+        {"calls": 0, "prompt_tokens_after": 0, "sampled_calls": 0, "context_tokens_before": 0, "context_tokens_after": 0},
+    )
+    monkeypatch.setattr(prompt_context, "_SECTION_PROFILES", {})
+
+
+def _fields(context):
+    assert context.startswith(CONTEXT_PREAMBLE)
+    return json.loads(context[len(CONTEXT_PREAMBLE):])
+
+
+def test_defaults_ui_fields_and_gated_fields_are_left_out():
+    register_section_context(
+        "3",
+        defaults={"is_all_cash": False},
+        ignore={"show_help"},
+        gates=[("has_second_loan", False, ("second_loan_",))],
+    )
+    assert _fields(build_section_context("3", STATE)) == {"first_loan_amount": 800000, "has_second_loan": False}
+    assert build_section_context("3", {"is_all_cash": False}) == ""
+    assert build_section_context("3", None) == ""
+
+
+def test_context_is_trimmed_to_the_models_budget(monkeypatch):
+    monkeypatch.setitem(prompt_context.SECTION_CONTEXT_BUDGETS, "tiny-model", 20)
+    state = {f"field_{i}": "x" * 30 for i in range(10)}
+    fields = _fields(build_section_context("9", state, model="tiny-model"))
+    assert list(fields)[:-1] == [f"field_{i}" for i in range(len(fields) - 1)]
+    assert fields["_omitted_fields"] == 10 - (len(fields) - 1)
+
+
+def test_only_sampled_calls_build_the_legacy_dump(monkeypatch):
+    monkeypatch.setattr(prompt_context, "PROMPT_SIZE_SAMPLE_EVERY", 3)
+    dumps = []
+    real_dumps = json.dumps
+    monkeypatch.setattr(prompt_context.json, "dumps", lambda *a, **k: dumps.append(k) or real_dumps(*a, **k))
+
+    messages = [{"role": "system", "content": "x" * 40}, {"role": "user", "content": "y" * 40}]
+    for _ in range(6):
+        assert record_prompt_size(messages, section="3", section_state=STATE) == 20
+
+    stats = get_prompt_size_stats()
+    assert stats["calls"] == 6 and stats["sampled_calls"] == 2
+    assert sum(1 for k in dumps if k.get("indent") == 2) == 2
+    assert stats["avg_prompt_tokens_after"] == 20
+    assert stats["avg_prompt_tokens_before"] > 20
+    assert stats["exact_token_counts"] in (True, False)
+
+
+def test_prompts_built_only_for_cache_keys_are_not_counted(monkeypatch):
+    monkeypatch.setattr(ai_helpers, "get_response_cache", lambda: None)
+    monkeypatch.setattr(ai_helpers, "get_openai_client", lambda: None)
+    monkeypatch.setattr(
+        ai_helpers,
+        "complete_chat",
+        lambda messages, model, temperature, timeout: ChatResult("ok", model, dict(USAGE), 0.1),
+    )
+    question = "How large should my initial deposit be for this house?"
+    ai_helpers.request_cache_key(question, section="3", model="gpt-4.1-mini")
+    ai_helpers._fallback_answer("3")
+    assert get_prompt_size_stats()["calls"] == 0
+
+    ai_helpers.call_purchase_agreement_ai(question, section="3", model="gpt-4.1-mini", use_cache=False)
+    assert get_prompt_size_stats()["calls"] == 1
@@ -0,0 +1,122 @@
+# tests/test_rate_limit.py
+
+import sqlite3
+import time
+
+import pytest
+
+from purchase_agreement import rate_limit
+from purchase_agreement.rate_limit import (
+    Bucket,
+    MemoryBucketStore,
+    RateLimitExceeded,
+    SQLiteBucketStore,
+    acquire_ai_call,
+    release_ai_call,
+)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = MemoryBucketStore()
+    monkeypatch.setattr(rate_limit, "_store", store)
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "SESSION_REQUESTS_PER_MIN", 2.0)
+    monkeypatch.setattr(rate_limit, "GLOBAL_REQUESTS_PER_MIN", 100.0)
+    return store
+
+
+def test_memory_store_is_all_or_nothing():
+    store = MemoryBucketStore()
+    small = Bucket("small", 1, 0.0, 1, "session")
+    big = Bucket("big", 10, 0.0, 1, "global")
+    assert store.acquire([small, big]) is None
+
+    blocked, wait = store.acquire([small, big])
+    assert blocked is small
+    assert wait == float("inf")
+    # The failed acquire did not charge the other bucket
+    assert store._levels["big"][0] == 9
+
+
+def test_session_limit_raises_with_session_scope(store):
+    acquire_ai_call(10, session_id="a")
+    acquire_ai_call(10, session_id="a")
+    with pytest.raises(RateLimitExceeded) as exc:
+        acquire_ai_call(10, session_id="a")
+    assert exc.value.scope == "session"
+    assert exc.value.retry_after > 0
+
+    # Another session still has its own budget
+    acquire_ai_call(10, session_id="b")
+
+
+def test_scope_charges_only_that_pair_of_buckets(store):
+    acquire_ai_call(10, session_id="a", scope="session")
+    assert not any(key.startswith("global:") for key in store._levels)
+
+    acquire_ai_call(10, session_id="a", scope="global")
+    assert store._levels["session:a:requests"][0] == pytest.approx(1.0, abs=0.01)
+    assert store._levels["global:requests"][0] == pytest.approx(99.0, abs=0.01)
+
+
+@pytest.mark.parametrize("make_store", [MemoryBucketStore, None], ids=["memory", "sqlite"])
+def test_release_gives_back_up_to_capacity(make_store, tmp_path):
+    store = make_store() if make_store else SQLiteBucketStore(tmp_path / "buckets.sqlite3")
+    bucket = Bucket("session:a:requests", 2, 0.0, 1, "session")
+    assert store.acquire([bucket]) is None
+    assert store.acquire([bucket]) is None
+    assert store.acquire([bucket]) is not None
+
+    store.release([bucket])
+    assert store.acquire([bucket]) is None
+    store.release([bucket])
+    store.release([bucket])
+    store.release([bucket])
+    # Never more than a full bucket
+    assert store.acquire([Bucket(bucket.key, 2, 0.0, 2, "session")]) is None
+    assert store.acquire([bucket]) is not None
+
+
+def test_refunded_session_charge_can_be_used_again(store):
+    acquire_ai_call(10, session_id="a", scope="session")
+    acquire_ai_call(10, session_id="a", scope="session")
+    release_ai_call(10, session_id="a", scope="session")
+    acquire_ai_call(10, session_id="a", scope="session")
+    with pytest.raises(RateLimitExceeded):
+        acquire_ai_call(10, session_id="a", scope="session")
+    assert rate_limit.get_rate_limit_stats()["refunded"] >= 1
+
+
+@pytest.mark.parametrize("make_store", [MemoryBucketStore, None], ids=["memory", "sqlite"])
+def test_buckets_that_refilled_completely_are_pruned(make_store, tmp_path):
+    if make_store is None:
+        store = SQLiteBucketStore(tmp_path / "buckets.sqlite3", prune_interval_s=0)
+    else:
+        store = make_store(prune_interval_s=0)
+
+    idle = Bucket("session:idle:requests", 1, 5.0, 1, "session")  # full again after 0.2 s
+    busy = Bucket("session:busy:requests", 5, 5 / 60, 1, "session")
+    assert store.acquire([idle]) is None
+    assert store.acquire([busy]) is None
+    assert len(store) == 2
+
+    time.sleep(0.3)
+    assert store.acquire([busy]) is None
+    # Only the bucket that is back at capacity is gone; the other keeps its level
+    assert len(store) == 1
+    blocked = store.acquire([Bucket(busy.key, 5, 5 / 60, 4, "session")])
+    assert blocked is not None and blocked[0].key == busy.key
+
+
+def test_sqlite_store_upgrades_files_without_full_at(tmp_path):
+    path = tmp_path / "old.sqlite3"
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+    conn.execute("INSERT INTO buckets VALUES ('session:old:requests', 0, ?)", (time.time() - 7200,))
+    conn.commit()
+    conn.close()
+
+    store = SQLiteBucketStore(path, prune_interval_s=0)
+    assert store.acquire([Bucket("global:requests", 10, 1.0, 1, "global")]) is None
+    assert len(store) == 1
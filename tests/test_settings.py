@@ -0,0 +1,71 @@
+# tests/test_settings.py
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from purchase_agreement.settings import env_flag, env_float, env_int, percentile
+
+
+def test_env_numbers_fall_back_on_missing_or_malformed_values(monkeypatch):
+    monkeypatch.delenv("PA_TEST_KNOB", raising=False)
+    assert env_int("PA_TEST_KNOB", 7) == 7
+    assert env_float("PA_TEST_KNOB", 1.5) == 1.5
+
+    monkeypatch.setenv("PA_TEST_KNOB", "12")
+    assert env_int("PA_TEST_KNOB", 7) == 12
+    assert env_float("PA_TEST_KNOB", 1.5) == 12.0
+
+    for bad in ("", "abc", "6k"):
+        monkeypatch.setenv("PA_TEST_KNOB", bad)
+        assert env_int("PA_TEST_KNOB", 7) == 7
+        assert env_float("PA_TEST_KNOB", 1.5) == 1.5
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(None, True), ("1", True), ("yes", True), ("0", False), ("false", False), ("False", False), (" off ", False)],
+)
+def test_env_flag(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("PA_TEST_FLAG", raising=False)
+    else:
+        monkeypatch.setenv("PA_TEST_FLAG", value)
+    assert env_flag("PA_TEST_FLAG") is expected
+
+
+def test_percentile():
+    assert percentile([], 50) is None
+    assert percentile([3.0], 95) == 3.0
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 51.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(list(reversed(values)), 100) == 100.0
+
+
+def test_malformed_settings_do_not_break_imports():
+    env = dict(
+        os.environ,
+        KNOWLEDGE_STATIC_MAX_TOKENS="6k",
+        KNOWLEDGE_CHUNK_TOKENS="lots",
+        RATE_LIMIT_SESSION_RPM="",
+        AI_CONVERSATION_WINDOW_TURNS="three",
+        GENERIC_CHAT_MAX_TOKENS="x",
+    )
+    code = (
+        "import core.chat_utils, purchase_agreement.conversations as c, purchase_agreement.ai_helpers as a; "
+        "print(a.KNOWLEDGE_STATIC_MAX_TOKENS, c.WINDOW_TURNS)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parent.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["6000", "3"]
@@ -0,0 +1,75 @@
+# tests/test_single_flight.py
+
+import threading
+
+import pytest
+
+from purchase_agreement.single_flight import Flight, SingleFlight
+
+
+def test_concurrent_identical_calls_run_once():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "answer"
+
+    results = []
+
+    def call():
+        results.append(flights.do("key", slow, timeout=5))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert started.wait(5)
+    waiters = [threading.Thread(target=call) for _ in range(4)]
+    for t in waiters:
+        t.start()
+    # Waiters register before the leader is released
+    while flights.get_stats()["coalesced"] < 4:
+        pass
+    release.set()
+    for t in [leader] + waiters:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert sorted(results) == [("answer", False)] + [("answer", True)] * 4
+    stats = flights.get_stats()
+    assert stats["leaders"] == 1 and stats["in_flight"] == 0
+    assert stats["coalesced_rate"] == pytest.approx(0.8)
+
+
+def test_leader_error_reaches_waiters_and_next_call_starts_fresh():
+    flights = SingleFlight()
+    flight, leader = flights.begin("key")
+    joined, joined_leader = flights.begin("key")
+    assert leader and not joined_leader and joined is flight
+
+    flights.finish(flight, error=ValueError("upstream failed"))
+    with pytest.raises(ValueError):
+        joined.wait(1)
+    assert flights.get_stats()["failures"] == 1
+
+    assert flights.do("key", lambda: "fresh") == ("fresh", False)
+
+
+def test_finishing_a_stale_flight_keeps_the_newer_one():
+    flights = SingleFlight()
+    old, _ = flights.begin("key")
+    flights.finish(old, result="old")
+    new, leader = flights.begin("key")
+    assert leader
+
+    flights.finish(old, result="again")
+    assert flights.get_stats()["in_flight"] == 1
+    assert flights.begin("key")[0] is new
+
+
+def test_wait_times_out():
+    with pytest.raises(TimeoutError):
+        Flight("key").wait(0.01)
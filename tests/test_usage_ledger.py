@@ -0,0 +1,82 @@
+# tests/test_usage_ledger.py
+
+import time
+
+import pytest
+
+from purchase_agreement import usage_ledger
+from purchase_agreement.usage_ledger import UsageLedger, estimate_usage, record_call
+
+
+def _row(**overrides):
+    row = {
+        "session_id": "s1",
+        "section": "3",
+        "model": "gpt-4.1-mini",
+        "route": "standard",
+        "streamed": True,
+        "prompt_tokens": 1000,
+        "cached_tokens": 200,
+        "completion_tokens": 100,
+        "latency_s": 1.0,
+        "ttft_s": 0.2,
+        "cost_usd": 0.01,
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return UsageLedger(tmp_path / "usage.sqlite3")
+
+
+def test_aggregate_groups_and_orders_by_cost(ledger):
+    ledger.append(_row())
+    ledger.append(_row(latency_s=3.0, cost_usd=0.02))
+    ledger.append(_row(section="14", session_id="s2", cost_usd=0.5))
+
+    by_section = ledger.aggregate(("section",))
+    assert [r["section"] for r in by_section] == ["14", "3"]
+    three = by_section[1]
+    assert three["calls"] == 2
+    assert three["prompt_tokens"] == 2000 and three["cached_tokens"] == 400
+    assert three["cost_usd"] == pytest.approx(0.03)
+    assert three["avg_latency_s"] == pytest.approx(2.0) and three["max_latency_s"] == 3.0
+
+    by_both = ledger.aggregate(("section", "session_id"))
+    assert {(r["section"], r["session_id"]) for r in by_both} == {("3", "s1"), ("14", "s2")}
+
+
+def test_aggregate_since_and_day(ledger):
+    now = time.time()
+    ledger.append(_row(ts=now - 3 * 86400))
+    ledger.append(_row(ts=now))
+
+    assert ledger.aggregate(("section",), since=now - 60)[0]["calls"] == 1
+    assert len(ledger.aggregate(("day",))) == 2
+
+
+def test_aggregate_rejects_unknown_columns(ledger):
+    with pytest.raises(ValueError):
+        ledger.aggregate(("section; DROP TABLE usage",))
+    with pytest.raises(ValueError):
+        ledger.aggregate(())
+
+
+def test_record_call_never_raises(monkeypatch):
+    class Broken:
+        def append(self, row):
+            raise RuntimeError("disk full")
+
+    monkeypatch.setattr(usage_ledger, "get_usage_ledger", lambda: Broken())
+    record_call(**_row())
+
+
+def test_estimate_usage_counts_prompt_and_partial_answer():
+    messages = [{"role": "system", "content": "x" * 400}, {"role": "user", "content": "y" * 40}]
+    usage = estimate_usage(messages, "z" * 80, "gpt-4.1-mini")
+    assert usage["cached_tokens"] == 0
+    assert usage["prompt_tokens"] >= 100
+    assert 0 < usage["completion_tokens"] < usage["prompt_tokens"]
+    assert estimate_usage(messages, "", "gpt-4.1-mini")["completion_tokens"] == 0
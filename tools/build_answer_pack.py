@@ -0,0 +1,181 @@
+# tools/build_answer_pack.py
+
+"""
+Precompute the "Explain this section" answers and write them to the answer
+pack shipped with the app (purchase_agreement/answer_pack.json).
+
+Only sections whose request changed since the last build (prompt, knowledge
+base, model or temperature, all captured by the cache key) are regenerated.
+
+    # against the real API (needs OPENAI_API_KEY)
+    python -m tools.build_answer_pack
+
+    # against a mock server started in-process, e.g. to check the pipeline
+    python -m tools.build_answer_pack --mock --output /tmp/answer_pack.json
+
+Deploying: the pack is a build artifact, like the dense knowledge index.
+Run the build whenever the knowledge base, an explainer prompt or the
+routed model changes, and commit or bundle the resulting answer_pack.json
+with the release. In the release pipeline, gate on
+
+    python -m tools.build_answer_pack --check
+
+which makes no API calls and exits non-zero when the pack is missing or
+any entry no longer matches its request. Without a pack every explainer
+is a live API call, and an open circuit breaker falls back to the short
+canned overviews.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List
+
+from tools.mock_openai_server import add_mock_arguments, settings_from_args, start_mock_server
+
+
+def _generate(section: str) -> Dict[str, Any]:
+    from purchase_agreement.ai_helpers import (
+        BACKEND_ERROR_PREFIX,
+        SERVICE_UNAVAILABLE_TEXT,
+        call_purchase_agreement_ai,
+        request_cache_key,
+    )
+    from purchase_agreement.explainers import explainer_request
+    from purchase_agreement.model_router import route_question
+
+    request = explainer_request(section)
+    route = route_question(request["user_prompt"], section, None, request["system_override"])
+    answer = call_purchase_agreement_ai(**request, use_cache=False)
+    if answer.lstrip().startswith((BACKEND_ERROR_PREFIX, SERVICE_UNAVAILABLE_TEXT)):
+        raise RuntimeError(answer.strip())
+    return {
+        "key": request_cache_key(**request),
+        "model": route.model,
+        "question": request["user_prompt"],
+        "answer": answer,
+    }
+
+
+def build_pack(
+    sections: List[str],
+    output: Path,
+    force: bool = False,
+    workers: int = 4,
+) -> Dict[str, Any]:
+    """
+    Regenerate stale entries in parallel and rewrite the pack. Entries whose
+    key still matches are kept as they are; a failed section keeps no entry.
+    """
+    from purchase_agreement.ai_helpers import request_cache_key
+    from purchase_agreement.answer_pack import load_pack, write_pack
+    from purchase_agreement.explainers import explainer_request
+
+    old_entries = load_pack(output).get("entries", {})
+    # Sections outside this build are carried over untouched
+    entries: Dict[str, Dict[str, Any]] = {s: e for s, e in old_entries.items() if s not in sections}
+    stale: List[str] = []
+    for section in sections:
+        old = old_entries.get(section)
+        if not force and old and old.get("key") == request_cache_key(**explainer_request(section)):
+            entries[section] = old
+        else:
+            stale.append(section)
+
+    failed: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="pa-pack") as pool:
+        futures = {section: pool.submit(_generate, section) for section in stale}
+        for section, future in futures.items():
+            try:
+                entries[section] = future.result()
+            except Exception as e:
+                failed[section] = str(e)
+
+    pack = write_pack(entries, output)
+    return {
+        "version": pack["version"],
+        "kept": sorted(set(sections) - set(stale)),
+        "regenerated": sorted(set(stale) - set(failed)),
+        "failed": failed,
+    }
+
+
+def stale_sections(sections: List[str], path: Path) -> List[str]:
+    """
+    Sections whose pack entry is missing or keyed on an older request.
+    """
+    from purchase_agreement.ai_helpers import request_cache_key
+    from purchase_agreement.answer_pack import load_pack
+    from purchase_agreement.explainers import explainer_request
+
+    entries = load_pack(path).get("entries", {})
+    return [
+        section
+        for section in sections
+        if entries.get(section, {}).get("key") != request_cache_key(**explainer_request(section))
+    ]
+
+
+def main(argv: List[str]) -> int:
+    from purchase_agreement.answer_pack import PACK_PATH
+
+    parser = argparse.ArgumentParser(description="Build the static answer pack for section explainers")
+    parser.add_argument("--sections", help="comma-separated section ids (default: every explainer)")
+    parser.add_argument("--output", type=Path, default=PACK_PATH)
+    parser.add_argument("--force", action="store_true", help="regenerate every entry")
+    parser.add_argument("--check", action="store_true", help="only report stale entries; exit 1 if there are any")
+    parser.add_argument("--workers", type=int, default=4, help="parallel API calls")
+    parser.add_argument("--base-url", help="OpenAI-compatible endpoint (default: OPENAI_BASE_URL or the real API)")
+    parser.add_argument("--mock", action="store_true", help="start a mock server in-process and build against it")
+    add_mock_arguments(parser)
+    args = parser.parse_args(argv)
+
+    # Must be set before the AI modules read their settings: build from a
+    # clean cache, without the pack we are rebuilding, and without limits.
+    os.environ["AI_CACHE_DIR"] = tempfile.mkdtemp(prefix="pa-pack-")
+    os.environ["ANSWER_PACK_ENABLED"] = "0"
+    os.environ["FAQ_CACHE_ENABLED"] = "0"
+    os.environ["RATE_LIMIT_ENABLED"] = "0"
+    os.environ["AI_PREFETCH_ENABLED"] = "0"
+
+    server = None
+    if args.mock:
+        server = start_mock_server(settings=settings_from_args(args))
+        os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+        os.environ["OPENAI_API_KEY"] = "mock"
+    elif args.base_url:
+        os.environ["OPENAI_BASE_URL"] = args.base_url
+
+    from purchase_agreement.explainers import SECTION_EXPLAINERS
+
+    sections = args.sections.split(",") if args.sections else list(SECTION_EXPLAINERS)
+    unknown = [s for s in sections if s not in SECTION_EXPLAINERS]
+    if unknown:
+        parser.error(f"no explainer for section(s) {', '.join(unknown)}")
+
+    if args.check:
+        stale = stale_sections(sections, args.output)
+        for section in stale:
+            print(f"stale        {section}")
+        print(f"answer pack {args.output}: {len(sections) - len(stale)}/{len(sections)} entries current")
+        return 1 if stale else 0
+
+    try:
+        result = build_pack(sections, args.output, force=args.force, workers=args.workers)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    print(f"answer pack {result['version']} → {args.output}")
+    print(f"  kept         {', '.join(result['kept']) or '-'}")
+    print(f"  regenerated  {', '.join(result['regenerated']) or '-'}")
+    for section, error in result["failed"].items():
+        print(f"  failed       {section}: {error}")
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,236 @@
+# tools/load_test.py
+
+"""
+Drive the Purchase Agreement AI helpers with N concurrent sessions and
+report throughput, latency percentiles and error rate.
+
+    # against a mock server started in-process (no API budget used)
+    python -m tools.load_test --sessions 20 --requests 10 --latency lognormal:0.8,0.4 --error-rate 0.05
+
+    # against an already-running server
+    python -m tools.load_test --base-url http://127.0.0.1:8765/v1 --stream
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from tools.mock_openai_server import add_mock_arguments, get_mock_stats, settings_from_args, start_mock_server
+
+from purchase_agreement.settings import percentile
+
+
+# ------------------------------
+# 1. Workload
+# ------------------------------
+
+SAMPLE_QUESTIONS: Dict[str, List[str]] = {
+    "3": [
+        "How big should my initial deposit be?",
+        "Should I waive the appraisal contingency?",
+        "What does an all-cash offer need for proof of funds?",
+        "How long is a typical loan contingency?",
+    ],
+    "8": [
+        "What does as-is mean in California?",
+        "Can I still ask for repairs after inspections?",
+        "Is a credit better than seller repairs?",
+    ],
+    "14": [
+        "How are contingency days counted?",
+        "What is a Notice to Buyer to Perform?",
+        "When can the seller cancel?",
+    ],
+    "15": [
+        "What does time is of the essence mean?",
+        "What happens if a deadline lands on a weekend?",
+    ],
+}
+
+
+# ------------------------------
+# 2. Sessions
+# ------------------------------
+
+def _run_session(
+    session_id: int,
+    args: argparse.Namespace,
+    results: List[Dict[str, Any]],
+    results_lock: threading.Lock,
+) -> None:
+    from purchase_agreement.ai_helpers import (
+        BACKEND_ERROR_PREFIX,
+        SERVICE_UNAVAILABLE_TEXT,
+        call_purchase_agreement_ai,
+        stream_purchase_agreement_ai,
+    )
+    from purchase_agreement.explainers import explainer_request
+    from purchase_agreement.rate_limit import RateLimitExceeded
+
+    rng = random.Random(args.seed + session_id)
+    sections = [s for s in args.sections.split(",") if s in SAMPLE_QUESTIONS]
+
+    for _ in range(args.requests):
+        section = rng.choice(sections)
+        if rng.random() < args.explain_share:
+            request = explainer_request(section)
+        else:
+            request = {"user_prompt": rng.choice(SAMPLE_QUESTIONS[section]), "section": section}
+        request["use_cache"] = not args.no_cache
+
+        started = time.perf_counter()
+        ttft = None
+        limited = False
+        try:
+            if args.stream:
+                parts = []
+                for part in stream_purchase_agreement_ai(**request):
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    parts.append(part)
+                answer = "".join(parts)
+            else:
+                answer = call_purchase_agreement_ai(**request)
+        except RateLimitExceeded:
+            answer, limited = "", True
+        elapsed = time.perf_counter() - started
+
+        error = limited or (answer or "").lstrip().startswith((BACKEND_ERROR_PREFIX, SERVICE_UNAVAILABLE_TEXT))
+        with results_lock:
+            results.append(
+                {"section": section, "latency_s": elapsed, "ttft_s": ttft, "error": error, "limited": limited}
+            )
+
+        if args.think_time:
+            time.sleep(rng.uniform(0, args.think_time))
+
+
+def run_load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    results_lock = threading.Lock()
+    threads = [
+        threading.Thread(target=_run_session, args=(i, args, results, results_lock), name=f"session-{i}")
+        for i in range(args.sessions)
+    ]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall_s = time.perf_counter() - started
+
+    latencies = [r["latency_s"] for r in results]
+    ttfts = [r["ttft_s"] for r in results if r["ttft_s"] is not None]
+    errors = sum(1 for r in results if r["error"])
+
+    report: Dict[str, Any] = {
+        "sessions": args.sessions,
+        "requests": len(results),
+        "wall_s": wall_s,
+        "throughput_rps": (len(results) / wall_s) if wall_s else 0.0,
+        "error_rate": (errors / len(results)) if results else 0.0,
+        "rate_limited": sum(1 for r in results if r["limited"]),
+        "latency_p50_s": percentile(latencies, 50),
+        "latency_p95_s": percentile(latencies, 95),
+        "latency_p99_s": percentile(latencies, 99),
+    }
+    if args.stream:
+        report["ttft_p50_s"] = percentile(ttfts, 50)
+        report["ttft_p95_s"] = percentile(ttfts, 95)
+        report["ttft_p99_s"] = percentile(ttfts, 99)
+
+    from gpt_client import get_pool_stats, get_request_stats
+    from purchase_agreement.ai_cache import get_cache_stats
+    from purchase_agreement.ai_helpers import get_coalescing_stats
+    from purchase_agreement.ai_resilience import get_resilience_stats
+    from purchase_agreement.model_router import get_router_stats
+    from purchase_agreement.usage_ledger import cost_by_section
+
+    report["coalescing"] = get_coalescing_stats()
+    report["resilience"] = get_resilience_stats()
+    report["router"] = get_router_stats()
+    report["pool"] = get_pool_stats()
+    report["client"] = get_request_stats()
+    report["cache"] = get_cache_stats()
+    report["cost_by_section"] = cost_by_section()
+    return report
+
+
+# ------------------------------
+# 3. Entry point
+# ------------------------------
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the Purchase Agreement AI helpers")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent sessions")
+    parser.add_argument("--requests", type=int, default=5, help="requests per session")
+    parser.add_argument("--sections", default="3,8,14,15")
+    parser.add_argument("--explain-share", type=float, default=0.3, help="share of 'Explain this section' requests")
+    parser.add_argument("--stream", action="store_true", help="use the streaming helper and report TTFT")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the response cache")
+    parser.add_argument("--keep-cache", action="store_true", help="use the real .cache dir instead of a temp one")
+    parser.add_argument("--think-time", type=float, default=0.0, help="max random pause between requests (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--base-url", help="OpenAI-compatible endpoint; default starts a mock server in-process")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    add_mock_arguments(parser)
+    args = parser.parse_args(argv)
+
+    # Must be set before the AI modules read their settings.
+    if not args.keep_cache:
+        os.environ["AI_CACHE_DIR"] = tempfile.mkdtemp(prefix="pa-loadtest-")
+    os.environ.setdefault("AI_PREFETCH_ENABLED", "0")
+
+    server = None
+    if args.base_url:
+        os.environ["OPENAI_BASE_URL"] = args.base_url
+    else:
+        server = start_mock_server(settings=settings_from_args(args))
+        os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+        os.environ["OPENAI_API_KEY"] = "mock"
+
+    report = run_load_test(args)
+    if server is not None:
+        report["upstream"] = get_mock_stats()
+        server.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+        return 0
+
+    def fmt(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value * 1000:.0f} ms"
+
+    print(f"{report['requests']} requests from {report['sessions']} sessions in {report['wall_s']:.1f}s")
+    print(f"  throughput   {report['throughput_rps']:.1f} req/s")
+    print(f"  error rate   {report['error_rate']:.1%} ({report['rate_limited']} rate limited)")
+    print(
+        f"  latency      p50 {fmt(report['latency_p50_s'])}  "
+        f"p95 {fmt(report['latency_p95_s'])}  p99 {fmt(report['latency_p99_s'])}"
+    )
+    if args.stream:
+        print(
+            f"  first token  p50 {fmt(report['ttft_p50_s'])}  "
+            f"p95 {fmt(report['ttft_p95_s'])}  p99 {fmt(report['ttft_p99_s'])}"
+        )
+    coalescing = report["coalescing"]
+    print(f"  coalesced    {coalescing['coalesced']} of {coalescing['leaders'] + coalescing['coalesced']}")
+    print(f"  breaker      {report['resilience']['breaker']['state']} {report['resilience']['breaker']['transitions']}")
+    routes = report["router"]["routes"]
+    print("  routes       " + ", ".join(f"{name} {r['requests']}" for name, r in sorted(routes.items())))
+    total_cost = sum(row["cost_usd"] or 0.0 for row in report["cost_by_section"])
+    print(f"  est. cost    ${total_cost:.4f}")
+    if "upstream" in report:
+        print(f"  upstream     {report['upstream']['requests']} API requests")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
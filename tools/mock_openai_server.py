@@ -0,0 +1,348 @@
+# tools/mock_openai_server.py
+
+"""
+Local stand-in for the OpenAI chat-completions API, for load tests.
+
+    python -m tools.mock_openai_server --port 8765 --latency lognormal:0.8,0.4 --error-rate 0.02
+
+Then point the app (or tools/load_test.py) at it:
+
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=mock streamlit run app.py
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any, List, Tuple
+
+from purchase_agreement.tokens import count_tokens
+
+
+# ------------------------------
+# 1. Latency + error settings
+# ------------------------------
+
+class LatencyModel:
+    """
+    Parse "fixed:0.5", "uniform:0.2,1.5", "normal:0.8,0.2" or
+    "lognormal:0.8,0.4" (median seconds, sigma) and draw samples in seconds.
+    """
+
+    def __init__(self, spec: str):
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p]
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            return p[0] if p else 0.0
+        if self.kind == "uniform":
+            return random.uniform(p[0], p[1])
+        if self.kind == "normal":
+            return max(0.0, random.gauss(p[0], p[1]))
+        # lognormal, parameterized by its median
+        median, sigma = p[0], p[1]
+        return random.lognormvariate(0.0, sigma) * median
+
+
+class MockSettings:
+    def __init__(
+        self,
+        latency: str = "fixed:0.3",
+        tokens_per_s: float = 80.0,
+        completion_tokens: int = 120,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        timeout_rate: float = 0.0,
+    ):
+        self.latency = LatencyModel(latency)  # time to first token
+        self.tokens_per_s = tokens_per_s
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.timeout_rate = timeout_rate  # requests that hang far past any client timeout
+
+
+# ------------------------------
+# 2. Token accounting
+# ------------------------------
+
+PROMPT_CACHE_MIN_TOKENS = 1024  # like the real API, only long prefixes are cached
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, int] = {
+    "requests": 0,
+    "streams": 0,
+    "errors_injected": 0,
+    "timeouts_injected": 0,
+    "prompt_tokens": 0,
+    "cached_tokens": 0,
+    "completion_tokens": 0,
+}
+_seen_prefixes: set = set()
+
+
+def _bump(name: str, amount: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def _prompt_usage(messages: List[Dict[str, Any]], model: str) -> Tuple[int, int]:
+    """
+    Prompt tokens plus how many of them a provider-side prefix cache would
+    have served: the longest run of leading messages seen before.
+    """
+    prompt_tokens = 0
+    cached_tokens = 0
+    still_cached = True
+    prefix = ""
+    with _stats_lock:
+        for message in messages:
+            content = str(message.get("content") or "")
+            prompt_tokens += count_tokens(content, model)
+            prefix += message.get("role", "") + "\x00" + content + "\x00"
+            if still_cached and prefix in _seen_prefixes:
+                cached_tokens = prompt_tokens
+            else:
+                still_cached = False
+            _seen_prefixes.add(prefix)
+
+    if cached_tokens < PROMPT_CACHE_MIN_TOKENS:
+        cached_tokens = 0
+    return prompt_tokens, cached_tokens
+
+
+def _answer_words(messages: List[Dict[str, Any]], count: int) -> List[str]:
+    question = next(
+        (str(m.get("content")) for m in reversed(messages) if m.get("role") == "user"),
+        "",
+    )
+    words = ["Mock", "answer", "about:"] + question.split()[:12]
+    filler = "In California this is usually negotiable so confirm the details with your agent".split()
+    while len(words) < count:
+        words.extend(filler)
+    return words[:count]
+
+
+def get_mock_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
+# ------------------------------
+# 3. HTTP handler
+# ------------------------------
+
+class ChatCompletionsHandler(BaseHTTPRequestHandler):
+    server_version = "MockOpenAI/1.0"
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    settings: MockSettings = MockSettings()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") in ("/stats", "/v1/stats"):
+            self._send_json(200, get_mock_stats())
+        else:
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path.rstrip("/") not in ("/chat/completions", "/v1/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+
+        settings = self.settings
+        _bump("requests")
+
+        roll = random.random()
+        if roll < settings.timeout_rate:
+            _bump("timeouts_injected")
+            time.sleep(3600)
+            return
+        if roll < settings.timeout_rate + settings.error_rate:
+            _bump("errors_injected")
+            time.sleep(settings.latency.sample() / 4)
+            headers = {"Retry-After": "1"} if settings.error_status == 429 else None
+            self._send_json(
+                settings.error_status,
+                {"error": {"message": "Injected mock error", "type": "server_error", "code": None}},
+                headers,
+            )
+            return
+
+        model = request.get("model", "gpt-4.1-mini")
+        messages = request.get("messages", [])
+        prompt_tokens, cached_tokens = _prompt_usage(messages, model)
+        words = _answer_words(messages, settings.completion_tokens)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(words),
+            "total_tokens": prompt_tokens + len(words),
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+        _bump("prompt_tokens", prompt_tokens)
+        _bump("cached_tokens", cached_tokens)
+        _bump("completion_tokens", len(words))
+
+        completion_id = "chatcmpl-mock-" + uuid.uuid4().hex[:12]
+        created = int(time.time())
+        time.sleep(settings.latency.sample())
+
+        if not request.get("stream"):
+            time.sleep(len(words) / settings.tokens_per_s)
+            self._send_json(
+                200,
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": " ".join(words)},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": usage,
+                },
+            )
+            return
+
+        _bump("streams")
+        self._stream(completion_id, created, model, words, usage, request)
+
+    def _stream(
+        self,
+        completion_id: str,
+        created: int,
+        model: str,
+        words: List[str],
+        usage: Dict[str, Any],
+        request: Dict[str, Any],
+    ) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(payload: Any) -> None:
+            data = payload if isinstance(payload, str) else json.dumps(payload)
+            self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> Dict[str, Any]:
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+
+        try:
+            send(chunk({"role": "assistant", "content": ""}))
+            for i, word in enumerate(words):
+                send(chunk({"content": (" " if i else "") + word}))
+                time.sleep(1.0 / self.settings.tokens_per_s)
+            send(chunk({}, "stop"))
+            if (request.get("stream_options") or {}).get("include_usage"):
+                send(
+                    {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [],
+                        "usage": usage,
+                    }
+                )
+            send("[DONE]")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+# ------------------------------
+# 4. Entry points
+# ------------------------------
+
+def start_mock_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    settings: Optional[MockSettings] = None,
+) -> ThreadingHTTPServer:
+    """
+    Start the mock server on a background thread (port 0 picks a free port)
+    and return it; the base URL is http://host:server.server_port/v1.
+    """
+    handler = type("Handler", (ChatCompletionsHandler,), {"settings": settings or MockSettings()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-openai", daemon=True).start()
+    return server
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", default="fixed:0.3", help="time-to-first-token distribution, e.g. lognormal:0.8,0.4")
+    parser.add_argument("--tokens-per-s", type=float, default=80.0)
+    parser.add_argument("--completion-tokens", type=int, default=120)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+
+
+def settings_from_args(args: argparse.Namespace) -> MockSettings:
+    return MockSettings(
+        latency=args.latency,
+        tokens_per_s=args.tokens_per_s,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        timeout_rate=args.timeout_rate,
+    )
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible mock server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_mock_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = start_mock_server(args.host, args.port, settings_from_args(args))
+    print(f"Mock OpenAI API on http://{args.host}:{server.server_port}/v1 (stats at /v1/stats)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
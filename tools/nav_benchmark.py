@@ -0,0 +1,106 @@
+# tools/nav_benchmark.py
+
+"""
+Time one rerun of the Purchase Agreement flow (what typing a character in a
+field costs) with every page rendered in tabs vs only the active section.
+
+Runs app.py headless through Streamlit's AppTest, so no browser or API key
+is needed; AI calls are not triggered.
+
+    python -m tools.nav_benchmark --reruns 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+
+
+def _new_app(nav_mode: str):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=120)
+    at.session_state["current_mode"] = "purchase_agreement"
+    at.session_state["pa_nav_mode"] = nav_mode
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"app.py failed in {nav_mode} mode: {at.exception[0].value}")
+    return at
+
+
+def _time_reruns(at, reruns: int) -> List[float]:
+    timings = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def _summary(timings: List[float]) -> Dict[str, float]:
+    ordered = sorted(timings)
+    return {
+        "mean_ms": statistics.mean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+    }
+
+
+def run_benchmark(reruns: int) -> Dict[str, Any]:
+    """
+    Per-rerun script time in tabs mode, and in sections mode with each page
+    active in turn (the flow a buyer walks through).
+    """
+    from purchase_agreement.navigation import PAGE_KEY
+
+    tabs = _new_app("tabs")
+    _time_reruns(tabs, 2)  # warm-up: imports, first-run state
+    report: Dict[str, Any] = {"reruns": reruns, "tabs": _summary(_time_reruns(tabs, reruns)), "sections": {}}
+
+    sections = _new_app("sections")
+    labels = list(sections.radio(key=PAGE_KEY).options)
+    all_timings: List[float] = []
+    for label in labels:
+        sections.radio(key=PAGE_KEY).set_value(label).run()
+        timings = _time_reruns(sections, reruns)
+        all_timings.extend(timings)
+        report["sections"][label] = _summary(timings)
+    report["sections_all_pages"] = _summary(all_timings)
+    report["speedup"] = report["tabs"]["mean_ms"] / report["sections_all_pages"]["mean_ms"]
+    return report
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Compare per-rerun script time: tabs vs active section only")
+    parser.add_argument("--reruns", type=int, default=20, help="timed reruns per mode and page")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    # Must be set before the app imports the AI modules: no background calls.
+    os.environ["AI_CACHE_DIR"] = tempfile.mkdtemp(prefix="pa-navbench-")
+    os.environ["AI_PREFETCH_ENABLED"] = "0"
+
+    report = run_benchmark(args.reruns)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"per-rerun script time over {args.reruns} reruns (ms)")
+    print(f"  {'tabs (all pages)':<60} mean {report['tabs']['mean_ms']:7.1f}  p95 {report['tabs']['p95_ms']:7.1f}")
+    for label, summary in report["sections"].items():
+        print(f"  {'sections: ' + label:<60} mean {summary['mean_ms']:7.1f}  p95 {summary['p95_ms']:7.1f}")
+    overall = report["sections_all_pages"]
+    print(f"  {'sections (all pages)':<60} mean {overall['mean_ms']:7.1f}  p95 {overall['p95_ms']:7.1f}")
+    print(f"  speedup {report['speedup']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))